@@ -0,0 +1,85 @@
+"""
+Benchmark for saving production planner timelines against a live workspace database.
+
+For jobs of increasing size it times the set-based WorkspaceDB.save_job_flowtag_timelines
+for a first save (every row moves), an unchanged save, and dragging one bar (one flowtag
+moves), next to the previous per-row implementation for the same drag.
+
+Usage:
+    python -m benchmarks.flowtag_timeline
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.workspace_add_job import FLOWTAG, SIZES, make_job
+from utils.database.pool_registry import PoolRegistry
+from utils.database.workspace_db import WorkspaceDB
+
+START = datetime(2026, 1, 5, 7, tzinfo=timezone.utc)
+
+
+def make_timeline(shift_days: int = 0) -> dict:
+    timeline = {}
+    for index, tag in enumerate(FLOWTAG["tags"]):
+        starting_date = START + timedelta(days=index * 2)
+        # Only the last bar is dragged
+        if index == len(FLOWTAG["tags"]) - 1:
+            starting_date += timedelta(days=shift_days)
+        timeline[tag] = {
+            "starting_date": starting_date.isoformat().replace("+00:00", "Z"),
+            "ending_date": (starting_date + timedelta(days=2)).isoformat().replace("+00:00", "Z"),
+        }
+    return timeline
+
+
+async def legacy_save(db: WorkspaceDB, job_id: int, timeline: dict):
+    """The per-row implementation this replaced: fetch every row, compute dates in Python, executemany."""
+    parsed = {
+        tag: (
+            datetime.fromisoformat(dates["starting_date"].replace("Z", "+00:00")),
+            datetime.fromisoformat(dates["ending_date"].replace("Z", "+00:00")),
+        )
+        for tag, dates in timeline.items()
+    }
+    async with db.db_pool.acquire() as conn:
+        for table in ("assembly_laser_cut_parts", "assemblies"):
+            updates = []
+            for row in await conn.fetch(f"SELECT id, flowtag FROM {table} WHERE job_id = $1", job_id):
+                dates = [parsed[tag] for tag in row["flowtag"] if tag in parsed]
+                if dates:
+                    updates.append((row["id"], min(start for start, _ in dates), max(end for _, end in dates)))
+            await conn.executemany(f"UPDATE {table} SET start_time = $2, end_time = $3, modified_at = NOW() WHERE id = $1", updates)
+
+
+async def timed(coroutine) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = await coroutine
+    return time.perf_counter() - started, result
+
+
+async def main():
+    db = WorkspaceDB()
+    await db.connect()
+
+    print(f"{'parts':>8} {'first save':>11} {'unchanged':>10} {'drag':>8} {'rows moved':>11} {'legacy drag':>12}")
+    for assemblies, parts, quantity in SIZES:
+        job_id = await db.add_job(make_job(assemblies, parts, quantity))
+        try:
+            first, _ = await timed(db.save_job_flowtag_timelines({job_id: make_timeline()}))
+            unchanged, _ = await timed(db.save_job_flowtag_timelines({job_id: make_timeline()}))
+            drag, updated = await timed(db.save_job_flowtag_timelines({job_id: make_timeline(shift_days=1)}))
+            legacy, _ = await timed(legacy_save(db, job_id, make_timeline(shift_days=2)))
+
+            rows = assemblies * parts * quantity
+            moved = updated["assembly_laser_cut_parts"] + updated["assemblies"]
+            print(f"{rows:>8} {first:>10.3f}s {unchanged:>9.3f}s {drag:>7.3f}s {moved:>11} {legacy:>11.3f}s")
+        finally:
+            await db.delete_job(job_id)
+
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
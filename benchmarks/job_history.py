@@ -0,0 +1,200 @@
+"""
+Benchmark for keyframe + delta job history against the previous full-copy layout.
+
+Saves one synthetic job SAVES times, changing a few part quantities (and now and then
+adding an assembly) per save, the way the job planner does. The same versions are
+written to the real jobs_history table through JobsHistroyDB and, in the previous
+layout (full job_data/nests/assemblies plus diff_from/diff_to on every version), to a
+scratch table. Reports stored bytes per layout and the latency of reading history.
+
+Usage:
+    python -m benchmarks.job_history [saves]
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+import msgspec
+
+from config.environments import Environment
+from utils.database.jobs_db import JobsDB
+from utils.database.pool_registry import PoolRegistry
+
+SAVES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+PAGE_SIZE = 50
+LEGACY_TABLE = "jobs_history_benchmark_legacy"
+
+
+def make_assembly(index: int, parts: int) -> dict:
+    return {
+        "name": f"BENCH-ASSEMBLY-{index}",
+        "meta_data": {"quantity": 1},
+        "workspace_data": {"flowtag": {"tags": ["Laser Cutting", "Bending", "Welding"]}},
+        "laser_cut_parts": [
+            {
+                "name": f"BENCH-PART-{index}-{p}",
+                "inventory_data": {"quantity": 1},
+                "meta_data": {"material": "Mild Steel", "gauge": "16", "notes": "x" * 40},
+                "prices": {"price": 1.5},
+            }
+            for p in range(parts)
+        ],
+        "components": [{"part_name": f"BENCH-COMPONENT-{index}", "quantity": 2}],
+        "sub_assemblies": [],
+    }
+
+
+def make_job() -> dict:
+    return {
+        "job_data": {"name": f"Benchmark History Job {time.time()}", "type": 0, "order_number": 1234},
+        "nests": [{"name": f"BENCH-NEST-{n}", "sheet_count": 1, "laser_cut_parts": []} for n in range(20)],
+        "assemblies": [make_assembly(a, 20) for a in range(20)],
+    }
+
+
+def mutate(job: dict, rng: random.Random) -> dict:
+    job = msgspec.json.decode(msgspec.json.encode(job))
+    for _ in range(3):
+        assembly = rng.choice(job["assemblies"])
+        part = rng.choice(assembly["laser_cut_parts"])
+        part["inventory_data"]["quantity"] += 1
+    if rng.random() < 0.02:
+        job["assemblies"].append(make_assembly(len(job["assemblies"]), 20))
+    job["nests"][rng.randrange(len(job["nests"]))]["sheet_count"] += 1
+    return job
+
+
+def legacy_diff(prev, current, path="") -> dict:
+    # JobsHistroyDB.compute_diff: lists are compared (and stored) whole
+    changes = {}
+    if isinstance(prev, dict) and isinstance(current, dict):
+        for key in set(prev) | set(current):
+            changes.update(legacy_diff(prev.get(key), current.get(key), f"{path}.{key}" if path else key))
+    elif prev != current:
+        changes[path] = {"from": prev, "to": current}
+    return changes
+
+
+async def write_legacy(conn, versions: list[dict]):
+    await conn.execute(
+        f"""
+        CREATE TABLE {LEGACY_TABLE} (
+            id SERIAL PRIMARY KEY,
+            job_id INT,
+            version INT NOT NULL,
+            job_data JSONB,
+            nests JSONB,
+            assemblies JSONB,
+            diff_from JSONB,
+            diff_to JSONB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE UNIQUE INDEX ON {LEGACY_TABLE} (job_id, version);
+        """
+    )
+    records = []
+    for index, job in enumerate(versions):
+        diff = legacy_diff(versions[index - 1], job) if index else {}
+        records.append(
+            (
+                0,
+                index + 1,
+                json.dumps(job["job_data"]),
+                json.dumps(job["nests"]),
+                json.dumps(job["assemblies"]),
+                json.dumps({k: v["from"] for k, v in diff.items()}),
+                json.dumps({k: v["to"] for k, v in diff.items()}),
+            )
+        )
+    await conn.executemany(
+        f"""
+        INSERT INTO {LEGACY_TABLE} (job_id, version, job_data, nests, assemblies, diff_from, diff_to)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        """,
+        records,
+    )
+
+
+async def read_legacy(conn) -> list[dict]:
+    # The previous get_job_history_diff: every version, decoded and diffed in Python
+    rows = await conn.fetch(f"SELECT version, job_data, nests, assemblies FROM {LEGACY_TABLE} WHERE job_id = 0 ORDER BY version")
+    versions = [{"job_data": json.loads(r["job_data"]), "nests": json.loads(r["nests"]), "assemblies": json.loads(r["assemblies"])} for r in rows]
+    return [{"from_version": i, "to_version": i + 1, "changes": legacy_diff(versions[i - 1], versions[i])} for i in range(1, len(versions))]
+
+
+async def timed(label: str, coroutine):
+    started = time.perf_counter()
+    result = await coroutine
+    print(f"  {label:<40} {(time.perf_counter() - started) * 1000:9.1f} ms")
+    return result
+
+
+async def main():
+    rng = random.Random(42)
+    jobs_db = JobsDB()
+    await jobs_db.connect()
+    history_db = jobs_db.jobs_history_db
+    await history_db.connect()
+    pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "benchmark")
+
+    versions = [make_job()]
+    for _ in range(SAVES - 1):
+        versions.append(mutate(versions[-1], rng))
+
+    job_id = await jobs_db.add_job(versions[0])
+    try:
+        started = time.perf_counter()
+        for job in versions:
+            await history_db.insert_history_job(job_id, job, modified_by="benchmark")
+        print(f"keyframe + delta: {SAVES} saves in {time.perf_counter() - started:.2f}s")
+
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {LEGACY_TABLE}")
+            await write_legacy(conn, versions)
+            legacy_bytes = await conn.fetchval(
+                f"""
+                SELECT SUM(pg_column_size(job_data) + pg_column_size(nests) + pg_column_size(assemblies)
+                    + pg_column_size(diff_from) + pg_column_size(diff_to))
+                FROM {LEGACY_TABLE}
+                """
+            )
+            legacy_table_bytes = await conn.fetchval(f"SELECT pg_total_relation_size('{LEGACY_TABLE}')")
+
+        stats = (await history_db.get_storage_stats(job_id))[0]
+        print("\nStorage")
+        print(f"  full copies:      {legacy_bytes / 1024 / 1024:8.2f} MiB in columns, {legacy_table_bytes / 1024 / 1024:8.2f} MiB table")
+        print(
+            f"  keyframe + delta: {stats['stored_bytes'] / 1024 / 1024:8.2f} MiB in columns "
+            f"({stats['versions']} versions, {stats['keyframes']} keyframes)"
+        )
+
+        print("\nLatency")
+        async with pool.acquire() as conn:
+            await timed("full copies: get_job_history_diff (all)", read_legacy(conn))
+        await timed(f"get_job_history (newest {PAGE_SIZE})", history_db.get_job_history(job_id, limit=PAGE_SIZE))
+        page = await timed(f"get_job_history_diff (newest {PAGE_SIZE})", history_db.get_job_history_diff(job_id, limit=PAGE_SIZE))
+        await timed(
+            f"get_job_history_diff (next {PAGE_SIZE})",
+            history_db.get_job_history_diff(job_id, limit=PAGE_SIZE, before_version=page[-1]["to_version"]),
+        )
+        await timed("get_job_history_diff (all)", history_db.get_job_history_diff(job_id))
+        middle = SAVES // 2
+        rebuilt = await timed(f"get_job_version ({middle})", history_db.get_job_version(job_id, middle))
+
+        # JSONB doesn't keep key order, so compare as dicts
+        expected = versions[middle - 1]
+        ok = rebuilt == {"job_data": expected["job_data"], "nests": expected["nests"], "assemblies": expected["assemblies"]}
+        print(f"\nRebuilt version {middle} matches: {ok}")
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {LEGACY_TABLE}")
+            await conn.execute("DELETE FROM jobs_history WHERE job_id = $1", job_id)
+        await jobs_db.delete_job(job_id)
+        await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+Concurrency stress test for LaserCutPartsInventoryDB.apply_quantity_deltas.
+
+WORKERS concurrent callers each apply ROUNDS batches to the same PARTS parts
+(ADD 2, then SUBTRACT 1, so every round nets +1 per part). Half of the parts
+don't exist when the run starts, so concurrent first inserts race too. Afterwards
+every part must have exactly the expected quantity and one history version
+per applied update. The previous read-modify-write path is run the same way
+for comparison, which shows the lost updates it allowed.
+
+Usage:
+    python -m benchmarks.laser_cut_quantities_stress [workers] [rounds]
+"""
+
+import asyncio
+import sys
+import time
+
+from config.environments import Environment
+from utils.database.laser_cut_parts_inventory_db import LaserCutPartsInventoryDB
+from utils.database.pool_registry import PoolRegistry
+
+WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+ROUNDS = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+PARTS = 20
+
+
+def make_part(name: str, quantity: float) -> dict:
+    return {"name": name, "categories": [], "inventory_data": {"quantity": quantity}, "meta_data": {}}
+
+
+async def legacy_add(db: LaserCutPartsInventoryDB, name: str, quantity: float):
+    # What upsert_quantities did before: read, add in Python, write back
+    part_id = await db.get_laser_cut_part_id(name)
+    part = await db.get_laser_cut_part_no_cache(part_id)
+    part["inventory_data"]["quantity"] += quantity
+    await db.update_laser_cut_part(part_id, part, modified_by="stress")
+
+
+async def cleanup(db: LaserCutPartsInventoryDB, prefix: str):
+    pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "benchmark")
+    async with pool.acquire() as conn:
+        await conn.execute(
+            f"""
+            DELETE FROM laser_cut_parts_inventory_history
+            WHERE laser_cut_part_id IN (SELECT id FROM {db.TABLE_NAME} WHERE part_name LIKE $1)
+            """,
+            f"{prefix}%",
+        )
+        await conn.execute(f"DELETE FROM {db.TABLE_NAME} WHERE part_name LIKE $1", f"{prefix}%")
+
+
+async def count_versions(db: LaserCutPartsInventoryDB, part_id: int) -> int:
+    pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "benchmark")
+    async with pool.acquire() as conn:
+        return await conn.fetchval("SELECT COUNT(*) FROM laser_cut_parts_inventory_history WHERE laser_cut_part_id = $1", part_id)
+
+
+async def run_set_based(db: LaserCutPartsInventoryDB, prefix: str) -> bool:
+    names = [f"{prefix}{i}" for i in range(PARTS)]
+    # Pre-create half of the parts, the rest are inserted by whichever worker gets there first
+    await db.apply_quantity_deltas([make_part(name, 0) for name in names[: PARTS // 2]])
+
+    async def worker():
+        for _ in range(ROUNDS):
+            await db.apply_quantity_deltas([make_part(name, 2) for name in names], operation="ADD", modified_by="stress")
+            await db.apply_quantity_deltas([make_part(name, 1) for name in names], operation="SUBTRACT", modified_by="stress")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(WORKERS)))
+    elapsed = time.perf_counter() - started
+
+    ok = True
+    expected = WORKERS * ROUNDS
+    for index, name in enumerate(names):
+        part_id = await db.get_laser_cut_part_id(name)
+        quantity = (await db.get_laser_cut_part_no_cache(part_id))["inventory_data"]["quantity"]
+        versions = await count_versions(db, part_id)
+        # Pre-created parts: every call is an update. Others: the first ADD inserted the part.
+        expected_versions = 2 * WORKERS * ROUNDS - (0 if index < PARTS // 2 else 1)
+        if quantity != expected or versions != expected_versions:
+            ok = False
+            print(f"  {name}: quantity {quantity} (expected {expected}), versions {versions} (expected {expected_versions})")
+
+    calls = 2 * WORKERS * ROUNDS
+    print(f"set-based: {calls} batches of {PARTS} parts in {elapsed:.2f}s ({calls * PARTS / elapsed:.0f} part updates/sec) -> {'OK' if ok else 'FAILED'}")
+    return ok
+
+
+async def run_legacy(db: LaserCutPartsInventoryDB, prefix: str):
+    names = [f"{prefix}{i}" for i in range(PARTS)]
+    await db.apply_quantity_deltas([make_part(name, 0) for name in names])
+
+    async def worker():
+        for _ in range(ROUNDS):
+            for name in names:
+                await legacy_add(db, name, 1)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(WORKERS)))
+    elapsed = time.perf_counter() - started
+
+    expected = WORKERS * ROUNDS
+    lost = 0
+    for name in names:
+        part_id = await db.get_laser_cut_part_id(name)
+        lost += expected - (await db.get_laser_cut_part_no_cache(part_id))["inventory_data"]["quantity"]
+    print(f"legacy read-modify-write: {elapsed:.2f}s, lost {lost:.0f} of {expected * PARTS} increments")
+
+
+async def main():
+    db = LaserCutPartsInventoryDB()
+    await db.connect()
+
+    prefix = f"STRESS-{int(time.time())}-"
+    try:
+        ok = await run_set_based(db, f"{prefix}SET-")
+        await run_legacy(db, f"{prefix}LEGACY-")
+    finally:
+        await cleanup(db, prefix)
+        await db.cache_manager.shutdown()
+        await PoolRegistry.close_all()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,255 @@
+"""
+Benchmark for the assembly_laser_cut_parts triggers against a live workspace database.
+
+Adds a job with one 5,000-unit part group, moves it to its second flowtag, then advances
+half of it, lowest ids first, the way WorkspaceDB.mark_workorder_parts_complete does. The
+timed advance runs once with the statement-level triggers from workspace.sql and once with
+the previous row-level triggers (timeline, notifications and part groups, and without the
+partial index on open timeline rows) swapped in. Each run happens in a transaction that is
+rolled back, so nothing is left behind, but the swap locks the table: use a development database.
+
+Advancing a whole group in one statement fails with the row-level group trigger: each row's
+trigger runs after the statement, so the lookup of the group's next lowest part finds none.
+
+Usage:
+    python -m benchmarks.part_status_triggers
+"""
+
+import asyncio
+import time
+
+from benchmarks.workspace_add_job import make_job
+from utils.database.pool_registry import PoolRegistry
+from utils.database.workspace_db import WorkspaceDB
+
+GROUP_SIZE = 5000
+
+ROW_LEVEL_TRIGGERS_SQL = """
+DROP TRIGGER laser_cut_parts_view_insert_trigger ON assembly_laser_cut_parts;
+DROP TRIGGER laser_cut_parts_view_update_trigger ON assembly_laser_cut_parts;
+DROP TRIGGER laser_cut_parts_view_delete_trigger ON assembly_laser_cut_parts;
+DROP TRIGGER trg_part_status_timeline_statement ON assembly_laser_cut_parts;
+DROP TRIGGER trg_maintain_grouped_laser_cut_parts_inserted ON assembly_laser_cut_parts;
+DROP TRIGGER trg_maintain_grouped_laser_cut_parts_updated ON assembly_laser_cut_parts;
+DROP TRIGGER trg_maintain_grouped_laser_cut_parts_deleted ON assembly_laser_cut_parts;
+DROP INDEX idx_part_status_timeline_open;
+
+CREATE FUNCTION benchmark_row_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'view_grouped_laser_cut_parts_by_job',
+        json_build_object(
+            'type', TG_OP, 'table', TG_TABLE_NAME,
+            'job_id', COALESCE(NEW.job_id, OLD.job_id), 'part_name', COALESCE(NEW.name, OLD.name),
+            'flowtag', COALESCE(NEW.flowtag, OLD.flowtag), 'flowtag_index', COALESCE(NEW.flowtag_index, OLD.flowtag_index),
+            'flowtag_status_index', COALESCE(NEW.flowtag_status_index, OLD.flowtag_status_index),
+            'recut', COALESCE(NEW.recut, OLD.recut), 'recoat', COALESCE(NEW.recoat, OLD.recoat),
+            'start_time', COALESCE(NEW.start_time, OLD.start_time), 'end_time', COALESCE(NEW.end_time, OLD.end_time),
+            'is_timing', COALESCE(NEW.is_timing, OLD.is_timing)
+        )::text
+    );
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION benchmark_row_timeline() RETURNS trigger AS $$
+BEGIN
+    IF NEW.flowtag_index = cardinality(NEW.flowtag) THEN
+        UPDATE part_status_timeline SET ended_at = now() WHERE part_id = OLD.id AND ended_at IS NULL;
+        RETURN NEW;
+    END IF;
+    IF OLD.flowtag_index IS DISTINCT FROM NEW.flowtag_index
+       OR OLD.flowtag_status_index IS DISTINCT FROM NEW.flowtag_status_index
+       OR OLD.recut IS DISTINCT FROM NEW.recut
+       OR OLD.recoat IS DISTINCT FROM NEW.recoat
+       OR OLD.is_timing IS DISTINCT FROM NEW.is_timing
+    THEN
+        UPDATE part_status_timeline SET ended_at = now() WHERE part_id = OLD.id AND ended_at IS NULL;
+        INSERT INTO part_status_timeline (
+            part_id, name, flowtag, flowtag_index, flowtag_name, flowtag_status_index,
+            recut, recoat, is_timing, changed_by, started_at
+        )
+        VALUES (
+            OLD.id, OLD.name, NEW.flowtag, NEW.flowtag_index, NEW.flowtag[NEW.flowtag_index + 1], NEW.flowtag_status_index,
+            NEW.recut, NEW.recoat, NEW.is_timing, NEW.changed_by, now()
+        );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION benchmark_row_groups()
+RETURNS trigger AS $$
+DECLARE
+    old_group_row_id BIGINT;
+    old_group_id BIGINT;
+    old_group_quantity BIGINT;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.job_id = NEW.job_id
+       AND OLD.name = NEW.name
+       AND OLD.flowtag = NEW.flowtag
+       AND OLD.flowtag_index = NEW.flowtag_index
+       AND OLD.flowtag_status_index = NEW.flowtag_status_index
+       AND OLD.recut = NEW.recut
+       AND OLD.recoat = NEW.recoat
+       AND OLD.is_timing = NEW.is_timing
+       AND OLD.start_time IS NOT DISTINCT FROM NEW.start_time
+       AND OLD.end_time IS NOT DISTINCT FROM NEW.end_time
+    THEN
+        -- Group membership unchanged
+        UPDATE grouped_laser_cut_parts
+        SET modified_at = GREATEST(modified_at, NEW.modified_at)
+        WHERE job_id = NEW.job_id
+          AND name = NEW.name
+          AND flowtag = NEW.flowtag
+          AND flowtag_index = NEW.flowtag_index
+          AND flowtag_status_index = NEW.flowtag_status_index
+          AND recut = NEW.recut
+          AND recoat = NEW.recoat
+          AND is_timing = NEW.is_timing
+          AND start_time IS NOT DISTINCT FROM NEW.start_time
+          AND end_time IS NOT DISTINCT FROM NEW.end_time;
+    ELSE
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE grouped_laser_cut_parts
+            SET quantity = quantity - 1
+            WHERE job_id = OLD.job_id
+              AND name = OLD.name
+              AND flowtag = OLD.flowtag
+              AND flowtag_index = OLD.flowtag_index
+              AND flowtag_status_index = OLD.flowtag_status_index
+              AND recut = OLD.recut
+              AND recoat = OLD.recoat
+              AND is_timing = OLD.is_timing
+              AND start_time IS NOT DISTINCT FROM OLD.start_time
+              AND end_time IS NOT DISTINCT FROM OLD.end_time
+            RETURNING id, group_id, quantity INTO old_group_row_id, old_group_id, old_group_quantity;
+
+            IF old_group_row_id IS NOT NULL THEN
+                IF old_group_quantity <= 0 THEN
+                    DELETE FROM grouped_laser_cut_parts WHERE id = old_group_row_id;
+                ELSIF old_group_id = OLD.id THEN
+                    UPDATE grouped_laser_cut_parts
+                    SET group_id = (
+                        SELECT MIN(w.id)
+                        FROM assembly_laser_cut_parts w
+                        WHERE w.job_id = OLD.job_id
+                          AND w.name = OLD.name
+                          AND w.flowtag = OLD.flowtag
+                          AND w.flowtag_index = OLD.flowtag_index
+                          AND w.flowtag_status_index = OLD.flowtag_status_index
+                          AND w.recut = OLD.recut
+                          AND w.recoat = OLD.recoat
+                          AND w.is_timing = OLD.is_timing
+                          AND w.start_time IS NOT DISTINCT FROM OLD.start_time
+                          AND w.end_time IS NOT DISTINCT FROM OLD.end_time
+                    )
+                    WHERE id = old_group_row_id;
+                END IF;
+            END IF;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO grouped_laser_cut_parts (
+                group_id, job_id, name, flowtag, flowtag_index, flowtag_status_index,
+                recut, recoat, is_timing, start_time, end_time, quantity, created_at, modified_at
+            )
+            VALUES (
+                NEW.id, NEW.job_id, NEW.name, NEW.flowtag, NEW.flowtag_index, NEW.flowtag_status_index,
+                NEW.recut, NEW.recoat, NEW.is_timing, NEW.start_time, NEW.end_time, 1, NEW.created_at, NEW.modified_at
+            )
+            ON CONFLICT (job_id, name, flowtag, flowtag_index, flowtag_status_index, recut, recoat, is_timing, start_time, end_time)
+            DO UPDATE SET
+                quantity = grouped_laser_cut_parts.quantity + 1,
+                group_id = LEAST(grouped_laser_cut_parts.group_id, EXCLUDED.group_id),
+                created_at = LEAST(grouped_laser_cut_parts.created_at, EXCLUDED.created_at),
+                modified_at = GREATEST(grouped_laser_cut_parts.modified_at, EXCLUDED.modified_at);
+        END IF;
+    END IF;
+
+    IF TG_OP = 'INSERT'
+       OR (TG_OP = 'UPDATE' AND (OLD.meta_data IS DISTINCT FROM NEW.meta_data OR OLD.workspace_data IS DISTINCT FROM NEW.workspace_data))
+    THEN
+        INSERT INTO laser_cut_part_latest_data (name, meta_data, workspace_data, modified_at)
+        VALUES (NEW.name, NEW.meta_data, NEW.workspace_data, NEW.modified_at)
+        ON CONFLICT (name) DO UPDATE SET
+            meta_data = EXCLUDED.meta_data,
+            workspace_data = EXCLUDED.workspace_data,
+            modified_at = EXCLUDED.modified_at
+        WHERE laser_cut_part_latest_data.modified_at IS NULL
+           OR EXCLUDED.modified_at >= laser_cut_part_latest_data.modified_at;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER benchmark_row_notify AFTER INSERT OR UPDATE OR DELETE ON assembly_laser_cut_parts
+    FOR EACH ROW EXECUTE FUNCTION benchmark_row_notify();
+CREATE TRIGGER benchmark_row_timeline AFTER UPDATE ON assembly_laser_cut_parts
+    FOR EACH ROW EXECUTE FUNCTION benchmark_row_timeline();
+CREATE TRIGGER benchmark_row_groups AFTER INSERT OR UPDATE OR DELETE ON assembly_laser_cut_parts
+    FOR EACH ROW EXECUTE FUNCTION benchmark_row_groups();
+"""
+
+# Same statement as ViewDB.update_flowtag_index, limited to the lowest $5 ids
+ADVANCE_SQL = """
+UPDATE assembly_laser_cut_parts
+SET
+    flowtag_index = $1,
+    flowtag_status_index = 0,
+    recut = false,
+    recoat = false,
+    is_timing = false,
+    changed_by = 'benchmark',
+    modified_at = NOW()
+WHERE id IN (
+    SELECT id
+    FROM assembly_laser_cut_parts
+    WHERE
+        job_id = $2
+        AND name = $3
+        AND flowtag_index = $4
+        AND flowtag_status_index = 0
+    ORDER BY id
+    LIMIT $5
+)
+"""
+
+
+async def advance_group(db: WorkspaceDB, job_id: int, row_level: bool) -> tuple[float, int]:
+    async with db.db_pool.acquire() as conn:
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            # The first advance opens a timeline row per part, the timed one closes and reopens half of them
+            await conn.execute(ADVANCE_SQL, 1, job_id, "BENCH-PART-0", 0, GROUP_SIZE)
+            if row_level:
+                await conn.execute(ROW_LEVEL_TRIGGERS_SQL)
+            started = time.perf_counter()
+            status = await conn.execute(ADVANCE_SQL, 2, job_id, "BENCH-PART-0", 1, GROUP_SIZE // 2)
+            elapsed = time.perf_counter() - started
+            return elapsed, int(status.split()[-1])
+        finally:
+            await transaction.rollback()
+
+
+async def main():
+    db = WorkspaceDB()
+    await db.connect()
+
+    job_id = await db.add_job(make_job(1, 1, GROUP_SIZE))
+    try:
+        print(f"{'triggers':>10} {'rows':>6} {'seconds':>9} {'rows/sec':>10}")
+        for row_level in (True, False):
+            elapsed, rows = await advance_group(db, job_id, row_level)
+            print(f"{'row' if row_level else 'statement':>10} {rows:>6} {elapsed:>9.3f} {rows / elapsed:>10.0f}")
+    finally:
+        await db.delete_job(job_id)
+
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
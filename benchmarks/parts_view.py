@@ -0,0 +1,131 @@
+"""
+Before/after latency benchmark for the grouped parts view.
+
+Seeds a synthetic job with ROWS assembly_laser_cut_parts rows (the
+grouping trigger runs during the seed), then compares the previous
+GROUP BY + correlated subquery view against the trigger-maintained
+grouped_laser_cut_parts table. The benchmark job is deleted afterwards.
+
+Usage:
+    python -m benchmarks.parts_view [rows]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry
+from utils.database.workspace_db import WorkspaceDB
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+BATCH_SIZE = 100_000
+RUNS = 5
+
+FLOWTAG = ["Laser Cutting", "Bending", "Welding", "Powder Coating"]
+
+LEGACY_VIEW = """
+    SELECT
+    MIN(w.id) AS group_id,
+    w.job_id,
+    w.name,
+    w.flowtag,
+    w.flowtag_index,
+    w.flowtag_status_index,
+    w.recut,
+    w.recoat,
+    w.is_timing,
+    w.flowtag[w.flowtag_index + 1] AS current_flowtag,
+    (w.flowtag_index = cardinality(w.flowtag)) AS is_completed,
+    COUNT(*) AS quantity,
+    MIN(w.start_time) AS start_time,
+    MAX(w.end_time) AS end_time,
+    (MAX(w.end_time) < NOW()) AS is_overdue,
+    (SELECT meta_data::jsonb FROM assembly_laser_cut_parts WHERE name = w.name ORDER BY modified_at DESC LIMIT 1) AS meta_data,
+    (SELECT workspace_data::jsonb FROM assembly_laser_cut_parts WHERE name = w.name ORDER BY modified_at DESC LIMIT 1) AS workspace_data,
+    MIN(w.created_at) AS created_at,
+    MAX(w.modified_at) AS modified_at
+    FROM assembly_laser_cut_parts w
+    GROUP BY w.job_id, w.name, w.flowtag, w.flowtag_index,
+            w.flowtag_status_index, w.recut, w.recoat,
+            w.is_timing, w.start_time, w.end_time
+"""
+
+FILTERS = {
+    "open parts": ("is_completed = false", []),
+    "open parts, one tag": ("is_completed = false AND current_flowtag = ANY($1::text[])", [["Bending"]]),
+}
+
+
+async def seed(conn, rows: int) -> int:
+    job_id = await conn.fetchval("INSERT INTO jobs (name, job_data) VALUES ($1, '{}'::jsonb) RETURNING id", f"Benchmark Parts View {time.time()}")
+    assembly_id = await conn.fetchval(
+        "INSERT INTO assemblies (job_id, name, flowtag) VALUES ($1, 'BENCH-ASSEMBLY', $2) RETURNING id",
+        job_id,
+        FLOWTAG,
+    )
+
+    for offset in range(0, rows, BATCH_SIZE):
+        count = min(BATCH_SIZE, rows - offset)
+        started = time.perf_counter()
+        await conn.execute(
+            """
+            INSERT INTO assembly_laser_cut_parts (job_id, assembly_id, name, flowtag, flowtag_index, start_time, end_time, meta_data, workspace_data)
+            SELECT
+                $1,
+                $2,
+                'BENCH-PART-' || (i % 2000),
+                $3::text[],
+                i % 5,
+                now() - ((i % 30) || ' days')::interval,
+                now() + ((i % 30) || ' days')::interval,
+                '{"material": "Mild Steel"}'::jsonb,
+                '{"flowtag": {}}'::jsonb
+            FROM generate_series($4::bigint, $5::bigint) AS i
+            """,
+            job_id,
+            assembly_id,
+            FLOWTAG,
+            offset,
+            offset + count - 1,
+        )
+        print(f"Seeded {offset + count:>9} rows ({time.perf_counter() - started:.1f}s)")
+
+    await conn.execute("ANALYZE assembly_laser_cut_parts; ANALYZE grouped_laser_cut_parts; ANALYZE laser_cut_part_latest_data;")
+    return job_id
+
+
+async def time_query(conn, query: str, params: list) -> tuple[float, int]:
+    timings = []
+    rows = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        rows = await conn.fetch(query, *params)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+async def main():
+    db = WorkspaceDB()
+    await db.connect()
+    pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "benchmark")
+
+    async with pool.acquire() as conn:
+        job_id = await seed(conn, ROWS)
+        try:
+            print(f"\n{'filter':<22} {'before (ms)':>12} {'after (ms)':>11} {'groups':>8}")
+            for label, (where, params) in FILTERS.items():
+                before, before_rows = await time_query(conn, f"SELECT * FROM ({LEGACY_VIEW}) v WHERE {where}", params)
+                after, after_rows = await time_query(conn, f"SELECT * FROM view_grouped_laser_cut_parts_by_job WHERE {where}", params)
+                if before_rows != after_rows:
+                    print(f"WARNING: group count mismatch for '{label}': {before_rows} vs {after_rows}")
+                print(f"{label:<22} {before:>12.1f} {after:>11.1f} {after_rows:>8}")
+        finally:
+            await conn.execute("DELETE FROM jobs WHERE id = $1", job_id)
+
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
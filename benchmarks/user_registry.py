@@ -0,0 +1,78 @@
+"""
+Microbenchmark of the per-request users.json overhead in BaseHandler.
+
+Compares the previous lookup (decode users.json and scan every client on each
+call) against UserRegistry, for a synthetic users.json of CLIENTS entries.
+
+Usage:
+    python -m benchmarks.user_registry [clients]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import msgspec
+
+from utils.cache.user_registry import UserRegistry
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+CALLS = 20_000
+
+
+def legacy_get_client_name(file_path: str, ip: str) -> str | None:
+    with open(file_path, "rb") as file:
+        data = msgspec.json.decode(file.read())
+    for client_name, client_data in data.items():
+        if client_data["ip"] == ip:
+            return client_name
+    return None
+
+
+def legacy_is_client_trusted(file_path: str, ip: str) -> bool:
+    with open(file_path, "rb") as file:
+        data = msgspec.json.decode(file.read())
+    for client_data in data.values():
+        if client_data["ip"] == ip:
+            return client_data["trusted"]
+    return False
+
+
+def bench(label: str, func) -> float:
+    started = time.perf_counter()
+    for i in range(CALLS):
+        func(f"10.0.{(i % CLIENTS) // 256}.{(i % CLIENTS) % 256}")
+    per_call = (time.perf_counter() - started) / CALLS * 1_000_000
+    print(f"{label:<40} {per_call:>8.2f} us/call")
+    return per_call
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "users.json")
+        users = {
+            f"client-{i}": {
+                "ip": f"10.0.{i // 256}.{i % 256}",
+                "trusted": i % 2 == 0,
+                "latest_version": "1.0.0",
+                "latest_connection": "2025-01-01 00:00:00",
+            }
+            for i in range(CLIENTS)
+        }
+        with open(file_path, "wb") as file:
+            file.write(msgspec.json.encode(users))
+
+        registry = UserRegistry(file_path)
+
+        print(f"{CLIENTS} clients, {CALLS} calls each")
+        # A typical request calls both (trusted check, then name for logging/history)
+        before = bench("before: get_client_name", lambda ip: legacy_get_client_name(file_path, ip))
+        before += bench("before: is_client_trusted", lambda ip: legacy_is_client_trusted(file_path, ip))
+        after = bench("after: get_client_name", registry.get_client_name)
+        after += bench("after: is_client_trusted", registry.is_client_trusted)
+        print(f"{'per request (both calls)':<40} {before:>8.2f} -> {after:.2f} us ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
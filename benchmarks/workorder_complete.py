@@ -0,0 +1,108 @@
+"""
+Benchmark for completing workorders against a live workspace database.
+
+Adds a synthetic job, puts its parts at flowtag index 1 and completes a workorder of
+increasing nest count with WorkspaceDB.mark_workorder_parts_complete, next to the previous
+implementation that ran one UPDATE per nested part occurrence. The job is deleted afterwards.
+
+Usage:
+    python -m benchmarks.workorder_complete
+"""
+
+import asyncio
+import time
+
+from benchmarks.workspace_add_job import make_job
+from utils.database.pool_registry import PoolRegistry
+from utils.database.workorders_db import WorkordersDB
+from utils.database.workspace_db import WorkspaceDB
+
+NEST_COUNTS = [10, 50, 200]
+PARTS_PER_NEST = 20
+
+LEGACY_ADVANCE_SQL = """
+WITH rows_to_advance AS (
+    SELECT id
+    FROM assembly_laser_cut_parts
+    WHERE name = $1
+      AND flowtag_index = 1
+    ORDER BY id
+    LIMIT $2
+)
+UPDATE assembly_laser_cut_parts p
+SET
+    flowtag_index = flowtag_index + 1,
+    flowtag_status_index = 0,
+    is_timing = false,
+    changed_by = $3,
+    modified_at = now()
+FROM rows_to_advance r
+WHERE p.id = r.id
+RETURNING p.id;
+"""
+
+
+def make_workorder(nests: int) -> dict:
+    return {
+        "nests": [
+            {"laser_cut_parts": [{"name": f"BENCH-PART-{part}", "inventory_data": {"quantity": 1}} for part in range(PARTS_PER_NEST)]}
+            for _ in range(nests)
+        ]
+    }
+
+
+def legacy_extract(workorder: dict) -> list[dict]:
+    return [
+        {"name": part["name"], "qty": int(part.get("inventory_data", {}).get("quantity", 1))}
+        for nest in workorder.get("nests", [])
+        for part in nest.get("laser_cut_parts", [])
+    ]
+
+
+async def legacy_complete(db: WorkspaceDB, parts: list[dict]) -> int:
+    advanced = 0
+    async with db.db_pool.acquire() as conn:
+        async with conn.transaction():
+            for part in parts:
+                advanced += len(await conn.fetch(LEGACY_ADVANCE_SQL, part["name"], part["qty"], "benchmark"))
+    return advanced
+
+
+async def reset(db: WorkspaceDB, job_id: int):
+    async with db.db_pool.acquire() as conn:
+        await conn.execute("UPDATE assembly_laser_cut_parts SET flowtag_index = 1 WHERE job_id = $1", job_id)
+
+
+async def main():
+    db = WorkspaceDB()
+    await db.connect()
+    workorders_db = WorkordersDB()
+
+    # Enough parts per name for the largest workorder
+    job_id = await db.add_job(make_job(max(NEST_COUNTS) // 10, PARTS_PER_NEST, 10))
+    try:
+        print(f"{'nests':>6} {'entries':>8} {'legacy':>9} {'set-based':>10} {'advanced':>9} {'speedup':>8}")
+        for nests in NEST_COUNTS:
+            workorder = make_workorder(nests)
+
+            await reset(db, job_id)
+            started = time.perf_counter()
+            legacy_advanced = await legacy_complete(db, legacy_extract(workorder))
+            legacy = time.perf_counter() - started
+
+            await reset(db, job_id)
+            started = time.perf_counter()
+            result = await db.mark_workorder_parts_complete(workorders_db._extract_parts_with_quantity(workorder), "benchmark", job_ids=[job_id])
+            set_based = time.perf_counter() - started
+
+            assert result["advanced_total"] == legacy_advanced, (result["advanced_total"], legacy_advanced)
+            entries = nests * PARTS_PER_NEST
+            print(f"{nests:>6} {entries:>8} {legacy:>8.3f}s {set_based:>9.3f}s {result['advanced_total']:>9} {legacy / set_based:>7.1f}x")
+    finally:
+        await db.delete_job(job_id)
+
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark for WorkspaceDB.add_job against a live workspace database.
+
+Builds synthetic jobs of increasing size, inserts each one, reports rows/sec and
+deletes the job afterwards.
+
+Usage:
+    python -m benchmarks.workspace_add_job
+"""
+
+import asyncio
+import time
+
+from utils.database.pool_registry import PoolRegistry
+from utils.database.workspace_db import WorkspaceDB
+
+FLOWTAG = {"tags": ["Laser Cutting", "Bending", "Welding", "Powder Coating"]}
+
+SIZES = [
+    # (assemblies, parts per assembly, quantity per part)
+    (5, 5, 2),
+    (10, 10, 5),
+    (20, 20, 10),
+    (40, 30, 20),
+]
+
+
+def make_part(index: int, quantity: int) -> dict:
+    return {
+        "name": f"BENCH-PART-{index}",
+        "inventory_data": {"quantity": quantity},
+        "meta_data": {"material": "Mild Steel", "gauge": "16"},
+        "prices": {"price": 1.5},
+        "paint_data": {},
+        "primer_data": {},
+        "powder_data": {},
+        "workspace_data": {"flowtag": FLOWTAG},
+    }
+
+
+def make_job(assemblies: int, parts: int, quantity: int) -> dict:
+    return {
+        "job_data": {"name": f"Benchmark Job {assemblies}x{parts}x{quantity} {time.time()}"},
+        "assemblies": [
+            {
+                "name": f"BENCH-ASSEMBLY-{a}",
+                "meta_data": {"quantity": 1},
+                "prices": {},
+                "paint_data": {},
+                "primer_data": {},
+                "powder_data": {},
+                "workspace_data": {"flowtag": FLOWTAG},
+                "laser_cut_parts": [make_part(p, quantity) for p in range(parts)],
+                "components": [{"part_name": f"BENCH-COMPONENT-{a}", "quantity": 2}],
+                "sub_assemblies": [],
+            }
+            for a in range(assemblies)
+        ],
+        "nests": [
+            {
+                "sheet": {"name": "Sheet"},
+                "laser_cut_parts": [make_part(p, quantity) for p in range(parts)],
+            }
+        ],
+    }
+
+
+async def main():
+    db = WorkspaceDB()
+    await db.connect()
+
+    print(f"{'assemblies':>10} {'parts':>6} {'qty':>5} {'rows':>8} {'seconds':>9} {'rows/sec':>10}")
+    for assemblies, parts, quantity in SIZES:
+        job = make_job(assemblies, parts, quantity)
+        rows = assemblies * (1 + parts * quantity + 1) + 1 + parts * quantity
+
+        started = time.perf_counter()
+        job_id = await db.add_job(job)
+        elapsed = time.perf_counter() - started
+
+        print(f"{assemblies:>10} {parts:>6} {quantity:>5} {rows:>8} {elapsed:>9.3f} {rows / elapsed:>10.0f}")
+        await db.delete_job(job_id)
+
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _parse_quotas(value: str) -> dict[str, int]:
+    """Parses ``"workspace=8,view=6"`` into ``{"workspace": 8, "view": 6}``."""
+    quotas: dict[str, int] = {}
+    for entry in value.split(","):
+        name, _, limit = entry.partition("=")
+        if name.strip() and limit.strip().isdigit():
+            quotas[name.strip()] = int(limit)
+    return quotas
+
+
 class Environment:
     def __init__(self):
         raise RuntimeError("Environment is a static class and cannot be instantiated.")
@@ -18,12 +28,24 @@ class Environment:
     POSTGRES_HOST = os.getenv("POSTGRES_HOST")
     POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", 5434))
     POSTGRES_MIN_POOL_SIZE = int(os.getenv("POSTGRES_MIN_POOL_SIZE", 5))
-    POSTGRES_MAX_POOL_SIZE = int(os.getenv("POSTGRES_MAX_POOL_SIZE", 10))
+    POSTGRES_MAX_POOL_SIZE = int(os.getenv("POSTGRES_MAX_POOL_SIZE", 20))
+    POSTGRES_SUBSYSTEM_MAX_CONCURRENCY = int(os.getenv("POSTGRES_SUBSYSTEM_MAX_CONCURRENCY", 8))
+    POSTGRES_SUBSYSTEM_QUOTAS = _parse_quotas(os.getenv("POSTGRES_SUBSYSTEM_QUOTAS", ""))
     POSTGRES_TIMEOUT = int(os.getenv("POSTGRES_TIMEOUT", 5))
     POSTGRES_COMMAND_TIMEOUT = int(os.getenv("POSTGRES_COMMAND_TIMEOUT", 30))
     POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME = int(os.getenv("POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME", 60))
     PORT = int(os.getenv("PORT", 5057))
     DATA_PATH = os.getenv("DATA_PATH", "")
+    RENDER_CACHE_PATH = os.getenv("RENDER_CACHE_PATH", os.path.join(DATA_PATH, "render_cache"))
+    RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", 1024))
+    BACKUP_PATH = os.getenv("BACKUP_PATH", os.path.join(DATA_PATH, "backups", "store"))
+    BACKUP_KEEP_HOURLY = int(os.getenv("BACKUP_KEEP_HOURLY", 24))
+    BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", 14))
+    BACKUP_KEEP_WEEKLY = int(os.getenv("BACKUP_KEEP_WEEKLY", 8))
+    WORKSPACE_ARCHIVE_AFTER_DAYS = int(os.getenv("WORKSPACE_ARCHIVE_AFTER_DAYS", 90))
+    WORKSPACE_ARCHIVE_BATCH_SIZE = int(os.getenv("WORKSPACE_ARCHIVE_BATCH_SIZE", 50))
     WORKSPACE_BACKGROUND_CACHE_WARM_UP_INTERVAL = int(os.getenv("WORKSPACE_BACKGROUND_CACHE_WARM_UP_INTERVAL", 60))
     COOKIE_SECRET = os.getenv("COOKIE_SECRET", "secret")
     CONTACT_ENCRYPTION_KEY = os.getenv("CONTACT_ENCRYPTION_KEY", "")
@@ -1,8 +1,39 @@
 import logging
+import re
 import sys
 
+import msgspec
+
 from config.environments import Environment
 
+IP_RE = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per line for ``server.jsonl``, read back by ``utils.log_index.LogIndex``.
+
+    ``ip`` is the record's ``client_ip`` extra, or the first IPv4 address in the message.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "source": f"{record.filename}:{record.lineno} - {record.funcName}",
+            "msg": message,
+        }
+        ip = getattr(record, "client_ip", None)
+        if ip is None and (match := IP_RE.search(message)):
+            ip = match.group(0)
+        if ip:
+            entry["ip"] = ip
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return msgspec.json.encode(entry).decode()
+
 
 def setup_logging():
     logging.basicConfig(
@@ -13,6 +44,10 @@ def setup_logging():
         level=logging.INFO,
     )
 
+    json_handler = logging.FileHandler(f"{Environment.DATA_PATH}/server.jsonl", mode="w", encoding="utf-8")
+    json_handler.setFormatter(JsonLinesFormatter())
+    logging.getLogger().addHandler(json_handler)
+
     def excepthook(exc_type, exc_value, exc_traceback):
         logging.error("Unhandled exception", exc_info=(exc_type, exc_value, exc_traceback))
         sys.__excepthook__(exc_type, exc_value, exc_traceback)
@@ -1,9 +1,10 @@
 import asyncio
 import logging
 import os
+import secrets
 import traceback
 import urllib.parse
-from typing import Literal
+from typing import Awaitable, Callable, Literal
 
 import jinja2
 import msgspec
@@ -14,10 +15,13 @@ import config.variables as variables
 from config.environments import Environment
 from handlers.websocket.website import WebSocketWebsiteHandler
 from utils.cache.job_directory_cache import JobDirectoryCache
+from utils.cache.response_cache import ResponseCache, negotiate_encoding
+from utils.cache.user_registry import UserRegistry
 from utils.database.coatings_inventory_db import CoatingsInventoryDB
 from utils.database.components_inventory_db import ComponentsInventoryDB
 from utils.database.jobs_db import JobsDB
 from utils.database.laser_cut_parts_inventory_db import LaserCutPartsInventoryDB
+from utils.database.production_analytics_db import ProductionAnalyticsDB
 from utils.database.purchase_orders_db import PurchaseOrdersDB
 from utils.database.recut_laser_cut_parts_inventory_db import (
     RecutLaserCutPartsInventoryDB,
@@ -28,7 +32,9 @@ from utils.database.shipping_address_db import ShippingAddressesDB
 from utils.database.users_db import UsersDB
 from utils.database.vendors_db import VendorsDB
 from utils.database.view_db import ViewDB
+from utils.database.wayback_db import WaybackDB
 from utils.database.workorders_db import WorkordersDB
+from utils.database.workspace_archive_db import WorkspaceArchiveDB
 from utils.database.workspace_db import WorkspaceDB
 
 
@@ -36,6 +42,9 @@ def urlencode_path_segment(value: str) -> str:
     return urllib.parse.quote(value, safe="")
 
 
+# Cache generations restart with the process, so ETags handed out before a restart must not match afterwards
+ETAG_EPOCH = secrets.token_hex(4)
+
 loader = jinja2.FileSystemLoader("public/html")
 env = jinja2.Environment(loader=loader)
 env.filters["urlencode_path"] = urlencode_path_segment
@@ -44,19 +53,24 @@ env.filters["urlencode_path"] = urlencode_path_segment
 class BaseHandler(RequestHandler):
     jobs_db = JobsDB()
     workspace_db = WorkspaceDB()
+    workspace_archive_db = WorkspaceArchiveDB()
     workorders_db = WorkordersDB()
     coatings_inventory_db = CoatingsInventoryDB()
     components_inventory_db = ComponentsInventoryDB()
     laser_cut_parts_inventory_db = LaserCutPartsInventoryDB()
     recut_laser_cut_parts_inventory_db: RecutLaserCutPartsInventoryDB
     sheets_inventory_db = SheetsInventoryDB()
-    job_directory_cache = JobDirectoryCache()
+    job_directory_cache = JobDirectoryCache(os.path.join(Environment.DATA_PATH, "job_directory_index.json"))
     purchase_orders_db = PurchaseOrdersDB()
     vendors_db = VendorsDB()
     shipping_addresses_db = ShippingAddressesDB()
     users_db = UsersDB()
     roles_db = RolesDB()
     view_db = ViewDB()
+    wayback_db = WaybackDB()
+    production_analytics_db = ProductionAnalyticsDB()
+    user_registry = UserRegistry(os.path.join(Environment.DATA_PATH, "users.json"))
+    response_cache = ResponseCache(Environment.RESPONSE_CACHE_MAX_BYTES, Environment.RESPONSE_COMPRESSION_MIN_BYTES)
 
     def write_error(self, status_code: int, **kwargs):
         if exc_info := kwargs.get("exc_info"):
@@ -78,34 +92,68 @@ class BaseHandler(RequestHandler):
         self.set_header("Content-Type", "text/html")
         self.write(rendered_template)
 
-    def get_client_name(self, ip: str) -> str | None:
-        file_path = os.path.join(Environment.DATA_PATH, "users.json")
-        name = None
+    async def write_json(self, data, cache_name: str | None = None, generation=None) -> int:
+        """
+        Writes ``data`` as JSON, compressed with the best encoding the client accepts (br/gzip/zstd).
+
+        Pass ``cache_name`` and the ``generation`` of the data (e.g. ``cache_manager.generation``) to reuse
+        the encoded body until the data changes. Returns the number of body bytes written.
+        """
+        encoding = negotiate_encoding(self.request.headers.get("Accept-Encoding", ""))
+        body, applied_encoding = await self.response_cache.encode(data, encoding, cache_name, generation)
+
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Vary", "Accept-Encoding")
+        if applied_encoding:
+            self.set_header("Content-Encoding", applied_encoding)
+        self.write(body)
+        return len(body)
+
+    def check_generation_etag(self, cache_name: str, generation) -> bool:
+        """
+        Sets a strong ETag for ``cache_name`` at ``generation`` (per content encoding) and, if the client's
+        ``If-None-Match`` already has it, answers 304 and returns True. Without a generation no ETag is sent.
+        """
+        if generation is None:
+            self.clear_header("Etag")
+            return False
+
+        encoding = negotiate_encoding(self.request.headers.get("Accept-Encoding", "")) or "identity"
+        self.set_header("Etag", f'"{cache_name}-{ETAG_EPOCH}-{generation}-{encoding}"')
+        self.set_header("Vary", "Accept-Encoding")
+        self.set_header("Cache-Control", "no-cache")
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return True
+        return False
+
+    async def write_cached_json(self, cache_name: str, load: Callable[[], Awaitable], generation: Callable[[], int | None]):
+        """
+        Writes ``await load()`` as JSON with an ETag from ``generation()``, the generation of the DB cache entry it is served from.
+
+        A matching ``If-None-Match`` gets a 304 without loading while the entry is cached, or after
+        loading when the entry had expired and came back unchanged.
+        """
+        if self.check_generation_etag(cache_name, generation()):
+            return
 
         try:
-            with open(file_path, "rb") as file:
-                data: dict[str, dict[str, str | bool]] = msgspec.json.decode(file.read())
-            for client_name, client_data in data.items():
-                if client_data["ip"] == ip:
-                    name = client_name
-                    break
-        except Exception as e:
-            logging.error(f"Error getting client name: {e}")
-        return name
+            data = await load()
+        except Exception:
+            self.clear_header("Etag")
+            raise
+
+        current = generation()
+        if self.check_generation_etag(cache_name, current):
+            return
+        await self.write_json(data, cache_name, current)
+
+    def get_client_name(self, ip: str) -> str | None:
+        return self.user_registry.get_client_name(ip)
 
     def is_client_trusted(self, ip: str) -> bool:
-        file_path = os.path.join(Environment.DATA_PATH, "users.json")
-        trusted = False
-        try:
-            with open(file_path, "rb") as file:
-                data: dict[str, dict[str, str | bool]] = msgspec.json.decode(file.read())
-                for client_name, client_data in data.items():
-                    if client_data["ip"] == ip:
-                        trusted = client_data["trusted"]
-                        break
-        except Exception as e:
-            logging.error(f"Error getting client trusted status: {e}")
-        return trusted
+        return self.user_registry.is_client_trusted(ip)
 
     def get_client_name_from_header(self) -> str | None:
         return self.request.headers.get("X-Client-Name")
@@ -120,6 +168,19 @@ class BaseHandler(RequestHandler):
         else :
             return -1
 
+    def get_history_page(self) -> dict:
+        """``?limit=&before=`` for paged history endpoints; history is returned newest first."""
+        limit = self.get_argument("limit", "")
+        before = self.get_argument("before", "")
+        return {
+            "limit": int(limit) if limit.isdigit() else None,
+            "before_version": int(before) if before.isdigit() else None,
+        }
+
+    def get_flag_argument(self, name: str) -> bool:
+        """``?name=1`` style flags; ``1``/``true``/``yes``/``on`` are true, anything else (or missing) is false."""
+        return self.get_argument(name, "").strip().lower() in ("1", "true", "yes", "on")
+
     def signal_clients_for_changes(
         self,
         client_name_to_ignore,
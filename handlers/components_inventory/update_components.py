@@ -11,13 +11,9 @@ class UpdateComponentsHandler(BaseHandler):
 
             if not isinstance(data, list):
                 raise ValueError("Expected a list of components")
-            component_ids = []
-            for component_data in data:
-                component_id = component_data.get("id", -1)
-                component_ids.append(component_id)
-                await self.components_inventory_db.update_component(
-                    component_id, component_data, modified_by=client_name
-                )
+            component_ids = await self.components_inventory_db.update_components(
+                data, modified_by=client_name
+            )
             if changes_urls := [
                 f"/components_inventory/get_component/{component_id}"
                 for component_id in component_ids
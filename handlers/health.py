@@ -4,6 +4,11 @@ from typing import Any, Dict
 from tornado.web import HTTPError
 
 from handlers.base import BaseHandler
+from handlers.misc.printout_render import CachedRenderHandler
+from handlers.websocket.workspace import WebSocketWorkspaceHandler
+from utils.backup.engine import backup_scheduler
+from utils.database.history_writer import history_writer
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool
 
 
@@ -14,6 +19,8 @@ class HealthHandler(BaseHandler):
     - Verifies all database dependencies
     - Fails fast per dependency
     - Returns structured, machine-readable status
+    - Reports shared pool usage (size/idle per database, acquired/wait time per subsystem)
+    - Reports workspace WebSocket fan-out counters (NOTIFYs in vs frames out)
     """
 
     async def get(self) -> None:
@@ -45,6 +52,17 @@ class HealthHandler(BaseHandler):
                 "type": "readiness",
                 "timestamp": time.time(),
                 "checks": checks,
+                "pools": PoolRegistry.stats(),
+                "history_writer": history_writer.status(),
+                "render_cache": CachedRenderHandler.render_cache.status(),
+                "response_cache": self.response_cache.status(),
+                "backups": backup_scheduler.status(),
+                "job_directory_cache": self.job_directory_cache.status(),
+                "workspace_archive": self.workspace_archive_db.status(),
+                "workspace_websocket": {
+                    "clients": len(WebSocketWorkspaceHandler.clients),
+                    **WebSocketWorkspaceHandler.stats,
+                },
             }
 
             self.set_status(200 if healthy else 503)
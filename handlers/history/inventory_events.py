@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime, timezone
+
+from handlers.base import BaseHandler
+from utils.database.item_history_db import ItemHistoryDB
+
+
+class InventoryEventsHandler(BaseHandler):
+    """
+    Serves one kind of inventory history event, newest first, paged with ``?limit=&before=``.
+
+    Events are derived when history is written (see ``utils.inventory_events``), so this is a
+    single range read on ``{item}s_inventory_events``.
+    """
+
+    kind: str
+
+    def get_history_db(self) -> ItemHistoryDB:
+        raise NotImplementedError
+
+    async def get(self, item_id):
+        try:
+            page = self.get_history_page()
+            events = await self.get_history_db().get_item_events(int(item_id), self.kind, **page)
+            history_entries = [
+                {
+                    "version": event["version"],
+                    "modified_by": event["modified_by"],
+                    "created_at_formatted": self.format_datetime_with_relative(event["created_at"]),
+                    "created_at": event["created_at"],
+                    "event_type": event["event_type"],
+                    "details": event["details"],
+                    **event["payload"],
+                }
+                for event in events
+            ]
+            next_cursor = events[-1]["version"] if page["limit"] and len(events) == page["limit"] else None
+            self.write({"success": True, "history_entries": history_entries, "next_cursor": next_cursor})
+        except Exception as e:
+            logging.error(f"Failed to get {self.kind} history for item {item_id}: {e}")
+            self.set_status(500)
+            self.write({"success": False, "error": str(e)})
+
+    def format_datetime_with_relative(self, created_at_str: str) -> str:
+        # Parse the string timestamp
+        dt = datetime.fromisoformat(created_at_str)
+        # Ensure timezone-aware
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+
+        now = datetime.now(timezone.utc)
+        delta = now - dt
+
+        # Calculate days difference
+        days_ago = delta.days
+        if days_ago == 0:
+            rel = "today"
+        elif days_ago == 1:
+            rel = "1 day ago"
+        else:
+            rel = f"{days_ago} days ago"
+
+        # Format date: Month day, year (Weekday) at HH:MM AM/PM
+        formatted = dt.strftime("%B %-d, %Y (%A) at %-I:%M %p")
+        return f"{formatted} ({rel})"
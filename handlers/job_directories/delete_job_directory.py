@@ -36,4 +36,4 @@ class DeleteJobDirectoryHandler(BaseHandler):
         )
 
         self.write({"status": "success", "message": "Quote deleted successfully."})
-        self.job_directory_cache.invalidate_cache()
+        self.job_directory_cache.remove_directory(folder_name)
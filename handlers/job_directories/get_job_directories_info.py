@@ -1,5 +1,3 @@
-import msgspec
-
 from config.environments import Environment
 from handlers.base import BaseHandler
 
@@ -16,5 +14,4 @@ class GetJobDirectoriesInfoHandler(BaseHandler):
                 "template",
             ],
         )
-        self.set_header("Content-Type", "application/json")
-        self.write(msgspec.json.encode(directories_info))
+        await self.write_json(directories_info)
@@ -37,7 +37,7 @@ class UploadJobDirectoryHandler(BaseHandler):
                     "message": "Job and HTML file uploaded successfully.",
                 }
             )
-            self.job_directory_cache.invalidate_cache()
+            self.job_directory_cache.update_directory(os.path.join(Environment.DATA_PATH, folder))
         except Exception as e:
             self.set_status(500)
             self.write({"status": "error", "message": str(e)})
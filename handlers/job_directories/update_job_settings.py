@@ -48,7 +48,10 @@ class UpdateJobSettingsHandler(BaseHandler):
                         "message": "Job settings updated successfully.",
                     }
                 )
-                self.job_directory_cache.invalidate_cache()
+                self.job_directory_cache.update_directory(folder)
+                if key_to_change == "type":
+                    # The folder moved; let the next listing pick it up where it landed
+                    self.job_directory_cache.invalidate_cache()
             else:
                 self.set_status(404)
                 self.write({"status": "error", "message": "File not found."})
@@ -1,14 +1,10 @@
-import msgspec
-
 from handlers.base import BaseHandler
 
 
 class GetAllJobsHandler(BaseHandler):
     async def get(self):
         try:
-            entry_data = await self.jobs_db.get_all_jobs()
-            self.set_header("Content-Type", "application/json")
-            self.write(msgspec.json.encode(entry_data))
+            await self.write_cached_json("jobs", self.jobs_db.get_all_jobs, lambda: self.jobs_db.cache_generation("all_jobs"))
         except Exception as e:
             self.set_status(400)
             self.write({"error": str(e)})
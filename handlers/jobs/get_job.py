@@ -1,5 +1,3 @@
-import msgspec
-
 from handlers.base import BaseHandler
 
 
@@ -7,9 +5,11 @@ class GetJobHandler(BaseHandler):
     async def get(self, job_id):
         try:
             job_id = int(job_id)
-            job_data = await self.jobs_db.get_job_by_id(job_id, include_data=True)
-            self.set_header("Content-Type", "application/json")
-            self.write(msgspec.json.encode(job_data))
+            await self.write_cached_json(
+                f"job_{job_id}",
+                lambda: self.jobs_db.get_job_by_id(job_id, include_data=True),
+                lambda: self.jobs_db.cache_generation(f"job_{job_id}_full"),
+            )
         except Exception as e:
             self.set_status(400)
             self.write({"error": str(e)})
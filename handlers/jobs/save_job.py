@@ -1,6 +1,7 @@
 import msgspec
 
 from handlers.base import BaseHandler
+from handlers.misc.printout_render import CachedRenderHandler
 
 
 class SaveJobHandler(BaseHandler):
@@ -12,6 +13,7 @@ class SaveJobHandler(BaseHandler):
             client_name = self.get_client_name_from_header()
 
             new_job_id = await self.jobs_db.save_job(job_id, job_data, modified_by=client_name)
+            CachedRenderHandler.prerender("/jobs/view", new_job_id)
 
             self.signal_clients_for_changes(
                 client_name,
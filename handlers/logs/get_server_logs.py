@@ -1,77 +1,77 @@
+from typing import Mapping
+
 from handlers.base import BaseHandler
-import os
-import json
-import re
-from config.environments import Environment
+from utils.log_index import LogFilter, server_log_index
+
+MAX_PAGE_SIZE = 1000
+
+
+def _float_or_none(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_log_filter(arguments: Mapping[str, str | None]) -> LogFilter:
+    """
+    ``level=INFO,ERROR``, ``since=``/``until=`` (unix seconds), ``client=`` (client names or IPs, comma separated)
+    and ``q=`` (text in the message, or a client name) into a ``LogFilter``.
+    """
+    levels = {level.strip().upper() for level in (arguments.get("level") or "").split(",") if level.strip()}
+
+    ips = set()
+    clients = BaseHandler.user_registry.get_all_clients()
+    for client in (arguments.get("client") or "").split(","):
+        client = client.strip()
+        if client in clients:
+            ips.add(clients[client].get("ip"))
+        elif client:
+            ips.add(client)
+
+    # Searching for a client's name finds the lines logged with its IP
+    text = (arguments.get("q") or "").strip().lower() or None
+    client_names = {name.lower(): name for name in clients}
+    if text in client_names:
+        ips.add(clients[client_names[text]].get("ip"))
+        text = None
+
+    return LogFilter(
+        levels=levels or None,
+        since=_float_or_none(arguments.get("since")),
+        until=_float_or_none(arguments.get("until")),
+        ips=ips or None,
+        text=text,
+    )
+
+
+def add_client_names(entries: list[dict]):
+    for entry in entries:
+        if ip := entry.get("ip"):
+            entry["client"] = BaseHandler.user_registry.get_client_name(ip)
 
 
 class GetServerLogsHandler(BaseHandler):
+    """
+    Pages through the structured server log (``server.jsonl``) by byte offset; rendering is left to the client.
 
-    def ms_to_color(self, ms: float, min_ms=0.0, max_ms=3000) -> str:
-        """
-        Map ms value to a color from green to red.
-        """
-        # Clamp between min and max
-        clamped = max(min(ms, max_ms), min_ms)
-        ratio = (clamped - min_ms) / (max_ms - min_ms)
-
-        # Convert to RGB gradient from green to red
-        red = int(255 * ratio)
-        green = int(255 * (1 - ratio))
-        return f"rgb({red},{green},0)"
-
-    def highlight_ms_times(self, logs: str) -> str:
-        def replacer(match):
-            ms_value = float(match.group(1))
-            color = self.ms_to_color(ms_value)
-            return f'<span style="color: {color}; font-weight: bold;">{ms_value:.2f}ms</span>'
-
-        return re.sub(r"(\d+\.\d+)ms", replacer, logs)
-
-    def get_logs(self) -> list[str]:
-        # Load users
-        users_path = os.path.join(Environment.DATA_PATH, "users.json")
-        with open(users_path, "r", encoding="utf-8") as f:
-            users = json.load(f)
-
-        # Load log file
-        with open(f"{Environment.DATA_PATH}/server.log", "r", encoding="utf-8") as f:
-            logs = f.read()
-
-        # Replace IPs with client names
-        for client_name, client_data in users.items():
-            logs = logs.replace(client_data["ip"], client_name)
-
-        # Highlight status codes
-        logs = re.sub(
-            r"\b200\b",
-            r'<span style="color: green; font-weight: bold;">200</span>',
-            logs,
+    ``?before=`` pages back from an offset (default: the end), ``?after=`` pages forward, ``?limit=`` sizes the
+    page, and the filters are described in ``parse_log_filter``. ``/ws/server-logs`` follows the tail.
+    """
+
+    async def get(self):
+        arguments = {name: self.get_argument(name, None) for name in ("level", "since", "until", "client", "q")}
+        before = self.get_argument("before", "")
+        after = self.get_argument("after", "")
+        limit = self.get_argument("limit", "")
+
+        result = await server_log_index.query(
+            parse_log_filter(arguments),
+            before=int(before) if before.isdigit() else None,
+            after=int(after) if after.isdigit() else None,
+            limit=min(int(limit), MAX_PAGE_SIZE) if limit.isdigit() and int(limit) > 0 else 200,
         )
-        logs = re.sub(r"\b101\b", r'<span style="color: blue;">101</span>', logs)
-        logs = re.sub(r"\b404\b", r'<span style="color: red;">404</span>', logs)
-        logs = re.sub(r"\b400\b", r'<span style="color: red;">400</span>', logs)
-        logs = re.sub(r"\b500\b", r'<span style="color: red;">500</span>', logs)
-        logs = re.sub(r"\bwarning\b", r'<span style="color: yellow;">warning</span>', logs)
-        logs = re.sub(r"\bWARNING\b", r'<span style="color: yellow;">WARNING</span>', logs)
-        logs = re.sub(r"\berror\b", r'<span style="color: red;">error</span>', logs)
-        logs = re.sub(r"\bERROR\b", r'<span style="color: red;">ERROR</span>', logs)
-
-        # Highlight method types
-        logs = re.sub(r"\bGET\b", r'<span style="color: orange;">GET</span>', logs)
-        logs = re.sub(r"\bPOST\b", r'<span style="color: purple;">POST</span>', logs)
-        logs = self.highlight_ms_times(logs)
-
-        # Highlight client names (optional)
-        for client_name in users.keys():
-            logs = logs.replace(
-                client_name,
-                f'<span style="color: teal; font-weight: bold;">{client_name}</span>',
-            )
-        return logs.split("\n")
-
-    def get(self):
-        logs = self.get_logs()
-        self.write({
-            "logs": logs
-        })
\ No newline at end of file
+        add_client_names(result["entries"])
+
+        self.set_header("Cache-Control", "no-store")
+        await self.write_json(result)
@@ -1,74 +1,63 @@
 import os
 import re
 
+from tornado.ioloop import IOLoop
+
 from config.environments import Environment
 from handlers.base import BaseHandler
 
+# server.log: "%(asctime)s [%(levelname)s] [%(filename)s:%(lineno)d - %(funcName)s] - %(message)s"
+LINE_RE = re.compile(r"^(?P<time>.+?) \[(?P<level>[A-Z]+)\] \[(?P<source>[^\]]*)\] - (?P<msg>.*)$")
+# Logs written before that format
+LEGACY_LINE_RE = re.compile(r"^(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+) - (?P<level>INFO|ERROR) - (?P<msg>.*)$", re.IGNORECASE)
+
+MAX_PAGE_LINES = 5000
+
+
+def read_log_page(path: str, offset: int, limit: int) -> dict:
+    entries = []
+    with open(path, "rb") as log_file:
+        size = os.fstat(log_file.fileno()).st_size
+        log_file.seek(min(offset, size))
+        position = log_file.tell()
+        while len(entries) < limit and (line := log_file.readline()):
+            text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            if match := LINE_RE.match(text) or LEGACY_LINE_RE.match(text):
+                entry = {key: value for key, value in match.groupdict().items() if value is not None}
+                entry["level"] = entry["level"].upper()
+            else:
+                # Tracebacks and other continuation lines
+                entry = {"msg": text}
+            entry["offset"] = position
+            entries.append(entry)
+            position += len(line)
+    return {"entries": entries, "after": position, "more": position < size, "size": size}
 
-class LogContentHandler(BaseHandler):
-    def post(self):
-        log_file_name = self.get_argument("log_file_name")
-        log_dir = "logs/"
-        log_file_path = os.path.join(Environment.DATA_PATH, log_dir, log_file_name)
-
-        if os.path.isfile(log_file_path):
-            with open(log_file_path, "r", encoding="utf-8") as log_file:
-                lines = log_file.readlines()
-
-                formatted_lines = []
-                ip_regex = re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}\b")
-                string_regex = re.compile(r'(["\'])(?:(?=(\\?))\2.)*?\1')
-                keywords = {
-                    "INFO": "#2ead65",
-                    "ERROR": "#bf382f",
-                    "Error": "#bf382f",
-                    "ERRNO": "#bf382f",
-                    "WARN": "#f1c234",
-                    "INVIGO SERVER STARTED": "#3daee9",
-                    "HOURLY BACKUP COMPLETE": "#f1c234",
-                    "DAILY BACKUP COMPLETE": "#f1c234",
-                    "WEEKLY BACKUP COMPLETE": "#f1c234",
-                    "LOCK": "#0057ea",
-                    "UPLOADED": "#0057ea",
-                    "DOWNLOADED": "#0057ea",
-                    "SENT": "#0057ea",
-                    "UPLOAD": "#0057ea",
-                    "DOWNLOAD": "#0057ea",
-                    "LOADED": "#0057ea",
-                    "PINECONE": "#25bc9d",
-                }
-
-                def keyword_replacer(match):
-                    keyword = match.group(0)
-                    color = keywords[keyword.upper()]
-                    return f'<span style="color: {color}">{keyword}</span>'
 
-                for line in lines:
-                    match = re.match(
-                        r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+) - (INFO|ERROR) - (.*)",
-                        line,
-                        re.IGNORECASE,
-                    )
-                    if match:
-                        date, level, message = match.groups()
-                        level_color = "#2ead65" if level.upper() == "INFO" else "#bf382f"
-                        message = string_regex.sub(r'<span style="color: #c3705d;">\g<0></span>', message)
-                        message = ip_regex.sub(r'<span style="color: #8d48aa;">\g<0></span>', message)
+class LogContentHandler(BaseHandler):
+    """
+    Returns a page of an archived log as ``{"entries": [{"time", "level", "source", "msg", "offset"}], "after", "more", "size"}``.
 
-                        for keyword in keywords:
-                            message = re.sub(
-                                r"\b" + re.escape(keyword) + r"\b",
-                                keyword_replacer,
-                                message,
-                                flags=re.IGNORECASE,
-                            )
+    ``offset`` (bytes) and ``limit`` (lines) page through the file; parsing runs off the event loop and
+    colouring is left to the client.
+    """
 
-                        formatted_line = f"<b>{date}</b> - <span style='color: {level_color}'>{level}</span> - <span style='color: #EAE9FC'>{message}</span>"
-                        formatted_lines.append(formatted_line)
-                    else:
-                        formatted_lines.append(line)
+    async def post(self):
+        log_file_name = os.path.basename(self.get_argument("log_file_name"))
+        log_file_path = os.path.join(Environment.DATA_PATH, "logs", log_file_name)
+        offset = self.get_argument("offset", "0")
+        limit = self.get_argument("limit", "")
 
-                self.write("".join(formatted_lines))
-        else:
+        if not os.path.isfile(log_file_path):
             self.set_status(404)
             self.write("Log file not found")
+            return
+
+        page = await IOLoop.current().run_in_executor(
+            None,
+            read_log_page,
+            log_file_path,
+            int(offset) if offset.isdigit() else 0,
+            min(int(limit), MAX_PAGE_LINES) if limit.isdigit() and int(limit) > 0 else MAX_PAGE_LINES,
+        )
+        await self.write_json(page)
@@ -1,12 +1,9 @@
-import json
-import os
 import re
 
 from natsort import natsorted
 from tornado.websocket import WebSocketHandler
 
 import config.variables as variables
-from config.environments import Environment
 from handlers.base import BaseHandler
 
 
@@ -15,9 +12,7 @@ class ServerLogsHandler(BaseHandler):
         return list(map(lambda x: x, s))
 
     def get_connect_clients_data(self):
-        users_path = os.path.join(Environment.DATA_PATH, "users.json")
-        with open(users_path, "r", encoding="utf-8") as f:
-            user_data = json.load(f)
+        user_data = self.user_registry.get_all_clients()
         user_data_ips = [client_data["ip"] for client_data in user_data.values()]
 
         software_clients = [client.request.remote_ip for client in self.convert_set_to_list(variables.software_connected_clients)]
@@ -47,11 +42,9 @@ class ServerLogsHandler(BaseHandler):
 
     def get_search_terms(self):
         search_terms = set()
-        with open(os.path.join(Environment.DATA_PATH, "users.json"), "r", encoding="utf-8") as file:
-            data: dict[str, dict[str, str | bool]] = json.load(file)
-            for client_name, client_data in data.items():
-                search_terms.add(client_name.lower())
-                search_terms.add(client_data["ip"])
+        for client_name, client_data in self.user_registry.get_all_clients().items():
+            search_terms.add(client_name.lower())
+            search_terms.add(client_data["ip"])
         search_terms.add("workspace")
         search_terms.add("laser_cut_parts_inventory")
         search_terms.add("recut")
@@ -86,12 +79,4 @@ class ServerLogsHandler(BaseHandler):
         )
 
     def get_client_name(self, ip: str) -> str:
-        try:
-            with open(os.path.join(Environment.DATA_PATH, "users.json"), "r", encoding="utf-8") as file:
-                data: dict[str, dict[str, str | bool]] = json.load(file)
-                for client_name, client_data in data.items():
-                    if client_data["ip"] == ip:
-                        return client_name
-        except Exception as e:
-            print(e)
-        return "Unknown"
+        return self.user_registry.get_client_name(ip) or "Unknown"
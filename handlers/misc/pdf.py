@@ -1,37 +1,42 @@
-import aiohttp
-
 import tornado
 
-from config.environments import Environment
 from handlers.base import BaseHandler
+from handlers.misc.printout_render import CachedRenderHandler
+from utils.renderer import RendererClient, RendererError
 
 
-class GeneratePDFHandler(BaseHandler):
+class GeneratePDFHandler(CachedRenderHandler):
     async def post(self):
         body = tornado.escape.json_decode(self.request.body)
         url = self.get_argument("url")
         local_storage = body.get("localStorage", {})
 
-        # CRITICAL: url must be reachable from the renderer container.
-        # If user provides http://invi.go/... rewrite to the docker service name:
-        url = (
-            url
-            .replace("http://invi.go", f"http://invigo_server:{Environment.PORT}")
-            .replace("http://localhost:5057", "http://127.0.0.1:5057")
-        )
-        renderer_url = Environment.PUPPETEER_URL
-
-        async with aiohttp.ClientSession() as session:
-          async with session.post(
-              f"{renderer_url}/pdf",
-              json={"url": url, "localStorage": local_storage},
-              timeout=aiohttp.ClientTimeout(total=90),
-          ) as resp:
-              data = await resp.read()
-              if resp.status != 200:
-                  self.set_status(500)
-                  self.write(data.decode(errors="replace"))
-                  return
+        data = await self.render_cached("pdf", url, local_storage, RendererClient.render_pdf)
+        if data is None:
+            return
+
+        self.set_header("Content-Type", "application/pdf")
+        self.set_header("Content-Disposition", "inline; filename=output.pdf")
+        self.write(data)
+
+
+class GenerateBatchPDFHandler(BaseHandler):
+    async def post(self):
+        body = tornado.escape.json_decode(self.request.body)
+        urls = body.get("urls")
+        local_storage = body.get("localStorage", {})
+
+        if not isinstance(urls, list) or not urls:
+            self.set_status(400)
+            self.write("urls must be a non-empty list")
+            return
+
+        try:
+            data = await RendererClient.render_pdf_batch(urls, local_storage)
+        except RendererError as e:
+            self.set_status(e.status if e.status in (400, 413, 503) else 500)
+            self.write(e.message)
+            return
 
         self.set_header("Content-Type", "application/pdf")
         self.set_header("Content-Disposition", "inline; filename=output.pdf")
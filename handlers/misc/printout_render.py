@@ -0,0 +1,91 @@
+import logging
+from typing import Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from tornado.ioloop import IOLoop
+
+from config.environments import Environment
+from handlers.base import BaseHandler
+from utils.cache.render_cache import RenderCache
+from utils.renderer import RendererClient, RendererError
+
+# Printout page -> BaseHandler database whose ``updated_at`` versions it
+PRINTOUT_SOURCES = {
+    "/jobs/view": "jobs_db",
+    "/workorders/view": "workorders_db",
+    "/purchase_orders/view": "purchase_orders_db",
+}
+
+
+class CachedRenderHandler(BaseHandler):
+    render_cache = RenderCache(Environment.RENDER_CACHE_PATH, Environment.RENDER_CACHE_MAX_BYTES)
+
+    # Printout path -> (origin, localStorage) it was last printed with, reused for pre-rendering
+    last_print_settings: dict[str, tuple[str, dict]] = {}
+
+    @staticmethod
+    async def get_printout_version(url: str) -> str | None:
+        parsed = urlsplit(url)
+        db_name = PRINTOUT_SOURCES.get(parsed.path.rstrip("/"))
+        entry_id = parse_qs(parsed.query).get("id", [""])[0]
+        if db_name is None or not entry_id.isdigit():
+            return None
+
+        updated_at = await getattr(BaseHandler, db_name).get_updated_at(int(entry_id))
+        return updated_at.isoformat() if updated_at else None
+
+    async def render_cached(
+        self,
+        mode: str,
+        url: str,
+        local_storage: dict,
+        render: Callable[[str, dict], Awaitable[bytes]],
+    ) -> bytes | None:
+        """
+        Returns the rendered document, or ``None`` when a 304 or error response was already written.
+
+        Pages that aren't a known printout (or whose entry no longer exists) are rendered uncached.
+        """
+        try:
+            version = await self.get_printout_version(url)
+            if version is None:
+                return await render(url, local_storage)
+
+            parsed = urlsplit(url)
+            self.last_print_settings[parsed.path.rstrip("/")] = (f"{parsed.scheme}://{parsed.netloc}", local_storage)
+
+            key = RenderCache.make_key(mode, url, local_storage, version)
+            self.set_header("Etag", f'"{key}"')
+            self.set_header("Cache-Control", "private, no-cache")
+            if self.check_etag_header():
+                self.set_status(304)
+                return None
+
+            return await self.render_cache.get_or_render(key, lambda: render(url, local_storage))
+        except RendererError as e:
+            self.set_status(500)
+            self.write(e.message)
+            return None
+
+    @classmethod
+    def prerender(cls, path: str, entry_id: int):
+        """Renders the PDF of a freshly saved entry in the background, using the settings it was last printed with."""
+        settings = cls.last_print_settings.get(path)
+        if settings is None or entry_id is None:
+            return
+
+        origin, local_storage = settings
+        url = f"{origin}{path}?id={entry_id}"
+
+        async def run():
+            try:
+                version = await cls.get_printout_version(url)
+                if version is None:
+                    return
+                key = RenderCache.make_key("pdf", url, local_storage, version)
+                if not cls.render_cache.contains(key):
+                    await cls.render_cache.get_or_render(key, lambda: RendererClient.render_pdf(url, local_storage))
+            except Exception as e:
+                logging.warning(f"[RenderCache] Pre-render of {url} failed: {e}")
+
+        IOLoop.current().spawn_callback(run)
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from handlers.base import BaseHandler
+
+
+class ProductionAnalyticsHandler(BaseHandler):
+    def get_range(self) -> tuple[datetime, datetime]:
+        """``since``/``until`` as ISO timestamps, defaulting to the last 7 days; naive ones are taken as UTC."""
+        until = self.parse_timestamp(self.get_argument("until", None)) or datetime.now(timezone.utc)
+        since = self.parse_timestamp(self.get_argument("since", None)) or until - timedelta(days=7)
+        if since >= until:
+            raise ValueError("since must be before until")
+        return since, until
+
+    @staticmethod
+    def parse_timestamp(value: str | None) -> datetime | None:
+        if not value:
+            return None
+        timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+    def get_job_id(self) -> int | None:
+        job_id = self.get_argument("job_id", None)
+        return int(job_id) if job_id else None
+
+
+class ProductionThroughputHandler(ProductionAnalyticsHandler):
+    async def get(self):
+        try:
+            since, until = self.get_range()
+            series = await self.production_analytics_db.get_throughput(
+                since,
+                until,
+                interval=self.get_argument("interval", "hour"),
+                flowtag_name=self.get_argument("flowtag", None),
+                job_id=self.get_job_id(),
+            )
+        except ValueError as e:
+            self.set_status(400)
+            self.write({"error": str(e)})
+            return
+
+        await self.write_json({"since": since.isoformat(), "until": until.isoformat(), "series": series})
+
+
+class ProductionBottlenecksHandler(ProductionAnalyticsHandler):
+    async def get(self):
+        try:
+            since, until = self.get_range()
+            bottlenecks = await self.production_analytics_db.get_bottlenecks(since, until, job_id=self.get_job_id())
+        except ValueError as e:
+            self.set_status(400)
+            self.write({"error": str(e)})
+            return
+
+        await self.write_json({"since": since.isoformat(), "until": until.isoformat(), "flowtags": bottlenecks})
@@ -1,5 +1,3 @@
-import json
-
 import tornado
 
 from handlers.base import BaseHandler
@@ -16,14 +14,9 @@ class JobTimelineHandler(BaseHandler):
 
     async def post(self):
         data = tornado.escape.json_decode(self.request.body)
-        for job_entry in data:
-            job_id = job_entry["id"]
-            flowtag_timeline = job_entry["flowtag_timeline"]
-
-            # convert to JSON string for PostgreSQL
-            flowtag_json = json.dumps(flowtag_timeline)
-
-            await self.workspace_db.save_job_flowtag_timeline(job_id, flowtag_json)
+        # Every posted job is saved in one transaction, later entries for the same job win
+        flowtag_timelines = {int(job_entry["id"]): job_entry["flowtag_timeline"] for job_entry in data}
+        updated = await self.workspace_db.save_job_flowtag_timelines(flowtag_timelines)
 
         self.set_header("Content-Type", "application/json")
-        self.write({"status": "ok"})
+        self.write({"status": "ok", "updated": updated})
@@ -1,10 +1,10 @@
-import msgspec
-
 from handlers.base import BaseHandler
 
 
 class GetAllPurchaseOrdersHandler(BaseHandler):
     async def get(self):
-        entry_data = await self.purchase_orders_db.get_all_purchase_orders(include_data=True)
-        self.set_header("Content-Type", "application/json")
-        self.write(msgspec.json.encode(entry_data))
+        await self.write_cached_json(
+            "purchase_orders",
+            lambda: self.purchase_orders_db.get_all_purchase_orders(include_data=True),
+            lambda: self.purchase_orders_db.cache_generation("all_purchase_orders_data"),
+        )
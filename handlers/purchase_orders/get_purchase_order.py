@@ -1,11 +1,11 @@
-import msgspec
-
 from handlers.base import BaseHandler
 
 
 class GetPurchaseOrderHandler(BaseHandler):
     async def get(self, purchase_order_id):
         purchase_order_id = int(purchase_order_id)
-        job_data = await self.purchase_orders_db.get_purchase_order_by_id(purchase_order_id)
-        self.set_header("Content-Type", "application/json")
-        self.write(msgspec.json.encode(job_data))
+        await self.write_cached_json(
+            f"purchase_order_{purchase_order_id}",
+            lambda: self.purchase_orders_db.get_purchase_order_by_id(purchase_order_id),
+            lambda: self.purchase_orders_db.cache_generation(f"purchase_order_{purchase_order_id}_meta"),
+        )
@@ -1,6 +1,7 @@
 import msgspec
 
 from handlers.base import BaseHandler
+from handlers.misc.printout_render import CachedRenderHandler
 
 
 class SavePurchaseOrderHandler(BaseHandler):
@@ -11,6 +12,7 @@ class SavePurchaseOrderHandler(BaseHandler):
         client_name = self.get_client_name_from_header()
 
         new_id = await self.purchase_orders_db.save_purchase_order(purchase_order_id, purchase_order_data, modified_by=client_name)
+        CachedRenderHandler.prerender("/purchase_orders/view", new_id)
 
         self.signal_clients_for_changes(client_name, ["/purchase_orders/get_all"])
 
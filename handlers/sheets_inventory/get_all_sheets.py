@@ -1,14 +1,10 @@
-import msgspec
-
 from handlers.base import BaseHandler
 
 
 class GetAllSheetsHandler(BaseHandler):
     async def get(self):
         try:
-            entry_data = await self.sheets_inventory_db.get_all_sheets()
-            self.set_header("Content-Type", "application/json")
-            self.write(msgspec.json.encode(entry_data))
+            await self.write_cached_json("sheets", self.sheets_inventory_db.get_all_sheets, self.sheets_inventory_db.cache_manager.get_generation)
         except Exception as e:
             self.set_status(400)
             self.write({"error": str(e)})
@@ -11,11 +11,7 @@ class UpdateSheetsHandler(BaseHandler):
 
             if not isinstance(data, list):
                 raise ValueError("Expected a list of sheets")
-            sheet_ids = []
-            for sheet_data in data:
-                sheet_id = sheet_data.get("id", -1)
-                sheet_ids.append(sheet_id)
-                await self.sheets_inventory_db.update_sheet(sheet_id, sheet_data, modified_by=client_name)
+            sheet_ids = await self.sheets_inventory_db.update_sheets(data, modified_by=client_name)
             if changes_urls := [f"sheets_inventory/get_sheet/{sheet_id}" for sheet_id in sheet_ids]:
                 self.signal_clients_for_changes(
                     client_name,
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import logging
+
+from tornado.websocket import WebSocketClosedError, WebSocketHandler
+
+from handlers.logs.get_server_logs import add_client_names, parse_log_filter
+from utils.log_index import LogFilter, server_log_index
+
+
+class WebSocketServerLogHandler(WebSocketHandler):
+    """
+    Follows the server log.
+
+    New entries matching the socket's filters (query string, as for ``/api/server-logs``) are pushed as
+    ``{"type": "entries", "entries": [...]}``; a ``{"type": "filter", "level": ..., ...}`` message replaces
+    the filters. One task polls the log index for every socket while any are open.
+    """
+
+    clients: set["WebSocketServerLogHandler"] = set()
+    POLL_SECONDS = 0.5
+    BATCH_SIZE = 500
+
+    _tail_task: asyncio.Task | None = None
+
+    def open(self, *args: str, **kwargs: str):
+        self.log_filter: LogFilter = parse_log_filter({name: self.get_argument(name, None) for name in ("level", "since", "until", "client", "q")})
+        cls = WebSocketServerLogHandler
+        cls.clients.add(self)
+        if cls._tail_task is None or cls._tail_task.done():
+            cls._tail_task = asyncio.create_task(cls._tail())
+
+    def on_message(self, message):
+        try:
+            data = json.loads(message)
+        except Exception:
+            return
+        message_type = data.get("type")
+        if message_type == "ping":
+            self.write_message({"type": "pong"})
+        elif message_type == "filter":
+            arguments = {name: ",".join(map(str, value)) if isinstance(value, list) else str(value) for name, value in data.items() if value is not None}
+            self.log_filter = parse_log_filter(arguments)
+
+    def on_close(self):
+        WebSocketServerLogHandler.clients.discard(self)
+
+    @classmethod
+    async def _tail(cls):
+        await server_log_index.refresh()
+        offset = server_log_index.size
+        while cls.clients:
+            try:
+                result = await server_log_index.query(after=offset, limit=cls.BATCH_SIZE)
+            except Exception as e:
+                logging.warning(f"[ServerLogTail] Reading the log index failed: {e}")
+                await asyncio.sleep(cls.POLL_SECONDS * 10)
+                continue
+
+            offset = result["after"]
+            if entries := result["entries"]:
+                add_client_names(entries)
+                for client in list(cls.clients):
+                    matching = [entry for entry in entries if client.log_filter.matches(entry)]
+                    if not matching:
+                        continue
+                    try:
+                        client.write_message({"type": "entries", "entries": matching, "after": offset})
+                    except WebSocketClosedError:
+                        cls.clients.discard(client)
+
+            if not result["more"]:
+                await asyncio.sleep(cls.POLL_SECONDS)
@@ -1,27 +1,185 @@
 import json
+import logging
+from collections import defaultdict
+from typing import Callable, Iterable
 
 import msgspec
-from tornado.websocket import WebSocketHandler
+from tornado.websocket import WebSocketClosedError, WebSocketHandler
+
+# Subscribe message keys -> topic kinds
+TOPIC_KINDS = {
+    "job_ids": "job",
+    "flowtags": "flowtag",
+    "part_names": "part",
+}
+
+# job_ids: ["*"] follows every job, e.g. for job lists that need to see newly created jobs
+ALL_JOBS = "*"
+
+Topic = tuple[str, int | str]
 
 
 class WebSocketWorkspaceHandler(WebSocketHandler):
     clients = set()
 
+    # Clients that never sent a subscribe message still receive everything
+    unfiltered_clients = set()
+
+    # Inverted index: (kind, key) -> subscribed sockets
+    topic_index: dict[Topic, set["WebSocketWorkspaceHandler"]] = defaultdict(set)
+
+    # Clients with more than this many bytes still queued are skipped instead of buffering further
+    MAX_PENDING_WRITE_BYTES = 1024 * 1024
+
+    stats = {
+        "messages_in": 0,
+        "broadcasts": 0,
+        "frames_out": 0,
+        "skipped_backpressure": 0,
+        "skipped_no_subscribers": 0,
+    }
+
     def open(self, *args: str, **kwargs: str):
+        self.topics: set[Topic] = set()
         WebSocketWorkspaceHandler.clients.add(self)
+        WebSocketWorkspaceHandler.unfiltered_clients.add(self)
 
     def on_message(self, message):
         try:
             data = json.loads(message)
         except Exception:
             return
-        if data.get("type") == "ping":
+        message_type = data.get("type")
+        if message_type == "ping":
             self.write_message({"type": "pong"})
+        elif message_type == "subscribe":
+            self.subscribe(self._parse_topics(data))
+            self.write_message({"type": "subscribed", "topics": self._describe_topics()})
+        elif message_type == "unsubscribe":
+            self.unsubscribe(self._parse_topics(data))
+            self.write_message({"type": "subscribed", "topics": self._describe_topics()})
 
     def on_close(self):
-        WebSocketWorkspaceHandler.clients.remove(self)
+        self.unsubscribe(set(self.topics))
+        WebSocketWorkspaceHandler.clients.discard(self)
+        WebSocketWorkspaceHandler.unfiltered_clients.discard(self)
+
+    # -------------------------
+    # Subscriptions
+    # -------------------------
+    @staticmethod
+    def _parse_topics(data: dict) -> set[Topic]:
+        topics = set()
+        for field, kind in TOPIC_KINDS.items():
+            for key in data.get(field) or []:
+                if kind == "job" and key != ALL_JOBS:
+                    try:
+                        key = int(key)
+                    except (TypeError, ValueError):
+                        continue
+                elif not isinstance(key, str) or not key:
+                    continue
+                topics.add((kind, key))
+        return topics
+
+    def _describe_topics(self) -> dict[str, list]:
+        described = {field: [] for field in TOPIC_KINDS}
+        fields = {kind: field for field, kind in TOPIC_KINDS.items()}
+        for kind, key in self.topics:
+            described[fields[kind]].append(key)
+        return described
+
+    def subscribe(self, topics: set[Topic]):
+        cls = WebSocketWorkspaceHandler
+        cls.unfiltered_clients.discard(self)
+        for topic in topics:
+            cls.topic_index[topic].add(self)
+        self.topics |= topics
+
+    def unsubscribe(self, topics: set[Topic]):
+        cls = WebSocketWorkspaceHandler
+        for topic in topics & self.topics:
+            subscribers = cls.topic_index.get(topic)
+            if subscribers is not None:
+                subscribers.discard(self)
+                if not subscribers:
+                    del cls.topic_index[topic]
+        self.topics -= topics
+
+    @classmethod
+    def subscribers(cls, topics: Iterable[Topic]) -> set["WebSocketWorkspaceHandler"]:
+        recipients = set(cls.unfiltered_clients)
+        for topic in topics:
+            recipients |= cls.topic_index.get(topic, set())
+        return recipients
 
     @classmethod
-    def broadcast(cls, message: dict):
-        for client in cls.clients:
-            client.write_message(msgspec.json.encode(message))
+    def has_subscribers(cls, topics: Iterable[Topic]) -> bool:
+        return bool(cls.unfiltered_clients) or any(topic in cls.topic_index for topic in topics)
+
+    # -------------------------
+    # Sending
+    # -------------------------
+    def pending_write_bytes(self) -> int:
+        stream = self.ws_connection.stream if self.ws_connection else None
+        return getattr(stream, "_write_buffer_size", 0) if stream else 0
+
+    @classmethod
+    def _send(cls, clients: Iterable["WebSocketWorkspaceHandler"], payload: bytes) -> int:
+        sent = 0
+        for client in list(clients):
+            if client.pending_write_bytes() > cls.MAX_PENDING_WRITE_BYTES:
+                cls.stats["skipped_backpressure"] += 1
+                continue
+            try:
+                client.write_message(payload)
+                sent += 1
+            except WebSocketClosedError:
+                client.on_close()
+            except Exception as e:
+                logging.warning(f"[WorkspaceWebSocket] Failed to send to {client.request.remote_ip}: {e}")
+
+        cls.stats["frames_out"] += sent
+        return sent
+
+    @classmethod
+    def broadcast(cls, message: dict, topics: Iterable[Topic] | None = None) -> int:
+        """
+        Sends ``message`` to every client, or only to unfiltered clients and
+        subscribers of ``topics`` when given.
+        """
+        recipients = cls.clients if topics is None else cls.subscribers(topics)
+        if not recipients:
+            cls.stats["skipped_no_subscribers"] += 1
+            return 0
+
+        # Encoded once; Tornado sends bytes as a text frame without re-encoding per client
+        cls.stats["broadcasts"] += 1
+        return cls._send(recipients, msgspec.json.encode(message))
+
+    @classmethod
+    def broadcast_changes(cls, message: dict, changes: list[dict], topics_of: Callable[[dict], Iterable[Topic]]) -> int:
+        """
+        Sends ``message`` with a ``changes`` list filtered per client to the changes it subscribed to.
+
+        Clients that end up with the same subset share one encoded frame.
+        """
+        per_client: dict[WebSocketWorkspaceHandler, list[int]] = defaultdict(list)
+        for index, change in enumerate(changes):
+            for client in cls.subscribers(topics_of(change)):
+                per_client[client].append(index)
+
+        if not per_client:
+            cls.stats["skipped_no_subscribers"] += 1
+            return 0
+
+        groups: dict[tuple[int, ...], list[WebSocketWorkspaceHandler]] = defaultdict(list)
+        for client, indexes in per_client.items():
+            groups[tuple(indexes)].append(client)
+
+        cls.stats["broadcasts"] += 1
+        sent = 0
+        for indexes, clients in groups.items():
+            payload = msgspec.json.encode({**message, "changes": [changes[i] for i in indexes]})
+            sent += cls._send(clients, payload)
+        return sent
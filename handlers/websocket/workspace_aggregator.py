@@ -0,0 +1,91 @@
+import asyncio
+import logging
+
+from handlers.websocket.workspace import ALL_JOBS, WebSocketWorkspaceHandler
+
+
+class GroupedPartsNotificationAggregator:
+    """
+    Debounces ``view_grouped_laser_cut_parts_by_job`` NOTIFYs.
+
+    Each statement on ``assembly_laser_cut_parts`` fires NOTIFYs whose ``changes`` list the
+    affected rows per (job_id, part_name, flowtag) with a ``count``. Notifications are collected
+    for ``flush_delay`` seconds and collapsed into one delta per (job_id, part_name, flowtag), so
+    each delta's ``flowtag_indexes`` index its own ``flowtag``, and sent as a single frame per set
+    of subscribers. Single-row payloads are still understood.
+    """
+
+    def __init__(self, flush_delay: float = 0.1, max_pending: int = 2000):
+        self.flush_delay = flush_delay
+        self.max_pending = max_pending
+        self._pending: dict[tuple[int | None, str | None, tuple[str, ...]], dict] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    @staticmethod
+    def topics_of(change: dict) -> list[tuple[str, int | str]]:
+        topics = [("job", change["job_id"]), ("job", ALL_JOBS), ("part", change["part_name"])]
+        # A part leaving a flowtag matters to that station as much as one arriving at it
+        flowtag = change.get("flowtag") or []
+        for index in change["flowtag_indexes"]:
+            for position in (index - 1, index):
+                if 0 <= position < len(flowtag):
+                    topics.append(("flowtag", flowtag[position]))
+        return topics
+
+    def add(self, msg: dict):
+        WebSocketWorkspaceHandler.stats["messages_in"] += 1
+
+        operation = (msg.get("type") or "update").lower()
+        for change in msg.get("changes") or [msg]:
+            self._add_change(operation, change)
+
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_delay, self.flush)
+
+    def _add_change(self, operation: str, change: dict):
+        job_id = change.get("job_id")
+        part_name = change.get("part_name")
+        # The same part can be in a job under different flowtags
+        key = (job_id, part_name, tuple(change.get("flowtag") or ()))
+        delta = self._pending.get(key)
+        if delta is None:
+            delta = {
+                "job_id": job_id,
+                "part_name": part_name,
+                "flowtag": change.get("flowtag"),
+                "insert": 0,
+                "update": 0,
+                "delete": 0,
+                "flowtag_indexes": set(),
+            }
+            self._pending[key] = delta
+
+        delta[operation] = delta.get(operation, 0) + change.get("count", 1)
+        delta["flowtag_indexes"].update(change.get("flowtag_indexes") or ())
+        if change.get("flowtag_index") is not None:
+            delta["flowtag_indexes"].add(change["flowtag_index"])
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        changes = []
+        for delta in self._pending.values():
+            delta["flowtag_indexes"] = sorted(delta["flowtag_indexes"])
+            changes.append(delta)
+        self._pending = {}
+
+        try:
+            WebSocketWorkspaceHandler.broadcast_changes(
+                {"type": "grouped_parts_job_view_changed", "operation": "batch"},
+                changes,
+                self.topics_of,
+            )
+        except Exception:
+            logging.exception("[GroupedPartsNotificationAggregator] Failed to broadcast batch")
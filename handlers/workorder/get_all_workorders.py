@@ -1,14 +1,10 @@
-import msgspec
-
 from handlers.base import BaseHandler
 
 
 class GetAllWorkordersHandler(BaseHandler):
     async def get(self):
         try:
-            entry_data = await self.workorders_db.get_all_workorders()
-            self.set_header("Content-Type", "application/json")
-            self.write(msgspec.json.encode(entry_data))
+            await self.write_cached_json("workorders", self.workorders_db.get_all_workorders, lambda: self.workorders_db.cache_generation("all_workorders"))
         except Exception as e:
             self.set_status(400)
             self.write({"error": str(e)})
@@ -16,6 +16,7 @@ class WorkorderMarkComplete(BaseHandler):
             result = await self.workspace_db.mark_workorder_parts_complete(
                 parts=parts,
                 changed_by=self.current_user,
+                job_ids=self.workorders_db._extract_job_ids(workorder),
             )
             params = urlencode({"title": "Workorder Updated", "message": f"Workorder {workorder_id} marked as complete.", "type": "success"})
             self.redirect(f"/message?{params}")
@@ -34,9 +35,10 @@ class WorkorderMarkComplete(BaseHandler):
 
         parts = self.workorders_db._extract_parts_with_quantity(workorder)
 
-        await self.workspace_db.mark_workorder_parts_complete(
+        result = await self.workspace_db.mark_workorder_parts_complete(
             parts=parts,
             changed_by=self.current_user,
+            job_ids=self.workorders_db._extract_job_ids(workorder),
         )
 
-        self.write({"ok": True, "workorder_id": workorder_id})
+        self.write({"ok": True, "workorder_id": workorder_id, "advanced_total": result["advanced_total"], "overflow": result["overflow"]})
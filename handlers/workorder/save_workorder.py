@@ -1,6 +1,7 @@
 import msgspec
 
 from handlers.base import BaseHandler
+from handlers.misc.printout_render import CachedRenderHandler
 
 
 class SaveWorkorderHandler(BaseHandler):
@@ -12,6 +13,7 @@ class SaveWorkorderHandler(BaseHandler):
             client_name = self.get_client_name_from_header()
 
             new_workorder_id = await self.workorders_db.save_workorder(workorder_id, workorder_data, modified_by=client_name)
+            CachedRenderHandler.prerender("/workorders/view", new_workorder_id)
 
             # self.signal_clients_for_changes(
             #     client_name,
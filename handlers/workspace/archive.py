@@ -0,0 +1,31 @@
+from handlers.base import BaseHandler
+
+
+class WorkspaceArchiveHandler(BaseHandler):
+    async def get(self):
+        await self.write_json(
+            {
+                **self.workspace_archive_db.status(),
+                "tables": await self.workspace_archive_db.get_table_sizes(),
+                "archived_jobs": await self.workspace_archive_db.get_archived_jobs(),
+            }
+        )
+
+    async def post(self):
+        # Same as the daily run; returns its summary, or 409 if one is already going
+        result = await self.workspace_archive_db.archive_completed_jobs()
+        if result is None:
+            self.set_status(409)
+            self.write({"error": "Archiving is already in progress"})
+            return
+        await self.write_json(result)
+
+
+class WorkspaceRestoreArchivedJobHandler(BaseHandler):
+    async def post(self, job_id: str):
+        restored = await self.workspace_archive_db.restore_job(int(job_id))
+        if not restored:
+            self.set_status(404)
+            self.write({"error": f"Job {job_id} is not archived"})
+            return
+        self.write({"status": "ok", "job_id": int(job_id)})
@@ -7,7 +7,8 @@ class WorkspaceGetPartsByJobHandler(BaseHandler):
     async def get(self, job_id):
         try:
             job_id = int(job_id)
-            job_data = await self.workspace_db.get_parts_by_job(job_id)
+            include_archived = self.get_flag_argument("include_archived")
+            job_data = await self.workspace_db.get_parts_by_job(job_id, include_archived)
             self.set_header("Content-Type", "application/json")
             self.write(msgspec.json.encode(job_data))
         except Exception as e:
@@ -50,6 +50,7 @@ class WorkspaceLaserCutPartHandler(BaseHandler):
         flowtag_status_index = int(flowtag_status_index_arg) if flowtag_status_index_arg is not None else None
 
         data_type = self.get_argument("data_type", None)
+        include_archived = self.get_flag_argument("include_archived")
 
         try:
             data = await self.view_db.find(
@@ -59,6 +60,7 @@ class WorkspaceLaserCutPartHandler(BaseHandler):
                 flowtag_index=flowtag_index,
                 flowtag_status_index=flowtag_status_index,
                 data_type=data_type,
+                include_archived=include_archived,
             )
             self.write_json({"data": data})
 
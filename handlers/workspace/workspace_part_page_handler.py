@@ -83,7 +83,8 @@ class WorkspacePartHandler(BaseHandler):
             return
 
         job_data = await self.workspace_db.get_job_by_id(int(job_id))
-        parts_data = await self.workspace_db.get_parts_by_job(int(job_id))
+        # Links to a part page stay valid after its job is archived
+        parts_data = await self.workspace_db.get_parts_by_job(int(job_id), include_archived=True)
 
         if not parts_data:
             self.redirect(f"/message?msg=No+parts+found+for+Job+ID+{job_id}.&type=error")
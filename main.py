@@ -3,7 +3,6 @@ import os
 import shutil
 import signal
 import sys
-import zipfile
 from datetime import datetime
 from functools import partial
 from typing import Literal
@@ -17,11 +16,19 @@ import config.variables as variables
 from config.environments import Environment
 from config.logging_config import setup_logging
 from handlers.base import BaseHandler
-from handlers.websocket.workspace import WebSocketWorkspaceHandler
+from handlers.websocket.workspace import ALL_JOBS, WebSocketWorkspaceHandler
+from handlers.websocket.workspace_aggregator import GroupedPartsNotificationAggregator
 from routes import route_map
+from utils.backup.engine import backup_scheduler
+from utils.database.history_writer import history_writer
+from utils.database.pool_registry import PoolRegistry
+from utils.renderer import RendererClient
 from utils.sheet_report import generate_sheet_report
+from utils.wayback_indexer import WaybackIndexer
 
 workspace_db = BaseHandler.workspace_db
+grouped_parts_aggregator = GroupedPartsNotificationAggregator()
+wayback_indexer = WaybackIndexer(BaseHandler.wayback_db)
 
 WORKSPACE_TABLE_CHANNELS = [
     "jobs",
@@ -42,7 +49,10 @@ async def start_workspace_services():
         try:
             await workspace_db.connect()
 
-            async with workspace_db.db_pool.acquire() as conn:
+            # Dedicated lease so the long-lived LISTEN connection does not eat into WorkspaceDB's quota
+            listener_pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "workspace_listener")
+
+            async with listener_pool.acquire() as conn:
                 for channel in WORKSPACE_TABLE_CHANNELS:
                     await conn.add_listener(channel, workspace_notify_handler)
 
@@ -77,65 +87,52 @@ async def _handle_workspace_message(channel: str, msg: dict):
     part_name = msg.get("part_name")
 
     if channel == "jobs":
+        topics = [("job", job_id), ("job", ALL_JOBS)]
         if op in ("INSERT", "UPDATE"):
+            # Nobody is looking at this job, so don't fetch it
+            if not WebSocketWorkspaceHandler.has_subscribers(topics):
+                WebSocketWorkspaceHandler.stats["skipped_no_subscribers"] += 1
+                return
             job = await workspace_db.get_job_by_id(job_id)
             WebSocketWorkspaceHandler.broadcast(
-                {"type": f"job_{op.lower()}", "job": job}
+                {"type": f"job_{op.lower()}", "job": job}, topics
             )
         elif op == "DELETE":
             WebSocketWorkspaceHandler.broadcast(
-                {"type": "job_deleted", "job_id": job_id}
+                {"type": "job_deleted", "job_id": job_id}, topics
             )
 
     elif channel == "view_grouped_laser_cut_parts_by_job":
-        WebSocketWorkspaceHandler.broadcast(
-            {
-                "type": "grouped_parts_job_view_changed",
-                "operation": op.lower(),
-                "job_id": job_id,
-                "part_name": part_name,
-                "flowtag": msg.get("flowtag"),
-                "flowtag_index": msg.get("flowtag_index"),
-            }
-        )
+        grouped_parts_aggregator.add(msg)
 
 
 # -------------------------
 # BACKUPS (SAFE)
 # -------------------------
-def zip_files(zip_path: str):
-    data_dir = os.path.join(Environment.DATA_PATH, "data")
-    os.makedirs(os.path.dirname(zip_path), exist_ok=True)
-
-    if not os.path.isdir(data_dir):
-        return
-
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
-        for name in os.listdir(data_dir):
-            full = os.path.join(data_dir, name)
-            if os.path.isfile(full):
-                z.write(full, name)
+# Snapshots run in a worker process, see utils/backup/engine.py
+def hourly_backup():
+    IOLoop.current().spawn_callback(backup_scheduler.run, "hourly")
 
 
-def hourly_backup():
-    zip_files(
-        f"{Environment.DATA_PATH}/backups/Hourly Backup - "
-        f"{datetime.now().strftime('%I %p')}.zip"
-    )
+async def _daily_backup():
+    if await backup_scheduler.run("daily"):
+        await wayback_indexer.index_new_backups()
 
 
 def daily_backup():
-    zip_files(
-        f"{Environment.DATA_PATH}/backups/Daily Backup - "
-        f"{datetime.now().strftime('%d %B')}.zip"
-    )
+    IOLoop.current().spawn_callback(_daily_backup)
 
 
 def weekly_backup():
-    zip_files(
-        f"{Environment.DATA_PATH}/backups/Weekly Backup - "
-        f"{datetime.now().strftime('%W')}.zip"
-    )
+    IOLoop.current().spawn_callback(backup_scheduler.run, "weekly")
+
+
+# -------------------------
+# ARCHIVING
+# -------------------------
+# Moves completed jobs out of the live workspace tables, see utils/database/workspace_archive_db.py
+def archive_completed_jobs():
+    IOLoop.current().spawn_callback(BaseHandler.workspace_archive_db.archive_completed_jobs)
 
 
 def copy_server_log():
@@ -168,9 +165,13 @@ def make_app():
 async def shutdown():
     tornado.log.app_log.info("Shutting down cleanly...")
     shutdown_event.set()
+    grouped_parts_aggregator.flush()
 
-    if workspace_db.db_pool:
-        await workspace_db.db_pool.close()
+    await BaseHandler.user_registry.flush()
+    await history_writer.drain()
+    await PoolRegistry.close_all()
+    await RendererClient.close()
+    backup_scheduler.shutdown()
 
     IOLoop.current().stop()
 
@@ -204,6 +205,7 @@ if __name__ == "__main__":
     PeriodicCallback(daily_backup, 24 * 60 * 60 * 1000).start()
     PeriodicCallback(weekly_backup, 7 * 24 * 60 * 60 * 1000).start()
     PeriodicCallback(copy_server_log, 24 * 60 * 60 * 1000).start()
+    PeriodicCallback(archive_completed_jobs, 24 * 60 * 60 * 1000).start()
 
     # Weekly report
     PeriodicCallback(
@@ -214,5 +216,8 @@ if __name__ == "__main__":
     # DB listeners
     IOLoop.current().spawn_callback(start_workspace_services)
 
+    # Picks up daily backups written while the server was down
+    IOLoop.current().spawn_callback(wayback_indexer.index_new_backups)
+
     tornado.log.app_log.info("Invigo server started")
     IOLoop.current().start()
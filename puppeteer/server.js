@@ -1,48 +1,205 @@
 const express = require("express");
 const puppeteer = require("puppeteer");
+const { PDFDocument } = require("pdf-lib");
 const { URL } = require("url");
 
 const app = express();
 app.use(express.json({ limit: "5mb" }));
 
-async function applyLocalStorage(page, targetUrl, storage) {
-    if (!storage || typeof storage !== "object") {
-        throw new Error("localStorage payload missing or invalid");
+const BROWSER_COUNT = parseInt(process.env.RENDER_BROWSERS || "2", 10);
+const PAGES_PER_BROWSER = parseInt(process.env.RENDER_PAGES_PER_BROWSER || "3", 10);
+const MAX_QUEUE = parseInt(process.env.RENDER_MAX_QUEUE || "100", 10);
+// Chromium leaks memory over long sessions, so each browser is recycled after this many renders
+const RENDERS_PER_BROWSER = parseInt(process.env.RENDER_RECYCLE_AFTER || "200", 10);
+
+const LAUNCH_OPTIONS = {
+    headless: "new",
+    args: [
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-gpu",
+        "--no-zygote",
+    ],
+};
+
+class RenderError extends Error {
+    constructor(status, message) {
+        super(message);
+        this.status = status;
+    }
+}
+
+// -------------------------
+// Browser pool
+// -------------------------
+class BrowserSlot {
+    constructor(index) {
+        this.index = index;
+        this.browser = null;
+        this.launching = null;
+        this.active = 0;
+        this.renders = 0;
+    }
+
+    async get(timings) {
+        if (this.browser && this.browser.connected && this.renders < RENDERS_PER_BROWSER) {
+            timings.launch = 0;
+            return this.browser;
+        }
+
+        if (!this.launching) {
+            const old = this.browser;
+            this.browser = null;
+            this.launching = (async () => {
+                if (old) {
+                    // Let in-flight renders on the old browser finish before closing it
+                    const closeWhenIdle = async () => {
+                        while (old.connected && old.__active > 0) {
+                            await new Promise((r) => setTimeout(r, 250));
+                        }
+                        await old.close().catch(() => {});
+                    };
+                    closeWhenIdle();
+                }
+                const browser = await puppeteer.launch(LAUNCH_OPTIONS);
+                browser.__active = 0;
+                this.browser = browser;
+                this.renders = 0;
+                return browser;
+            })().finally(() => {
+                this.launching = null;
+            });
+        }
+
+        const started = Date.now();
+        const browser = await this.launching;
+        timings.launch = Date.now() - started;
+        return browser;
+    }
+}
+
+class RenderPool {
+    constructor(size, pagesPerBrowser, maxQueue) {
+        this.slots = Array.from({ length: size }, (_, i) => new BrowserSlot(i));
+        this.pagesPerBrowser = pagesPerBrowser;
+        this.maxQueue = maxQueue;
+        this.queue = [];
+        this.stats = { rendered: 0, failed: 0, rejected: 0 };
+    }
+
+    async warm() {
+        await Promise.all(this.slots.map((slot) => slot.get({})));
     }
 
-    const u = new URL(targetUrl);
-    const origin = `${u.protocol}//${u.host}`;
+    freeSlot() {
+        let best = null;
+        for (const slot of this.slots) {
+            if (slot.active < this.pagesPerBrowser && (!best || slot.active < best.active)) {
+                best = slot;
+            }
+        }
+        return best;
+    }
+
+    acquire() {
+        const slot = this.freeSlot();
+        if (slot) {
+            slot.active += 1;
+            return Promise.resolve(slot);
+        }
+        if (this.queue.length >= this.maxQueue) {
+            this.stats.rejected += 1;
+            return Promise.reject(new RenderError(503, "Render queue is full"));
+        }
+        return new Promise((resolve) => this.queue.push(resolve));
+    }
 
-    // Load correct origin
-    await page.goto(origin, {
-        waitUntil: "domcontentloaded",
-        timeout: 60000,
-    });
+    release(slot) {
+        const next = this.queue.shift();
+        if (next) {
+            // Hand the page slot straight to the next waiter
+            next(slot);
+        } else {
+            slot.active -= 1;
+        }
+    }
 
-    // Apply storage on THAT origin
-    await page.evaluate((state) => {
-        localStorage.clear();
-        for (const [k, v] of Object.entries(state)) {
-            localStorage.setItem(k, String(v));
+    async run(job) {
+        const timings = {};
+        const queued = Date.now();
+        const slot = await this.acquire();
+        timings.queue = Date.now() - queued;
+
+        let browser = null;
+        try {
+            browser = await slot.get(timings);
+            browser.__active += 1;
+            slot.renders += 1;
+            const result = await renderOnBrowser(browser, job, timings);
+            this.stats.rendered += 1;
+            return { data: result, timings };
+        } catch (e) {
+            this.stats.failed += 1;
+            throw e;
+        } finally {
+            if (browser) browser.__active -= 1;
+            this.release(slot);
         }
-    }, storage);
+    }
+
+    status() {
+        return {
+            ...this.stats,
+            queued: this.queue.length,
+            browsers: this.slots.map((slot) => ({
+                active: slot.active,
+                renders: slot.renders,
+                connected: Boolean(slot.browser && slot.browser.connected),
+            })),
+        };
+    }
+}
+
+const pool = new RenderPool(BROWSER_COUNT, PAGES_PER_BROWSER, MAX_QUEUE);
+
+// -------------------------
+// Rendering
+// -------------------------
+async function applyLocalStorage(page, targetUrl, storage) {
+    if (!storage || typeof storage !== "object") {
+        throw new RenderError(400, "localStorage payload missing or invalid");
+    }
+
+    const origin = new URL(targetUrl).origin;
+
+    // Seed storage before any page script runs, so the app boots with it on the first load
+    await page.evaluateOnNewDocument(
+        (expectedOrigin, state) => {
+            if (location.origin !== expectedOrigin) return;
+            localStorage.clear();
+            for (const [k, v] of Object.entries(state)) {
+                localStorage.setItem(k, String(v));
+            }
+        },
+        origin,
+        storage
+    );
 }
 
-async function render({ url, localStorage, mode }) {
-    if (!url) throw new Error("Missing url");
+async function renderOnBrowser(browser, { url, localStorage, mode }, timings) {
+    if (!url) throw new RenderError(400, "Missing url");
 
-    const browser = await puppeteer.launch({
-        headless: "new",
-        args: [
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-gpu",
-            "--no-zygote",
-        ],
-    });
+    let stage = Date.now();
+    const lap = (name) => {
+        const now = Date.now();
+        timings[name] = now - stage;
+        stage = now;
+    };
 
+    // Isolated context per render: storage/cookies never leak between requests sharing a browser
+    const context = await browser.createBrowserContext();
     try {
-        const page = await browser.newPage();
+        const page = await context.newPage();
 
         await page.setViewport({
             width: 1400,
@@ -50,17 +207,10 @@ async function render({ url, localStorage, mode }) {
             deviceScaleFactor: 2,
         });
 
-        // Apply storage correctly
         await applyLocalStorage(page, url, localStorage);
+        lap("storage");
 
-        // Load real page
         await page.goto(url, {
-            waitUntil: "domcontentloaded",
-            timeout: 60000,
-        });
-
-        // Force app to boot WITH storage
-        await page.reload({
             waitUntil: "networkidle0",
             timeout: 60000,
         });
@@ -69,56 +219,71 @@ async function render({ url, localStorage, mode }) {
         await page.evaluate(() => {
             if (window.applyStoredSettings) window.applyStoredSettings();
         });
+        lap("load");
 
+        let data;
         if (mode === "png") {
             await page.emulateMediaType("screen");
             await page.emulateMediaType("print");
-            return await page.screenshot({
+            data = await page.screenshot({
                 type: "png",
                 fullPage: true,
                 printBackground: true,
                 preferCSSPageSize: true,
             });
+        } else {
+            await page.emulateMediaType("print");
+            data = await page.pdf({
+                printBackground: true,
+                preferCSSPageSize: true,
+            });
         }
+        lap("print");
 
-        await page.emulateMediaType("print");
-        return await page.pdf({
-            printBackground: true,
-            preferCSSPageSize: true,
-        });
+        return Buffer.isBuffer(data) ? data : Buffer.from(data);
     } finally {
-        await browser.close();
+        await context.close().catch(() => {});
     }
 }
 
-app.post("/pdf", async (req, res) => {
-    const raw = await render({
-        url: req.body.url,
-        localStorage: req.body.localStorage,
-        mode: "pdf",
-    });
-
-    // FORCE Node Buffer
-    const buf = Buffer.isBuffer(raw)
-        ? raw
-        : Buffer.from(raw);
-
-    // SAFE check
+function assertPdf(buf) {
     if (buf.slice(0, 5).toString("ascii") !== "%PDF-") {
         throw new Error(
             "Not a PDF. First 32 bytes: " + buf.slice(0, 32).toString("hex")
         );
     }
+}
 
-    res.status(200)
-        .set("Content-Type", "application/pdf")
-        .set("Content-Disposition", 'inline; filename="output.pdf"')
-        .send(buf);
+function sendError(res, e) {
+    console.error(e);
+    res.status(e.status || 500).type("text/plain").send(String(e.stack || e));
+}
 
+// -------------------------
+// Routes
+// -------------------------
+app.post("/pdf", async (req, res) => {
+    try {
+        const { data, timings } = await pool.run({
+            url: req.body.url,
+            localStorage: req.body.localStorage,
+            mode: "pdf",
+        });
+        assertPdf(data);
+
+        res.status(200)
+            .set("Content-Type", "application/pdf")
+            .set("Content-Disposition", 'inline; filename="output.pdf"')
+            .set("X-Render-Timings", JSON.stringify(timings))
+            .send(data);
+    } catch (e) {
+        sendError(res, e);
+    }
 });
+
 app.post("/png", async (req, res) => {
     try {
-        const buf = await render({
+        const { data, timings } = await pool.run({
             url: req.body.url,
             localStorage: req.body.localStorage,
             mode: "png",
@@ -127,13 +292,62 @@ app.post("/png", async (req, res) => {
         res.status(200)
             .set("Content-Type", "image/png")
             .set("Content-Disposition", 'inline; filename="output.png"')
+            .set("X-Render-Timings", JSON.stringify(timings))
+            .send(data);
+    } catch (e) {
+        sendError(res, e);
+    }
+});
+
+// Renders every url through the pool and merges the results, in request order, into one PDF
+app.post("/pdf/batch", async (req, res) => {
+    try {
+        const urls = req.body.urls;
+        if (!Array.isArray(urls) || urls.length === 0) {
+            throw new RenderError(400, "urls must be a non-empty array");
+        }
+        if (urls.length > MAX_QUEUE) {
+            throw new RenderError(413, `At most ${MAX_QUEUE} urls per batch`);
+        }
+
+        const started = Date.now();
+        const results = await Promise.all(
+            urls.map((url) =>
+                pool.run({ url, localStorage: req.body.localStorage, mode: "pdf" })
+            )
+        );
+
+        const mergeStarted = Date.now();
+        const merged = await PDFDocument.create();
+        for (const { data } of results) {
+            assertPdf(data);
+            const doc = await PDFDocument.load(data);
+            const pages = await merged.copyPages(doc, doc.getPageIndices());
+            pages.forEach((page) => merged.addPage(page));
+        }
+        const buf = Buffer.from(await merged.save());
+
+        const timings = {
+            total: Date.now() - started,
+            merge: Date.now() - mergeStarted,
+            documents: results.map((r) => r.timings),
+        };
+
+        res.status(200)
+            .set("Content-Type", "application/pdf")
+            .set("Content-Disposition", 'inline; filename="output.pdf"')
+            .set("X-Render-Timings", JSON.stringify(timings))
             .send(buf);
     } catch (e) {
-        console.error(e);
-        res.status(500).type("text/plain").send(String(e.stack || e));
+        sendError(res, e);
     }
 });
 
+app.get("/status", (req, res) => {
+    res.json(pool.status());
+});
+
 app.listen(3000, "0.0.0.0", () => {
     console.log("puppeteer renderer listening on :3000");
+    pool.warm().catch((e) => console.error("Failed to warm browser pool", e));
 });
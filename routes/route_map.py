@@ -75,13 +75,17 @@ from handlers.misc.email_sent import EmailSentHandler
 from handlers.misc.inventory_page import InventoryHandler
 from handlers.misc.inventory_tables_page import InventoryTablesHandler
 from handlers.misc.message_handler import MessageHandler
-from handlers.misc.pdf import GeneratePDFHandler
+from handlers.misc.pdf import GenerateBatchPDFHandler, GeneratePDFHandler
 from handlers.misc.png import GeneratePNGHandler
 from handlers.misc.qr_code_page import QRCodePageHandler
 from handlers.order_number.get_order_number import GetOrderNumberHandler
 from handlers.order_number.set_order_number import SetOrderNumberHandler
 from handlers.page import PageHandler
 from handlers.ping import PingHandler
+from handlers.production_planner.analytics_handler import (
+    ProductionBottlenecksHandler,
+    ProductionThroughputHandler,
+)
 from handlers.production_planner.file_uploader import ProductionPlannerFileUploadHandler
 from handlers.production_planner.job_timeline_handler import JobTimelineHandler
 from handlers.purchase_orders.delete_purchase_order import DeletePurchaseOrderHandler
@@ -123,6 +127,7 @@ from handlers.vendors.save_vendor import SaveVendorHandler
 from handlers.wayback_machine.fetch_data import FetchDataHandler
 from handlers.wayback_machine.get_data import WayBackMachineDataHandler
 from handlers.wayback_machine.way_back_machine import WayBackMachineHandler
+from handlers.websocket.server_log import WebSocketServerLogHandler
 from handlers.websocket.software import WebSocketSoftwareHandler
 from handlers.websocket.website import WebSocketWebsiteHandler
 from handlers.websocket.workspace import WebSocketWorkspaceHandler
@@ -134,6 +139,10 @@ from handlers.workorder.mark_complete import WorkorderMarkComplete
 from handlers.workorder.save_workorder import SaveWorkorderHandler
 from handlers.workorder.workorder_printouts import WorkordersPageHandler
 from handlers.workspace.add_job import WorkspaceAddJobHandler
+from handlers.workspace.archive import (
+    WorkspaceArchiveHandler,
+    WorkspaceRestoreArchivedJobHandler,
+)
 from handlers.workspace.delete_job import WorkspaceDeleteJobHandler
 from handlers.workspace.get_all_jobs import WorkspaceGetAllJobsHandler
 from handlers.workspace.get_job import WorkspaceGetJobHandler
@@ -219,6 +228,7 @@ api_routes = [
     route(r"/ws", WebSocketSoftwareHandler),
     route(r"/ws/web", WebSocketWebsiteHandler),
     route(r"/ws/workspace", WebSocketWorkspaceHandler),
+    route(r"/ws/server-logs", WebSocketServerLogHandler),
     route(r"/api/fetch-log", LogContentHandler),
     route(r"/api/delete-log", LogDeleteHandler),
     route(r"/command", CommandHandler),
@@ -247,9 +257,13 @@ api_routes = [
     route(r"/api/workspace/laser_cut_part", WorkspaceLaserCutPartHandler),
     route(r"/api/workspace/request_recut", RecutPartHandler),
     route(r"/api/workspace/recut_finished", RecutPartFinishedHandler),
+    route(r"/api/workspace/archive", WorkspaceArchiveHandler),
+    route(r"/api/workspace/archive/restore/([0-9]+)", WorkspaceRestoreArchivedJobHandler),
     # Production Planner Routes
     route(r"/api/production_planner/job/timeline", JobTimelineHandler),
     route(r"/api/production_planner/job/timeline/(.*)", JobTimelineHandler),
+    route(r"/api/production_planner/analytics/throughput", ProductionThroughputHandler),
+    route(r"/api/production_planner/analytics/bottlenecks", ProductionBottlenecksHandler),
     # OLD Workspace Routes
     route(r"/workspace/get_file/(.*)", WorkspaceFileReceiverHandler),
     route(r"/workspace/download_bundle", DownloadBundleHandler),
@@ -362,6 +376,7 @@ api_routes = [
     route(r"/api/users/([0-9]+)", UserHandler),
     route(r"/api/roles", RoleAPIHandler),
     route(r"/api/generate-pdf", GeneratePDFHandler),
+    route(r"/api/generate-pdf/batch", GenerateBatchPDFHandler),
     route(r"/api/generate-png", GeneratePNGHandler),
     route(r"/api/email-purchase-order", EmailPurchaseOrderHandler),
     route(r"/api/email-sent/([0-9]+)", EmailSentHandler),
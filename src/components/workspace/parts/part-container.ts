@@ -1,6 +1,6 @@
 import { LaserCutPartData } from "@interfaces/laser-cut-part";
 import { PartDataService } from "@components/workspace/parts/part-data.service";
-import { WorkspaceWebSocket } from "@core/websocket/workspace-websocket";
+import { WorkspaceTopics, WorkspaceWebSocket } from "@core/websocket/workspace-websocket";
 import { Loading } from "@components/common/loading/loading";
 import { WorkspaceSort } from "@models/workspace-sort";
 import { WorkspaceFilter } from "@models/workspace-filter";
@@ -42,6 +42,7 @@ type PartPageData = Array<PartData>;
 
 export class PartContainer {
     readonly element: HTMLElement;
+    private subscribedTopics: WorkspaceTopics = {};
 
     constructor() {
         this.element = document.createElement("div");
@@ -55,9 +56,29 @@ export class PartContainer {
         });
     }
 
+    // Only changes to the parts this view shows are pushed; unfiltered or with completed parts shown, that's every job
+    private syncSubscription() {
+        const tags = PartDataService.getViewTags();
+        const topics: WorkspaceTopics = tags.length === 0 || WorkspaceFilter.getManager().get().showCompleted
+            ? { job_ids: ["*"] }
+            : { flowtags: tags };
+        if (JSON.stringify(topics) === JSON.stringify(this.subscribedTopics)) {
+            return;
+        }
+
+        // Subscribe before dropping the old topics so no change slips through in between
+        WorkspaceWebSocket.subscribe(topics);
+        WorkspaceWebSocket.unsubscribe({
+            job_ids: this.subscribedTopics.job_ids?.filter(id => !topics.job_ids?.includes(id)),
+            flowtags: this.subscribedTopics.flowtags?.filter(tag => !topics.flowtags?.includes(tag)),
+        });
+        this.subscribedTopics = topics;
+    }
+
     async load() {
         const t0 = performance.now();
         Loading.show();
+        this.syncSubscription();
 
         // fetch
         const f0 = performance.now();
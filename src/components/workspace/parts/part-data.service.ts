@@ -70,29 +70,35 @@ export class PartDataService {
         return new URL('/api/workspace/recut_finished', window.location.origin).toString();
     }
 
-    private static buildGetPartsUrl(): string {
+    // Flowtags the parts view is filtered to; empty means every flowtag
+    static getViewTags(): string[] {
         const workspaceFilter = WorkspaceFilter.getManager().get();
         const user = Object.freeze(UserContext.getInstance().user);
 
-        // const currentView = ViewSettingsManager.get().lastActivePartView;
-        // const dbView = PartViewConfig[currentView].dbView;
-        const url = new URL(`/api/workspace/view/parts`, window.location.origin);
-
-        url.searchParams.append("show_completed", String(Number(workspaceFilter.showCompleted)));
-
         const filterTags = Object
             .entries(workspaceFilter)
             .filter(([key, value]) => key.startsWith("show_tag:") && value)
             .map(([key]) => key.slice("show_tag:".length));
 
         if (filterTags.length > 0) {
-            url.searchParams.append("tags", filterTags.join(","));
-        } else {
-            const tagNames = Object.keys(WorkspaceSettings.tags);
-            const viewableTags = tagNames.filter(tag => user.canViewTag(tag));
-            if (viewableTags.length > 0) {
-                url.searchParams.append("tags", viewableTags.join(","));
-            }
+            return filterTags;
+        }
+        const tagNames = Object.keys(WorkspaceSettings.tags);
+        return tagNames.filter(tag => user.canViewTag(tag));
+    }
+
+    private static buildGetPartsUrl(): string {
+        const workspaceFilter = WorkspaceFilter.getManager().get();
+
+        // const currentView = ViewSettingsManager.get().lastActivePartView;
+        // const dbView = PartViewConfig[currentView].dbView;
+        const url = new URL(`/api/workspace/view/parts`, window.location.origin);
+
+        url.searchParams.append("show_completed", String(Number(workspaceFilter.showCompleted)));
+
+        const viewTags = this.getViewTags();
+        if (viewTags.length > 0) {
+            url.searchParams.append("tags", viewTags.join(","));
         }
 
         const range = WorkspaceDateRange.getActiveRange();
@@ -43,10 +43,32 @@ export interface GroupedPartsChangeData {
     flowtag_index: number;
 }
 
+export interface GroupedPartsDelta {
+    job_id: number | null;
+    part_name: string | null;
+    flowtag: string[] | null;
+    insert: number;
+    update: number;
+    delete: number;
+    flowtag_indexes: number[];
+}
+
+export interface GroupedPartsBatchData {
+    operation: "batch";
+    changes: GroupedPartsDelta[];
+}
+
+export interface WorkspaceTopics {
+    job_ids?: (number | "*")[];
+    flowtags?: string[];
+    part_names?: string[];
+}
+
 type Listener<T extends WorkspaceMessage> = (data: T) => void;
 
 type WorkspaceMessage =
     | { type: "pong" }
+    | { type: "subscribed"; topics: Required<WorkspaceTopics> }
     | { type: "job_created"; job: WorkspaceJobData }
     | { type: "job_updated"; job: WorkspaceJobData }
     | { type: "job_deleted"; job_id: number }
@@ -56,7 +78,7 @@ type WorkspaceMessage =
     | { type: "part_created"; part: PartData }
     | { type: "part_updated"; part_id: number; delta: Partial<PartData> }
     | { type: "part_deleted"; part_id: number; }
-    | ({ type: "grouped_parts_job_view_changed" } & GroupedPartsChangeData)
+    | ({ type: "grouped_parts_job_view_changed" } & (GroupedPartsChangeData | GroupedPartsBatchData))
     | ({ type: "grouped_parts_global_view_changed" } & GroupedPartsChangeData);
 
 export class WorkspaceWebSocket {
@@ -66,12 +88,18 @@ export class WorkspaceWebSocket {
     private static buffer: Partial<Record<WorkspaceMessage["type"], any[]>> = {};
     private static timers: Partial<Record<WorkspaceMessage["type"], number>> = {};
     private static heartbeatTimer: number | null = null;
+    private static topics: WorkspaceTopics | null = null;
 
 
     static connect() {
         this.socket = new WebSocket(`ws://${location.host}/ws/workspace`);
 
         this.socket.onopen = () => {
+            // Re-register interest after a reconnect; without it the server sends everything
+            if (this.topics) {
+                this.socket.send(JSON.stringify({ type: "subscribe", ...this.topics }));
+            }
+
             // Start sending heartbeats every 25s
             this.heartbeatTimer = window.setInterval(() => {
                 if (this.socket.readyState === WebSocket.OPEN) {
@@ -110,6 +138,30 @@ export class WorkspaceWebSocket {
         };
     }
 
+    static subscribe(topics: WorkspaceTopics) {
+        this.topics = {
+            job_ids: [...new Set([...(this.topics?.job_ids ?? []), ...(topics.job_ids ?? [])])],
+            flowtags: [...new Set([...(this.topics?.flowtags ?? []), ...(topics.flowtags ?? [])])],
+            part_names: [...new Set([...(this.topics?.part_names ?? []), ...(topics.part_names ?? [])])],
+        };
+        if (this.socket?.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify({ type: "subscribe", ...topics }));
+        }
+    }
+
+    static unsubscribe(topics: WorkspaceTopics) {
+        if (this.topics) {
+            this.topics = {
+                job_ids: this.topics.job_ids?.filter((id) => !topics.job_ids?.includes(id)),
+                flowtags: this.topics.flowtags?.filter((tag) => !topics.flowtags?.includes(tag)),
+                part_names: this.topics.part_names?.filter((name) => !topics.part_names?.includes(name)),
+            };
+        }
+        if (this.socket?.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify({ type: "unsubscribe", ...topics }));
+        }
+    }
+
     static onReconnect(handler: () => void) {
         this.reconnectHandlers.push(handler);
     }
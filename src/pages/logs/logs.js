@@ -1,32 +1,62 @@
 import "beercss"
 import "@utils/theme"
+import { renderLogEntry } from "@utils/log-format";
 
 function goToMainUrl() {
     window.location.href = "/";
 }
 
-function fetchLogContent(file_name) {
+const LOG_PAGE_SIZE = 2000;
+
+// Archived log currently shown and where its next page starts
+let openLog = null;
+let nextOffset = 0;
+let loadingPage = false;
+
+async function loadLogPage() {
+    if (openLog === null || nextOffset === null || loadingPage) return;
+    loadingPage = true;
+    const fileName = openLog;
+
     const formData = new FormData();
-    formData.append("log_file_name", file_name);
+    formData.append("log_file_name", fileName);
+    formData.append("offset", nextOffset);
+    formData.append("limit", LOG_PAGE_SIZE);
+
+    try {
+        const response = await fetch("/api/fetch-log", {
+            method: "POST",
+            body: formData
+        });
+        if (!response.ok || fileName !== openLog) return;
+        const page = await response.json();
 
+        const fragment = document.createDocumentFragment();
+        for (const entry of page.entries) {
+            fragment.appendChild(renderLogEntry(entry));
+            fragment.appendChild(document.createTextNode("\n"));
+        }
+        document.getElementById("log_content").appendChild(fragment);
+        nextOffset = page.more ? page.after : null;
+    } catch (error) {
+        console.error('Error fetching log content:', error);
+    } finally {
+        loadingPage = false;
+    }
+}
+
+async function fetchLogContent(file_name) {
     const logNameElement = document.getElementById("log-name");
     if (logNameElement) {
         logNameElement.textContent = file_name;
     }
 
-    fetch("/api/fetch-log", {
-        method: "POST",
-        body: formData
-    })
-        .then(response => response.text())
-        .then(data => {
-            document.getElementById("log_content").innerHTML = data;
-            ui("#log_dialog");
-            window.location.hash = encodeURIComponent(file_name);
-        })
-        .catch(error => {
-            console.error('Error fetching log content:', error);
-        });
+    openLog = file_name;
+    nextOffset = 0;
+    document.getElementById("log_content").replaceChildren();
+    await loadLogPage();
+    ui("#log_dialog");
+    window.location.hash = encodeURIComponent(file_name);
 }
 
 function deleteLog(logFileName, button) {
@@ -116,6 +146,13 @@ document.addEventListener("DOMContentLoaded", function () {
     if (logDialog) {
         logDialog.addEventListener('close', function () {
             window.location.hash = "";
+            openLog = null;
+        });
+        // Load the next page when scrolled near the end
+        logDialog.addEventListener('scroll', function () {
+            if (logDialog.scrollHeight - logDialog.scrollTop - logDialog.clientHeight < 400) {
+                loadLogPage();
+            }
         });
     }
 });
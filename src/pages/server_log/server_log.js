@@ -1,5 +1,7 @@
 import "beercss"
 import "@utils/theme"
+import { debounce } from "@utils/debounce";
+import { renderLogEntry } from "@utils/log-format";
 
 function goToMainUrl() {
     window.location.href = "/";
@@ -8,60 +10,87 @@ function goToMainUrl() {
 window.goToMainUrl = goToMainUrl;
 
 const logContainer = document.getElementById("log-container");
-const CHUNK_SIZE = 200;
+const PAGE_SIZE = 500;
 
-async function loadLogsInBackground() {
-    if (!logContainer) return;
+// Byte offset of the oldest loaded entry; older pages are fetched before it
+let before = null;
+let hasOlder = true;
+let loadingOlder = false;
+let socket = null;
 
-    const res = await fetch("/api/server-logs", { credentials: "include" });
-    if (!res.ok) return;
+function searchParams() {
+    const search = document.getElementById("search");
+    const params = new URLSearchParams();
+    if (search && search.value.trim()) params.set("q", search.value.trim());
+    return params;
+}
 
-    const { logs } = await res.json();
+function isScrolledToBottom(article) {
+    return article.scrollHeight - article.scrollTop - article.clientHeight < 40;
+}
 
-    let index = 0;
+async function loadOlder() {
+    if (!logContainer || loadingOlder || !hasOlder) return;
+    loadingOlder = true;
 
-    function renderChunk(deadline) {
-        let count = 0;
-        const fragment = document.createDocumentFragment();
+    const params = searchParams();
+    params.set("limit", PAGE_SIZE);
+    if (before !== null) params.set("before", before);
 
-        while (
-            index < logs.length &&
-            count < CHUNK_SIZE &&
-            (!deadline || deadline.timeRemaining() > 5)
-        ) {
-            const code = document.createElement("code");
-            code.className = "log-line no-margin no-line no-wrap no-padding transparent";
-            code.innerHTML = logs[index];
-            fragment.appendChild(code);
-
-            index++;
-            count++;
-        }
+    try {
+        const res = await fetch(`/api/server-logs?${params}`, { credentials: "include" });
+        if (!res.ok) return;
+        const page = await res.json();
 
-        logContainer.appendChild(fragment);
+        const article = document.querySelector("article.scroll");
+        const previousHeight = article ? article.scrollHeight : 0;
+        const fragment = document.createDocumentFragment();
+        for (const entry of page.entries) {
+            fragment.appendChild(renderLogEntry(entry));
+        }
+        logContainer.prepend(fragment);
 
-        if (index < logs.length) {
-            requestIdleCallback(renderChunk);
+        // Keep the lines the user was looking at in place
+        if (article && before !== null) {
+            article.scrollTop += article.scrollHeight - previousHeight;
+        } else if (article) {
+            article.scrollTop = article.scrollHeight;
         }
 
-        filterSearch();
+        before = page.before;
+        hasOlder = page.more;
+    } finally {
+        loadingOlder = false;
+    }
+}
+
+function follow() {
+    if (socket) socket.close();
 
-        const savedX = localStorage.getItem("logScrollX");
-        const savedY = localStorage.getItem("logScrollY");
+    const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+    socket = new WebSocket(`${protocol}://${window.location.host}/ws/server-logs?${searchParams()}`);
+    socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type !== "entries") return;
 
         const article = document.querySelector("article.scroll");
-        if (!article) return;
-        if (savedX !== null) article.scrollLeft = parseInt(savedX, 10);
-        if (savedY !== null) {
-            // Delay scrollTop in case content isn't fully loaded yet
-            setTimeout(() => {
-                article.scrollTop = parseInt(savedY, 10);
-            }, 0);
+        const stickToBottom = article && isScrolledToBottom(article);
+        const fragment = document.createDocumentFragment();
+        for (const entry of message.entries) {
+            fragment.appendChild(renderLogEntry(entry));
         }
+        logContainer.appendChild(fragment);
+        if (stickToBottom) article.scrollTop = article.scrollHeight;
+    };
+}
 
-    }
-
-    requestIdleCallback(renderChunk);
+async function reload() {
+    if (!logContainer) return;
+    logContainer.replaceChildren();
+    before = null;
+    hasOlder = true;
+    await loadOlder();
+    follow();
 }
 
 function resize() {
@@ -82,41 +111,24 @@ function resize() {
 window.addEventListener("load", resize);
 window.addEventListener("resize", resize);
 
-function filterSearch() {
-    const search = document.getElementById("search");
-    const searchText = search.value.toLowerCase();
-    const logLines = document.querySelectorAll(".log-line");
-    for (let i = 0; i < logLines.length; i++) {
-        const logLine = logLines[i];
-        const logText = logLine.textContent.toLowerCase();
-        if (logText.includes(searchText)) {
-            logLine.classList.remove("hidden");
-        } else {
-            logLine.classList.add("hidden");
-        }
-    }
-}
-
 document.addEventListener("DOMContentLoaded", function () {
     const search = document.getElementById("search");
     const savedSearch = localStorage.getItem("searchText");
     const article = document.querySelector("article.scroll");
 
-    // Restore article scroll (horizontal and vertical)
     if (article) {
-        // Save scroll
         article.addEventListener("scroll", () => {
-            localStorage.setItem("logScrollX", article.scrollLeft);
-            localStorage.setItem("logScrollY", article.scrollTop);
+            if (article.scrollTop < 200) loadOlder();
         });
     }
 
+    const reloadDebounced = debounce(reload, 300);
 
     if (search) {
+        if (savedSearch) search.value = savedSearch;
         search.addEventListener("input", function () {
-            const searchText = search.value.toLowerCase();
             localStorage.setItem("searchText", search.value);
-            filterSearch();
+            reloadDebounced();
         });
     }
 
@@ -125,16 +137,11 @@ document.addEventListener("DOMContentLoaded", function () {
         const quickSearch = quickSearches[i];
         quickSearch.addEventListener("click", function () {
             const span = quickSearch.querySelector("span");
-            const searchText = span.textContent.toLowerCase();
-            search.value = searchText;
+            search.value = span.textContent.toLowerCase();
             search.dispatchEvent(new Event("input"));
         });
     }
 
-    if (search && savedSearch) {
-        search.value = savedSearch;
-        search.dispatchEvent(new Event("input"));
-    }
-    loadLogsInBackground();
+    reload();
     resize();
-});
\ No newline at end of file
+});
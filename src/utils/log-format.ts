@@ -0,0 +1,76 @@
+export interface LogEntry {
+    offset: number;
+    msg: string;
+    level?: string;
+    ts?: number;
+    time?: string;
+    source?: string;
+    ip?: string;
+    client?: string | null;
+    exc?: string;
+}
+
+const LEVEL_COLORS: Record<string, string> = {
+    DEBUG: "#8d8d8d",
+    INFO: "#2ead65",
+    WARNING: "#f1c234",
+    ERROR: "#bf382f",
+    CRITICAL: "#bf382f",
+};
+
+// One pass over the message instead of a replace per keyword
+const TOKEN_RE = /\b(200|304)\b|\b(101)\b|\b(400|404|500)\b|\b(GET)\b|\b(POST)\b|\b(\d+\.\d+)ms\b|\b((?:\d{1,3}\.){3}\d{1,3})\b/g;
+
+function msToColor(ms: number, maxMs = 3000): string {
+    const ratio = Math.min(Math.max(ms, 0), maxMs) / maxMs;
+    return `rgb(${Math.round(255 * ratio)},${Math.round(255 * (1 - ratio))},0)`;
+}
+
+function span(text: string, color?: string, bold = false): HTMLSpanElement {
+    const element = document.createElement("span");
+    element.textContent = text;
+    if (color) element.style.color = color;
+    if (bold) element.style.fontWeight = "bold";
+    return element;
+}
+
+function appendMessage(parent: HTMLElement, message: string, ipNames: Record<string, string>) {
+    let last = 0;
+    for (const match of message.matchAll(TOKEN_RE)) {
+        const index = match.index ?? 0;
+        if (index > last) parent.append(message.slice(last, index));
+        const [text, ok, upgrade, failed, get, post, ms, ip] = match;
+        if (ok) parent.append(span(text, "green", true));
+        else if (upgrade) parent.append(span(text, "blue"));
+        else if (failed) parent.append(span(text, "red"));
+        else if (get) parent.append(span(text, "orange"));
+        else if (post) parent.append(span(text, "purple"));
+        else if (ms) parent.append(span(`${parseFloat(ms).toFixed(2)}ms`, msToColor(parseFloat(ms)), true));
+        else if (ip) parent.append(span(ipNames[ip] ?? ip, ipNames[ip] ? "teal" : "#8d48aa", Boolean(ipNames[ip])));
+        last = index + text.length;
+    }
+    if (last < message.length) parent.append(message.slice(last));
+}
+
+export function formatLogTime(entry: LogEntry): string {
+    if (entry.time) return entry.time;
+    if (entry.ts === undefined) return "";
+    return new Date(entry.ts * 1000).toLocaleString();
+}
+
+export function renderLogEntry(entry: LogEntry): HTMLElement {
+    const line = document.createElement("code");
+    line.className = "log-line no-margin no-line no-wrap no-padding transparent";
+    line.dataset.offset = String(entry.offset);
+
+    const ipNames: Record<string, string> = {};
+    if (entry.ip && entry.client) ipNames[entry.ip] = entry.client;
+
+    const time = formatLogTime(entry);
+    if (time) line.append(span(time, undefined, true), " ");
+    if (entry.level) line.append(span(`[${entry.level}]`, LEVEL_COLORS[entry.level]), " ");
+    if (entry.source) line.append(span(`[${entry.source}]`, "#8d8d8d"), " - ");
+    appendMessage(line, entry.msg ?? "", ipNames);
+    if (entry.exc) line.append("\n", span(entry.exc, LEVEL_COLORS.ERROR));
+    return line;
+}
@@ -0,0 +1,365 @@
+"""
+Incremental, deduplicated backups of ``DATA_PATH/data`` and the Postgres tables.
+
+Each run stores a snapshot in the ``BackupStore``: data files are chunked and only chunks
+the store doesn't have are written (files whose size and mtime didn't change since the
+previous snapshot aren't even read), and the tables are exported with binary
+``COPY ... TO STDOUT``, ordered by primary key inside one REPEATABLE READ transaction, so
+they are consistent with each other and unchanged rows produce unchanged chunks. Runs
+happen in a worker process, never on the event loop.
+
+Usage:
+    python -m utils.backup.engine list
+    python -m utils.backup.engine run {hourly,daily,weekly}
+    python -m utils.backup.engine restore SNAPSHOT_ID [--files DIR] [--tables]
+
+Restoring tables replaces their contents; stop the server first.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import asyncpg
+from filelock import FileLock
+
+from config.environments import Environment
+from utils.backup.store import BackupStore, ChunkWriter, FileEntry, Snapshot, TableEntry
+
+# Parents before the tables referencing them, so a restore never breaks a foreign key; missing tables are skipped
+BACKUP_TABLES = [
+    "components_inventory",
+    "coatings_inventory",
+    "sheets_inventory",
+    "laser_cut_parts_inventory",
+    "recut_laser_cut_parts_inventory",
+    "jobs",
+    "workorders",
+    "vendors",
+    "shipping_addresses",
+    "purchase_orders",
+    "components_inventory_history",
+    "coatings_inventory_history",
+    "coatings_inventory_events",
+    "sheets_inventory_history",
+    "laser_cut_parts_inventory_history",
+    "components_inventory_events",
+    "sheets_inventory_events",
+    "laser_cut_parts_inventory_events",
+    "jobs_history",
+    "workorders_history",
+    "vendors_history",
+    "shipping_addresses_history",
+    "purchase_orders_history",
+]
+
+KINDS = ("hourly", "daily", "weekly")
+
+
+def get_store() -> BackupStore:
+    return BackupStore(Environment.BACKUP_PATH)
+
+
+def _retention() -> dict[str, int]:
+    return {
+        "hourly": Environment.BACKUP_KEEP_HOURLY,
+        "daily": Environment.BACKUP_KEEP_DAILY,
+        "weekly": Environment.BACKUP_KEEP_WEEKLY,
+    }
+
+
+async def _connect() -> asyncpg.Connection:
+    return await asyncpg.connect(
+        user=Environment.POSTGRES_USER,
+        password=Environment.POSTGRES_PASSWORD,
+        database=Environment.POSTGRES_DB,
+        host=Environment.POSTGRES_HOST,
+        port=Environment.POSTGRES_PORT,
+    )
+
+
+async def _table_layout(conn: asyncpg.Connection, table: str) -> tuple[list[str], list[str]] | None:
+    """``(columns, primary key columns)`` of ``table``, or ``None`` if it doesn't exist."""
+    if await conn.fetchval("SELECT to_regclass($1)", table) is None:
+        return None
+    columns = await conn.fetch(
+        """
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = $1::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+        """,
+        table,
+    )
+    primary_key = await conn.fetch(
+        """
+        SELECT a.attname
+        FROM pg_index i
+        JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, position) ON TRUE
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+        WHERE i.indrelid = $1::regclass AND i.indisprimary
+        ORDER BY k.position
+        """,
+        table,
+    )
+    return [row["attname"] for row in columns], [row["attname"] for row in primary_key]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+# -------------------------
+# Backup (runs in the worker process)
+# -------------------------
+def _backup_files(store: BackupStore, previous: Snapshot | None) -> dict[str, FileEntry]:
+    data_dir = os.path.join(Environment.DATA_PATH, "data")
+    files = {}
+    for root, _, names in os.walk(data_dir):
+        for name in names:
+            full_path = os.path.join(root, name)
+            relative_path = os.path.relpath(full_path, data_dir).replace(os.sep, "/")
+            try:
+                stat = os.stat(full_path)
+                known = previous.files.get(relative_path) if previous else None
+                if known and known.size == stat.st_size and known.mtime_ns == stat.st_mtime_ns and store.has_chunks(known.chunks):
+                    files[relative_path] = known
+                    continue
+
+                writer = ChunkWriter(store)
+                with open(full_path, "rb") as f:
+                    while data := f.read(1024 * 1024):
+                        writer.write(data)
+                files[relative_path] = FileEntry(size=writer.size, mtime_ns=stat.st_mtime_ns, chunks=writer.close())
+            except OSError as e:
+                # Files can be replaced by uploads while we walk
+                logging.warning(f"[Backup] Skipping {relative_path}: {e}")
+    return files
+
+
+async def _backup_tables(store: BackupStore) -> dict[str, TableEntry]:
+    tables = {}
+    conn = await _connect()
+    try:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            for table in BACKUP_TABLES:
+                layout = await _table_layout(conn, table)
+                if layout is None:
+                    continue
+                columns, primary_key = layout
+                order_by = f" ORDER BY {', '.join(map(_quote, primary_key))}" if primary_key else ""
+
+                writer = ChunkWriter(store)
+
+                async def sink(data: bytes):
+                    writer.write(data)
+
+                status = await conn.copy_from_query(
+                    f"SELECT {', '.join(map(_quote, columns))} FROM {_quote(table)}{order_by}",
+                    output=sink,
+                    format="binary",
+                )
+                rows = int(status.split()[-1]) if status else 0
+                tables[table] = TableEntry(columns=columns, rows=rows, size=writer.size, chunks=writer.close())
+    finally:
+        await conn.close()
+    return tables
+
+
+def run_backup(kind: str, include_tables: bool = True) -> dict:
+    """Takes one snapshot, applies retention and collects garbage. Meant to run in a worker process."""
+    store = get_store()
+    store.ensure_dirs()
+    started = time.monotonic()
+
+    with FileLock(os.path.join(store.path, ".lock")):
+        snapshots = store.list_snapshots()
+        previous = snapshots[-1] if snapshots else None
+
+        created_at = time.time()
+        snapshot_id = f"{datetime.fromtimestamp(created_at):%Y%m%d-%H%M%S}-{kind}"
+        if any(snapshot.id == snapshot_id for snapshot in snapshots):
+            snapshot_id = f"{snapshot_id}-{len(snapshots)}"
+        snapshot = Snapshot(id=snapshot_id, kind=kind, created_at=created_at)
+        snapshot.files = _backup_files(store, previous)
+        if include_tables:
+            snapshot.tables = asyncio.run(_backup_tables(store))
+
+        logical_bytes = sum(entry.size for entry in (*snapshot.files.values(), *snapshot.tables.values()))
+        snapshot.stats = {
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "logical_bytes": logical_bytes,
+            **store.stats,
+        }
+        store.save_snapshot(snapshot)
+
+        deleted = store.apply_retention(_retention())
+        usage = store.collect_garbage()
+
+    return {
+        "snapshot": snapshot.id,
+        "kind": kind,
+        "files": len(snapshot.files),
+        "tables": len(snapshot.tables),
+        "rows": sum(entry.rows for entry in snapshot.tables.values()),
+        "logical_bytes": logical_bytes,
+        "new_chunks": store.stats["new_chunks"],
+        "new_bytes": store.stats["new_bytes"],
+        "deleted_snapshots": len(deleted),
+        "store_chunks": usage["chunks"],
+        "store_bytes": usage["stored_bytes"],
+        "duration_seconds": round(time.monotonic() - started, 3),
+    }
+
+
+# -------------------------
+# Restore
+# -------------------------
+def restore_files(store: BackupStore, snapshot: Snapshot, target_dir: str) -> int:
+    for relative_path, entry in snapshot.files.items():
+        path = os.path.join(target_dir, *relative_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.restore"
+        with open(tmp_path, "wb") as f:
+            for data in store.read_chunks(entry.chunks):
+                f.write(data)
+        os.replace(tmp_path, path)
+    return len(snapshot.files)
+
+
+async def restore_tables(store: BackupStore, snapshot: Snapshot) -> int:
+    """Replaces the contents of every table in the snapshot in one transaction."""
+    tables = [table for table in BACKUP_TABLES if table in snapshot.tables]
+    conn = await _connect()
+    try:
+        async with conn.transaction():
+            await conn.execute(f"TRUNCATE {', '.join(map(_quote, tables))}")
+            for table in tables:
+                entry = snapshot.tables[table]
+
+                async def source():
+                    for data in store.read_chunks(entry.chunks):
+                        yield data
+
+                await conn.copy_to_table(table, source=source(), columns=entry.columns, format="binary")
+                # Serial ids continue after the restored rows
+                if "id" in entry.columns:
+                    await conn.execute(
+                        f"""
+                        SELECT setval(pg_get_serial_sequence($1, 'id'), COALESCE((SELECT MAX(id) FROM {_quote(table)}), 0) + 1, false)
+                        WHERE pg_get_serial_sequence($1, 'id') IS NOT NULL
+                        """,
+                        table,
+                    )
+    finally:
+        await conn.close()
+    return len(tables)
+
+
+# -------------------------
+# Scheduling (server side)
+# -------------------------
+class BackupScheduler:
+    """
+    Runs backups in a single worker process and keeps the last result of each kind for metrics.
+
+    A run that is due while another is still going is skipped rather than queued.
+    """
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = asyncio.Lock()
+        self.last_runs: dict[str, dict] = {}
+        self.stats = {"runs": 0, "failures": 0, "skipped": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process with a running event loop and thread pools isn't safe
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def run(self, kind: str) -> dict | None:
+        if self._lock.locked():
+            self.stats["skipped"] += 1
+            logging.warning(f"[Backup] Skipping {kind} backup, the previous backup is still running")
+            return None
+
+        async with self._lock:
+            started = time.time()
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), run_backup, kind)
+            except Exception as e:
+                self.stats["failures"] += 1
+                self.last_runs[kind] = {"error": str(e), "started_at": started}
+                logging.error(f"[Backup] {kind} backup failed: {e}")
+                # A crashed worker leaves a broken pool behind
+                self.shutdown()
+                return None
+
+            self.stats["runs"] += 1
+            self.last_runs[kind] = {**result, "started_at": started}
+            logging.info(
+                f"[Backup] {kind} snapshot {result['snapshot']}: {result['files']} files, {result['rows']} rows, "
+                f"{result['new_bytes']} new bytes in {result['duration_seconds']}s"
+            )
+            return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "running": self._lock.locked(),
+            "last_runs": self.last_runs,
+        }
+
+
+backup_scheduler = BackupScheduler()
+
+
+# -------------------------
+# CLI
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(prog="python -m utils.backup.engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("kind", choices=KINDS)
+    restore_parser = commands.add_parser("restore")
+    restore_parser.add_argument("snapshot_id")
+    restore_parser.add_argument("--files", metavar="DIR", help="write the data files into DIR")
+    restore_parser.add_argument("--tables", action="store_true", help="replace the database tables")
+    args = parser.parse_args()
+
+    store = get_store()
+    if args.command == "list":
+        for snapshot in store.list_snapshots():
+            print(
+                f"{snapshot.id:<28} {len(snapshot.files):>6} files {len(snapshot.tables):>3} tables "
+                f"{snapshot.stats.get('logical_bytes', 0) / 1024 / 1024:>10.1f} MiB "
+                f"({snapshot.stats.get('new_bytes', 0) / 1024 / 1024:.1f} MiB new)"
+            )
+    elif args.command == "run":
+        print(run_backup(args.kind))
+    elif args.command == "restore":
+        if not args.files and not args.tables:
+            parser.error("restore needs --files DIR and/or --tables")
+        snapshot = store.load_snapshot(args.snapshot_id)
+        with FileLock(os.path.join(store.path, ".lock")):
+            if args.files:
+                print(f"Restored {restore_files(store, snapshot, args.files)} files into {args.files}")
+            if args.tables:
+                print(f"Restored {asyncio.run(restore_tables(store, snapshot))} tables")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
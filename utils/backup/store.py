@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+import time
+import zlib
+from typing import Iterable, Iterator
+
+import msgspec
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileEntry(msgspec.Struct):
+    size: int
+    mtime_ns: int
+    chunks: list[str]
+
+
+class TableEntry(msgspec.Struct):
+    columns: list[str]
+    rows: int
+    size: int
+    chunks: list[str]
+
+
+class Snapshot(msgspec.Struct):
+    id: str
+    kind: str
+    created_at: float
+    files: dict[str, FileEntry] = {}
+    tables: dict[str, TableEntry] = {}
+    stats: dict[str, float] = {}
+
+
+class ChunkWriter:
+    """Splits a stream into ``CHUNK_SIZE`` chunks and stores the ones the store doesn't have yet."""
+
+    def __init__(self, store: "BackupStore"):
+        self.store = store
+        self.chunks: list[str] = []
+        self.size = 0
+        self._buffer = bytearray()
+
+    def write(self, data: bytes):
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= CHUNK_SIZE:
+            self.chunks.append(self.store.put_chunk(bytes(self._buffer[:CHUNK_SIZE])))
+            del self._buffer[:CHUNK_SIZE]
+
+    def close(self) -> list[str]:
+        if self._buffer:
+            self.chunks.append(self.store.put_chunk(bytes(self._buffer)))
+            self._buffer.clear()
+        return self.chunks
+
+
+class BackupStore:
+    """
+    Content-addressed backup store.
+
+    Data is split into fixed-size chunks named by their SHA-256 and stored zlib-compressed
+    under ``chunks/``, so a chunk that is already stored (an unchanged file, the unchanged
+    start of an append-mostly table export) costs nothing. A snapshot is a manifest under
+    ``snapshots/`` listing each file's and table's chunks; deleting snapshots and then
+    ``collect_garbage`` frees the chunks nothing references any more.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.chunks_path = os.path.join(path, "chunks")
+        self.snapshots_path = os.path.join(path, "snapshots")
+        self.stats = {"new_chunks": 0, "new_bytes": 0, "reused_chunks": 0}
+
+    def ensure_dirs(self):
+        os.makedirs(self.chunks_path, exist_ok=True)
+        os.makedirs(self.snapshots_path, exist_ok=True)
+
+    # -------------------------
+    # Chunks
+    # -------------------------
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunks_path, digest[:2], digest)
+
+    def put_chunk(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            self.stats["reused_chunks"] += 1
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        self.stats["new_chunks"] += 1
+        self.stats["new_bytes"] += len(compressed)
+        return digest
+
+    def get_chunk(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest} is corrupt")
+        return data
+
+    def has_chunks(self, digests: Iterable[str]) -> bool:
+        return all(os.path.exists(self._chunk_path(digest)) for digest in digests)
+
+    def read_chunks(self, digests: Iterable[str]) -> Iterator[bytes]:
+        for digest in digests:
+            yield self.get_chunk(digest)
+
+    # -------------------------
+    # Snapshots
+    # -------------------------
+    def _snapshot_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.snapshots_path, f"{snapshot_id}.json")
+
+    def save_snapshot(self, snapshot: Snapshot):
+        path = self._snapshot_path(snapshot.id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(msgspec.json.encode(snapshot))
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, snapshot_id: str) -> Snapshot:
+        with open(self._snapshot_path(snapshot_id), "rb") as f:
+            return msgspec.json.decode(f.read(), type=Snapshot)
+
+    def list_snapshots(self) -> list[Snapshot]:
+        """Every snapshot, oldest first."""
+        if not os.path.isdir(self.snapshots_path):
+            return []
+        snapshots = []
+        for name in os.listdir(self.snapshots_path):
+            if name.endswith(".json"):
+                try:
+                    snapshots.append(self.load_snapshot(name[: -len(".json")]))
+                except (OSError, msgspec.DecodeError) as e:
+                    logging.warning(f"[BackupStore] Skipping unreadable snapshot {name}: {e}")
+        return sorted(snapshots, key=lambda snapshot: snapshot.created_at)
+
+    def read_file(self, snapshot: Snapshot, name: str) -> bytes | None:
+        entry = snapshot.files.get(name)
+        return b"".join(self.read_chunks(entry.chunks)) if entry else None
+
+    # -------------------------
+    # Retention
+    # -------------------------
+    def apply_retention(self, keep: dict[str, int]) -> list[str]:
+        """Keeps the newest ``keep[kind]`` snapshots of each kind and deletes the rest; returns the deleted ids."""
+        by_kind: dict[str, list[Snapshot]] = {}
+        for snapshot in self.list_snapshots():
+            by_kind.setdefault(snapshot.kind, []).append(snapshot)
+
+        deleted = []
+        for kind, snapshots in by_kind.items():
+            limit = keep.get(kind)
+            if limit is None:
+                continue
+            for snapshot in snapshots[: max(len(snapshots) - limit, 0)]:
+                os.remove(self._snapshot_path(snapshot.id))
+                deleted.append(snapshot.id)
+        return deleted
+
+    def collect_garbage(self, grace_seconds: float = 3600) -> dict[str, int]:
+        """
+        Deletes chunks no snapshot references and returns what is left.
+
+        Chunks younger than ``grace_seconds`` are kept, they may belong to a backup still being written.
+        """
+        referenced = set()
+        for snapshot in self.list_snapshots():
+            for entry in (*snapshot.files.values(), *snapshot.tables.values()):
+                referenced.update(entry.chunks)
+
+        now = time.time()
+        removed = removed_bytes = chunks = stored_bytes = 0
+        if os.path.isdir(self.chunks_path):
+            for prefix in os.scandir(self.chunks_path):
+                if not prefix.is_dir():
+                    continue
+                for chunk in os.scandir(prefix.path):
+                    stat = chunk.stat()
+                    if chunk.name in referenced or now - stat.st_mtime < grace_seconds:
+                        chunks += 1
+                        stored_bytes += stat.st_size
+                    else:
+                        os.remove(chunk.path)
+                        removed += 1
+                        removed_bytes += stat.st_size
+        return {"chunks": chunks, "stored_bytes": stored_bytes, "removed_chunks": removed, "removed_bytes": removed_bytes}
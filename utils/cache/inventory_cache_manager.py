@@ -1,58 +1,257 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Callable
+from typing import Awaitable, Callable, Iterable
+
+import msgspec
+
+from utils.database.pool_registry import PoolRegistry
+
+
+def _default_categories(item: dict) -> Iterable[str]:
+    return item.get("categories") or []
 
 
 class InventoryCacheManager:
-    def __init__(self, expiry_seconds=60):
-        self.cache = {}
-        self.expiry_seconds = expiry_seconds
-        self._refresh_tasks = {}  # key -> (func, interval)
+    """
+    Event-driven cache for a single inventory table.
+
+    The whole table is loaded once when the LISTEN connection is established
+    (and again after every reconnect). From then on the ``notify_inventory_change``
+    trigger sends one NOTIFY per changed row and only those rows are re-fetched
+    and patched into ``items``. Every change bumps ``generation`` so consumers
+    can tell whether anything they derived from the cache is still current;
+    ``item_generations`` records the generation at which each item last changed.
+    """
+
+    KEEPALIVE_SECONDS = 30
+    RECONNECT_DELAY_SECONDS = 5
+
+    TRIGGER_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION notify_inventory_change() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify(
+            TG_TABLE_NAME,
+            json_build_object('type', TG_OP, 'id', COALESCE(NEW.id, OLD.id))::text
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        database: str,
+        loader: Callable[[], Awaitable[list[dict]]],
+        rows_loader: Callable[[list[int]], Awaitable[list[dict]]],
+        categories_of: Callable[[dict], Iterable[str]] = _default_categories,
+    ):
+        self.table_name = table_name
+        self.database = database
+        self.items: dict[int, dict] = {}
+        self.generation = 0
+        self.item_generations: dict[int, int] = {}
+        self.cache = {}  # key -> (value, generation)
+        self._loader = loader
+        self._rows_loader = rows_loader
+        self._categories_of = categories_of
+        self._ready = False
         self._stop = False
         self._task = None  # Start later
+        self._changes_task = None
+        self._changes: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+        self._lock = asyncio.Lock()
 
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    # -------------------------
+    # Reads
+    # -------------------------
     def get(self, key):
+        if not self._ready:
+            return None
         item = self.cache.get(key)
         if item:
-            value, timestamp = item
-            if datetime.now() - timestamp < timedelta(seconds=self.expiry_seconds):
+            value, generation = item
+            if generation == self.generation:
                 return value
         return None
 
     def set(self, key, value):
-        self.cache[key] = (value, datetime.now())
+        # Derived values are only kept while NOTIFY events are flowing, otherwise they could go stale unnoticed.
+        if self._ready:
+            self.cache[key] = (value, self.generation)
 
     def invalidate(self, key_startswith):
         self.cache = {k: v for k, v in self.cache.items() if not k.startswith(key_startswith)}
 
-    def schedule_refresh(self, key: str, func: Callable, interval: int | None = None):
-        self._refresh_tasks[key] = (func, interval or self.expiry_seconds)
+    def get_all(self) -> list[dict]:
+        if cached := self.get("__all__"):
+            return cached
+        all_items = list(self.items.values())
+        self.set("__all__", all_items)
+        return all_items
+
+    def get_item(self, item_id: int) -> dict | None:
+        return self.items.get(item_id)
+
+    def get_generation(self) -> int | None:
+        return self.generation if self._ready else None
+
+    def item_generation(self, item_id: int) -> int | None:
+        if not self._ready:
+            return None
+        return self.item_generations.get(item_id)
+
+    def get_categories(self) -> list[str]:
+        if cached := self.get("__categories__"):
+            return cached
+        categories = sorted({category for item in self.items.values() for category in self._categories_of(item) if category})
+        self.set("__categories__", categories)
+        return categories
+
+    # -------------------------
+    # Local patches (read-your-writes before the NOTIFY arrives)
+    # -------------------------
+    def upsert(self, item_id: int, data: dict):
+        self.upsert_many({item_id: data})
+
+    def upsert_many(self, items: dict[int, dict]):
+        # One generation bump for the whole batch, so derived caches are rebuilt once
+        if self._ready and items:
+            self._patch({item_id: {**data, "id": item_id} for item_id, data in items.items()}, [])
+
+    def remove(self, item_id: int):
+        if self._ready:
+            self._patch({}, [item_id])
 
+    def _patch(self, rows: dict[int, dict], deleted_ids: list[int]):
+        # Rows that come back unchanged (e.g. the NOTIFY for a local patch) keep their generation
+        generation = self.generation + 1
+        changed = False
+        for item_id in deleted_ids:
+            if self.items.pop(item_id, None) is not None:
+                self.item_generations.pop(item_id, None)
+                changed = True
+        for item_id, row in rows.items():
+            if self.items.get(item_id) != row:
+                self.items[item_id] = row
+                self.item_generations[item_id] = generation
+                changed = True
+        if changed:
+            self.generation = generation
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
     async def start(self):
         if self._task is None:
+            self._stop = False
             self._task = asyncio.create_task(self._worker())
 
+    async def reload(self):
+        async with self._lock:
+            items = {item["id"]: item for item in await self._loader()}
+            self.generation += 1
+            self.item_generations = {
+                item_id: self.item_generations[item_id] if item_id in self.item_generations and self.items.get(item_id) == item else self.generation
+                for item_id, item in items.items()
+            }
+            self.items = items
+            self.cache.clear()
+
+    async def _install_trigger(self, conn):
+        async with conn.transaction():
+            # Serialise concurrent installs from the other inventory caches
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext('notify_inventory_change'))")
+            await conn.execute(self.TRIGGER_FUNCTION_SQL)
+            await conn.execute(
+                f"""
+                CREATE OR REPLACE TRIGGER {self.table_name}_change_trigger
+                AFTER INSERT OR UPDATE OR DELETE ON {self.table_name}
+                FOR EACH ROW EXECUTE FUNCTION notify_inventory_change();
+                """
+            )
+
     async def _worker(self):
         while not self._stop:
-            for key, (func, interval) in self._refresh_tasks.items():
+            try:
+                listener_pool = await PoolRegistry.borrow(self.database, f"{self.table_name}_listener")
+                async with listener_pool.acquire() as conn:
+                    await self._install_trigger(conn)
+
+                    connection_lost = asyncio.Event()
+                    conn.add_termination_listener(lambda _: connection_lost.set())
+                    await conn.add_listener(self.table_name, self._on_notify)
+
+                    # Listener is registered before the snapshot, so nothing committed after it is missed
+                    await self.reload()
+                    self._ready = True
+                    if self._changes_task is None or self._changes_task.done():
+                        self._changes_task = asyncio.create_task(self._apply_changes())
+
+                    while not self._stop and not connection_lost.is_set():
+                        try:
+                            await asyncio.wait_for(connection_lost.wait(), timeout=self.KEEPALIVE_SECONDS)
+                        except asyncio.TimeoutError:
+                            await conn.execute("SELECT 1")
+
+                    if not conn.is_closed():
+                        await conn.remove_listener(self.table_name, self._on_notify)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logging.info(f"[CacheManager] Listener for '{self.table_name}' failed: {e}")
+
+            # Without a live listener the cache can no longer be trusted
+            self._ready = False
+            if not self._stop:
+                await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            message = msgspec.json.decode(payload)
+            self._changes.put_nowait((message["type"], int(message["id"])))
+        except Exception:
+            logging.warning(f"[CacheManager] Invalid NOTIFY payload on '{channel}': {payload!r}")
+
+    async def _apply_changes(self):
+        while not self._stop:
+            operation, item_id = await self._changes.get()
+
+            # Coalesce bursts (bulk updates) into a single fetch; the last operation per row wins
+            batch = {item_id: operation}
+            while not self._changes.empty():
+                operation, item_id = self._changes.get_nowait()
+                batch[item_id] = operation
+
+            changed_ids = [i for i, op in batch.items() if op != "DELETE"]
+            try:
+                async with self._lock:
+                    rows = {row["id"]: row for row in (await self._rows_loader(changed_ids) if changed_ids else [])}
+                    # Rows that are gone by the time they are fetched were deleted
+                    deleted_ids = [i for i, op in batch.items() if op == "DELETE" or i not in rows]
+                    self._patch(rows, deleted_ids)
+            except Exception as e:
+                logging.info(f"[CacheManager] Failed to apply changes to '{self.table_name}', reloading: {e}")
                 try:
-                    result = await func()
-                    self.set(key, result)
-                except Exception as e:
-                    logging.info(f"[CacheManager] Failed to refresh key '{key}': {e}")
-            await asyncio.sleep(self.expiry_seconds)
+                    await self.reload()
+                except Exception as reload_error:
+                    logging.info(f"[CacheManager] Reload of '{self.table_name}' failed: {reload_error}")
+                    self._ready = False
 
     async def stop(self):
         self._stop = True
-        if self._task:
-            await self._task
+        for task in (self._task, self._changes_task):
+            if task:
+                task.cancel()
+        self._task = None
+        self._changes_task = None
+        self._ready = False
 
     async def shutdown(self):
+        await self.stop()
         self.cache.clear()
-        self._refresh_tasks.clear()
-        self._stop = True
-        self._task = None
-        if self._task:
-            self._task.cancel()
-            self._task = None
+        self.items.clear()
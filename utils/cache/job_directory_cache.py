@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import os
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
@@ -7,57 +9,259 @@ import msgspec
 from tornado.ioloop import IOLoop
 
 
+class JobDataSummary(msgspec.Struct):
+    type: int = 0
+    order_number: int | float = 0
+    ship_to: str | None = ""
+    starting_date: str | None = ""
+    ending_date: str | None = ""
+    color: str | None = ""
+
+
+class JobFileSummary(msgspec.Struct):
+    # Every other key (assemblies, nests, ...) is skipped by the decoder without being built
+    job_data: JobDataSummary
+
+
+class JobDirectoryInfo(msgspec.Struct):
+    dir: str
+    name: str
+    modified_date: float
+    formated_modified_date: str
+    type: int
+    order_number: int | float
+    ship_to: str | None
+    date_shipped: str | None
+    date_expected: str | None
+    color: str | None
+
+
+class IndexEntry(msgspec.Struct):
+    mtime_ns: int
+    size: int
+    info: JobDirectoryInfo
+
+
+class JobDirectoryIndex(msgspec.Struct):
+    base_directory: str
+    entries: dict[str, IndexEntry] = {}
+
+
+_summary_decoder = msgspec.json.Decoder(JobFileSummary)
+
+
+def _read_entry(dir_path: str, stat: os.stat_result) -> IndexEntry:
+    job_data_path = os.path.join(dir_path, "data.json")
+    with open(job_data_path, "rb") as f:
+        job_data = _summary_decoder.decode(f.read()).job_data
+
+    modified_timestamp = stat.st_mtime
+    return IndexEntry(
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        info=JobDirectoryInfo(
+            dir=os.path.dirname(dir_path).replace("\\", "/"),
+            name=os.path.basename(dir_path),
+            modified_date=modified_timestamp,
+            formated_modified_date=datetime.fromtimestamp(modified_timestamp).strftime("%Y-%m-%d %I:%M:%S %p"),
+            type=job_data.type,
+            order_number=job_data.order_number,
+            ship_to=job_data.ship_to,
+            date_shipped=job_data.starting_date,
+            date_expected=job_data.ending_date,
+            color=job_data.color,
+        ),
+    )
+
+
 class JobDirectoryCache:
-    def __init__(self):
-        self._cache = None
+    """
+    Summaries of the saved job directories, backed by an index persisted at ``index_path``.
+
+    Entries are keyed by the directory's path relative to the base directory and remember the
+    mtime and size of its ``data.json``; a rescan only stats the directories and decodes the
+    ``data.json`` files that changed. Uploads and deletes patch their entry directly, and
+    ``invalidate_cache`` just makes the next ``gather`` rescan.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._index: JobDirectoryIndex | None = None
+        self._specific_dirs: list[str] = []
+        self._cache: dict[str, JobDirectoryInfo] | None = None
         self._cache_timestamp = None
         self.cache_expiry = timedelta(hours=1)
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self._scan: asyncio.Future | None = None
+        self._patched_during_scan: set[str] = set()
+        self._save_lock = threading.Lock()
+        self.stats = {"scans": 0, "decoded": 0, "reused": 0, "patches": 0}
 
     def _is_cache_valid(self):
         return self._cache is not None and self._cache_timestamp is not None and datetime.now() - self._cache_timestamp < self.cache_expiry
 
     def invalidate_cache(self):
-        self._cache = None
         self._cache_timestamp = None
 
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _load_index(self, base_directory: str) -> JobDirectoryIndex:
+        try:
+            with open(self.index_path, "rb") as f:
+                index = msgspec.json.decode(f.read(), type=JobDirectoryIndex)
+            if index.base_directory == base_directory:
+                return index
+        except FileNotFoundError:
+            pass
+        except (OSError, msgspec.DecodeError) as e:
+            logging.warning(f"[JobDirectoryCache] Rebuilding unreadable index {self.index_path}: {e}")
+        return JobDirectoryIndex(base_directory=base_directory)
+
+    def _save_index(self, data: bytes):
+        with self._save_lock:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.index_path)
+
+    def _schedule_save(self):
+        data = msgspec.json.encode(self._index)
+        future = IOLoop.current().run_in_executor(self.executor, self._save_index, data)
+        future.add_done_callback(lambda f: f.exception() and logging.error(f"[JobDirectoryCache] Could not save index: {f.exception()}"))
+
+    # -------------------------
+    # Scanning
+    # -------------------------
+    def _rescan(self, index: JobDirectoryIndex, specific_dirs: list[str]) -> tuple[dict[str, IndexEntry], bool]:
+        base_directory = index.base_directory
+        previous = index.entries
+        entries: dict[str, IndexEntry] = {}
+        changed = False
+        for specific_dir in specific_dirs:
+            specific_path: str = os.path.join(base_directory, specific_dir)
+            for root, dirs, _ in os.walk(specific_path):
+                for dirname in dirs:
+                    dir_path = os.path.join(root, dirname)
+                    relative_path = dir_path.replace(f"{base_directory}/", "")
+                    try:
+                        stat = os.stat(os.path.join(dir_path, "data.json"))
+                    except FileNotFoundError:
+                        continue  # Not a job directory
+                    except OSError as e:
+                        logging.error(f"Could not process {dir_path}: {str(e)}")
+                        continue
+
+                    known = previous.get(relative_path)
+                    if known is not None and known.mtime_ns == stat.st_mtime_ns and known.size == stat.st_size:
+                        entries[relative_path] = known
+                        self.stats["reused"] += 1
+                        continue
+                    try:
+                        entries[relative_path] = _read_entry(dir_path, stat)
+                        self.stats["decoded"] += 1
+                        changed = True
+                    except Exception as e:
+                        logging.error(f"Could not process {dir_path}: {str(e)}")
+        return entries, changed or entries.keys() != previous.keys()
+
     async def gather(self, base_directory: str, specific_dirs: list[str]):
-        if self._is_cache_valid():
+        if self._is_cache_valid() and self._index.base_directory == base_directory:
             return self._cache
 
-        def blocking_io():
-            gathered_data: dict[str, dict[str, str]] = {}
-            for specific_dir in specific_dirs:
-                specific_path: str = os.path.join(base_directory, specific_dir)
-                for root, dirs, _ in os.walk(specific_path):
-                    for dirname in dirs:
-                        dir_path = os.path.join(root, dirname)
-                        job_data_path = os.path.join(dir_path, "data.json")
-                        try:
-                            with open(job_data_path, "rb") as f:
-                                job_data = msgspec.json.decode(f.read())
-
-                            modified_timestamp = os.path.getmtime(job_data_path)
-                            formatted_modified_date = datetime.fromtimestamp(modified_timestamp).strftime("%Y-%m-%d %I:%M:%S %p")
-
-                            dir_info = {
-                                "dir": root.replace("\\", "/"),
-                                "name": dirname,
-                                "modified_date": modified_timestamp,
-                                "formated_modified_date": formatted_modified_date,
-                                "type": job_data["job_data"].get("type", 0),
-                                "order_number": job_data["job_data"].get("order_number", 0),
-                                "ship_to": job_data["job_data"].get("ship_to", ""),
-                                "date_shipped": job_data["job_data"].get("starting_date", ""),
-                                "date_expected": job_data["job_data"].get("ending_date", ""),
-                                "color": job_data["job_data"].get("color", ""),
-                            }
-                            relative_path = dir_path.replace(f"{base_directory}/", "")
-                            gathered_data[relative_path] = dir_info
-                        except Exception as e:
-                            logging.error(f"Could not process {dir_path}: {str(e)}")
-            return gathered_data
-
-        self._cache = await IOLoop.current().run_in_executor(self.executor, blocking_io)
-        self._cache_timestamp = datetime.now()
+        # Concurrent requests share one rescan
+        if self._scan is None:
+            self._scan = asyncio.ensure_future(self._refresh(base_directory, specific_dirs))
+        scan = self._scan
+        try:
+            await scan
+        finally:
+            if self._scan is scan:
+                self._scan = None
         return self._cache
+
+    async def _refresh(self, base_directory: str, specific_dirs: list[str]):
+        loop = IOLoop.current()
+        self._specific_dirs = list(specific_dirs)
+        if self._index is None or self._index.base_directory != base_directory:
+            self._index = await loop.run_in_executor(self.executor, self._load_index, base_directory)
+
+        self._patched_during_scan.clear()
+        index = JobDirectoryIndex(base_directory=base_directory, entries=dict(self._index.entries))
+        entries, changed = await loop.run_in_executor(self.executor, self._rescan, index, specific_dirs)
+
+        # Patches that landed while the scan was running are newer than what it saw
+        for relative_path in self._patched_during_scan:
+            if (entry := self._index.entries.get(relative_path)) is not None:
+                entries[relative_path] = entry
+            else:
+                entries.pop(relative_path, None)
+        self._patched_during_scan.clear()
+
+        self._index.entries = entries
+        self._cache = {relative_path: entry.info for relative_path, entry in entries.items()}
+        self._cache_timestamp = datetime.now()
+        self.stats["scans"] += 1
+        if changed:
+            self._schedule_save()
+
+    # -------------------------
+    # Patching
+    # -------------------------
+    def _relative_path(self, dir_path: str) -> str | None:
+        if self._index is None:
+            return None
+        dir_path = os.path.normpath(dir_path.replace("\\", "/"))
+        base_directory = os.path.normpath(self._index.base_directory)
+        if not dir_path.startswith(f"{base_directory}/"):
+            return None
+        relative_path = dir_path[len(base_directory) + 1 :]
+        # Only directories gather() would have found
+        return relative_path if relative_path.split("/")[0] in self._specific_dirs else None
+
+    def _patch(self, relative_path: str, entry: IndexEntry | None):
+        if entry is None:
+            self._index.entries.pop(relative_path, None)
+            if self._cache is not None:
+                self._cache.pop(relative_path, None)
+        else:
+            self._index.entries[relative_path] = entry
+            if self._cache is not None:
+                self._cache[relative_path] = entry.info
+        if self._scan is not None:
+            self._patched_during_scan.add(relative_path)
+        self.stats["patches"] += 1
+        self._schedule_save()
+
+    def update_directory(self, dir_path: str):
+        """Re-reads one job directory's ``data.json`` after it was written."""
+        relative_path = self._relative_path(dir_path)
+        if relative_path is None:
+            self.invalidate_cache()
+            return
+        try:
+            stat = os.stat(os.path.join(dir_path, "data.json"))
+            entry = _read_entry(os.path.join(self._index.base_directory, relative_path), stat)
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            logging.error(f"Could not process {dir_path}: {str(e)}")
+            self.invalidate_cache()
+            return
+        self._patch(relative_path, entry)
+
+    def remove_directory(self, dir_path: str):
+        relative_path = self._relative_path(dir_path)
+        if relative_path is None:
+            self.invalidate_cache()
+            return
+        self._patch(relative_path, None)
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "entries": len(self._index.entries) if self._index else 0,
+        }
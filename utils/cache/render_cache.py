@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+import msgspec
+from tornado.ioloop import IOLoop
+
+
+class RenderCache:
+    """
+    On-disk LRU cache for rendered printouts.
+
+    Entries are content-addressed by (mode, url, localStorage, entity version), so
+    a save that bumps ``updated_at`` naturally misses and stale files age out of
+    the LRU instead of having to be invalidated. File access runs on a thread pool.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()  # key -> size, least recently used first
+        self._total_bytes = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(mode: str, url: str, local_storage: dict, version: str) -> str:
+        settings = msgspec.json.encode(dict(sorted(local_storage.items())))
+        digest = hashlib.sha256()
+        for part in (mode.encode(), url.encode(), settings, version.encode()):
+            digest.update(part)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            def scan() -> list[tuple[float, str, int]]:
+                os.makedirs(self.directory, exist_ok=True)
+                found = []
+                for entry in os.scandir(self.directory):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        found.append((stat.st_mtime, entry.name, stat.st_size))
+                return sorted(found)
+
+            for _, key, size in await IOLoop.current().run_in_executor(self.executor, scan):
+                self._entries[key] = size
+                self._total_bytes += size
+            self._loaded = True
+            await self._evict()
+
+    async def get(self, key: str) -> bytes | None:
+        await self._ensure_loaded()
+        if key not in self._entries:
+            self.stats["misses"] += 1
+            return None
+
+        def read() -> bytes | None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                # mtime doubles as last-used time so LRU order survives restarts
+                os.utime(path)
+                return data
+            except FileNotFoundError:
+                return None
+
+        data = await IOLoop.current().run_in_executor(self.executor, read)
+        if data is None:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return data
+
+    def contains(self, key: str) -> bool:
+        return key in self._entries
+
+    async def put(self, key: str, data: bytes):
+        await self._ensure_loaded()
+
+        def write():
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        await IOLoop.current().run_in_executor(self.executor, write)
+        self._total_bytes += len(data) - self._entries.pop(key, 0)
+        self._entries[key] = len(data)
+        await self._evict()
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        if (data := await self.get(key)) is not None:
+            return data
+
+        # Concurrent prints of the same document share one render
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await render()
+            await self.put(key, data)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; avoid "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _evict(self):
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(key)
+
+        if not evicted:
+            return
+
+        def remove():
+            for key in evicted:
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+
+        self.stats["evictions"] += len(evicted)
+        await IOLoop.current().run_in_executor(self.executor, remove)
+        logging.info(f"[RenderCache] Evicted {len(evicted)} entries, {self._total_bytes} bytes in use")
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,162 @@
+import asyncio
+import gzip
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import brotli
+import msgspec
+from tornado.ioloop import IOLoop
+
+try:
+    # Standard library from Python 3.14
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+# Server preference when the client accepts several equally
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "br": lambda body: brotli.compress(body, quality=5),
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+if zstd is not None:
+    COMPRESSORS = {"zstd": lambda body: zstd.compress(body, level=3), **COMPRESSORS}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Picks the best encoding from an ``Accept-Encoding`` header, honouring q-values; ``None`` means identity."""
+    accepted: dict[str, float] = {}
+    for entry in accept_encoding.split(","):
+        name, _, params = entry.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in COMPRESSORS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of encoded JSON response bodies.
+
+    Bodies are keyed by (name, encoding) and tagged with the generation of the data they
+    were built from (an inventory cache's ``generation``, a DB cache's counter, ...), so a
+    change makes the next request miss instead of having to invalidate anything. JSON is
+    encoded once per generation and compressed on a thread pool, off the event loop;
+    concurrent requests for the same body share one compression.
+    """
+
+    def __init__(self, max_bytes: int, min_compress_bytes: int = 1024):
+        self.max_bytes = max_bytes
+        self.min_compress_bytes = min_compress_bytes
+        # (name, encoding) -> (generation, body, applied encoding), least recently used first
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, bytes, str | None]] = OrderedDict()
+        self._total_bytes = 0
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "compressions": 0,
+            "compress_ms": 0.0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+        }
+
+    async def encode(self, data: Any, encoding: str | None, name: str | None = None, generation: Any = None) -> tuple[bytes, str | None]:
+        """
+        Returns ``(body, applied encoding)`` for ``data`` as JSON.
+
+        Without a ``name`` and ``generation`` nothing is cached. Bodies under ``min_compress_bytes`` are sent as is.
+        """
+        if name is None or generation is None:
+            return await self._compress(msgspec.json.encode(data), encoding)
+
+        if (cached := self._get((name, encoding or "identity"), generation)) is not None:
+            self.stats["hits"] += 1
+            return cached
+        self.stats["misses"] += 1
+
+        inflight_key = (name, encoding, generation)
+        if inflight_key in self._inflight:
+            return await asyncio.shield(self._inflight[inflight_key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            if (identity := self._get((name, "identity"), generation)) is None:
+                identity = (msgspec.json.encode(data), None)
+                self._put((name, "identity"), generation, identity)
+            result = await self._compress(identity[0], encoding) if encoding else identity
+            if encoding:
+                self._put((name, encoding), generation, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; avoid "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[inflight_key]
+
+    async def _compress(self, body: bytes, encoding: str | None) -> tuple[bytes, str | None]:
+        if encoding not in COMPRESSORS or len(body) < self.min_compress_bytes:
+            return body, None
+
+        started = time.perf_counter()
+        compressed = await IOLoop.current().run_in_executor(self.executor, COMPRESSORS[encoding], body)
+        self.stats["compressions"] += 1
+        self.stats["compress_ms"] = round(self.stats["compress_ms"] + (time.perf_counter() - started) * 1000, 2)
+        self.stats["bytes_in"] += len(body)
+        self.stats["bytes_out"] += len(compressed)
+        return compressed, encoding
+
+    def _get(self, key: tuple[str, str], generation: Any) -> tuple[bytes, str | None] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != generation:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def _put(self, key: tuple[str, str], generation: Any, result: tuple[bytes, str | None]):
+        # Replaces the previous generation's body
+        if previous := self._entries.pop(key, None):
+            self._total_bytes -= len(previous[1])
+        self._entries[key] = (generation, *result)
+        self._total_bytes += len(result[0])
+
+        evicted = 0
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, (_, body, _) = self._entries.popitem(last=False)
+            self._total_bytes -= len(body)
+            evicted += 1
+        if evicted:
+            self.stats["evictions"] += evicted
+            logging.info(f"[ResponseCache] Evicted {evicted} entries, {self._total_bytes} bytes in use")
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "encodings": list(COMPRESSORS),
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+import msgspec
+from filelock import FileLock
+
+
+class UserRegistry:
+    """
+    In-memory view of ``users.json`` indexed by client name and IP.
+
+    The file is decoded once and re-read only when its mtime changes (checked at
+    most every ``CHECK_INTERVAL`` seconds), so lookups are dict hits. Connection
+    updates are applied in memory immediately and written back in one batch,
+    atomically and off the event loop. Entries edited by hand in the meantime
+    (e.g. flipping ``trusted``) are merged rather than overwritten.
+    """
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, file_path: str, flush_delay: float = 2.0):
+        self.file_path = file_path
+        self.flush_delay = flush_delay
+        self._clients: dict[str, dict] = {}
+        self._by_ip: dict[str, str] = {}
+        self._mtime: float | None = None
+        self._last_check = 0.0
+        self._dirty: set[str] = set()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_lock = asyncio.Lock()
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def _read_file(self) -> tuple[dict[str, dict], float | None]:
+        try:
+            mtime = os.path.getmtime(self.file_path)
+            with open(self.file_path, "rb") as file:
+                return msgspec.json.decode(file.read()), mtime
+        except FileNotFoundError:
+            return {}, None
+
+    def _index(self, clients: dict[str, dict]):
+        # Connections not yet flushed are newer than anything on disk
+        for name in self._dirty:
+            if name in self._clients:
+                clients[name] = self._clients[name]
+        self._clients = clients
+        self._by_ip = {}
+        for client_name, client_data in clients.items():
+            # First match wins, same as the linear scan this replaces
+            self._by_ip.setdefault(client_data.get("ip"), client_name)
+
+    def _reindex_ip(self, ip: str | None):
+        """Re-resolves one IP with the same first-match rule as ``_index``."""
+        client_name = next((name for name, data in self._clients.items() if data.get("ip") == ip), None)
+        if client_name is None:
+            self._by_ip.pop(ip, None)
+        else:
+            self._by_ip[ip] = client_name
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if now - self._last_check < self.CHECK_INTERVAL:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.file_path)
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+
+        try:
+            clients, self._mtime = self._read_file()
+            self._index(clients)
+        except Exception as e:
+            logging.error(f"[UserRegistry] Failed to load {self.file_path}: {e}")
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def get_client_name(self, ip: str) -> str | None:
+        self._ensure_fresh()
+        return self._by_ip.get(ip)
+
+    def is_client_trusted(self, ip: str) -> bool:
+        self._ensure_fresh()
+        client_name = self._by_ip.get(ip)
+        return bool(client_name and self._clients[client_name].get("trusted", False))
+
+    def get_client(self, client_name: str) -> dict | None:
+        self._ensure_fresh()
+        return self._clients.get(client_name)
+
+    def get_all_clients(self) -> dict[str, dict]:
+        self._ensure_fresh()
+        return dict(self._clients)
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def record_connection(self, client_name: str, ip: str, version: str | None):
+        self._ensure_fresh()
+        client = self._clients.setdefault(client_name, {"ip": ip, "trusted": False})
+
+        previous_ip = client.get("ip")
+        client["ip"] = ip
+        client["latest_version"] = version
+        client["latest_connection"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Another client sharing an IP may own (or take over) its mapping, so resolve it the way the next reload will
+        if previous_ip != ip and self._by_ip.get(previous_ip) == client_name:
+            self._reindex_ip(previous_ip)
+        if self._by_ip.get(ip) is None:
+            self._by_ip[ip] = client_name
+        elif self._by_ip[ip] != client_name:
+            self._reindex_ip(ip)
+
+        self._dirty.add(client_name)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_delay, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+
+            dirty = {name: dict(self._clients[name]) for name in self._dirty}
+            self._dirty.clear()
+
+            def write() -> tuple[dict[str, dict], float]:
+                with FileLock(f"{self.file_path}.lock", timeout=10):
+                    clients, _ = self._read_file()
+                    for name, data in dirty.items():
+                        clients[name] = {**clients.get(name, {}), **data, "trusted": clients.get(name, data).get("trusted", False)}
+                    tmp_path = f"{self.file_path}.tmp"
+                    with open(tmp_path, "wb") as file:
+                        file.write(msgspec.json.encode(clients))
+                    os.replace(tmp_path, self.file_path)
+                    return clients, os.path.getmtime(self.file_path)
+
+            try:
+                clients, mtime = await asyncio.get_running_loop().run_in_executor(None, write)
+            except Exception as e:
+                logging.error(f"[UserRegistry] Failed to write {self.file_path}: {e}")
+                self._dirty.update(dirty)
+                return
+
+            self._mtime = mtime
+            self._index(clients)
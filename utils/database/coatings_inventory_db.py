@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 
@@ -7,7 +6,9 @@ from dotenv import load_dotenv
 
 from config.environments import Environment
 from utils.cache.inventory_cache_manager import InventoryCacheManager
+from utils.database.history_writer import history_writer
 from utils.database.item_history_db import ItemHistoryDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
@@ -16,26 +17,20 @@ class CoatingsInventoryDB(BaseWithDBPool):
 
     def __init__(self):
         self.db_pool = None
-        self.cache_manager = InventoryCacheManager(expiry_seconds=1)
+        self.cache_manager = InventoryCacheManager(
+            self.TABLE_NAME,
+            Environment.POSTGRES_DB,
+            loader=self.get_all_coatings_no_cache,
+            rows_loader=self.get_coatings_by_ids_no_cache,
+            categories_of=lambda coating: [coating.get("coating_type")],
+        )
         self.coatings_history_db = ItemHistoryDB("coating")
         load_dotenv()
-        self.cache_manager.schedule_refresh("all_coatings", self.get_all_coatings_no_cache, 60)
 
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "coatings_inventory")
                 await self._create_table_if_not_exists()
                 await self.cache_manager.start()
             except asyncpg.exceptions.PostgresError as e:
@@ -67,6 +62,11 @@ class CoatingsInventoryDB(BaseWithDBPool):
         if cached := self.cache_manager.get(key):
             return cached
 
+        if self.cache_manager.is_ready:
+            paints = [coating for coating in self.cache_manager.get_all() if coating.get("coating_type") == category]
+            self.cache_manager.set(key, paints)
+            return paints
+
         query = f"SELECT data FROM {self.TABLE_NAME} WHERE coating_type = $1"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query, category)
@@ -77,6 +77,9 @@ class CoatingsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_coating(self, coating_id: int | str) -> dict | None:
+        if isinstance(coating_id, int) and self.cache_manager.is_ready:
+            return self.cache_manager.get_item(coating_id)
+
         key = f"coating_{coating_id}"
         if cached := self.cache_manager.get(key):
             return cached
@@ -100,37 +103,21 @@ class CoatingsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_all_coatings(self) -> list[dict]:
-        key = "all_coatings"
-        if cached := self.cache_manager.get(key):
-            return cached
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_all()
 
-        query = f"SELECT * FROM {self.TABLE_NAME}"
-        async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
-
-        coatings = []
-        for row in rows:
-            row_dict = dict(row)
-            json_data = json.loads(row_dict["data"])
-            json_data["id"] = row_dict["id"]
-            coatings.append(json_data)
-
-        self.cache_manager.set(key, coatings)
-        return coatings
+        return await self.get_all_coatings_no_cache()
 
     @ensure_connection
     async def get_categories(self) -> list[str]:
-        key = "all_categories"
-        if cached := self.cache_manager.get(key):
-            return cached
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_categories()
 
         query = f"SELECT coating_type FROM {self.TABLE_NAME}"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query)
 
-        all_categories = sorted({cat for row in rows if row for cat in row})
-        self.cache_manager.set(key, all_categories)
-        return all_categories
+        return sorted({cat for row in rows if row for cat in row})
 
     @ensure_connection
     async def get_all_coatings_no_cache(self) -> list[dict]:
@@ -147,6 +134,20 @@ class CoatingsInventoryDB(BaseWithDBPool):
 
         return coatings
 
+    @ensure_connection
+    async def get_coatings_by_ids_no_cache(self, coating_ids: list[int]) -> list[dict]:
+        query = f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[])"
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(query, coating_ids)
+
+        coatings = []
+        for row in rows:
+            json_data = json.loads(row["data"])
+            json_data["id"] = row["id"]
+            coatings.append(json_data)
+
+        return coatings
+
     @ensure_connection
     async def add_coating(self, data: dict):
         query = f"""
@@ -157,7 +158,7 @@ class CoatingsInventoryDB(BaseWithDBPool):
         RETURNING id;
         """
         async with self.db_pool.acquire() as conn:
-            return await conn.fetchval(
+            coating_id = await conn.fetchval(
                 query,
                 data.get("component_id"),
                 data.get("part_name"),
@@ -167,6 +168,9 @@ class CoatingsInventoryDB(BaseWithDBPool):
                 json.dumps(data),
             )
 
+        self.cache_manager.upsert(coating_id, data)
+        return coating_id
+
     @ensure_connection
     async def save_coating(self, coating_id: int | str, new_data: dict, modified_by: str = "system"):
         if isinstance(coating_id, str):
@@ -182,10 +186,6 @@ class CoatingsInventoryDB(BaseWithDBPool):
                 if current_row is None:
                     coating_does_not_exist = True
                 else:
-                    # Record history in background
-                    task = asyncio.create_task(self.coatings_history_db.insert_history_item(coating_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
-
                     await conn.execute(
                         f"""
                         UPDATE {self.TABLE_NAME} SET
@@ -208,8 +208,10 @@ class CoatingsInventoryDB(BaseWithDBPool):
             new_id = await self.add_coating(new_data)
             return new_id
 
-        self.cache_manager.invalidate(f"coating_{coating_id}")
-        self.cache_manager.invalidate("all_coatings")
+        # Queued once the update has committed and the connection is back in the pool
+        await history_writer.enqueue(self.coatings_history_db, coating_id, new_data, modified_by)
+
+        self.cache_manager.upsert(coating_id, new_data)
         return coating_id
 
     @ensure_connection
@@ -225,8 +227,8 @@ class CoatingsInventoryDB(BaseWithDBPool):
         async with self.db_pool.acquire() as conn:
             deleted_id = await conn.fetchval(query, coating_id)
 
-        self.cache_manager.invalidate(f"coating_{coating_id}")
-        self.cache_manager.invalidate("all_coatings")
+        if deleted_id is not None:
+            self.cache_manager.remove(deleted_id)
         return deleted_id is not None
 
     async def close(self):
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 
@@ -7,7 +6,9 @@ from dotenv import load_dotenv
 
 from config.environments import Environment
 from utils.cache.inventory_cache_manager import InventoryCacheManager
+from utils.database.history_writer import history_writer
 from utils.database.item_history_db import ItemHistoryDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
@@ -16,27 +17,19 @@ class ComponentsInventoryDB(BaseWithDBPool):
 
     def __init__(self):
         self.db_pool = None
-        self.cache_manager = InventoryCacheManager(expiry_seconds=1)
+        self.cache_manager = InventoryCacheManager(
+            self.TABLE_NAME,
+            Environment.POSTGRES_DB,
+            loader=self.get_all_components_no_cache,
+            rows_loader=self.get_components_by_ids_no_cache,
+        )
         self.components_history_db = ItemHistoryDB("component")
         load_dotenv()
-        self.cache_manager.schedule_refresh("all_components", self.get_all_components_no_cache, 60)
-        self.cache_manager.schedule_refresh("all_categories", self.get_categories_no_cache, 60)
 
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "components_inventory")
                 await self._create_table_if_not_exists()
                 await self.cache_manager.start()
             except asyncpg.exceptions.PostgresError as e:
@@ -63,17 +56,10 @@ class ComponentsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_categories(self) -> list[str]:
-        key = "all_categories"
-        if cached := self.cache_manager.get(key):
-            return cached
-
-        query = f"SELECT categories FROM {self.TABLE_NAME}"
-        async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_categories()
 
-        all_categories = sorted({cat for row in rows if row["categories"] for cat in row["categories"]})
-        self.cache_manager.set(key, all_categories)
-        return all_categories
+        return await self.get_categories_no_cache()
 
     @ensure_connection
     async def get_categories_no_cache(self) -> list[str]:
@@ -90,6 +76,11 @@ class ComponentsInventoryDB(BaseWithDBPool):
         if cached := self.cache_manager.get(key):
             return cached
 
+        if self.cache_manager.is_ready:
+            components = [component for component in self.cache_manager.get_all() if category in (component.get("categories") or [])]
+            self.cache_manager.set(key, components)
+            return components
+
         query = f"SELECT data FROM {self.TABLE_NAME} WHERE $1 = ANY(categories)"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query, category)
@@ -100,6 +91,9 @@ class ComponentsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_component(self, component_id: int | str) -> dict | None:
+        if isinstance(component_id, int) and self.cache_manager.is_ready:
+            return self.cache_manager.get_item(component_id)
+
         key = f"component_{component_id}"
         if cached := self.cache_manager.get(key):
             return cached
@@ -123,10 +117,13 @@ class ComponentsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_all_components(self) -> list[dict]:
-        key = "all_components"
-        if cached := self.cache_manager.get(key):
-            return cached
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_all()
+
+        return await self.get_all_components_no_cache()
 
+    @ensure_connection
+    async def get_all_components_no_cache(self) -> list[dict]:
         query = f"SELECT * FROM {self.TABLE_NAME}"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query)
@@ -137,20 +134,19 @@ class ComponentsInventoryDB(BaseWithDBPool):
             json_data = json.loads(row_dict["data"])
             json_data["id"] = row_dict["id"]
             components.append(json_data)
-        self.cache_manager.set(key, components)
+
         return components
 
     @ensure_connection
-    async def get_all_components_no_cache(self) -> list[dict]:
-        query = f"SELECT * FROM {self.TABLE_NAME}"
+    async def get_components_by_ids_no_cache(self, component_ids: list[int]) -> list[dict]:
+        query = f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[])"
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
+            rows = await conn.fetch(query, component_ids)
 
         components = []
         for row in rows:
-            row_dict = dict(row)
-            json_data = json.loads(row_dict["data"])
-            json_data["id"] = row_dict["id"]
+            json_data = json.loads(row["data"])
+            json_data["id"] = row["id"]
             components.append(json_data)
 
         return components
@@ -164,9 +160,8 @@ class ComponentsInventoryDB(BaseWithDBPool):
         ) VALUES ($1, $2, $3, $4, $5)
         RETURNING id;
         """
-        self.cache_manager.invalidate("all_components")
         async with self.db_pool.acquire() as conn:
-            return await conn.fetchval(
+            component_id = await conn.fetchval(
                 query,
                 data.get("part_name"),
                 data.get("part_number"),
@@ -175,6 +170,9 @@ class ComponentsInventoryDB(BaseWithDBPool):
                 json.dumps(data),
             )
 
+        self.cache_manager.upsert(component_id, data)
+        return component_id
+
     @ensure_connection
     async def get_component_id(self, component_name: str) -> int:
         async with self.db_pool.acquire() as conn:
@@ -204,10 +202,7 @@ class ComponentsInventoryDB(BaseWithDBPool):
                 current_row = await conn.fetchrow(f"SELECT * FROM {self.TABLE_NAME} WHERE id = $1", component_id)
                 current_json = json.loads(current_row["data"])
                 new_json = new_data.copy()
-
-                if current_json != new_json:
-                    task = asyncio.create_task(self.components_history_db.insert_history_item(component_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
+                changed = current_json != new_json
 
                 # Update the main row
                 await conn.execute(
@@ -225,9 +220,78 @@ class ComponentsInventoryDB(BaseWithDBPool):
                     json.dumps(new_data),
                 )
 
-        # Invalidate caches
-        self.cache_manager.invalidate(f"component_{component_id}")
-        self.cache_manager.invalidate("all_components")
+        # Queued once the update has committed and the connection is back in the pool
+        if changed:
+            await history_writer.enqueue(self.components_history_db, component_id, new_data, modified_by)
+
+        self.cache_manager.upsert(component_id, new_data)
+
+    @ensure_connection
+    async def update_components(self, components: list[dict], modified_by: str = "system") -> list[int]:
+        """
+        Bulk ``update_component``.
+
+        Reads every current row with one ``SELECT ... FOR NO KEY UPDATE``, writes all rows with one
+        ``UPDATE ... FROM unnest(...)`` and all history versions with one INSERT, in a single transaction.
+        """
+        await self.components_history_db.connect()
+
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                if unresolved := [component["part_number"] for component in components if component.get("id", -1) < 0]:
+                    rows = await conn.fetch(
+                        f"SELECT id, part_name, part_number FROM {self.TABLE_NAME} WHERE part_name = ANY($1::text[]) OR part_number = ANY($1::text[])",
+                        unresolved,
+                    )
+                    # Same precedence as get_component_id: part_name first, then part_number
+                    by_part_name, by_part_number = {}, {}
+                    for row in rows:
+                        by_part_name.setdefault(row["part_name"], row["id"])
+                        by_part_number.setdefault(row["part_number"], row["id"])
+                    for component in components:
+                        if component.get("id", -1) < 0:
+                            key = component["part_number"]
+                            component["id"] = by_part_name.get(key, by_part_number.get(key, -1))
+
+                # Last entry wins if the same component is posted twice
+                new_components = {component["id"]: component for component in components}
+
+                current_rows = await conn.fetch(
+                    f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[]) FOR NO KEY UPDATE",
+                    list(new_components),
+                )
+                current = {row["id"]: json.loads(row["data"]) for row in current_rows}
+                if missing := [component.get("part_number", component_id) for component_id, component in new_components.items() if component_id not in current]:
+                    raise ValueError(f"Components not found: {missing}")
+
+                changed = [(component_id, component) for component_id, component in new_components.items() if current[component_id] != component]
+                await self.components_history_db.insert_history_items(conn, changed, modified_by)
+
+                values = list(new_components.values())
+                await conn.execute(
+                    f"""
+                    UPDATE {self.TABLE_NAME} AS t SET
+                        part_name = v.part_name,
+                        part_number = v.part_number,
+                        categories = CASE WHEN v.categories IS NULL THEN NULL ELSE ARRAY(SELECT jsonb_array_elements_text(v.categories::jsonb)) END,
+                        quantity = v.quantity,
+                        data = v.data::jsonb,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM unnest($1::int[], $2::text[], $3::text[], $4::text[], $5::float8[], $6::text[])
+                        AS v(id, part_name, part_number, categories, quantity, data)
+                    WHERE t.id = v.id
+                    """,
+                    list(new_components),
+                    [component.get("part_name") for component in values],
+                    [component.get("part_number") for component in values],
+                    # TEXT[] columns are ragged, so each row's categories travel as a JSON array
+                    [json.dumps(component.get("categories", [])) if component.get("categories", []) is not None else None for component in values],
+                    [component.get("quantity", 0) for component in values],
+                    [json.dumps(component) for component in values],
+                )
+
+        self.cache_manager.upsert_many(new_components)
+        return list(new_components)
 
     @ensure_connection
     async def delete_component(self, component_id: int | str) -> bool:
@@ -237,8 +301,8 @@ class ComponentsInventoryDB(BaseWithDBPool):
         async with self.db_pool.acquire() as conn:
             deleted_id = await conn.fetchval(query, component_id)
 
-        self.cache_manager.invalidate(f"component_{component_id}")
-        self.cache_manager.invalidate("all_components")
+        if deleted_id is not None:
+            self.cache_manager.remove(deleted_id)
         return deleted_id is not None
 
     async def close(self):
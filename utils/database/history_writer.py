@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Protocol
+
+import asyncpg
+
+from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry
+
+
+def history_lock_key(table_name: str, entity_id: Any) -> str:
+    return f"{table_name}:{entity_id}"
+
+
+async def lock_history_versions(conn: asyncpg.Connection, keys: list[str]):
+    """
+    Takes transaction-scoped advisory locks on history entities (see ``history_lock_key``) in a fixed order.
+
+    Everything that assigns history versions holds the entity's lock while it reads the latest version
+    and inserts the next one, so versions never collide. Take it before row-locking the entity with
+    ``FOR UPDATE``; a history row's foreign key check waits on that lock (``FOR NO KEY UPDATE`` is fine).
+    """
+    await conn.execute(
+        """
+        SELECT pg_advisory_xact_lock(lock_key)
+        FROM (
+            SELECT DISTINCT hashtext(key) AS lock_key
+            FROM unnest($1::text[]) AS key
+            ORDER BY lock_key
+        ) AS locks
+        """,
+        keys,
+    )
+
+
+class HistorySource(Protocol):
+    table_name: str
+
+    async def connect(self): ...
+
+    async def write_history(self, conn: asyncpg.Connection, entries: list[tuple[Any, dict, str]]):
+        """Writes one new version per ``(entity_id, data, modified_by)``; entity ids are unique within a call."""
+        ...
+
+
+class HistoryWriter:
+    """
+    Single writer for every history table.
+
+    Saves call ``enqueue`` instead of spawning a task per change. One worker drains the queue in
+    FIFO order, so an entity's versions are written in the order its saves happened, and each flush
+    writes up to ``batch_size`` entries, across entities and tables, in one transaction under the
+    entities' history locks. ``enqueue`` waits while ``max_pending`` entries are queued.
+    Call it after the save has committed and released its connection: a full queue waits on the
+    worker, which needs a connection of its own, and a rolled back save must not leave a version.
+
+    Paths that write versions directly on their own connection (bulk updates, quantity deltas) call
+    ``flush_pending`` for their entities first, so those keep the same order.
+    """
+
+    def __init__(self, max_pending: int = 10_000, batch_size: int = 500, flush_delay: float = 0.05, max_attempts: int = 3):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self.max_attempts = max_attempts
+        self.db_pool = None
+        # (source, entity_id, data, modified_by, enqueued_at); entries stay here until written
+        self._pending: deque[tuple[HistorySource, Any, dict, str, float]] = deque()
+        self._slots = asyncio.Semaphore(max_pending)
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self.stats = {
+            "written": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "max_lag_seconds": 0.0,
+            "last_flush_ms": 0.0,
+        }
+
+    async def connect(self):
+        if self.db_pool is None or self.db_pool._closed:
+            self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "history_writer")
+
+    # -------------------------
+    # Queue
+    # -------------------------
+    async def enqueue(self, source: HistorySource, entity_id: Any, new_data: dict, modified_by: str = "system"):
+        await self._slots.acquire()
+        self._pending.append((source, entity_id, new_data, modified_by, time.monotonic()))
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Let a burst of saves land in the same flush
+            await asyncio.sleep(self.flush_delay)
+
+            while self._pending:
+                batch = [self._pending[index] for index in range(min(self.batch_size, len(self._pending)))]
+                await self._flush(batch)
+                for _ in batch:
+                    self._pending.popleft()
+                    self._slots.release()
+
+    async def flush_pending(self, source: HistorySource, entity_ids: list[Any], timeout: float = 30.0):
+        """
+        Waits until every queued version of these entities is written.
+
+        Call it before taking the entities' history locks (the worker needs them), so a version
+        queued by an earlier save can't be written after, and numbered above, a direct write.
+        """
+        keys = {(source.table_name, entity_id) for entity_id in entity_ids}
+
+        def has_pending() -> bool:
+            return any((entry[0].table_name, entry[1]) in keys for entry in self._pending)
+
+        deadline = time.monotonic() + timeout
+        while has_pending():
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"[HistoryWriter] Queued history of {source.table_name} was not written within {timeout}s")
+            if self._worker is None or self._worker.done():
+                self._worker = asyncio.create_task(self._run())
+            self._wakeup.set()
+            await asyncio.sleep(self.flush_delay)
+
+    async def drain(self, timeout: float = 30.0):
+        """Waits until everything queued so far is written, e.g. on shutdown."""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            if self._worker is None or self._worker.done():
+                self._worker = asyncio.create_task(self._run())
+            self._wakeup.set()
+            await asyncio.sleep(0.05)
+        if self._pending:
+            logging.error(f"[HistoryWriter] {len(self._pending)} history entries were not written before shutdown")
+
+    def status(self) -> dict:
+        oldest = self._pending[0][4] if self._pending else None
+        return {
+            "pending": len(self._pending),
+            "lag_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            **self.stats,
+        }
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    async def _flush(self, batch: list[tuple]):
+        started = time.monotonic()
+        self.stats["max_lag_seconds"] = max(self.stats["max_lag_seconds"], round(started - batch[0][4], 3))
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self._write(batch)
+                self.stats["written"] += len(batch)
+                self.stats["flushes"] += 1
+                self.stats["last_flush_ms"] = round((time.monotonic() - started) * 1000, 2)
+                return
+            except Exception as e:
+                self.stats["failed_flushes"] += 1
+                logging.warning(f"[HistoryWriter] Flush of {len(batch)} entries failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.1 * attempt)
+
+        # Write the entries one by one so a single bad one (e.g. its entity was deleted) doesn't lose the rest
+        for entry in batch:
+            try:
+                await self._write([entry])
+                self.stats["written"] += 1
+            except Exception as e:
+                self.stats["dropped"] += 1
+                logging.error(f"[HistoryWriter] Dropped history version of {entry[0].table_name} {entry[1]}: {e}")
+
+    async def _write(self, batch: list[tuple]):
+        await self.connect()
+        for source in {id(entry[0]): entry[0] for entry in batch}.values():
+            await source.connect()
+
+        # An entity saved several times in the batch gets one version per round, in order
+        rounds: list[dict[HistorySource, list]] = []
+        occurrences: dict[tuple, int] = defaultdict(int)
+        for source, entity_id, new_data, modified_by, _ in batch:
+            index = occurrences[(id(source), entity_id)]
+            occurrences[(id(source), entity_id)] += 1
+            if index == len(rounds):
+                rounds.append(defaultdict(list))
+            rounds[index][source].append((entity_id, new_data, modified_by))
+
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await lock_history_versions(conn, [history_lock_key(entry[0].table_name, entry[1]) for entry in batch])
+                for round_entries in rounds:
+                    for source, entries in round_entries.items():
+                        await source.write_history(conn, entries)
+
+
+history_writer = HistoryWriter()
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 
@@ -6,10 +5,26 @@ import asyncpg
 from dotenv import load_dotenv
 
 from config.environments import Environment
+from utils.database.history_writer import history_lock_key, history_writer, lock_history_versions
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
+from utils.history_delta import describe_delta, diff_documents, plan_version, replay
+from utils.inventory_events import EVENT_FIELDS, derive_events
 
 
 class ItemHistoryDB(BaseWithDBPool):
+    """
+    Versioned history of an inventory item.
+
+    Every ``KEYFRAME_INTERVAL``-th version stores the full ``data``; the versions in between
+    store only a path-level ``delta`` from the previous version and point at their keyframe
+    through ``keyframe_version``. Any version is rebuilt from its keyframe plus at most
+    ``KEYFRAME_INTERVAL - 1`` deltas (see ``utils.history_delta``).
+
+    Price, quantity and order changes are also written as typed rows to
+    ``{item}s_inventory_events`` in the same transaction (see ``utils.inventory_events``).
+    """
+
     def __init__(self, item_name: str):
         self.db_pool = None
         self.item_name = item_name
@@ -18,45 +33,83 @@ class ItemHistoryDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, f"{self.item_name}_history")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.info(f"[HistoryDB] Database connection error: {e}")
                 self.db_pool = None
 
+    @property
+    def table_name(self) -> str:
+        return f"{self.item_name}s_inventory_history"
+
+    @property
+    def id_column(self) -> str:
+        return f"{self.item_name}_id"
+
+    @property
+    def events_table_name(self) -> str:
+        return f"{self.item_name}s_inventory_events"
+
+    @staticmethod
+    def _read_keyframe(row) -> dict:
+        return json.loads(row["data"])
+
+    async def _fetch_page(self, conn: asyncpg.Connection, item_id: int, limit: int | None, before_version: int | None, with_previous: bool):
+        """
+        Rows needed to rebuild the newest ``limit`` versions older than ``before_version``, ordered by version.
+
+        Starts at the keyframe of the oldest version in the page (or of the version before it, when
+        ``with_previous``); ``in_page`` marks the rows that belong to the page itself.
+        """
+        first_needed = "version < (SELECT MIN(version) FROM page)" if with_previous else "version = (SELECT MIN(version) FROM page)"
+        return await conn.fetch(
+            f"""
+            WITH page AS (
+                SELECT version FROM {self.table_name}
+                WHERE {self.id_column} = $1 AND ($2::int IS NULL OR version < $2)
+                ORDER BY version DESC
+                LIMIT $3
+            ),
+            start AS (
+                SELECT COALESCE(
+                    (SELECT keyframe_version FROM {self.table_name}
+                     WHERE {self.id_column} = $1 AND {first_needed}
+                     ORDER BY version DESC LIMIT 1),
+                    (SELECT MIN(version) FROM page)
+                ) AS version
+            )
+            SELECT version, data, delta, modified_by, created_at, diff_from, diff_to,
+                version >= (SELECT MIN(version) FROM page) AS in_page
+            FROM {self.table_name}
+            WHERE {self.id_column} = $1
+                AND version >= (SELECT version FROM start)
+                AND version <= (SELECT MAX(version) FROM page)
+            ORDER BY version
+            """,
+            item_id,
+            before_version,
+            limit,
+        )
+
     @ensure_connection
-    async def get_item_history(self, item_id: int):
+    async def get_item_history(self, item_id: int, limit: int | None = None, before_version: int | None = None):
         """
-        Retrieve full history records for a specific item ID, ordered by version ascending.
-        Returns a list of dicts representing each version's data.
+        Retrieve history records for a specific item ID, newest version first.
+
+        Returns at most ``limit`` versions older than ``before_version`` (all of them by default);
+        pass the last returned ``version`` as ``before_version`` to get the next page.
         """
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(
-                f"""
-                SELECT version, data, modified_by, created_at, diff_from, diff_to
-                FROM {self.item_name}s_inventory_history
-                WHERE {self.item_name}_id = $1
-                ORDER BY version ASC
-                """,
-                item_id,
-            )
+            rows = await self._fetch_page(conn, item_id, limit, before_version, with_previous=False)
 
         history = []
-        for row in rows:
+        for row, data, _ in replay(rows, self._read_keyframe):
+            if not row["in_page"]:
+                continue
             record = {
                 "version": row["version"],
-                "data": json.loads(row["data"]),
+                "data": data,
                 "modified_by": row["modified_by"],
                 "created_at": row["created_at"].isoformat() if row["created_at"] else None,
                 "diff_from": json.loads(row["diff_from"]),
@@ -64,8 +117,55 @@ class ItemHistoryDB(BaseWithDBPool):
             }
             history.append(record)
 
+        history.reverse()
         return history
 
+    @ensure_connection
+    async def get_item_version(self, item_id: int, version: int) -> dict | None:
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT version, data, delta
+                FROM {self.table_name}
+                WHERE {self.id_column} = $1
+                    AND version >= (SELECT keyframe_version FROM {self.table_name} WHERE {self.id_column} = $1 AND version = $2)
+                    AND version <= $2
+                ORDER BY version
+                """,
+                item_id,
+                version,
+            )
+
+        data = None
+        for _, data, _ in replay(rows, self._read_keyframe):
+            pass
+        return data
+
+    @ensure_connection
+    async def get_storage_stats(self, item_id: int | None = None, limit: int = 50) -> list[dict]:
+        """Versions, keyframes and on-disk (compressed) bytes per item, largest first."""
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT
+                    {self.id_column} AS item_id,
+                    COUNT(*) AS versions,
+                    COUNT(*) FILTER (WHERE delta IS NULL) AS keyframes,
+                    SUM(
+                        COALESCE(pg_column_size(data), 0) + COALESCE(pg_column_size(delta), 0)
+                        + COALESCE(pg_column_size(diff_from), 0) + COALESCE(pg_column_size(diff_to), 0)
+                    ) AS stored_bytes
+                FROM {self.table_name}
+                WHERE $1::int IS NULL OR {self.id_column} = $1
+                GROUP BY {self.id_column}
+                ORDER BY stored_bytes DESC
+                LIMIT $2
+                """,
+                item_id,
+                limit,
+            )
+        return [dict(row) for row in rows]
+
     @ensure_connection
     async def _create_table_if_not_exists(self):
         table_query = f"""
@@ -75,13 +175,23 @@ class ItemHistoryDB(BaseWithDBPool):
             version INT NOT NULL,
             name TEXT NOT NULL,
             modified_by TEXT NOT NULL,
-            data JSONB NOT NULL,
+            data JSONB,
+            delta JSONB,
+            keyframe_version INT,
             diff_from JSONB NOT NULL,
             diff_to JSONB NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """
 
+        # Tables created before keyframes: every existing version holds its full data, so each one is a keyframe
+        migrate_query = f"""
+        ALTER TABLE {self.item_name}s_inventory_history ADD COLUMN delta JSONB;
+        ALTER TABLE {self.item_name}s_inventory_history ADD COLUMN keyframe_version INT;
+        ALTER TABLE {self.item_name}s_inventory_history ALTER COLUMN data DROP NOT NULL;
+        UPDATE {self.item_name}s_inventory_history SET keyframe_version = version;
+        """
+
         index_unique_query = f"""
         CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.item_name}_version
         ON {self.item_name}s_inventory_history ({self.item_name}_id, version);
@@ -92,91 +202,287 @@ class ItemHistoryDB(BaseWithDBPool):
         ON {self.item_name}s_inventory_history ({self.item_name}_id);
         """
 
+        events_query = f"""
+        CREATE TABLE IF NOT EXISTS {self.events_table_name} (
+            id BIGSERIAL PRIMARY KEY,
+            {self.item_name}_id INT REFERENCES {self.item_name}s_inventory(id) ON DELETE SET NULL,
+            version INT NOT NULL,
+            kind TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            modified_by TEXT,
+            details JSONB NOT NULL,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.item_name}_events_kind_version
+        ON {self.events_table_name} ({self.item_name}_id, kind, version);
+        """
+
         if self.db_pool:
             async with self.db_pool.acquire() as conn:
                 async with conn.transaction():
                     await conn.execute(table_query)
+                    if self.item_name in EVENT_FIELDS:
+                        events_exist = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", self.events_table_name)
+                        await conn.execute(events_query)
+                        if not events_exist:
+                            logging.warning(
+                                f"[HistoryDB] Created {self.events_table_name}; run `python -m utils.inventory_events` to derive events from existing history"
+                            )
+                    has_keyframes = await conn.fetchval(
+                        """
+                        SELECT EXISTS (
+                            SELECT 1 FROM information_schema.columns
+                            WHERE table_name = $1 AND column_name = 'keyframe_version'
+                        )
+                        """,
+                        f"{self.item_name}s_inventory_history",
+                    )
+                    if not has_keyframes:
+                        await conn.execute(migrate_query)
                     await conn.execute(index_unique_query)
                     await conn.execute(index_lookup_query)
 
+    async def _get_latest(self, conn: asyncpg.Connection, item_ids: list[int]) -> dict[int, tuple]:
+        """``{item_id: (latest_row, data)}``, rebuilding each item's latest version from its keyframe in one query."""
+        rows = await conn.fetch(
+            f"""
+            SELECT h.{self.id_column} AS item_id, h.version, h.keyframe_version, h.data, h.delta
+            FROM {self.table_name} h
+            JOIN (
+                SELECT DISTINCT ON ({self.id_column}) {self.id_column} AS item_id, keyframe_version
+                FROM {self.table_name}
+                WHERE {self.id_column} = ANY($1::int[])
+                ORDER BY {self.id_column}, version DESC
+            ) AS k ON h.{self.id_column} = k.item_id AND h.version >= k.keyframe_version
+            ORDER BY h.{self.id_column}, h.version
+            """,
+            item_ids,
+        )
+
+        latest = {}
+        for row, data, _ in replay(rows, self._read_keyframe):
+            latest[row["item_id"]] = (row, data)
+        return latest
+
     @ensure_connection
     async def insert_history_item(self, item_id: int, new_data: dict, modified_by: str):
-        max_retries = 3
-        for attempt in range(1, max_retries + 1):
-            try:
-                async with self.db_pool.acquire() as conn:
-                    async with conn.transaction():
-                        # Get previous entry (if any)
-                        latest = await conn.fetchrow(
-                            f"""
-                                SELECT data, version
-                                FROM {self.item_name}s_inventory_history
-                                WHERE {self.item_name}_id = $1
-                                ORDER BY version DESC
-                                LIMIT 1
-                            """,
-                            item_id,
-                        )
+        """Writes a version right away; saves queue theirs on ``history_writer`` instead."""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await self.insert_history_items(conn, [(item_id, new_data)], modified_by)
 
-                        if latest:
-                            prev_data = json.loads(latest["data"])
-                            version = latest["version"] + 1
-                            diff = self.compute_diff(prev_data, new_data)
-
-                            if not diff:  # No difference found
-                                return
-
-                            diff_from = {k: v["from"] for k, v in diff.items()}
-                            diff_to = {k: v["to"] for k, v in diff.items()}
-                        else:
-                            version = 1
-                            diff_from = {}
-                            diff_to = new_data  # treat all as new
-
-                        await conn.execute(
-                            f"""
-                            INSERT INTO {self.item_name}s_inventory_history (
-                                {self.item_name}_id, version, name, modified_by, data, diff_from, diff_to, created_at
-                            ) VALUES ($1, $2, $3, $4, $5, $6, $7, CURRENT_TIMESTAMP)
-                            """,
-                            item_id,
-                            version,
-                            new_data.get("name"),
-                            modified_by,
-                            json.dumps(new_data),
-                            json.dumps(diff_from),
-                            json.dumps(diff_to),
-                        )
+    async def write_history(self, conn: asyncpg.Connection, entries: list[tuple[int, dict, str]]):
+        """``HistoryWriter`` entry point: one version per ``(item_id, data, modified_by)``."""
+        by_modifier: dict[str, list[tuple[int, dict]]] = {}
+        for item_id, new_data, modified_by in entries:
+            by_modifier.setdefault(modified_by, []).append((item_id, new_data))
+        for modified_by, items in by_modifier.items():
+            # Runs inside the writer's flush, where these are the queued entries: flushing would wait on itself
+            await self._insert_history_items(conn, items, modified_by)
+
+    async def insert_history_items(self, conn: asyncpg.Connection, entries: list[tuple[int, dict]], modified_by: str):
+        """
+        Batched ``insert_history_item`` for bulk updates, run on the caller's connection and transaction.
+
+        The latest version of every item is read in one query and all new versions are written
+        in one INSERT, under the items' history locks (see ``lock_history_versions``). The caller
+        must have called ``connect()`` so the history table exists, and must not hold ``FOR UPDATE``
+        row locks on the items (``FOR NO KEY UPDATE`` is fine) or their history locks.
+        """
+        if not entries:
+            return
 
-                return
-            except asyncpg.UniqueViolationError:
-                logging.info(f"[History Insert] Version {version} conflict, retrying...")
-                if attempt < max_retries:
-                    await asyncio.sleep(attempt)
-                else:
-                    logging.info(f"[History Insert] Gave up after {max_retries} attempts.")
-            except Exception as e:
-                logging.info(f"[History Insert Error] Attempt {attempt}: {e}")
-                if attempt < max_retries:
-                    await asyncio.sleep(attempt)
-                else:
-                    logging.info(f"[History Insert] FAILED after {max_retries} attempts.")
+        # Versions queued by earlier single-item saves go first
+        await history_writer.flush_pending(self, [item_id for item_id, _ in entries])
+        await self._insert_history_items(conn, entries, modified_by)
+
+    async def _insert_history_items(self, conn: asyncpg.Connection, entries: list[tuple[int, dict]], modified_by: str):
+        if not entries:
+            return
+
+        await lock_history_versions(conn, [history_lock_key(self.table_name, item_id) for item_id, _ in entries])
+        latest = await self._get_latest(conn, [item_id for item_id, _ in entries])
+
+        item_ids, versions, names, data, deltas, keyframe_versions, diffs_from, diffs_to = [], [], [], [], [], [], [], []
+        event_versions = []
+        for item_id, new_data in entries:
+            if previous := latest.get(item_id):
+                latest_row, prev_data = previous
+                diff = self.compute_diff(prev_data, new_data)
+                if not diff:  # No difference found
+                    continue
+                version = latest_row["version"] + 1
+                diff_from = {k: v["from"] for k, v in diff.items()}
+                diff_to = {k: v["to"] for k, v in diff.items()}
+                keyframe_version, delta = plan_version(version, (latest_row["keyframe_version"], prev_data), new_data)
+            else:
+                version = 1
+                diff_from = {}
+                diff_to = new_data  # treat all as new
+                keyframe_version, delta = plan_version(version, None, new_data)
+
+            item_ids.append(item_id)
+            versions.append(version)
+            names.append(new_data.get("name"))
+            data.append(json.dumps(new_data) if delta is None else None)
+            deltas.append(delta)
+            keyframe_versions.append(keyframe_version)
+            diffs_from.append(json.dumps(diff_from))
+            diffs_to.append(json.dumps(diff_to))
+            event_versions.append((item_id, version, modified_by, diff_from, diff_to, None))
+
+        if not item_ids:
+            return
+
+        await conn.execute(
+            f"""
+            INSERT INTO {self.item_name}s_inventory_history (
+                {self.item_name}_id, version, name, modified_by, data, delta, keyframe_version, diff_from, diff_to, created_at
+            )
+            SELECT
+                item_id, version, COALESCE(name, ''), COALESCE($4::text, 'system'),
+                data::jsonb, delta::jsonb, keyframe_version, diff_from::jsonb, diff_to::jsonb, CURRENT_TIMESTAMP
+            FROM unnest($1::int[], $2::int[], $3::text[], $5::text[], $6::text[], $7::int[], $8::text[], $9::text[])
+                AS t(item_id, version, name, data, delta, keyframe_version, diff_from, diff_to)
+            """,
+            item_ids,
+            versions,
+            names,
+            modified_by,
+            data,
+            deltas,
+            keyframe_versions,
+            diffs_from,
+            diffs_to,
+        )
+        await self._insert_events(conn, event_versions)
+
+    # -------------------------
+    # Events
+    # -------------------------
+    async def _insert_events(self, conn: asyncpg.Connection, versions: list[tuple]) -> int:
+        """
+        Derives and stores the events of ``(item_id, version, modified_by, diff_from, diff_to, created_at)`` versions.
+
+        A ``None`` created_at means now. Events that already exist are left alone, so this is safe to re-run.
+        """
+        item_ids, event_versions, kinds, event_types, modified_bys, details, payloads, created_ats = [], [], [], [], [], [], [], []
+        for item_id, version, modified_by, diff_from, diff_to, created_at in versions:
+            for kind, event_type, event_details, payload in derive_events(self.item_name, diff_from, diff_to):
+                item_ids.append(item_id)
+                event_versions.append(version)
+                kinds.append(kind)
+                event_types.append(event_type)
+                modified_bys.append(modified_by)
+                details.append(json.dumps(event_details))
+                payloads.append(json.dumps(payload))
+                created_ats.append(created_at)
+
+        if not item_ids:
+            return 0
+
+        await conn.execute(
+            f"""
+            INSERT INTO {self.events_table_name} (
+                {self.item_name}_id, version, kind, event_type, modified_by, details, payload, created_at
+            )
+            SELECT item_id, version, kind, event_type, modified_by, details::jsonb, payload::jsonb, COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM unnest($1::int[], $2::int[], $3::text[], $4::text[], $5::text[], $6::text[], $7::text[], $8::timestamp[])
+                AS t(item_id, version, kind, event_type, modified_by, details, payload, created_at)
+            ON CONFLICT ({self.item_name}_id, kind, version) DO NOTHING
+            """,
+            item_ids,
+            event_versions,
+            kinds,
+            event_types,
+            modified_bys,
+            details,
+            payloads,
+            created_ats,
+        )
+        return len(item_ids)
 
     @ensure_connection
-    async def get_item_history_diff(self, item_id: int):
+    async def get_item_events(self, item_id: int, kind: str, limit: int | None = None, before_version: int | None = None) -> list[dict]:
+        """``price``, ``quantity`` or ``orders`` events of an item, newest first, paged like ``get_item_history``."""
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(
-                f"SELECT version, data FROM {self.item_name}s_inventory_history WHERE {self.item_name}_id = $1 ORDER BY version",
+                f"""
+                SELECT version, event_type, modified_by, details, payload, created_at
+                FROM {self.events_table_name}
+                WHERE {self.item_name}_id = $1 AND kind = $2 AND ($3::int IS NULL OR version < $3)
+                ORDER BY version DESC
+                LIMIT $4
+                """,
                 item_id,
+                kind,
+                before_version,
+                limit,
             )
 
-        versions = [json.loads(row["data"]) for row in rows]
-        diffs = []
+        return [
+            {
+                "version": row["version"],
+                "event_type": row["event_type"],
+                "modified_by": row["modified_by"],
+                "details": json.loads(row["details"]),
+                "payload": json.loads(row["payload"]),
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            }
+            for row in rows
+        ]
 
-        for i in range(1, len(versions)):
-            diff = self.compute_diff(versions[i - 1], versions[i])
-            diffs.append({"from_version": i, "to_version": i + 1, "changes": diff})
+    @ensure_connection
+    async def backfill_events(self, batch_size: int = 1000) -> int:
+        """Derives events from every stored history version; see ``python -m utils.inventory_events``."""
+        if self.item_name not in EVENT_FIELDS:
+            return 0
+
+        count = 0
+        last_id = 0
+        while True:
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    f"""
+                    SELECT id, {self.item_name}_id AS item_id, version, modified_by, diff_from, diff_to, created_at
+                    FROM {self.item_name}s_inventory_history
+                    WHERE id > $1 AND {self.item_name}_id IS NOT NULL
+                    ORDER BY id
+                    LIMIT $2
+                    """,
+                    last_id,
+                    batch_size,
+                )
+                if not rows:
+                    return count
+
+                async with conn.transaction():
+                    count += await self._insert_events(
+                        conn,
+                        [
+                            (row["item_id"], row["version"], row["modified_by"], json.loads(row["diff_from"]), json.loads(row["diff_to"]), row["created_at"])
+                            for row in rows
+                        ],
+                    )
+            last_id = rows[-1]["id"]
+            logging.info(f"[HistoryDB] {self.item_name} events backfilled up to history id {last_id}")
+
+    @ensure_connection
+    async def get_item_history_diff(self, item_id: int, limit: int | None = None, before_version: int | None = None):
+        """Changes made by each version, newest first, paged like ``get_item_history``."""
+        async with self.db_pool.acquire() as conn:
+            rows = await self._fetch_page(conn, item_id, limit, before_version, with_previous=True)
+
+        diffs = []
+        previous = None
+        for row, data, ops in replay(rows, self._read_keyframe):
+            if row["in_page"] and previous is not None:
+                changes = describe_delta(previous[1], diff_documents(previous[1], data) if ops is None else ops)
+                diffs.append({"from_version": previous[0], "to_version": row["version"], "changes": changes})
+            previous = (row["version"], data)
 
+        diffs.reverse()
         return diffs
 
     def compute_diff(self, prev, current, path="") -> dict:
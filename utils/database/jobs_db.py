@@ -7,7 +7,9 @@ import asyncpg
 import msgspec
 
 from config.environments import Environment
+from utils.database.history_writer import history_writer
 from utils.database.jobs_history_db import JobsHistroyDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 from utils.workspace.job import JobStatus
 
@@ -18,6 +20,7 @@ class JobsDB(BaseWithDBPool):
     def __init__(self):
         self.db_pool = None
         self.cache = {}
+        self.generation = 0  # source of the cache entries' generations, see cache_generation
         self.jobs_history_db = JobsHistroyDB()
         self.cache_expiry = timedelta(seconds=60)
         self._stop_background = False
@@ -27,18 +30,7 @@ class JobsDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "jobs")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
@@ -64,17 +56,31 @@ class JobsDB(BaseWithDBPool):
     def _get_cache(self, key):
         item = self.cache.get(key)
         if item:
-            value, timestamp = item
+            value, timestamp, _ = item
             if datetime.now() - timestamp < self.cache_expiry:
                 return value
         return None
 
     def _set_cache(self, key, value):
-        self.cache[key] = (value, datetime.now())
+        previous = self.cache.get(key)
+        if previous and previous[0] == value:
+            # Refreshed after expiring but unchanged, so ETags handed out for it stay valid
+            generation = previous[2]
+        else:
+            self.generation += 1
+            generation = self.generation
+        self.cache[key] = (value, datetime.now(), generation)
 
     def _invalidate_cache(self, key_startswith):
         self.cache = {k: v for k, v in self.cache.items() if not k.startswith(key_startswith)}
 
+    def cache_generation(self, key) -> int | None:
+        """Generation of a fresh cache entry (changes whenever its value does); ``None`` if it isn't cached."""
+        item = self.cache.get(key)
+        if item and datetime.now() - item[1] < self.cache_expiry:
+            return item[2]
+        return None
+
     def start_background_cache_worker(self):
         async def background_job():
             while not self._stop_background:
@@ -180,6 +186,11 @@ class JobsDB(BaseWithDBPool):
         self._set_cache(cache_key, job)
         return job
 
+    @ensure_connection
+    async def get_updated_at(self, entry_id: int) -> datetime | None:
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchval(f"SELECT updated_at FROM {self.TABLE_NAME} WHERE id = $1", entry_id)
+
     @ensure_connection
     async def save_job(self, job_id: int | str, new_data: dict, modified_by: str = "system"):
         if isinstance(job_id, str):
@@ -194,10 +205,6 @@ class JobsDB(BaseWithDBPool):
                 if current_row is None:
                     job_does_not_exist = True
                 else:
-                    # Record history in background
-                    task = asyncio.create_task(self.jobs_history_db.insert_history_job(job_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
-
                     job_data = new_data.get("job_data", {})
                     nests = new_data.get("nests", [])
                     assemblies = new_data.get("assemblies", [])
@@ -224,9 +231,12 @@ class JobsDB(BaseWithDBPool):
             logging.info(f"[SaveJob] Job ID {job_id} not found. Creating new job.")
             new_id = await self.add_job(new_data)
             # Optional: write to history right after creation
-            await self.jobs_history_db.insert_history_job(new_id, new_data, modified_by)
+            await history_writer.enqueue(self.jobs_history_db, new_id, new_data, modified_by)
             return new_id
 
+        # Queued once the update has committed and the connection is back in the pool
+        await history_writer.enqueue(self.jobs_history_db, job_id, new_data, modified_by)
+
         self._invalidate_cache(f"job_{job_id}")
         self._invalidate_cache("all_jobs")
         return job_id
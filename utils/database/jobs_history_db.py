@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 
@@ -7,10 +6,23 @@ import msgspec
 from dotenv import load_dotenv
 
 from config.environments import Environment
+from utils.database.history_writer import history_lock_key, lock_history_versions
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
+from utils.history_delta import describe_delta, diff_documents, plan_version, replay
 
 
 class JobsHistroyDB(BaseWithDBPool):
+    """
+    Versioned history of jobs, stored as keyframes plus deltas like ``ItemHistoryDB``.
+
+    Keyframes hold the full ``job_data``, ``nests`` and ``assemblies``; other versions hold a
+    ``delta`` against ``{"job_data": ..., "nests": ..., "assemblies": ...}`` and leave those
+    columns NULL. ``diff_from``/``diff_to`` are no longer written, they duplicated whole lists.
+    """
+
+    table_name = "jobs_history"
+
     def __init__(self):
         self.db_pool = None
         load_dotenv()
@@ -18,18 +30,7 @@ class JobsHistroyDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "jobs_history")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.info(f"[HistoryDB] Database connection error: {e}")
@@ -46,12 +47,21 @@ class JobsHistroyDB(BaseWithDBPool):
             job_data JSONB,
             nests JSONB,
             assemblies JSONB,
+            delta JSONB,
+            keyframe_version INT,
             diff_from JSONB,
             diff_to JSONB,
             modified_by TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """
+        # Tables created before keyframes: every existing version holds its full data, so each one is a keyframe
+        migrate_query = """
+        ALTER TABLE jobs_history ADD COLUMN delta JSONB;
+        ALTER TABLE jobs_history ADD COLUMN keyframe_version INT;
+        UPDATE jobs_history SET keyframe_version = version;
+        """
+
         index_unique_query = """
         CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_history_version
         ON jobs_history (job_id, version);
@@ -66,105 +76,217 @@ class JobsHistroyDB(BaseWithDBPool):
             async with self.db_pool.acquire() as conn:
                 async with conn.transaction():
                     await conn.execute(table_query)
+                    has_keyframes = await conn.fetchval(
+                        """
+                        SELECT EXISTS (
+                            SELECT 1 FROM information_schema.columns
+                            WHERE table_name = 'jobs_history' AND column_name = 'keyframe_version'
+                        )
+                        """
+                    )
+                    if not has_keyframes:
+                        await conn.execute(migrate_query)
                     await conn.execute(index_unique_query)
                     await conn.execute(index_lookup_query)
 
     @ensure_connection
     async def insert_history_job(self, job_id: int | str, new_data: dict, modified_by: str = "system"):
-        max_retries = 3
-        for attempt in range(1, max_retries + 1):
-            try:
-                async with self.db_pool.acquire() as conn:
-                    async with conn.transaction():
-                        latest = await conn.fetchrow(
-                            """
-                            SELECT job_data, nests, assemblies, version
-                            FROM jobs_history
-                            WHERE job_id = $1
-                            ORDER BY version DESC
-                            LIMIT 1
-                            """,
-                            job_id,
-                        )
+        """Writes a version right away; saves queue theirs on ``history_writer`` instead."""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await lock_history_versions(conn, [history_lock_key(self.table_name, job_id)])
+                await self._insert_version(conn, job_id, new_data, modified_by)
 
-                        version = 1
-                        diff_from = {}
-                        diff_to = {}
-                        if latest:
-                            version = latest["version"] + 1
-                            prev_combined = {
-                                "job_data": msgspec.json.decode(latest["job_data"]),
-                                "nests": msgspec.json.decode(latest["nests"]),
-                                "assemblies": msgspec.json.decode(latest["assemblies"]),
-                            }
-                            new_combined = {
-                                "job_data": new_data.get("job_data"),
-                                "nests": new_data.get("nests"),
-                                "assemblies": new_data.get("assemblies"),
-                            }
-                            diff = self.compute_diff(prev_combined, new_combined)
-
-                            if not diff:  # No difference found
-                                return
-
-                            diff_from = {k: v["from"] for k, v in diff.items()}
-                            diff_to = {k: v["to"] for k, v in diff.items()}
-
-                        job_data = new_data.get("job_data", {})
-                        nests = new_data.get("nests", [])
-                        assemblies = new_data.get("assemblies", [])
-                        name = job_data.get("name")
-
-                        await conn.execute(
-                            """
-                            INSERT INTO jobs_history (
-                                job_id, version, name, job_data, nests, assemblies,
-                                diff_from, diff_to, modified_by, created_at
-                            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, CURRENT_TIMESTAMP)
-                            """,
-                            job_id,
-                            version,
-                            name,
-                            json.dumps(job_data),
-                            json.dumps(nests),
-                            json.dumps(assemblies),
-                            json.dumps(diff_from),
-                            json.dumps(diff_to),
-                            modified_by,
-                        )
+    async def write_history(self, conn: asyncpg.Connection, entries: list[tuple[int | str, dict, str]]):
+        """``HistoryWriter`` entry point: one version per ``(job_id, data, modified_by)``, under locks it already holds."""
+        for job_id, new_data, modified_by in entries:
+            await self._insert_version(conn, job_id, new_data, modified_by)
+
+    async def _insert_version(self, conn: asyncpg.Connection, job_id: int | str, new_data: dict, modified_by: str):
+        latest = await self._get_latest(conn, job_id)
+
+        job_data = new_data.get("job_data", {})
+        nests = new_data.get("nests", [])
+        assemblies = new_data.get("assemblies", [])
+        name = job_data.get("name")
+        new_combined = {"job_data": job_data, "nests": nests, "assemblies": assemblies}
+
+        version = 1
+        previous = None
+        if latest:
+            latest_row, prev_combined = latest
+            if prev_combined == new_combined:  # No difference found
                 return
-            except asyncpg.UniqueViolationError:
-                logging.warning(f"[History Insert] Version conflict at version {version}, retrying...")
-                await asyncio.sleep(attempt)
-            except Exception as e:
-                logging.error(f"[History Insert Error] Attempt {attempt}: {e}")
-                if attempt == max_retries:
-                    logging.error("[History Insert] FAILED after all retries.")
+            version = latest_row["version"] + 1
+            previous = (latest_row["keyframe_version"], prev_combined)
+
+        keyframe_version, delta = plan_version(version, previous, new_combined)
+        is_keyframe = delta is None
+
+        await conn.execute(
+            """
+            INSERT INTO jobs_history (
+                job_id, version, name, job_data, nests, assemblies,
+                delta, keyframe_version, modified_by, created_at
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, CURRENT_TIMESTAMP)
+            """,
+            job_id,
+            version,
+            name,
+            json.dumps(job_data) if is_keyframe else None,
+            json.dumps(nests) if is_keyframe else None,
+            json.dumps(assemblies) if is_keyframe else None,
+            delta,
+            keyframe_version,
+            modified_by,
+        )
+
+    @staticmethod
+    def _read_keyframe(row) -> dict:
+        return {
+            "job_data": msgspec.json.decode(row["job_data"]),
+            "nests": msgspec.json.decode(row["nests"]),
+            "assemblies": msgspec.json.decode(row["assemblies"]),
+        }
+
+    async def _get_latest(self, conn: asyncpg.Connection, job_id: int) -> tuple | None:
+        """``(latest_row, {"job_data", "nests", "assemblies"})``, rebuilt from the latest keyframe."""
+        rows = await conn.fetch(
+            """
+            SELECT version, keyframe_version, job_data, nests, assemblies, delta
+            FROM jobs_history
+            WHERE job_id = $1
+                AND version >= (SELECT keyframe_version FROM jobs_history WHERE job_id = $1 ORDER BY version DESC LIMIT 1)
+            ORDER BY version
+            """,
+            job_id,
+        )
+
+        latest = None
+        for row, combined, _ in replay(rows, self._read_keyframe):
+            latest = (row, combined)
+        return latest
+
+    async def _fetch_page(self, conn: asyncpg.Connection, job_id: int, limit: int | None, before_version: int | None, with_previous: bool):
+        """Same as ``ItemHistoryDB._fetch_page``: the page's rows plus the ones needed to rebuild them, ordered by version."""
+        first_needed = "version < (SELECT MIN(version) FROM page)" if with_previous else "version = (SELECT MIN(version) FROM page)"
+        return await conn.fetch(
+            f"""
+            WITH page AS (
+                SELECT version FROM jobs_history
+                WHERE job_id = $1 AND ($2::int IS NULL OR version < $2)
+                ORDER BY version DESC
+                LIMIT $3
+            ),
+            start AS (
+                SELECT COALESCE(
+                    (SELECT keyframe_version FROM jobs_history
+                     WHERE job_id = $1 AND {first_needed}
+                     ORDER BY version DESC LIMIT 1),
+                    (SELECT MIN(version) FROM page)
+                ) AS version
+            )
+            SELECT version, job_data, nests, assemblies, delta, modified_by, created_at,
+                version >= (SELECT MIN(version) FROM page) AS in_page
+            FROM jobs_history
+            WHERE job_id = $1
+                AND version >= (SELECT version FROM start)
+                AND version <= (SELECT MAX(version) FROM page)
+            ORDER BY version
+            """,
+            job_id,
+            before_version,
+            limit,
+        )
+
+    @ensure_connection
+    async def get_job_history(self, job_id: int, limit: int | None = None, before_version: int | None = None) -> list[dict]:
+        """
+        Full job versions, newest first.
+
+        Returns at most ``limit`` versions older than ``before_version``; pass the last
+        returned ``version`` as ``before_version`` to get the next page.
+        """
+        async with self.db_pool.acquire() as conn:
+            rows = await self._fetch_page(conn, job_id, limit, before_version, with_previous=False)
+
+        history = [
+            {
+                "version": row["version"],
+                **combined,
+                "modified_by": row["modified_by"],
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            }
+            for row, combined, _ in replay(rows, self._read_keyframe)
+            if row["in_page"]
+        ]
+        history.reverse()
+        return history
 
     @ensure_connection
-    async def get_job_history_diff(self, job_id: int):
+    async def get_job_version(self, job_id: int, version: int) -> dict | None:
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(
-                "SELECT version, job_data, nests, assemblies FROM jobs_history WHERE job_id = $1 ORDER BY version",
+                """
+                SELECT version, job_data, nests, assemblies, delta
+                FROM jobs_history
+                WHERE job_id = $1
+                    AND version >= (SELECT keyframe_version FROM jobs_history WHERE job_id = $1 AND version = $2)
+                    AND version <= $2
+                ORDER BY version
+                """,
                 job_id,
+                version,
             )
 
-        versions = [
-            {
-                "job_data": json.loads(row["job_data"]),
-                "nests": json.loads(row["nests"]),
-                "assemblies": json.loads(row["assemblies"]),
-            }
-            for row in rows
-        ]
+        combined = None
+        for _, combined, _ in replay(rows, self._read_keyframe):
+            pass
+        return combined
+
+    @ensure_connection
+    async def get_job_history_diff(self, job_id: int, limit: int | None = None, before_version: int | None = None):
+        """Changes made by each version, newest first, paged like ``get_job_history``."""
+        async with self.db_pool.acquire() as conn:
+            rows = await self._fetch_page(conn, job_id, limit, before_version, with_previous=True)
 
         diffs = []
-        for i in range(1, len(versions)):
-            diff = self.compute_diff(versions[i - 1], versions[i])
-            diffs.append({"from_version": i, "to_version": i + 1, "changes": diff})
+        previous = None
+        for row, combined, ops in replay(rows, self._read_keyframe):
+            if row["in_page"] and previous is not None:
+                changes = describe_delta(previous[1], diff_documents(previous[1], combined) if ops is None else ops)
+                diffs.append({"from_version": previous[0], "to_version": row["version"], "changes": changes})
+            previous = (row["version"], combined)
 
+        diffs.reverse()
         return diffs
 
+    @ensure_connection
+    async def get_storage_stats(self, job_id: int | None = None, limit: int = 50) -> list[dict]:
+        """Versions, keyframes and on-disk (compressed) bytes per job, largest first."""
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT
+                    job_id,
+                    COUNT(*) AS versions,
+                    COUNT(*) FILTER (WHERE delta IS NULL) AS keyframes,
+                    SUM(
+                        COALESCE(pg_column_size(job_data), 0) + COALESCE(pg_column_size(nests), 0)
+                        + COALESCE(pg_column_size(assemblies), 0) + COALESCE(pg_column_size(delta), 0)
+                        + COALESCE(pg_column_size(diff_from), 0) + COALESCE(pg_column_size(diff_to), 0)
+                    ) AS stored_bytes
+                FROM jobs_history
+                WHERE $1::int IS NULL OR job_id = $1
+                GROUP BY job_id
+                ORDER BY stored_bytes DESC
+                LIMIT $2
+                """,
+                job_id,
+                limit,
+            )
+        return [dict(row) for row in rows]
+
     def compute_diff(self, prev, current, path="") -> dict:
         changes = {}
 
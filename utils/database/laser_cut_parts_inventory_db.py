@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 from typing import Literal
@@ -8,8 +7,11 @@ from dotenv import load_dotenv
 
 from config.environments import Environment
 from utils.cache.inventory_cache_manager import InventoryCacheManager
+from utils.database.history_writer import history_lock_key, history_writer, lock_history_versions
 from utils.database.item_history_db import ItemHistoryDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
+from utils.history_delta import KEYFRAME_INTERVAL
 
 
 class LaserCutPartsInventoryDB(BaseWithDBPool):
@@ -18,32 +20,30 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
 
     def __init__(self):
         self.db_pool = None
-        self.cache_manager = InventoryCacheManager(expiry_seconds=1)
+        self.cache_manager = InventoryCacheManager(
+            self.TABLE_NAME,
+            Environment.POSTGRES_DB,
+            loader=self.get_all_laser_cut_parts_no_cache,
+            rows_loader=self.get_laser_cut_parts_by_ids_no_cache,
+        )
         self.laser_cut_parts_history_db = ItemHistoryDB(self.ITEM_NAME)
+        # apply_quantity_deltas matches and upserts by name, which needs the unique part_name index
+        self.part_name_index_ready = False
         load_dotenv()
-        self.cache_manager.schedule_refresh("all_laser_cut_parts", self.get_all_laser_cut_parts_no_cache, 60)
-        self.cache_manager.schedule_refresh("all_categories", self.get_categories_no_cache, 60)
 
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "laser_cut_parts_inventory")
                 await self._create_table_if_not_exists()
                 await self.cache_manager.start()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
                 self.db_pool = None
+            except RuntimeError:
+                # Stay disconnected so every call retries the schema check and fails the same way
+                self.db_pool = None
+                raise
 
     @ensure_connection
     async def _create_table_if_not_exists(self):
@@ -65,23 +65,30 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """
+        # apply_quantity_deltas upserts by name
+        index_query = f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_part_name
+        ON {self.TABLE_NAME} (part_name);
+        """
         if self.db_pool:
             async with self.db_pool.acquire() as conn:
                 await conn.execute(query)
+                try:
+                    await conn.execute(index_query)
+                except asyncpg.UniqueViolationError as e:
+                    duplicates = await conn.fetch(f"SELECT part_name, COUNT(*) AS count FROM {self.TABLE_NAME} GROUP BY part_name HAVING COUNT(*) > 1")
+                    message = f"[LaserCutPartsInventoryDB] Cannot create unique part_name index, merge these duplicates first: {[dict(row) for row in duplicates]}"
+                    logging.critical(message)
+                    # Not a PostgresError, so connect() and ensure_connection re-raise it
+                    raise RuntimeError(message) from e
+                self.part_name_index_ready = True
 
     @ensure_connection
     async def get_categories(self) -> list[str]:
-        key = "all_categories"
-        if cached := self.cache_manager.get(key):
-            return cached
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_categories()
 
-        query = f"SELECT categories FROM {self.TABLE_NAME}"
-        async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
-
-        all_categories = sorted({cat for row in rows if row["categories"] for cat in row["categories"]})
-        self.cache_manager.set(key, all_categories)
-        return all_categories
+        return await self.get_categories_no_cache()
 
     @ensure_connection
     async def get_categories_no_cache(self) -> list[str]:
@@ -101,6 +108,11 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
         if cached := self.cache_manager.get(key):
             return cached
 
+        if self.cache_manager.is_ready:
+            laser_cut_parts = [part for part in self.cache_manager.get_all() if category in (part.get("categories") or [])]
+            self.cache_manager.set(key, laser_cut_parts)
+            return laser_cut_parts
+
         query = f"SELECT data FROM {self.TABLE_NAME} WHERE $1 = ANY(categories)"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query, category)
@@ -111,6 +123,9 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_laser_cut_part(self, laser_cut_part_id: int | str) -> dict | None:
+        if isinstance(laser_cut_part_id, int) and self.cache_manager.is_ready:
+            return self.cache_manager.get_item(laser_cut_part_id)
+
         key = f"laser_cut_part_{laser_cut_part_id}"
         if cached := self.cache_manager.get(key):
             return cached
@@ -146,10 +161,13 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_all_laser_cut_parts(self) -> list[dict]:
-        key = "all_laser_cut_parts"
-        if cached := self.cache_manager.get(key):
-            return cached
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_all()
+
+        return await self.get_all_laser_cut_parts_no_cache()
 
+    @ensure_connection
+    async def get_all_laser_cut_parts_no_cache(self) -> list[dict]:
         query = f"SELECT * FROM {self.TABLE_NAME}"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query)
@@ -160,20 +178,19 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
             json_data = json.loads(row_dict["data"])
             json_data["id"] = row_dict["id"]
             laser_cut_parts.append(json_data)
-        self.cache_manager.set(key, laser_cut_parts)
+
         return laser_cut_parts
 
     @ensure_connection
-    async def get_all_laser_cut_parts_no_cache(self) -> list[dict]:
-        query = f"SELECT * FROM {self.TABLE_NAME}"
+    async def get_laser_cut_parts_by_ids_no_cache(self, laser_cut_part_ids: list[int]) -> list[dict]:
+        query = f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[])"
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
+            rows = await conn.fetch(query, laser_cut_part_ids)
 
         laser_cut_parts = []
         for row in rows:
-            row_dict = dict(row)
-            json_data = json.loads(row_dict["data"])
-            json_data["id"] = row_dict["id"]
+            json_data = json.loads(row["data"])
+            json_data["id"] = row["id"]
             laser_cut_parts.append(json_data)
 
         return laser_cut_parts
@@ -191,7 +208,7 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
         RETURNING id;
         """
         async with self.db_pool.acquire() as conn:
-            return await conn.fetchval(
+            laser_cut_part_id = await conn.fetchval(
                 query,
                 data.get("name"),
                 data.get("categories", []),
@@ -206,6 +223,9 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
                 json.dumps(data),
             )
 
+        self.cache_manager.upsert(laser_cut_part_id, data)
+        return laser_cut_part_id
+
     @ensure_connection
     async def get_laser_cut_part_id(self, laser_cut_part_name: str) -> int:
         query = f"SELECT id FROM {self.TABLE_NAME} WHERE part_name = $1"
@@ -228,10 +248,7 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
                 )
                 current_json = json.loads(current_row["data"])
                 new_json = new_data.copy()
-
-                if current_json != new_json:
-                    task = asyncio.create_task(self.laser_cut_parts_history_db.insert_history_item(laser_cut_part_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
+                changed = current_json != new_json
 
                 # Update the main row
                 await conn.execute(
@@ -265,9 +282,89 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
                     json.dumps(new_data),
                 )
 
-        # Invalidate caches
-        self.cache_manager.invalidate(f"laser_cut_part_{laser_cut_part_id}")
-        self.cache_manager.invalidate("all_laser_cut_parts")
+        # Queued once the update has committed and the connection is back in the pool
+        if changed:
+            await history_writer.enqueue(self.laser_cut_parts_history_db, laser_cut_part_id, new_data, modified_by)
+
+        self.cache_manager.upsert(laser_cut_part_id, new_data)
+
+    @ensure_connection
+    async def update_laser_cut_parts(self, laser_cut_parts: list[dict], modified_by: str = "system") -> list[int]:
+        """
+        Bulk ``update_laser_cut_part``.
+
+        Reads every current row with one ``SELECT ... FOR NO KEY UPDATE``, writes all rows with one
+        ``UPDATE ... FROM unnest(...)`` and all history versions with one INSERT, in a single transaction.
+        """
+        await self.laser_cut_parts_history_db.connect()
+
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                if unresolved := [part["name"] for part in laser_cut_parts if part.get("id", -1) < 0]:
+                    rows = await conn.fetch(f"SELECT id, part_name FROM {self.TABLE_NAME} WHERE part_name = ANY($1::text[])", unresolved)
+                    name_to_id = {}
+                    for row in rows:
+                        name_to_id.setdefault(row["part_name"], row["id"])
+                    for part in laser_cut_parts:
+                        if part.get("id", -1) < 0:
+                            part["id"] = name_to_id.get(part["name"], -1)
+
+                # Last entry wins if the same part is posted twice
+                new_parts = {part["id"]: part for part in laser_cut_parts}
+
+                current_rows = await conn.fetch(
+                    f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[]) FOR NO KEY UPDATE",
+                    list(new_parts),
+                )
+                current = {row["id"]: json.loads(row["data"]) for row in current_rows}
+                if missing := [part.get("name", part_id) for part_id, part in new_parts.items() if part_id not in current]:
+                    raise ValueError(f"Laser cut parts not found: {missing}")
+
+                changed = [(part_id, part) for part_id, part in new_parts.items() if current[part_id] != part]
+                await self.laser_cut_parts_history_db.insert_history_items(conn, changed, modified_by)
+
+                parts = list(new_parts.values())
+                await conn.execute(
+                    f"""
+                    UPDATE {self.TABLE_NAME} AS t SET
+                        part_name = v.part_name,
+                        categories = CASE WHEN v.categories IS NULL THEN NULL ELSE ARRAY(SELECT jsonb_array_elements_text(v.categories::jsonb)) END,
+                        category_quantities = v.category_quantities::jsonb,
+                        inventory_data = v.inventory_data::jsonb,
+                        meta_data = v.meta_data::jsonb,
+                        prices = v.prices::jsonb,
+                        paint_data = v.paint_data::jsonb,
+                        primer_data = v.primer_data::jsonb,
+                        powder_data = v.powder_data::jsonb,
+                        workspace_data = v.workspace_data::jsonb,
+                        data = v.data::jsonb,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM unnest(
+                        $1::int[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[],
+                        $7::text[], $8::text[], $9::text[], $10::text[], $11::text[], $12::text[]
+                    ) AS v(
+                        id, part_name, categories, category_quantities, inventory_data, meta_data,
+                        prices, paint_data, primer_data, powder_data, workspace_data, data
+                    )
+                    WHERE t.id = v.id
+                    """,
+                    list(new_parts),
+                    [part.get("name") for part in parts],
+                    # TEXT[] columns are ragged, so each row's categories travel as a JSON array
+                    [json.dumps(part.get("categories", [])) if part.get("categories", []) is not None else None for part in parts],
+                    [json.dumps(part.get("category_quantities", {})) for part in parts],
+                    [json.dumps(part.get("inventory_data", {})) for part in parts],
+                    [json.dumps(part.get("meta_data", {})) for part in parts],
+                    [json.dumps(part.get("prices", {})) for part in parts],
+                    [json.dumps(part.get("paint_data", {})) for part in parts],
+                    [json.dumps(part.get("primer_data", {})) for part in parts],
+                    [json.dumps(part.get("powder_data", {})) for part in parts],
+                    [json.dumps(part.get("workspace_data", {})) for part in parts],
+                    [json.dumps(part) for part in parts],
+                )
+
+        self.cache_manager.upsert_many(new_parts)
+        return list(new_parts)
 
     @ensure_connection
     async def upsert_quantities(
@@ -276,36 +373,197 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
         operation: Literal["ADD", "SUBTRACT"] = "ADD",
         modified_by: str = "system",
     ):
-        laser_cut_part_id = await self.get_laser_cut_part_id(new_part_data["name"])
+        results = await self.apply_quantity_deltas([new_part_data], operation=operation, modified_by=modified_by)
+        return results[new_part_data["name"]]["id"]
 
-        if laser_cut_part_id != -1:
-            part_data = await self.get_laser_cut_part_no_cache(laser_cut_part_id)
-            current_part_quantity = part_data.get("inventory_data", {}).get("quantity", 0)
-            new_part_quantity = new_part_data.get("inventory_data", {}).get("quantity", 0)
+    @ensure_connection
+    async def apply_quantity_deltas(
+        self,
+        parts: list[dict],
+        operation: Literal["ADD", "SUBTRACT"] = "ADD",
+        modified_by: str = "system",
+    ) -> dict[str, dict]:
+        """
+        Adds or subtracts each part's ``inventory_data.quantity`` from the stored quantity, inserting parts that don't exist yet.
 
-            if operation == "ADD":
-                new_quantity = new_part_quantity + current_part_quantity
-            elif operation == "SUBTRACT":
-                new_quantity = current_part_quantity - new_part_quantity
+        The arithmetic happens in SQL on the locked row, and every name in the batch is first locked with a
+        transaction-scoped advisory lock (in a fixed order, so concurrent batches can't deadlock), so
+        concurrent callers never lose an update. Updates, inserts and their history versions are written
+        by a single statement. Returns ``{name: {"id": ..., "quantity": ...}}``.
+        """
+        if operation not in ("ADD", "SUBTRACT"):
+            raise ValueError(f"Invalid operation: {operation}")
+        if not self.part_name_index_ready:
+            # Without it the upsert has no conflict target and a delta would hit every duplicate row
+            raise RuntimeError("[LaserCutPartsInventoryDB] Unique part_name index is missing, quantities can't be applied by name")
+        sign = 1 if operation == "ADD" else -1
+
+        # Collapse repeated names into one delta. A new part is inserted with its posted quantity
+        # (even for SUBTRACT) and later entries in the batch are applied on top of it.
+        batch: dict[str, dict] = {}
+        for part in parts:
+            quantity = part.get("inventory_data", {}).get("quantity", 0)
+            if entry := batch.get(part["name"]):
+                entry["delta"] += sign * quantity
+                entry["insert_quantity"] += sign * quantity
             else:
-                raise ValueError(f"Invalid operation: {operation}")
+                batch[part["name"]] = {"data": part, "delta": sign * quantity, "insert_quantity": quantity}
 
-            part_data["inventory_data"]["quantity"] = new_quantity
+        names = list(batch)
+        insert_data = [
+            json.dumps({**entry["data"], "inventory_data": {**entry["data"].get("inventory_data", {}), "quantity": entry["insert_quantity"]}})
+            for entry in batch.values()
+        ]
 
-            # The part exists — update it (with history tracking)
-            await self.update_laser_cut_part(
-                laser_cut_part_id,
-                part_data,
-                modified_by=modified_by,
-            )
-            return laser_cut_part_id
-        else:
-            # The part does not exist — insert it
-            part_id = await self.add_laser_cut_part(new_part_data)
+        await self.laser_cut_parts_history_db.connect()
+        history_table = f"{self.laser_cut_parts_history_db.item_name}s_inventory_history"
+        history_id = f"{self.laser_cut_parts_history_db.item_name}_id"
+        events_table = self.laser_cut_parts_history_db.events_table_name
+
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"""
+                    SELECT pg_advisory_xact_lock(lock_key)
+                    FROM (
+                        SELECT DISTINCT hashtext('{self.TABLE_NAME}:' || name) AS lock_key
+                        FROM unnest($1::text[]) AS name
+                        ORDER BY lock_key
+                    ) AS locks
+                    """,
+                    names,
+                )
+                # Existing parts get a history version from the statement below, under the same lock every history writer takes
+                existing = await conn.fetch(f"SELECT id FROM {self.TABLE_NAME} WHERE part_name = ANY($1::text[])", names)
+                # Versions queued by earlier single-part saves go first
+                await history_writer.flush_pending(self.laser_cut_parts_history_db, [row["id"] for row in existing])
+                await lock_history_versions(conn, [history_lock_key(history_table, row["id"]) for row in existing])
+
+                rows = await conn.fetch(
+                    f"""
+                    WITH input AS (
+                        SELECT name, delta, data::jsonb AS data
+                        FROM unnest($1::text[], $2::float8[], $3::text[]) AS i(name, delta, data)
+                    ),
+                    updated AS (
+                        UPDATE {self.TABLE_NAME} AS t SET
+                            inventory_data = COALESCE(t.inventory_data, '{{}}'::jsonb)
+                                || jsonb_build_object('quantity', q.new_quantity),
+                            data = t.data || jsonb_build_object(
+                                'inventory_data',
+                                COALESCE(t.data->'inventory_data', '{{}}'::jsonb) || jsonb_build_object('quantity', q.new_quantity)
+                            ),
+                            updated_at = CURRENT_TIMESTAMP
+                        FROM input i
+                        CROSS JOIN LATERAL (
+                            SELECT COALESCE((t.data->'inventory_data'->>'quantity')::float8, 0) + i.delta AS new_quantity
+                        ) AS q
+                        WHERE t.part_name = i.name
+                        RETURNING t.id, t.part_name, t.data, i.delta, false AS inserted
+                    ),
+                    inserted AS (
+                        INSERT INTO {self.TABLE_NAME} (
+                            part_name, categories, category_quantities, inventory_data, meta_data,
+                            prices, paint_data, primer_data, powder_data, workspace_data, data
+                        )
+                        SELECT
+                            i.name,
+                            ARRAY(SELECT jsonb_array_elements_text(COALESCE(i.data->'categories', '[]'::jsonb))),
+                            COALESCE(i.data->'category_quantities', '{{}}'::jsonb),
+                            COALESCE(i.data->'inventory_data', '{{}}'::jsonb),
+                            COALESCE(i.data->'meta_data', '{{}}'::jsonb),
+                            COALESCE(i.data->'prices', '{{}}'::jsonb),
+                            COALESCE(i.data->'paint_data', '{{}}'::jsonb),
+                            COALESCE(i.data->'primer_data', '{{}}'::jsonb),
+                            COALESCE(i.data->'powder_data', '{{}}'::jsonb),
+                            COALESCE(i.data->'workspace_data', '{{}}'::jsonb),
+                            i.data
+                        FROM input i
+                        WHERE NOT EXISTS (SELECT 1 FROM {self.TABLE_NAME} e WHERE e.part_name = i.name)
+                        ON CONFLICT (part_name) DO NOTHING
+                        RETURNING id, part_name, data, 0::float8 AS delta, true AS inserted
+                    ),
+                    changed AS (
+                        SELECT * FROM updated
+                        UNION ALL
+                        SELECT * FROM inserted
+                    ),
+                    history AS (
+                        INSERT INTO {history_table} (
+                            {history_id}, version, name, modified_by, data, delta, keyframe_version, diff_from, diff_to, created_at
+                        )
+                        SELECT
+                            c.id,
+                            COALESCE(h.version, 0) + 1,
+                            c.part_name,
+                            COALESCE($4::text, 'system'),
+                            CASE WHEN k.is_keyframe THEN c.data END,
+                            CASE WHEN NOT k.is_keyframe
+                                THEN jsonb_build_array(jsonb_build_array('["inventory_data", "quantity"]'::jsonb, c.data->'inventory_data'->'quantity')) END,
+                            CASE WHEN k.is_keyframe THEN COALESCE(h.version, 0) + 1 ELSE h.keyframe_version END,
+                            CASE WHEN h.version IS NULL THEN '{{}}'::jsonb
+                                ELSE jsonb_build_object('inventory_data.quantity', (c.data->'inventory_data'->>'quantity')::float8 - c.delta) END,
+                            CASE WHEN h.version IS NULL THEN c.data
+                                ELSE jsonb_build_object('inventory_data.quantity', c.data->'inventory_data'->'quantity') END,
+                            CURRENT_TIMESTAMP
+                        FROM changed c
+                        LEFT JOIN LATERAL (
+                            SELECT version, keyframe_version FROM {history_table}
+                            WHERE {history_id} = c.id
+                            ORDER BY version DESC
+                            LIMIT 1
+                        ) AS h ON true
+                        -- The only change is the quantity, so the delta is one operation (see utils.history_delta)
+                        CROSS JOIN LATERAL (
+                            SELECT h.version IS NULL OR h.version + 1 - h.keyframe_version >= {KEYFRAME_INTERVAL} AS is_keyframe
+                        ) AS k
+                        -- Same as before: new parts start without history and an unchanged quantity is not a new version
+                        WHERE NOT c.inserted AND c.delta <> 0
+                        RETURNING {history_id} AS id, version, modified_by, diff_from, diff_to, created_at
+                    ),
+                    events AS (
+                        -- What utils.inventory_events derives from these diffs: only the quantity changed
+                        INSERT INTO {events_table} (
+                            {history_id}, version, kind, event_type, modified_by, details, payload, created_at
+                        )
+                        SELECT
+                            h.id,
+                            h.version,
+                            'quantity',
+                            CASE WHEN q.to_quantity > q.from_quantity THEN 'quantity_added' ELSE 'quantity_removed' END,
+                            h.modified_by,
+                            jsonb_build_object('modification_reason', 'Unknown'),
+                            jsonb_build_object('from_quantity', q.from_quantity, 'to_quantity', q.to_quantity),
+                            h.created_at
+                        FROM history h
+                        CROSS JOIN LATERAL (
+                            SELECT
+                                (h.diff_from->>'inventory_data.quantity')::float8 AS from_quantity,
+                                (h.diff_to->>'inventory_data.quantity')::float8 AS to_quantity
+                        ) AS q
+                        WHERE q.from_quantity IS NOT NULL AND q.to_quantity IS NOT NULL AND q.from_quantity <> q.to_quantity
+                    )
+                    SELECT id, part_name, data FROM changed
+                    """,
+                    names,
+                    [entry["delta"] for entry in batch.values()],
+                    insert_data,
+                    modified_by,
+                )
+
+        results = {}
+        changed_parts = {}
+        for row in rows:
+            data = json.loads(row["data"])
+            changed_parts[row["id"]] = data
+            results[row["part_name"]] = {"id": row["id"], "quantity": data.get("inventory_data", {}).get("quantity", 0)}
+
+        if missing := [name for name in names if name not in results]:
+            # Only possible if another writer inserted the name without taking the advisory lock
+            raise RuntimeError(f"Laser cut parts were inserted concurrently, retry: {missing}")
 
-            # Invalidate caches
-            self.cache_manager.invalidate("all_laser_cut_parts")
-            return part_id
+        self.cache_manager.upsert_many(changed_parts)
+        return results
 
     @ensure_connection
     async def delete_laser_cut_part(self, laser_cut_part_id: int | str) -> bool:
@@ -317,8 +575,8 @@ class LaserCutPartsInventoryDB(BaseWithDBPool):
         async with self.db_pool.acquire() as conn:
             deleted_id = await conn.fetchval(query, laser_cut_part_id)
 
-        self.cache_manager.invalidate(f"laser_cut_part_{laser_cut_part_id}")
-        self.cache_manager.invalidate("all_laser_cut_parts")
+        if deleted_id is not None:
+            self.cache_manager.remove(deleted_id)
         return deleted_id is not None
 
     async def close(self):
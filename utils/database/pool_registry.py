@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from config.environments import Environment
+
+
+class SubsystemPool:
+    """
+    A lease on a shared asyncpg pool for one subsystem (JobsDB, WorkspaceDB, ...).
+
+    Exposes the subset of the ``asyncpg.Pool`` API the DB classes rely on
+    (``acquire()``, ``close()``, ``_closed``) while enforcing a per-subsystem
+    concurrency quota and recording acquire/wait statistics.
+    """
+
+    def __init__(self, registry: "type[PoolRegistry]", database: str, subsystem: str, max_concurrency: int):
+        self._registry = registry
+        self.database = database
+        self.subsystem = subsystem
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.acquired = 0
+        self.waiting = 0
+        self.total_acquires = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @property
+    def _closed(self) -> bool:
+        pool = self._registry._pools.get(self.database)
+        return pool is None or pool._closed
+
+    @asynccontextmanager
+    async def acquire(self):
+        pool = await self._registry.get_pool(self.database)
+
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                conn = await pool.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - started
+        self.total_acquires += 1
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+        self.acquired += 1
+        try:
+            yield conn
+        finally:
+            self.acquired -= 1
+            try:
+                await pool.release(conn)
+            finally:
+                self._semaphore.release()
+
+    async def close(self) -> None:
+        # The underlying pool is shared; only PoolRegistry.close_all() closes it.
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "database": self.database,
+            "max_concurrency": self.max_concurrency,
+            "acquired": self.acquired,
+            "waiting": self.waiting,
+            "total_acquires": self.total_acquires,
+            "avg_wait_ms": round(self.total_wait_time / self.total_acquires * 1000, 3) if self.total_acquires else 0.0,
+            "max_wait_ms": round(self.max_wait_time * 1000, 3),
+        }
+
+
+class PoolRegistry:
+    """
+    Process-wide registry of asyncpg pools, one per database.
+
+    Every ``BaseWithDBPool`` subclass borrows a ``SubsystemPool`` lease from here
+    instead of creating its own pool, so the server holds at most
+    ``POSTGRES_MAX_POOL_SIZE`` connections per database.
+    """
+
+    _pools: dict[str, asyncpg.Pool] = {}
+    _locks: dict[str, asyncio.Lock] = {}
+    _leases: dict[str, SubsystemPool] = {}
+
+    def __init__(self):
+        raise RuntimeError("PoolRegistry is a static class and cannot be instantiated.")
+
+    @classmethod
+    def _quota_for(cls, subsystem: str) -> int:
+        return Environment.POSTGRES_SUBSYSTEM_QUOTAS.get(subsystem, Environment.POSTGRES_SUBSYSTEM_MAX_CONCURRENCY)
+
+    @classmethod
+    async def get_pool(cls, database: str) -> asyncpg.Pool:
+        pool = cls._pools.get(database)
+        if pool is not None and not pool._closed:
+            return pool
+
+        lock = cls._locks.setdefault(database, asyncio.Lock())
+        async with lock:
+            pool = cls._pools.get(database)
+            if pool is None or pool._closed:
+                logging.info(f"[PoolRegistry] Creating pool for database '{database}'")
+                pool = await asyncpg.create_pool(
+                    user=Environment.POSTGRES_USER,
+                    password=Environment.POSTGRES_PASSWORD,
+                    database=database,
+                    host=Environment.POSTGRES_HOST,
+                    port=Environment.POSTGRES_PORT,
+                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
+                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
+                    timeout=Environment.POSTGRES_TIMEOUT,
+                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
+                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
+                )
+                cls._pools[database] = pool
+        return pool
+
+    @classmethod
+    async def borrow(cls, database: str, subsystem: str) -> SubsystemPool:
+        await cls.get_pool(database)
+
+        lease = cls._leases.get(subsystem)
+        if lease is None or lease.database != database:
+            lease = SubsystemPool(cls, database, subsystem, cls._quota_for(subsystem))
+            cls._leases[subsystem] = lease
+        return lease
+
+    @classmethod
+    def stats(cls) -> dict:
+        pools = {}
+        for database, pool in cls._pools.items():
+            if pool._closed:
+                pools[database] = {"closed": True}
+                continue
+            pools[database] = {
+                "closed": False,
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size(),
+            }
+
+        return {
+            "pools": pools,
+            "subsystems": {name: lease.stats() for name, lease in cls._leases.items()},
+        }
+
+    @classmethod
+    async def close_all(cls) -> None:
+        for database, pool in list(cls._pools.items()):
+            if not pool._closed:
+                await pool.close()
+            cls._pools.pop(database, None)
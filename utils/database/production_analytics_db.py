@@ -0,0 +1,222 @@
+"""
+Throughput, WIP and time-in-process per flowtag, from the rollups maintained in workspace.sql.
+
+The rollups are kept current by triggers on ``part_status_timeline``; rebuild them from the
+whole history (e.g. after restoring a backup) with:
+    python -m utils.database.production_analytics_db
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import asyncpg
+
+from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry, SubsystemPool
+from utils.decorators.connection import BaseWithDBPool, ensure_connection
+
+# Upper bounds (seconds) of the visit duration histogram; keep in sync with production_duration_bucket() in workspace.sql
+DURATION_BUCKET_BOUNDS = [60, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400, 172800, 345600, 604800, 1209600, 2592000]
+
+INTERVALS = ("hour", "day", "week")
+
+
+def percentile(histogram: dict[int, int], q: float) -> float | None:
+    """Estimates the ``q`` quantile in seconds by interpolating inside the histogram bucket it falls in."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    target = q * total
+    seen = 0
+    for bucket in sorted(histogram):
+        count = histogram[bucket]
+        if seen + count >= target:
+            lower = DURATION_BUCKET_BOUNDS[bucket - 1] if bucket > 0 else 0
+            if bucket >= len(DURATION_BUCKET_BOUNDS):
+                return float(lower)  # Open-ended last bucket
+            upper = DURATION_BUCKET_BOUNDS[bucket]
+            return lower + (upper - lower) * (target - seen) / count
+        seen += count
+    return float(DURATION_BUCKET_BOUNDS[-1])
+
+
+class ProductionAnalyticsDB(BaseWithDBPool):
+    """
+    Read side of the production rollups (``production_flowtag_hourly``, ``..._durations`` and ``..._wip``).
+
+    Queries only touch hourly buckets, so they stay cheap however long the timeline gets; results are
+    also cached for a few seconds since every dashboard polls the same ranges.
+    """
+
+    def __init__(self):
+        self.db_pool: SubsystemPool | None = None
+        self.cache = {}
+        self.cache_expiry = timedelta(seconds=15)
+
+    async def connect(self):
+        if self.db_pool is None or self.db_pool._closed:
+            try:
+                # The tables and triggers are created with the rest of the workspace schema
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "production_analytics")
+            except asyncpg.exceptions.PostgresError as e:
+                logging.error(f"Database connection error: {e}")
+                self.db_pool = None
+
+    def _get_cache(self, key):
+        item = self.cache.get(key)
+        if item:
+            value, timestamp = item
+            if datetime.now() - timestamp < self.cache_expiry:
+                return value
+        return None
+
+    def _set_cache(self, key, value):
+        # Keys include the requested range, so drop expired ones instead of letting them pile up
+        now = datetime.now()
+        self.cache = {k: v for k, v in self.cache.items() if now - v[1] < self.cache_expiry}
+        self.cache[key] = (value, now)
+
+    @ensure_connection
+    async def get_throughput(
+        self,
+        since: datetime,
+        until: datetime,
+        interval: str = "hour",
+        flowtag_name: str | None = None,
+        job_id: int | None = None,
+    ) -> list[dict]:
+        """Units entering and leaving each flowtag per ``interval``, with the average visit of the ones that left."""
+        if interval not in INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+
+        cache_key = ("throughput", since, until, interval, flowtag_name, job_id)
+        if (cached := self._get_cache(cache_key)) is not None:
+            return cached
+
+        query = """
+        SELECT
+            date_trunc($3, bucket) AS bucket,
+            flowtag_name,
+            SUM(units_entered)::bigint AS entered,
+            SUM(units_exited)::bigint AS exited,
+            SUM(visit_seconds) AS visit_seconds
+        FROM production_flowtag_hourly
+        WHERE bucket >= $1
+          AND bucket < $2
+          AND ($4::text IS NULL OR flowtag_name = $4)
+          AND ($5::bigint IS NULL OR job_id = $5)
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        """
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(query, since, until, interval, flowtag_name, job_id)
+
+        series = [
+            {
+                "bucket": row["bucket"].isoformat(),
+                "flowtag": row["flowtag_name"],
+                "entered": row["entered"],
+                "exited": row["exited"],
+                "average_visit_seconds": row["visit_seconds"] / row["exited"] if row["exited"] else None,
+            }
+            for row in rows
+        ]
+        self._set_cache(cache_key, series)
+        return series
+
+    @ensure_connection
+    async def get_bottlenecks(self, since: datetime, until: datetime, job_id: int | None = None) -> list[dict]:
+        """
+        Per flowtag over the range: flow in and out, time-in-process percentiles and current WIP,
+        ordered by the estimated wait for the current WIP to clear (WIP / throughput).
+        """
+        cache_key = ("bottlenecks", since, until, job_id)
+        if (cached := self._get_cache(cache_key)) is not None:
+            return cached
+
+        flow_query = """
+        WITH flow AS (
+            SELECT flowtag_name, SUM(units_entered)::bigint AS entered, SUM(units_exited)::bigint AS exited, SUM(visit_seconds) AS visit_seconds
+            FROM production_flowtag_hourly
+            WHERE bucket >= $1
+              AND bucket < $2
+              AND ($3::bigint IS NULL OR job_id = $3)
+            GROUP BY flowtag_name
+        ),
+        wip AS (
+            SELECT flowtag_name, SUM(wip)::bigint AS wip
+            FROM production_flowtag_wip
+            WHERE ($3::bigint IS NULL OR job_id = $3)
+            GROUP BY flowtag_name
+        )
+        SELECT
+            flowtag_name,
+            COALESCE(flow.entered, 0) AS entered,
+            COALESCE(flow.exited, 0) AS exited,
+            COALESCE(flow.visit_seconds, 0) AS visit_seconds,
+            GREATEST(COALESCE(wip.wip, 0), 0) AS wip
+        FROM flow
+        FULL JOIN wip USING (flowtag_name)
+        """
+        histogram_query = """
+        SELECT flowtag_name, duration_bucket, SUM(units)::bigint AS units
+        FROM production_flowtag_hourly_durations
+        WHERE bucket >= $1
+          AND bucket < $2
+          AND ($3::bigint IS NULL OR job_id = $3)
+        GROUP BY flowtag_name, duration_bucket
+        """
+        async with self.db_pool.acquire() as conn:
+            flow_rows = await conn.fetch(flow_query, since, until, job_id)
+            histogram_rows = await conn.fetch(histogram_query, since, until, job_id)
+
+        histograms: dict[str, dict[int, int]] = {}
+        for row in histogram_rows:
+            histograms.setdefault(row["flowtag_name"], {})[row["duration_bucket"]] = row["units"]
+
+        hours = max((until - since).total_seconds() / 3600, 1 / 60)
+        bottlenecks = []
+        for row in flow_rows:
+            histogram = histograms.get(row["flowtag_name"], {})
+            throughput = row["exited"] / hours
+            bottlenecks.append(
+                {
+                    "flowtag": row["flowtag_name"],
+                    "wip": row["wip"],
+                    "entered": row["entered"],
+                    "exited": row["exited"],
+                    "throughput_per_hour": throughput,
+                    "average_visit_seconds": row["visit_seconds"] / row["exited"] if row["exited"] else None,
+                    "p50_visit_seconds": percentile(histogram, 0.5),
+                    "p90_visit_seconds": percentile(histogram, 0.9),
+                    # Little's law; WIP that nothing is leaving has no finite wait
+                    "estimated_wait_hours": row["wip"] / throughput if throughput else None,
+                }
+            )
+
+        bottlenecks.sort(key=lambda b: (b["estimated_wait_hours"] is None and b["wip"] > 0, b["estimated_wait_hours"] or 0, b["wip"]), reverse=True)
+        self._set_cache(cache_key, bottlenecks)
+        return bottlenecks
+
+    @ensure_connection
+    async def rebuild(self):
+        """Recomputes every rollup from ``part_status_timeline``."""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                # Scans the whole timeline, so it gets longer than the usual command timeout
+                await conn.execute("SELECT production_rollup_rebuild()", timeout=3600)
+        self.cache.clear()
+
+
+async def main():
+    analytics_db = ProductionAnalyticsDB()
+    await analytics_db.rebuild()
+    print("Rebuilt production rollups")
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
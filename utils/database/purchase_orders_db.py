@@ -7,7 +7,9 @@ import asyncpg
 import msgspec
 
 from config.environments import Environment
+from utils.database.history_writer import history_writer
 from utils.database.purchase_orders_history_db import PurchaseOrdersHistoryDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
@@ -17,6 +19,7 @@ class PurchaseOrdersDB(BaseWithDBPool):
     def __init__(self):
         self.db_pool = None
         self.cache = {}
+        self.generation = 0  # source of the cache entries' generations, see cache_generation
         self.purchase_orders_history_db = PurchaseOrdersHistoryDB()
         self.cache_expiry = timedelta(seconds=60)
         self._stop_background = False
@@ -26,18 +29,7 @@ class PurchaseOrdersDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "purchase_orders")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
@@ -63,17 +55,31 @@ class PurchaseOrdersDB(BaseWithDBPool):
     def _get_cache(self, key):
         item = self.cache.get(key)
         if item:
-            value, timestamp = item
+            value, timestamp, _ = item
             if datetime.now() - timestamp < self.cache_expiry:
                 return value
         return None
 
     def _set_cache(self, key, value):
-        self.cache[key] = (value, datetime.now())
+        previous = self.cache.get(key)
+        if previous and previous[0] == value:
+            # Refreshed after expiring but unchanged, so ETags handed out for it stay valid
+            generation = previous[2]
+        else:
+            self.generation += 1
+            generation = self.generation
+        self.cache[key] = (value, datetime.now(), generation)
 
     def _invalidate_cache(self, key_startswith):
         self.cache = {k: v for k, v in self.cache.items() if not k.startswith(key_startswith)}
 
+    def cache_generation(self, key) -> int | None:
+        """Generation of a fresh cache entry (changes whenever its value does); ``None`` if it isn't cached."""
+        item = self.cache.get(key)
+        if item and datetime.now() - item[1] < self.cache_expiry:
+            return item[2]
+        return None
+
     def start_background_cache_worker(self):
         async def background_purchase_order():
             while not self._stop_background:
@@ -166,6 +172,11 @@ class PurchaseOrdersDB(BaseWithDBPool):
         self._set_cache(cache_key, po_dict)
         return po_dict
 
+    @ensure_connection
+    async def get_updated_at(self, entry_id: int) -> datetime | None:
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchval(f"SELECT updated_at FROM {self.TABLE_NAME} WHERE id = $1", entry_id)
+
     @ensure_connection
     async def save_purchase_order(self, purchase_order_id: int | str, new_data: dict, modified_by: str = "system"):
         if isinstance(purchase_order_id, str):
@@ -180,10 +191,6 @@ class PurchaseOrdersDB(BaseWithDBPool):
                 if current_row is None:
                     purchase_order_does_not_exist = True
                 else:
-                    # Insert history in background
-                    task = asyncio.create_task(self.purchase_orders_history_db.insert_history_purchase_order(purchase_order_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
-
                     meta_data = new_data.get("meta_data", {})
                     vendor = meta_data.get("vendor", {})
                     vendor_name = vendor.get("name", "")
@@ -211,9 +218,12 @@ class PurchaseOrdersDB(BaseWithDBPool):
             logging.info(f"[SavePurchaseOrder] ID {purchase_order_id} not found. Creating new.")
             new_id = await self.add_purchase_order(new_data)
             # Optional: add immediate history record after add
-            await self.purchase_orders_history_db.insert_history_purchase_order(new_id, new_data, modified_by)
+            await history_writer.enqueue(self.purchase_orders_history_db, new_id, new_data, modified_by)
             return new_id
 
+        # Queued once the update has committed and the connection is back in the pool
+        await history_writer.enqueue(self.purchase_orders_history_db, purchase_order_id, new_data, modified_by)
+
         self._invalidate_cache(f"purchase_order_{purchase_order_id}")
         self._invalidate_cache("all_purchase_orders")
         return purchase_order_id
@@ -271,9 +281,6 @@ class PurchaseOrdersDB(BaseWithDBPool):
                 meta = po_data.setdefault("meta_data", {})
                 meta["email_sent_at"] = datetime.utcnow().isoformat()
 
-                # history
-                asyncio.create_task(self.purchase_orders_history_db.insert_history_purchase_order(purchase_order_id, po_data, modified_by))
-
                 await conn.execute(
                     f"""
                     UPDATE {self.TABLE_NAME}
@@ -286,6 +293,9 @@ class PurchaseOrdersDB(BaseWithDBPool):
                     json.dumps(po_data),
                 )
 
+        # Queued once the update has committed and the connection is back in the pool
+        await history_writer.enqueue(self.purchase_orders_history_db, purchase_order_id, po_data, modified_by)
+
         self._invalidate_cache(f"purchase_order_{purchase_order_id}")
         self._invalidate_cache("all_purchase_orders")
         return True
@@ -5,10 +5,14 @@ import asyncpg
 from dotenv import load_dotenv
 
 from config.environments import Environment
+from utils.database.history_writer import history_lock_key, lock_history_versions
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
 class PurchaseOrdersHistoryDB(BaseWithDBPool):
+    table_name = "purchase_orders_history"
+
     def __init__(self):
         self.db_pool = None
         load_dotenv()
@@ -16,18 +20,7 @@ class PurchaseOrdersHistoryDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "purchase_orders_history")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.info(f"[PurchaseOrdersHistoryDB] Database connection error: {e}")
@@ -59,46 +52,56 @@ class PurchaseOrdersHistoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def insert_history_purchase_order(self, purchase_order_id: int, new_data: dict, modified_by: str = "system"):
+        """Writes a version right away; saves queue theirs on ``history_writer`` instead."""
         async with self.db_pool.acquire() as conn:
             async with conn.transaction():
-                latest = await conn.fetchrow(
-                    """
-                    SELECT purchase_order_data, version
-                    FROM purchase_orders_history
-                    WHERE purchase_order_id = $1
-                    ORDER BY version DESC
-                    LIMIT 1
-                    """,
-                    purchase_order_id,
-                )
-
-                version = 1
-                diff_from = {}
-                diff_to = {}
-                if latest:
-                    version = latest["version"] + 1
-                    prev_data = json.loads(latest["purchase_order_data"])
-                    diff = self.compute_diff(prev_data, new_data)
-
-                    if not diff:  # No change, skip
-                        return
-
-                    diff_from = {k: v["from"] for k, v in diff.items()}
-                    diff_to = {k: v["to"] for k, v in diff.items()}
-
-                await conn.execute(
-                    """
-                    INSERT INTO purchase_orders_history (
-                        purchase_order_id, version, purchase_order_data, diff_from, diff_to, modified_by, created_at
-                    ) VALUES ($1, $2, $3, $4, $5, $6, CURRENT_TIMESTAMP)
-                    """,
-                    purchase_order_id,
-                    version,
-                    json.dumps(new_data),
-                    json.dumps(diff_from),
-                    json.dumps(diff_to),
-                    modified_by,
-                )
+                await lock_history_versions(conn, [history_lock_key(self.table_name, purchase_order_id)])
+                await self._insert_version(conn, purchase_order_id, new_data, modified_by)
+
+    async def write_history(self, conn: asyncpg.Connection, entries: list[tuple[int, dict, str]]):
+        """``HistoryWriter`` entry point: one version per ``(purchase_order_id, data, modified_by)``, under locks it already holds."""
+        for purchase_order_id, new_data, modified_by in entries:
+            await self._insert_version(conn, purchase_order_id, new_data, modified_by)
+
+    async def _insert_version(self, conn: asyncpg.Connection, purchase_order_id: int, new_data: dict, modified_by: str):
+        latest = await conn.fetchrow(
+            """
+            SELECT purchase_order_data, version
+            FROM purchase_orders_history
+            WHERE purchase_order_id = $1
+            ORDER BY version DESC
+            LIMIT 1
+            """,
+            purchase_order_id,
+        )
+
+        version = 1
+        diff_from = {}
+        diff_to = {}
+        if latest:
+            version = latest["version"] + 1
+            prev_data = json.loads(latest["purchase_order_data"])
+            diff = self.compute_diff(prev_data, new_data)
+
+            if not diff:  # No change, skip
+                return
+
+            diff_from = {k: v["from"] for k, v in diff.items()}
+            diff_to = {k: v["to"] for k, v in diff.items()}
+
+        await conn.execute(
+            """
+            INSERT INTO purchase_orders_history (
+                purchase_order_id, version, purchase_order_data, diff_from, diff_to, modified_by, created_at
+            ) VALUES ($1, $2, $3, $4, $5, $6, CURRENT_TIMESTAMP)
+            """,
+            purchase_order_id,
+            version,
+            json.dumps(new_data),
+            json.dumps(diff_from),
+            json.dumps(diff_to),
+            modified_by,
+        )
 
     def compute_diff(self, prev, current, path="") -> dict:
         changes = {}
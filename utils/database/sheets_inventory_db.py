@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 
@@ -7,7 +6,9 @@ from dotenv import load_dotenv
 
 from config.environments import Environment
 from utils.cache.inventory_cache_manager import InventoryCacheManager
+from utils.database.history_writer import history_writer
 from utils.database.item_history_db import ItemHistoryDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
@@ -16,27 +17,19 @@ class SheetsInventoryDB(BaseWithDBPool):
 
     def __init__(self):
         self.db_pool = None
-        self.cache_manager = InventoryCacheManager(expiry_seconds=1)
+        self.cache_manager = InventoryCacheManager(
+            self.TABLE_NAME,
+            Environment.POSTGRES_DB,
+            loader=self.get_all_sheets_no_cache,
+            rows_loader=self.get_sheets_by_ids_no_cache,
+        )
         self.sheets_history_db = ItemHistoryDB("sheet")
         load_dotenv()
-        self.cache_manager.schedule_refresh("all_sheets", self.get_all_sheets_no_cache, 60)
-        self.cache_manager.schedule_refresh("all_categories", self.get_categories_no_cache, 60)
 
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "sheets_inventory")
                 await self._create_table_if_not_exists()
                 await self.cache_manager.start()
             except asyncpg.exceptions.PostgresError as e:
@@ -65,17 +58,10 @@ class SheetsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_categories(self) -> list[str]:
-        key = "all_categories"
-        if cached := self.cache_manager.get(key):
-            return cached
-
-        query = f"SELECT categories FROM {self.TABLE_NAME}"
-        async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_categories()
 
-        all_categories = sorted({cat for row in rows if row["categories"] for cat in row["categories"]})
-        self.cache_manager.set(key, all_categories)
-        return all_categories
+        return await self.get_categories_no_cache()
 
     @ensure_connection
     async def get_categories_no_cache(self) -> list[str]:
@@ -96,6 +82,11 @@ class SheetsInventoryDB(BaseWithDBPool):
         if cached := self.cache_manager.get(key):
             return cached
 
+        if self.cache_manager.is_ready:
+            sheets = [sheet for sheet in self.cache_manager.get_all() if category in (sheet.get("categories") or [])]
+            self.cache_manager.set(key, sheets)
+            return sheets
+
         query = f"SELECT data FROM {self.TABLE_NAME} WHERE $1 = ANY(categories)"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query, category)
@@ -106,6 +97,9 @@ class SheetsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_sheet(self, sheet_id: int | str) -> dict | None:
+        if isinstance(sheet_id, int) and self.cache_manager.is_ready:
+            return self.cache_manager.get_item(sheet_id)
+
         key = f"sheet_{sheet_id}"
         if cached := self.cache_manager.get(key):
             return cached
@@ -129,10 +123,13 @@ class SheetsInventoryDB(BaseWithDBPool):
 
     @ensure_connection
     async def get_all_sheets(self) -> list[dict]:
-        key = "all_sheets"
-        if cached := self.cache_manager.get(key):
-            return cached
+        if self.cache_manager.is_ready:
+            return self.cache_manager.get_all()
 
+        return await self.get_all_sheets_no_cache()
+
+    @ensure_connection
+    async def get_all_sheets_no_cache(self) -> list[dict]:
         query = f"SELECT * FROM {self.TABLE_NAME}"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(query)
@@ -143,20 +140,19 @@ class SheetsInventoryDB(BaseWithDBPool):
             json_data = json.loads(row_dict["data"])
             json_data["id"] = row_dict["id"]
             sheets.append(json_data)
-        self.cache_manager.set(key, sheets)
+
         return sheets
 
     @ensure_connection
-    async def get_all_sheets_no_cache(self) -> list[dict]:
-        query = f"SELECT * FROM {self.TABLE_NAME}"
+    async def get_sheets_by_ids_no_cache(self, sheet_ids: list[int]) -> list[dict]:
+        query = f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[])"
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query)
+            rows = await conn.fetch(query, sheet_ids)
 
         sheets = []
         for row in rows:
-            row_dict = dict(row)
-            json_data = json.loads(row_dict["data"])
-            json_data["id"] = row_dict["id"]
+            json_data = json.loads(row["data"])
+            json_data["id"] = row["id"]
             sheets.append(json_data)
 
         return sheets
@@ -182,6 +178,8 @@ class SheetsInventoryDB(BaseWithDBPool):
                 data.get("quantity", 0),
                 json.dumps(data),
             )
+
+        self.cache_manager.upsert(row, data)
         return row
 
     @ensure_connection
@@ -203,10 +201,7 @@ class SheetsInventoryDB(BaseWithDBPool):
                 current_row = await conn.fetchrow(f"SELECT * FROM {self.TABLE_NAME} WHERE id = $1", sheet_id)
                 current_json = json.loads(current_row["data"])
                 new_json = new_data.copy()
-
-                if current_json != new_json:
-                    task = asyncio.create_task(self.sheets_history_db.insert_history_item(sheet_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
+                changed = current_json != new_json
             # Update the main row
             await conn.fetchval(
                 f"""
@@ -226,9 +221,78 @@ class SheetsInventoryDB(BaseWithDBPool):
                 new_data.get("quantity", 0),
                 json.dumps(new_data),
             )
-        # Invalidate caches
-        self.cache_manager.invalidate(f"sheet_{sheet_id}")
-        self.cache_manager.invalidate("all_sheets")
+        # Queued once the update has committed and the connection is back in the pool
+        if changed:
+            await history_writer.enqueue(self.sheets_history_db, sheet_id, new_data, modified_by)
+
+        self.cache_manager.upsert(sheet_id, new_data)
+
+    @ensure_connection
+    async def update_sheets(self, sheets: list[dict], modified_by: str = "system") -> list[int]:
+        """
+        Bulk ``update_sheet``.
+
+        Reads every current row with one ``SELECT ... FOR NO KEY UPDATE``, writes all rows with one
+        ``UPDATE ... FROM unnest(...)`` and all history versions with one INSERT, in a single transaction.
+        """
+        await self.sheets_history_db.connect()
+
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                if unresolved := [sheet["name"] for sheet in sheets if sheet.get("id", -1) < 0]:
+                    rows = await conn.fetch(f"SELECT id, name FROM {self.TABLE_NAME} WHERE name = ANY($1::text[])", unresolved)
+                    name_to_id = {}
+                    for row in rows:
+                        name_to_id.setdefault(row["name"], row["id"])
+                    for sheet in sheets:
+                        if sheet.get("id", -1) < 0:
+                            sheet["id"] = name_to_id.get(sheet["name"], -1)
+
+                # Last entry wins if the same sheet is posted twice
+                new_sheets = {sheet["id"]: sheet for sheet in sheets}
+
+                current_rows = await conn.fetch(
+                    f"SELECT id, data FROM {self.TABLE_NAME} WHERE id = ANY($1::int[]) FOR NO KEY UPDATE",
+                    list(new_sheets),
+                )
+                current = {row["id"]: json.loads(row["data"]) for row in current_rows}
+                if missing := [sheet.get("name", sheet_id) for sheet_id, sheet in new_sheets.items() if sheet_id not in current]:
+                    raise ValueError(f"Sheets not found: {missing}")
+
+                changed = [(sheet_id, sheet) for sheet_id, sheet in new_sheets.items() if current[sheet_id] != sheet]
+                await self.sheets_history_db.insert_history_items(conn, changed, modified_by)
+
+                values = list(new_sheets.values())
+                await conn.execute(
+                    f"""
+                    UPDATE {self.TABLE_NAME} AS t SET
+                        name = v.name,
+                        thickness = v.thickness,
+                        material = v.material,
+                        width = v.width,
+                        length = v.length,
+                        categories = CASE WHEN v.categories IS NULL THEN NULL ELSE ARRAY(SELECT jsonb_array_elements_text(v.categories::jsonb)) END,
+                        quantity = v.quantity,
+                        data = v.data::jsonb,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM unnest($1::int[], $2::text[], $3::text[], $4::text[], $5::float8[], $6::float8[], $7::text[], $8::float8[], $9::text[])
+                        AS v(id, name, thickness, material, width, length, categories, quantity, data)
+                    WHERE t.id = v.id
+                    """,
+                    list(new_sheets),
+                    [sheet.get("name") for sheet in values],
+                    [sheet.get("thickness") for sheet in values],
+                    [sheet.get("material") for sheet in values],
+                    [sheet.get("width") for sheet in values],
+                    [sheet.get("length") for sheet in values],
+                    # TEXT[] columns are ragged, so each row's categories travel as a JSON array
+                    [json.dumps(sheet.get("categories", [])) if sheet.get("categories", []) is not None else None for sheet in values],
+                    [sheet.get("quantity", 0) for sheet in values],
+                    [json.dumps(sheet) for sheet in values],
+                )
+
+        self.cache_manager.upsert_many(new_sheets)
+        return list(new_sheets)
 
     @ensure_connection
     async def delete_sheet(self, sheet_id: int | str) -> bool:
@@ -236,8 +300,8 @@ class SheetsInventoryDB(BaseWithDBPool):
         async with self.db_pool.acquire() as conn:
             deleted_id = await conn.fetchval(query, sheet_id)
 
-        self.cache_manager.invalidate(f"sheet_{sheet_id}")
-        self.cache_manager.invalidate("all_sheets")
+        if deleted_id is not None:
+            self.cache_manager.remove(deleted_id)
         return deleted_id is not None
 
     async def close(self):
@@ -2,31 +2,20 @@ import logging
 
 import asyncpg
 import bcrypt
-from asyncpg import Pool
 
 from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry, SubsystemPool
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
 class UsersDB(BaseWithDBPool):
     def __init__(self):
-        self.db_pool: Pool | None = None
+        self.db_pool: SubsystemPool | None = None
 
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_WORKSPACE_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "users")
                 await self._create_table_if_not_exists()
                 await self.ensure_default_admin()
             except asyncpg.exceptions.PostgresError as e:
@@ -1,11 +1,12 @@
-import asyncio
 import logging
 from typing import Optional
 
 import asyncpg
 
 from config.environments import Environment
+from utils.database.history_writer import history_writer
 from utils.database.vendors_history_db import VendorsHistoryDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
@@ -19,18 +20,7 @@ class VendorsDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "vendors")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
@@ -90,10 +80,6 @@ class VendorsDB(BaseWithDBPool):
                 if current_row is None:
                     vendor_does_not_exist = True
                 else:
-                    # Insert history in background
-                    task = asyncio.create_task(self.vendors_history_db.insert_history_vendor(vendor_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
-
                     await conn.execute(
                         f"""
                         UPDATE {self.TABLE_NAME} SET
@@ -118,9 +104,12 @@ class VendorsDB(BaseWithDBPool):
         if vendor_does_not_exist:
             logging.info(f"[SaveVendor] Vendor ID {vendor_id} not found. Creating new vendor.")
             new_id = await self.add_vendor(new_data)
-            await self.vendors_history_db.insert_history_vendor(new_id, new_data, modified_by)
+            await history_writer.enqueue(self.vendors_history_db, new_id, new_data, modified_by)
             return new_id
 
+        # Queued once the update has committed and the connection is back in the pool
+        await history_writer.enqueue(self.vendors_history_db, vendor_id, new_data, modified_by)
+
         # Optionally invalidate vendor cache here if you have one
         # self._invalidate_cache(f"vendor_{vendor_id}")
         # self._invalidate_cache("all_vendors")
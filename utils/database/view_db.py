@@ -7,15 +7,15 @@ from typing import Any, Dict, List, Optional
 
 import asyncpg
 import msgspec
-from asyncpg import Pool
 
 from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry, SubsystemPool
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
 class ViewDB(BaseWithDBPool):
     def __init__(self):
-        self.db_pool: Pool | None = None
+        self.db_pool: SubsystemPool | None = None
         self.cache = {}
         self.cache_expiry = timedelta(seconds=60)
         self._stop_background = False
@@ -26,18 +26,7 @@ class ViewDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_WORKSPACE_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "view")
                 # await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
@@ -52,6 +41,7 @@ class ViewDB(BaseWithDBPool):
         flowtag_index: Optional[int] = None,
         flowtag_status_index: Optional[int] = None,
         data_type: Optional[str] = None,
+        include_archived: bool = False,
     ) -> List[Dict[str, Any]]:
         conditions = []
         params = []
@@ -87,9 +77,10 @@ class ViewDB(BaseWithDBPool):
 
         # If specific data type is requested, select only that column
         columns = data_type if data_type else "*"
+        table = "assembly_laser_cut_parts_with_archive" if include_archived else "assembly_laser_cut_parts"
         query = f"""
             SELECT {columns}
-            FROM assembly_laser_cut_parts
+            FROM {table}
             {where_clause}
             ORDER BY created_at DESC
             LIMIT 1
@@ -431,7 +422,14 @@ class ViewDB(BaseWithDBPool):
         return result
 
     @ensure_connection
-    async def get_parts_view(self, show_completed: int, viewable_tags: list[str], start_date: str | None, end_date: str | None) -> list[dict]:
+    async def get_parts_view(
+        self,
+        show_completed: int,
+        viewable_tags: list[str],
+        start_date: str | None,
+        end_date: str | None,
+        include_archived: bool = False,
+    ) -> list[dict]:
         def parse_iso_date(date_str: str) -> datetime:
             return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
 
@@ -463,7 +461,9 @@ class ViewDB(BaseWithDBPool):
                     params.extend([end_dt, start_dt])
 
                 where_sql = " AND ".join(where_clauses) if where_clauses else ""
-                query = f"SELECT * FROM view_grouped_laser_cut_parts_by_job"
+                # Archived jobs are all complete, so they only matter when completed parts are shown
+                view = "view_grouped_laser_cut_parts_by_job_with_archive" if include_archived and show_completed else "view_grouped_laser_cut_parts_by_job"
+                query = f"SELECT * FROM {view}"
                 if where_sql:
                     query += f" WHERE {where_sql}"
 
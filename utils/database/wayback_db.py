@@ -0,0 +1,123 @@
+import logging
+from datetime import date
+
+import asyncpg
+
+from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry
+from utils.decorators.connection import BaseWithDBPool, ensure_connection
+
+
+class WaybackDB(BaseWithDBPool):
+    """
+    Per-item quantity/price time series extracted from the daily backup zips.
+
+    ``wayback_item_history`` is keyed by (inventory_type, item_name, snapshot_date) so
+    a history chart is one primary key range scan. ``wayback_ingested_backups`` records
+    which zip (and which version of it, by mtime) has already been ingested; daily backups
+    are named by day-of-year and get overwritten a year later.
+    """
+
+    TABLE_NAME = "wayback_item_history"
+    INGESTED_TABLE_NAME = "wayback_ingested_backups"
+
+    def __init__(self):
+        self.db_pool = None
+
+    async def connect(self):
+        if self.db_pool is None or self.db_pool._closed:
+            try:
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "wayback")
+                await self._create_table_if_not_exists()
+            except asyncpg.exceptions.PostgresError as e:
+                logging.error(f"Database connection error: {e}")
+                self.db_pool = None
+
+    @ensure_connection
+    async def _create_table_if_not_exists(self):
+        query = f"""
+        CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+            inventory_type TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            snapshot_date DATE NOT NULL,
+            quantity DOUBLE PRECISION,
+            price DOUBLE PRECISION,
+            PRIMARY KEY (inventory_type, item_name, snapshot_date)
+        );
+
+        CREATE TABLE IF NOT EXISTS {self.INGESTED_TABLE_NAME} (
+            file_name TEXT PRIMARY KEY,
+            file_mtime DOUBLE PRECISION NOT NULL,
+            snapshot_date DATE NOT NULL,
+            item_count INTEGER NOT NULL,
+            ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        async with self.db_pool.acquire() as conn:
+            await conn.execute(query)
+
+    @ensure_connection
+    async def get_item_history(self, inventory_type: str, item_name: str) -> list[dict]:
+        query = f"""
+        SELECT snapshot_date, quantity, price
+        FROM {self.TABLE_NAME}
+        WHERE inventory_type = $1 AND item_name = $2
+        ORDER BY snapshot_date DESC
+        """
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(query, inventory_type, item_name)
+        return [dict(row) for row in rows]
+
+    @ensure_connection
+    async def get_ingested_backups(self) -> dict[str, float]:
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(f"SELECT file_name, file_mtime FROM {self.INGESTED_TABLE_NAME}")
+        return {row["file_name"]: row["file_mtime"] for row in rows}
+
+    @ensure_connection
+    async def ingest_snapshot(
+        self,
+        file_name: str,
+        file_mtime: float,
+        snapshot_date: date,
+        items: list[tuple[str, str, float | None, float | None]],
+    ):
+        """Stores one backup's (inventory_type, item_name, quantity, price) rows; re-ingesting a date replaces it."""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE wayback_staging (
+                        inventory_type TEXT,
+                        item_name TEXT,
+                        quantity DOUBLE PRECISION,
+                        price DOUBLE PRECISION
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table("wayback_staging", records=items)
+                await conn.execute(
+                    f"""
+                    INSERT INTO {self.TABLE_NAME} (inventory_type, item_name, snapshot_date, quantity, price)
+                    SELECT DISTINCT ON (inventory_type, item_name) inventory_type, item_name, $1, quantity, price
+                    FROM wayback_staging
+                    ON CONFLICT (inventory_type, item_name, snapshot_date)
+                    DO UPDATE SET quantity = EXCLUDED.quantity, price = EXCLUDED.price
+                    """,
+                    snapshot_date,
+                )
+                await conn.execute(
+                    f"""
+                    INSERT INTO {self.INGESTED_TABLE_NAME} (file_name, file_mtime, snapshot_date, item_count)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (file_name) DO UPDATE SET
+                        file_mtime = EXCLUDED.file_mtime,
+                        snapshot_date = EXCLUDED.snapshot_date,
+                        item_count = EXCLUDED.item_count,
+                        ingested_at = CURRENT_TIMESTAMP
+                    """,
+                    file_name,
+                    file_mtime,
+                    snapshot_date,
+                    len(items),
+                )
@@ -7,7 +7,9 @@ import asyncpg
 import msgspec
 
 from config.environments import Environment
+from utils.database.history_writer import history_writer
 from utils.database.workorders_history_db import WorkordersHistroyDB
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
@@ -17,6 +19,7 @@ class WorkordersDB(BaseWithDBPool):
     def __init__(self):
         self.db_pool = None
         self.cache = {}
+        self.generation = 0  # source of the cache entries' generations, see cache_generation
         self.workorders_history_db = WorkordersHistroyDB()
         self.cache_expiry = timedelta(seconds=60)
         self._stop_background = False
@@ -26,18 +29,7 @@ class WorkordersDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "workorders")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
@@ -59,17 +51,31 @@ class WorkordersDB(BaseWithDBPool):
     def _get_cache(self, key):
         item = self.cache.get(key)
         if item:
-            value, timestamp = item
+            value, timestamp, _ = item
             if datetime.now() - timestamp < self.cache_expiry:
                 return value
         return None
 
     def _set_cache(self, key, value):
-        self.cache[key] = (value, datetime.now())
+        previous = self.cache.get(key)
+        if previous and previous[0] == value:
+            # Refreshed after expiring but unchanged, so ETags handed out for it stay valid
+            generation = previous[2]
+        else:
+            self.generation += 1
+            generation = self.generation
+        self.cache[key] = (value, datetime.now(), generation)
 
     def _invalidate_cache(self, key_startswith):
         self.cache = {k: v for k, v in self.cache.items() if not k.startswith(key_startswith)}
 
+    def cache_generation(self, key) -> int | None:
+        """Generation of a fresh cache entry (changes whenever its value does); ``None`` if it isn't cached."""
+        item = self.cache.get(key)
+        if item and datetime.now() - item[1] < self.cache_expiry:
+            return item[2]
+        return None
+
     def start_background_cache_worker(self):
         async def background_workorder():
             while not self._stop_background:
@@ -154,6 +160,11 @@ class WorkordersDB(BaseWithDBPool):
         self._set_cache(cache_key, workorder)
         return workorder
 
+    @ensure_connection
+    async def get_updated_at(self, entry_id: int) -> datetime | None:
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchval(f"SELECT updated_at FROM {self.TABLE_NAME} WHERE id = $1", entry_id)
+
     @ensure_connection
     async def save_workorder(self, workorder_id: int | str, new_data: dict, modified_by: str = "system") -> int:
         if isinstance(workorder_id, str):
@@ -168,10 +179,6 @@ class WorkordersDB(BaseWithDBPool):
                 if current_row is None:
                     workorder_does_not_exist = True
                 else:
-                    # Record history in background
-                    task = asyncio.create_task(self.workorders_history_db.insert_history_workorder(workorder_id, new_data, modified_by))
-                    task.add_done_callback(lambda t: logging.error("Unhandled task error", exc_info=t.exception()) if t.exception() else None)
-
                     # Proceed with update
                     await conn.execute(
                         f"""
@@ -190,6 +197,9 @@ class WorkordersDB(BaseWithDBPool):
             # await self.workorders_history_db.insert_history_workorder(new_id, new_data, modified_by)
             return new_id
 
+        # Queued once the update has committed and the connection is back in the pool
+        await history_writer.enqueue(self.workorders_history_db, workorder_id, new_data, modified_by)
+
         self._invalidate_cache(f"workorder_{workorder_id}")
         self._invalidate_cache("all_workorders")
         return workorder_id
@@ -224,19 +234,29 @@ class WorkordersDB(BaseWithDBPool):
         self._invalidate_cache(f"workorder_{workorder_id}_")
 
     def _extract_parts_with_quantity(self, workorder: dict) -> list[dict]:
-        result = []
+        """One ``{"name", "qty"}`` per part name across every nest, in order of first appearance."""
+        quantities: dict[str, int] = {}
 
         for nest in workorder.get("nests", []):
             for part in nest.get("laser_cut_parts", []):
                 qty = part.get("inventory_data", {}).get("quantity", 1)
-                result.append(
-                    {
-                        "name": part["name"],
-                        "qty": int(qty),
-                    }
-                )
-
-        return result
+                quantities[part["name"]] = quantities.get(part["name"], 0) + int(qty)
+
+        return [{"name": name, "qty": qty} for name, qty in quantities.items()]
+
+    def _extract_job_ids(self, workorder: dict) -> list[int] | None:
+        """The jobs the workorder's parts came from, or ``None`` (any job) unless every part records its job."""
+        if workorder.get("job_ids"):
+            return sorted(int(job_id) for job_id in workorder["job_ids"])
+
+        job_ids = set()
+        for nest in workorder.get("nests", []):
+            for part in nest.get("laser_cut_parts", []):
+                job_id = part.get("job_id", nest.get("job_id"))
+                if job_id is None:
+                    return None
+                job_ids.add(int(job_id))
+        return sorted(job_ids) or None
 
     async def close(self):
         if self.db_pool:
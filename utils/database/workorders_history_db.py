@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 
@@ -7,10 +6,14 @@ import msgspec
 from dotenv import load_dotenv
 
 from config.environments import Environment
+from utils.database.history_writer import history_lock_key, lock_history_versions
+from utils.database.pool_registry import PoolRegistry
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
 class WorkordersHistroyDB(BaseWithDBPool):
+    table_name = "workorders_history"
+
     def __init__(self):
         self.db_pool = None
         load_dotenv()
@@ -18,18 +21,7 @@ class WorkordersHistroyDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_DB, "workorders_history")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.info(f"[HistoryDB] Database connection error: {e}")
@@ -70,71 +62,70 @@ class WorkordersHistroyDB(BaseWithDBPool):
 
     @ensure_connection
     async def insert_history_workorder(self, workorder_id: int | str, new_data: dict, modified_by: str = "system"):
-        max_retries = 3
-        for attempt in range(1, max_retries + 1):
-            try:
-                async with self.db_pool.acquire() as conn:
-                    async with conn.transaction():
-                        latest = await conn.fetchrow(
-                            """
-                            SELECT workorder_data, nests, version
-                            FROM workorders_history
-                            WHERE workorder_id = $1
-                            ORDER BY version DESC
-                            LIMIT 1
-                            """,
-                            workorder_id,
-                        )
-
-                        version = 1
-                        diff_from = {}
-                        diff_to = {}
-                        if latest:
-                            version = latest["version"] + 1
-                            prev_combined = {
-                                "workorder_data": msgspec.json.decode(latest["workorder_data"]),
-                                "nests": msgspec.json.decode(latest["nests"]),
-                            }
-                            new_combined = {
-                                "workorder_data": new_data.get("workorder_data"),
-                                "nests": new_data.get("nests"),
-                            }
-                            diff = self.compute_diff(prev_combined, new_combined)
-
-                            if not diff:  # No difference found
-                                return
-
-                            diff_from = {k: v["from"] for k, v in diff.items()}
-                            diff_to = {k: v["to"] for k, v in diff.items()}
-
-                        workorder_data = new_data.get("workorder_data", {})
-                        nests = new_data.get("nests", [])
-                        name = workorder_data.get("name")
-
-                        await conn.execute(
-                            """
-                            INSERT INTO workorders_history (
-                                workorder_id, version, name, workorder_data, nests,
-                                diff_from, diff_to, modified_by, created_at
-                            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, CURRENT_TIMESTAMP)
-                            """,
-                            workorder_id,
-                            version,
-                            name,
-                            json.dumps(workorder_data),
-                            json.dumps(nests),
-                            json.dumps(diff_from),
-                            json.dumps(diff_to),
-                            modified_by,
-                        )
+        """Writes a version right away; saves queue theirs on ``history_writer`` instead."""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                await lock_history_versions(conn, [history_lock_key(self.table_name, workorder_id)])
+                await self._insert_version(conn, workorder_id, new_data, modified_by)
+
+    async def write_history(self, conn: asyncpg.Connection, entries: list[tuple[int | str, dict, str]]):
+        """``HistoryWriter`` entry point: one version per ``(workorder_id, data, modified_by)``, under locks it already holds."""
+        for workorder_id, new_data, modified_by in entries:
+            await self._insert_version(conn, workorder_id, new_data, modified_by)
+
+    async def _insert_version(self, conn: asyncpg.Connection, workorder_id: int | str, new_data: dict, modified_by: str):
+        latest = await conn.fetchrow(
+            """
+            SELECT workorder_data, nests, version
+            FROM workorders_history
+            WHERE workorder_id = $1
+            ORDER BY version DESC
+            LIMIT 1
+            """,
+            workorder_id,
+        )
+
+        version = 1
+        diff_from = {}
+        diff_to = {}
+        if latest:
+            version = latest["version"] + 1
+            prev_combined = {
+                "workorder_data": msgspec.json.decode(latest["workorder_data"]),
+                "nests": msgspec.json.decode(latest["nests"]),
+            }
+            new_combined = {
+                "workorder_data": new_data.get("workorder_data"),
+                "nests": new_data.get("nests"),
+            }
+            diff = self.compute_diff(prev_combined, new_combined)
+
+            if not diff:  # No difference found
                 return
-            except asyncpg.UniqueViolationError:
-                logging.warning(f"[History Insert] Version conflict at version {version}, retrying...")
-                await asyncio.sleep(attempt)
-            except Exception as e:
-                logging.error(f"[History Insert Error] Attempt {attempt}: {e}")
-                if attempt == max_retries:
-                    logging.error("[History Insert] FAILED after all retries.")
+
+            diff_from = {k: v["from"] for k, v in diff.items()}
+            diff_to = {k: v["to"] for k, v in diff.items()}
+
+        workorder_data = new_data.get("workorder_data", {})
+        nests = new_data.get("nests", [])
+        name = workorder_data.get("name")
+
+        await conn.execute(
+            """
+            INSERT INTO workorders_history (
+                workorder_id, version, name, workorder_data, nests,
+                diff_from, diff_to, modified_by, created_at
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, CURRENT_TIMESTAMP)
+            """,
+            workorder_id,
+            version,
+            name,
+            json.dumps(workorder_data),
+            json.dumps(nests),
+            json.dumps(diff_from),
+            json.dumps(diff_to),
+            modified_by,
+        )
 
     @ensure_connection
     async def get_workorder_history_diff(self, workorder_id: int):
@@ -112,6 +112,11 @@ CREATE INDEX IF NOT EXISTS idx_parts_overdue_incomplete ON assembly_laser_cut_pa
 
 CREATE INDEX IF NOT EXISTS idx_assembly_parts_end_time ON assembly_laser_cut_parts (end_time) WHERE end_time IS NOT NULL;
 
+-- Per-job lookups (timeline propagation, deletes cascading from jobs)
+CREATE INDEX IF NOT EXISTS idx_assembly_laser_cut_parts_job_id ON assembly_laser_cut_parts (job_id);
+
+CREATE INDEX IF NOT EXISTS idx_assemblies_job_id ON assemblies (job_id);
+
 CREATE TABLE IF NOT EXISTS part_status_timeline (
     id BIGSERIAL PRIMARY KEY,
     name TEXT NOT NULL,
@@ -168,129 +173,976 @@ UPDATE
     OR DELETE ON jobs FOR EACH ROW EXECUTE FUNCTION notify_job_change();
 
 -- Notification Trigger for laser cut parts
--- Auto-updated grouping view per job
+-- Trigger-maintained grouping of laser cut parts per job.
+-- One row per distinct (job, name, flowtag, index, status, flags, start/end) with a quantity counter,
+-- so the parts view is an indexed scan instead of a GROUP BY over every part.
+CREATE TABLE IF NOT EXISTS grouped_laser_cut_parts (
+    id BIGSERIAL PRIMARY KEY,
+    group_id BIGINT NOT NULL,
+    job_id BIGINT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    flowtag TEXT [] NOT NULL,
+    flowtag_index INTEGER NOT NULL,
+    flowtag_status_index INTEGER NOT NULL,
+    recut BOOLEAN NOT NULL,
+    recoat BOOLEAN NOT NULL,
+    is_timing BOOLEAN NOT NULL,
+    start_time TIMESTAMPTZ,
+    end_time TIMESTAMPTZ,
+    current_flowtag TEXT GENERATED ALWAYS AS (flowtag[flowtag_index + 1]) STORED,
+    is_completed BOOLEAN GENERATED ALWAYS AS (flowtag_index = cardinality(flowtag)) STORED,
+    quantity BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ,
+    modified_at TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_grouped_laser_cut_parts_key ON grouped_laser_cut_parts (job_id, name, flowtag, flowtag_index, flowtag_status_index, recut, recoat, is_timing, start_time, end_time) NULLS NOT DISTINCT;
+
+CREATE INDEX IF NOT EXISTS idx_grouped_laser_cut_parts_open ON grouped_laser_cut_parts (current_flowtag, end_time, start_time) WHERE NOT is_completed;
+
+CREATE INDEX IF NOT EXISTS idx_grouped_laser_cut_parts_flowtag ON grouped_laser_cut_parts (current_flowtag, end_time, start_time);
+
+-- Latest meta/workspace data per part name (previously two correlated subqueries per group)
+CREATE TABLE IF NOT EXISTS laser_cut_part_latest_data (
+    name TEXT PRIMARY KEY,
+    meta_data JSONB,
+    workspace_data JSONB,
+    modified_at TIMESTAMPTZ
+);
+
+-- The grouping is maintained one statement at a time: changed parts are counted per group key, so moving K units
+-- costs one upsert per group they join and one update per group they leave, and a group whose lowest part
+-- (its group_id) left looks up the next lowest once. Transition tables need one trigger per event.
+CREATE OR REPLACE FUNCTION settle_grouped_laser_cut_parts(emptied_ids BIGINT[], regroup_ids BIGINT[])
+RETURNS void AS $$
+    DELETE FROM grouped_laser_cut_parts WHERE id = ANY(emptied_ids);
+
+    UPDATE grouped_laser_cut_parts g
+    SET group_id = (
+        SELECT MIN(w.id)
+        FROM assembly_laser_cut_parts w
+        WHERE w.job_id = g.job_id
+          AND w.name = g.name
+          AND w.flowtag = g.flowtag
+          AND w.flowtag_index = g.flowtag_index
+          AND w.flowtag_status_index = g.flowtag_status_index
+          AND w.recut = g.recut
+          AND w.recoat = g.recoat
+          AND w.is_timing = g.is_timing
+          AND w.start_time IS NOT DISTINCT FROM g.start_time
+          AND w.end_time IS NOT DISTINCT FROM g.end_time
+    )
+    WHERE g.id = ANY(regroup_ids);
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION maintain_grouped_laser_cut_parts_inserted()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO grouped_laser_cut_parts (
+        group_id, job_id, name, flowtag, flowtag_index, flowtag_status_index,
+        recut, recoat, is_timing, start_time, end_time, quantity, created_at, modified_at
+    )
+    SELECT
+        MIN(n.id), n.job_id, n.name, n.flowtag, n.flowtag_index, n.flowtag_status_index,
+        n.recut, n.recoat, n.is_timing, n.start_time, n.end_time, COUNT(*), MIN(n.created_at), MAX(n.modified_at)
+    FROM new_rows n
+    GROUP BY n.job_id, n.name, n.flowtag, n.flowtag_index,
+             n.flowtag_status_index, n.recut, n.recoat,
+             n.is_timing, n.start_time, n.end_time
+    ON CONFLICT (job_id, name, flowtag, flowtag_index, flowtag_status_index, recut, recoat, is_timing, start_time, end_time)
+    DO UPDATE SET
+        quantity = grouped_laser_cut_parts.quantity + EXCLUDED.quantity,
+        group_id = LEAST(grouped_laser_cut_parts.group_id, EXCLUDED.group_id),
+        created_at = LEAST(grouped_laser_cut_parts.created_at, EXCLUDED.created_at),
+        modified_at = GREATEST(grouped_laser_cut_parts.modified_at, EXCLUDED.modified_at);
+
+    INSERT INTO laser_cut_part_latest_data (name, meta_data, workspace_data, modified_at)
+    SELECT DISTINCT ON (n.name) n.name, n.meta_data, n.workspace_data, n.modified_at
+    FROM new_rows n
+    ORDER BY n.name, n.modified_at DESC NULLS LAST, n.id DESC
+    ON CONFLICT (name) DO UPDATE SET
+        meta_data = EXCLUDED.meta_data,
+        workspace_data = EXCLUDED.workspace_data,
+        modified_at = EXCLUDED.modified_at
+    WHERE laser_cut_part_latest_data.modified_at IS NULL
+       OR EXCLUDED.modified_at >= laser_cut_part_latest_data.modified_at;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_grouped_laser_cut_parts_updated()
+RETURNS trigger AS $$
+DECLARE
+    emptied_ids BIGINT[];
+    regroup_ids BIGINT[];
+BEGIN
+    -- Count the parts that moved into each group; parts that stayed only bump modified_at.
+    -- Joining before leaving keeps a group that both gains and loses parts from being dropped in between.
+    INSERT INTO grouped_laser_cut_parts (
+        group_id, job_id, name, flowtag, flowtag_index, flowtag_status_index,
+        recut, recoat, is_timing, start_time, end_time, quantity, created_at, modified_at
+    )
+    SELECT
+        MIN(n.id), n.job_id, n.name, n.flowtag, n.flowtag_index, n.flowtag_status_index,
+        n.recut, n.recoat, n.is_timing, n.start_time, n.end_time,
+        COUNT(*) FILTER (WHERE n.moved), MIN(n.created_at), MAX(n.modified_at)
+    FROM (
+        SELECT
+            n.id, n.job_id, n.name, n.flowtag, n.flowtag_index, n.flowtag_status_index,
+            n.recut, n.recoat, n.is_timing, n.start_time, n.end_time, n.created_at, n.modified_at,
+            (o.job_id, o.name, o.flowtag, o.flowtag_index, o.flowtag_status_index, o.recut, o.recoat, o.is_timing, o.start_time, o.end_time)
+                IS DISTINCT FROM
+            (n.job_id, n.name, n.flowtag, n.flowtag_index, n.flowtag_status_index, n.recut, n.recoat, n.is_timing, n.start_time, n.end_time)
+                AS moved
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+    ) n
+    GROUP BY n.job_id, n.name, n.flowtag, n.flowtag_index,
+             n.flowtag_status_index, n.recut, n.recoat,
+             n.is_timing, n.start_time, n.end_time
+    ON CONFLICT (job_id, name, flowtag, flowtag_index, flowtag_status_index, recut, recoat, is_timing, start_time, end_time)
+    DO UPDATE SET
+        quantity = grouped_laser_cut_parts.quantity + EXCLUDED.quantity,
+        group_id = LEAST(grouped_laser_cut_parts.group_id, EXCLUDED.group_id),
+        created_at = LEAST(grouped_laser_cut_parts.created_at, EXCLUDED.created_at),
+        modified_at = GREATEST(grouped_laser_cut_parts.modified_at, EXCLUDED.modified_at);
+
+    WITH removed AS (
+        SELECT
+            o.job_id, o.name, o.flowtag, o.flowtag_index, o.flowtag_status_index,
+            o.recut, o.recoat, o.is_timing, o.start_time, o.end_time, COUNT(*) AS count, array_agg(o.id) AS ids
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        WHERE (o.job_id, o.name, o.flowtag, o.flowtag_index, o.flowtag_status_index, o.recut, o.recoat, o.is_timing, o.start_time, o.end_time)
+            IS DISTINCT FROM
+            (n.job_id, n.name, n.flowtag, n.flowtag_index, n.flowtag_status_index, n.recut, n.recoat, n.is_timing, n.start_time, n.end_time)
+        GROUP BY o.job_id, o.name, o.flowtag, o.flowtag_index,
+                 o.flowtag_status_index, o.recut, o.recoat,
+                 o.is_timing, o.start_time, o.end_time
+    ),
+    decremented AS (
+        UPDATE grouped_laser_cut_parts g
+        SET quantity = g.quantity - r.count
+        FROM removed r
+        WHERE g.job_id = r.job_id
+          AND g.name = r.name
+          AND g.flowtag = r.flowtag
+          AND g.flowtag_index = r.flowtag_index
+          AND g.flowtag_status_index = r.flowtag_status_index
+          AND g.recut = r.recut
+          AND g.recoat = r.recoat
+          AND g.is_timing = r.is_timing
+          AND g.start_time IS NOT DISTINCT FROM r.start_time
+          AND g.end_time IS NOT DISTINCT FROM r.end_time
+        RETURNING g.id, g.quantity, g.group_id = ANY(r.ids) AS lost_group_id
+    )
+    SELECT
+        array_agg(id) FILTER (WHERE quantity <= 0),
+        array_agg(id) FILTER (WHERE quantity > 0 AND lost_group_id)
+    INTO emptied_ids, regroup_ids
+    FROM decremented;
+
+    PERFORM settle_grouped_laser_cut_parts(emptied_ids, regroup_ids);
+
+    INSERT INTO laser_cut_part_latest_data (name, meta_data, workspace_data, modified_at)
+    SELECT DISTINCT ON (n.name) n.name, n.meta_data, n.workspace_data, n.modified_at
+    FROM old_rows o
+    JOIN new_rows n ON n.id = o.id
+    WHERE o.meta_data IS DISTINCT FROM n.meta_data
+       OR o.workspace_data IS DISTINCT FROM n.workspace_data
+    ORDER BY n.name, n.modified_at DESC NULLS LAST, n.id DESC
+    ON CONFLICT (name) DO UPDATE SET
+        meta_data = EXCLUDED.meta_data,
+        workspace_data = EXCLUDED.workspace_data,
+        modified_at = EXCLUDED.modified_at
+    WHERE laser_cut_part_latest_data.modified_at IS NULL
+       OR EXCLUDED.modified_at >= laser_cut_part_latest_data.modified_at;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_grouped_laser_cut_parts_deleted()
+RETURNS trigger AS $$
+DECLARE
+    emptied_ids BIGINT[];
+    regroup_ids BIGINT[];
+BEGIN
+    WITH removed AS (
+        SELECT
+            o.job_id, o.name, o.flowtag, o.flowtag_index, o.flowtag_status_index,
+            o.recut, o.recoat, o.is_timing, o.start_time, o.end_time, COUNT(*) AS count, array_agg(o.id) AS ids
+        FROM old_rows o
+        GROUP BY o.job_id, o.name, o.flowtag, o.flowtag_index,
+                 o.flowtag_status_index, o.recut, o.recoat,
+                 o.is_timing, o.start_time, o.end_time
+    ),
+    decremented AS (
+        UPDATE grouped_laser_cut_parts g
+        SET quantity = g.quantity - r.count
+        FROM removed r
+        WHERE g.job_id = r.job_id
+          AND g.name = r.name
+          AND g.flowtag = r.flowtag
+          AND g.flowtag_index = r.flowtag_index
+          AND g.flowtag_status_index = r.flowtag_status_index
+          AND g.recut = r.recut
+          AND g.recoat = r.recoat
+          AND g.is_timing = r.is_timing
+          AND g.start_time IS NOT DISTINCT FROM r.start_time
+          AND g.end_time IS NOT DISTINCT FROM r.end_time
+        RETURNING g.id, g.quantity, g.group_id = ANY(r.ids) AS lost_group_id
+    )
+    SELECT
+        array_agg(id) FILTER (WHERE quantity <= 0),
+        array_agg(id) FILTER (WHERE quantity > 0 AND lost_group_id)
+    INTO emptied_ids, regroup_ids
+    FROM decremented;
+
+    PERFORM settle_grouped_laser_cut_parts(emptied_ids, regroup_ids);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Replaces the row-level trigger
+DROP TRIGGER IF EXISTS trg_maintain_grouped_laser_cut_parts ON assembly_laser_cut_parts;
+DROP FUNCTION IF EXISTS maintain_grouped_laser_cut_parts();
+
+CREATE OR REPLACE TRIGGER trg_maintain_grouped_laser_cut_parts_inserted
+    AFTER INSERT
+    ON assembly_laser_cut_parts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_grouped_laser_cut_parts_inserted();
+
+CREATE OR REPLACE TRIGGER trg_maintain_grouped_laser_cut_parts_updated
+    AFTER UPDATE
+    ON assembly_laser_cut_parts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_grouped_laser_cut_parts_updated();
+
+CREATE OR REPLACE TRIGGER trg_maintain_grouped_laser_cut_parts_deleted
+    AFTER DELETE
+    ON assembly_laser_cut_parts
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION maintain_grouped_laser_cut_parts_deleted();
+
+-- One-off backfill when the grouped tables are introduced on an existing database
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM grouped_laser_cut_parts)
+       AND EXISTS (SELECT 1 FROM assembly_laser_cut_parts)
+    THEN
+        INSERT INTO grouped_laser_cut_parts (
+            group_id, job_id, name, flowtag, flowtag_index, flowtag_status_index,
+            recut, recoat, is_timing, start_time, end_time, quantity, created_at, modified_at
+        )
+        SELECT
+            MIN(w.id), w.job_id, w.name, w.flowtag, w.flowtag_index, w.flowtag_status_index,
+            w.recut, w.recoat, w.is_timing, w.start_time, w.end_time, COUNT(*), MIN(w.created_at), MAX(w.modified_at)
+        FROM assembly_laser_cut_parts w
+        GROUP BY w.job_id, w.name, w.flowtag, w.flowtag_index,
+                 w.flowtag_status_index, w.recut, w.recoat,
+                 w.is_timing, w.start_time, w.end_time;
+
+        INSERT INTO laser_cut_part_latest_data (name, meta_data, workspace_data, modified_at)
+        SELECT DISTINCT ON (name) name, meta_data, workspace_data, modified_at
+        FROM assembly_laser_cut_parts
+        ORDER BY name, modified_at DESC
+        ON CONFLICT (name) DO NOTHING;
+    END IF;
+END
+$$;
+
+-- Grouping view per job, served from the trigger-maintained tables
 CREATE OR REPLACE VIEW view_grouped_laser_cut_parts_by_job AS
     SELECT
-    MIN(w.id) AS group_id,
-    w.job_id,
-    w.name,
-    w.flowtag,
-    w.flowtag_index,
-    w.flowtag_status_index,
-    w.recut,
-    w.recoat,
-    w.is_timing,
-    w.flowtag[w.flowtag_index + 1] AS current_flowtag,
-    (w.flowtag_index = cardinality(w.flowtag)) AS is_completed,
-    COUNT(*) AS quantity,
-    MIN(w.start_time) AS start_time,
-    MAX(w.end_time) AS end_time,
-    (MAX(w.end_time) < NOW()) AS is_overdue,
-    (SELECT meta_data::jsonb FROM assembly_laser_cut_parts WHERE name = w.name ORDER BY modified_at DESC LIMIT 1) AS meta_data,
-    (SELECT workspace_data::jsonb FROM assembly_laser_cut_parts WHERE name = w.name ORDER BY modified_at DESC LIMIT 1) AS workspace_data,
-    MIN(w.created_at) AS created_at,
-    MAX(w.modified_at) AS modified_at
-    FROM assembly_laser_cut_parts w
-    GROUP BY w.job_id, w.name, w.flowtag, w.flowtag_index,
-            w.flowtag_status_index, w.recut, w.recoat,
-            w.is_timing, w.start_time, w.end_time;
-
--- Notification function for laser cut parts view changes
+    g.group_id,
+    g.job_id,
+    g.name,
+    g.flowtag,
+    g.flowtag_index,
+    g.flowtag_status_index,
+    g.recut,
+    g.recoat,
+    g.is_timing,
+    g.current_flowtag,
+    g.is_completed,
+    g.quantity,
+    g.start_time,
+    g.end_time,
+    (g.end_time < NOW()) AS is_overdue,
+    l.meta_data,
+    l.workspace_data,
+    g.created_at,
+    g.modified_at
+    FROM grouped_laser_cut_parts g
+    LEFT JOIN laser_cut_part_latest_data l ON l.name = g.name;
+
+-- Notifications for laser cut parts view changes, one per statement.
+-- Changed rows are collapsed per (job, part name, flowtag) with a count and the flowtag indexes
+-- they are at, and sent in as few NOTIFYs as fit under the 8000 byte payload limit.
+CREATE OR REPLACE FUNCTION notify_laser_cut_parts_view_batch(operation TEXT, table_name TEXT, changes JSONB)
+RETURNS void AS $$
+DECLARE
+    change JSONB;
+    batch JSONB := '[]'::jsonb;
+    batch_bytes INTEGER := 0;
+BEGIN
+    FOR change IN SELECT value FROM jsonb_array_elements(COALESCE(changes, '[]'::jsonb))
+    LOOP
+        IF batch_bytes > 0 AND batch_bytes + octet_length(change::text) > 7000 THEN
+            PERFORM pg_notify(
+                'view_grouped_laser_cut_parts_by_job',
+                jsonb_build_object('type', operation, 'table', table_name, 'changes', batch)::text
+            );
+            batch := '[]'::jsonb;
+            batch_bytes := 0;
+        END IF;
+        batch := batch || jsonb_build_array(change);
+        batch_bytes := batch_bytes + octet_length(change::text) + 2;
+    END LOOP;
+
+    IF batch_bytes > 0 THEN
+        PERFORM pg_notify(
+            'view_grouped_laser_cut_parts_by_job',
+            jsonb_build_object('type', operation, 'table', table_name, 'changes', batch)::text
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
 CREATE OR REPLACE FUNCTION notify_laser_cut_parts_view_change()
 RETURNS trigger AS $$
 BEGIN
-    -- Notify for the job-specific view
-    PERFORM pg_notify(
-        'view_grouped_laser_cut_parts_by_job',
-        json_build_object(
-            'type', TG_OP,
-            'table', TG_TABLE_NAME,
-            'job_id', COALESCE(NEW.job_id, OLD.job_id),
-            'part_name', COALESCE(NEW.name, OLD.name),
-            'flowtag', COALESCE(NEW.flowtag, OLD.flowtag),
-            'flowtag_index', COALESCE(NEW.flowtag_index, OLD.flowtag_index),
-            'flowtag_status_index', COALESCE(NEW.flowtag_status_index, OLD.flowtag_status_index),
-            'recut', COALESCE(NEW.recut, OLD.recut),
-            'recoat', COALESCE(NEW.recoat, OLD.recoat),
-            'start_time', COALESCE(NEW.start_time, OLD.start_time),
-            'end_time', COALESCE(NEW.end_time, OLD.end_time),
-            'is_timing', COALESCE(NEW.is_timing, OLD.is_timing)
-        )::text
-    );
-
-    RETURN COALESCE(NEW, OLD);
+    -- Each branch only runs on the trigger whose transition table it reads
+    IF TG_OP = 'DELETE' THEN
+        PERFORM notify_laser_cut_parts_view_batch(TG_OP, TG_TABLE_NAME, (
+            SELECT jsonb_agg(jsonb_build_object(
+                'job_id', job_id,
+                'part_name', name,
+                'flowtag', flowtag,
+                'flowtag_indexes', flowtag_indexes,
+                'count', count
+            ))
+            FROM (
+                SELECT job_id, name, flowtag, jsonb_agg(DISTINCT flowtag_index) AS flowtag_indexes, COUNT(*) AS count
+                FROM old_rows
+                GROUP BY job_id, name, flowtag
+            ) grouped
+        ));
+    ELSE
+        PERFORM notify_laser_cut_parts_view_batch(TG_OP, TG_TABLE_NAME, (
+            SELECT jsonb_agg(jsonb_build_object(
+                'job_id', job_id,
+                'part_name', name,
+                'flowtag', flowtag,
+                'flowtag_indexes', flowtag_indexes,
+                'count', count
+            ))
+            FROM (
+                SELECT job_id, name, flowtag, jsonb_agg(DISTINCT flowtag_index) AS flowtag_indexes, COUNT(*) AS count
+                FROM new_rows
+                GROUP BY job_id, name, flowtag
+            ) grouped
+        ));
+    END IF;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create trigger on the underlying table
-CREATE OR REPLACE TRIGGER laser_cut_parts_view_event_trigger
-    AFTER INSERT OR UPDATE OR DELETE
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS laser_cut_parts_view_event_trigger ON assembly_laser_cut_parts;
+
+CREATE OR REPLACE TRIGGER laser_cut_parts_view_insert_trigger
+    AFTER INSERT
+    ON assembly_laser_cut_parts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_laser_cut_parts_view_change();
+
+CREATE OR REPLACE TRIGGER laser_cut_parts_view_update_trigger
+    AFTER UPDATE
+    ON assembly_laser_cut_parts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_laser_cut_parts_view_change();
+
+CREATE OR REPLACE TRIGGER laser_cut_parts_view_delete_trigger
+    AFTER DELETE
     ON assembly_laser_cut_parts
-    FOR EACH ROW
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
     EXECUTE FUNCTION notify_laser_cut_parts_view_change();
 
+-- Closing a part's open state looks it up by part_id
+CREATE INDEX IF NOT EXISTS idx_part_status_timeline_open ON part_status_timeline (part_id) WHERE ended_at IS NULL;
+
 CREATE OR REPLACE FUNCTION log_part_status_timeline()
 RETURNS TRIGGER AS $$
 BEGIN
-    -- If part is complete, close any open timeline and exit
-    IF NEW.flowtag_index = cardinality(NEW.flowtag) THEN
-        UPDATE part_status_timeline
-        SET ended_at = now()
-        WHERE part_id = OLD.id
-          AND ended_at IS NULL;
-        RETURN NEW;
+    -- Close the open state of every part that completed or changed state
+    UPDATE part_status_timeline t
+    SET ended_at = now()
+    FROM old_rows o
+    JOIN new_rows n ON n.id = o.id
+    WHERE t.part_id = o.id
+      AND t.ended_at IS NULL
+      AND (
+          n.flowtag_index = cardinality(n.flowtag)
+          OR o.flowtag_index IS DISTINCT FROM n.flowtag_index
+          OR o.flowtag_status_index IS DISTINCT FROM n.flowtag_status_index
+          OR o.recut IS DISTINCT FROM n.recut
+          OR o.recoat IS DISTINCT FROM n.recoat
+          OR o.is_timing IS DISTINCT FROM n.is_timing
+      );
+
+    -- Open the new state of the ones that aren't complete
+    INSERT INTO part_status_timeline (
+        part_id,
+        name,
+        flowtag,
+        flowtag_index,
+        flowtag_name,
+        flowtag_status_index,
+        recut,
+        recoat,
+        is_timing,
+        changed_by,
+        started_at
+    )
+    SELECT
+        o.id,
+        o.name,
+        n.flowtag,
+        n.flowtag_index,
+        n.flowtag[n.flowtag_index + 1],
+        n.flowtag_status_index,
+        n.recut,
+        n.recoat,
+        n.is_timing,
+        n.changed_by,
+        now()
+    FROM old_rows o
+    JOIN new_rows n ON n.id = o.id
+    WHERE n.flowtag_index <> cardinality(n.flowtag)
+      AND (
+          o.flowtag_index IS DISTINCT FROM n.flowtag_index
+          OR o.flowtag_status_index IS DISTINCT FROM n.flowtag_status_index
+          OR o.recut IS DISTINCT FROM n.recut
+          OR o.recoat IS DISTINCT FROM n.recoat
+          OR o.is_timing IS DISTINCT FROM n.is_timing
+      );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Replaces the row-level trigger of the same function
+DROP TRIGGER IF EXISTS trg_part_status_timeline ON assembly_laser_cut_parts;
+
+CREATE OR REPLACE TRIGGER trg_part_status_timeline_statement
+    AFTER UPDATE ON assembly_laser_cut_parts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION log_part_status_timeline();
+
+-- Archive of completed jobs.
+-- Once every laser cut part of a job is complete, workspace_archive_job() moves its assemblies, parts, components,
+-- part groups and timeline out of the live tables into these copies (same columns, ids kept, no foreign keys),
+-- so the views and flowtag updates stop scanning them. The jobs row itself stays live; archived_jobs records the move.
+-- The archive tables are created with LIKE: a column added to a live table has to be added to its archive too.
+CREATE TABLE IF NOT EXISTS archived_jobs (
+    job_id BIGINT PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    assemblies BIGINT NOT NULL,
+    laser_cut_parts BIGINT NOT NULL,
+    components BIGINT NOT NULL,
+    timeline_rows BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS archived_assemblies (LIKE assemblies, PRIMARY KEY (id));
+
+CREATE TABLE IF NOT EXISTS archived_assembly_laser_cut_parts (LIKE assembly_laser_cut_parts, PRIMARY KEY (id));
+
+CREATE TABLE IF NOT EXISTS archived_components (LIKE components, PRIMARY KEY (id));
+
+-- Generated columns are copied as plain values
+CREATE TABLE IF NOT EXISTS archived_grouped_laser_cut_parts (LIKE grouped_laser_cut_parts, PRIMARY KEY (id));
+
+CREATE TABLE IF NOT EXISTS archived_part_status_timeline (LIKE part_status_timeline, PRIMARY KEY (id));
+
+CREATE INDEX IF NOT EXISTS idx_archived_assemblies_job_id ON archived_assemblies (job_id);
+
+CREATE INDEX IF NOT EXISTS idx_archived_assembly_laser_cut_parts_job_id ON archived_assembly_laser_cut_parts (job_id);
+
+CREATE INDEX IF NOT EXISTS idx_archived_components_job_id ON archived_components (job_id);
+
+CREATE INDEX IF NOT EXISTS idx_archived_grouped_laser_cut_parts_job_id ON archived_grouped_laser_cut_parts (job_id);
+
+CREATE INDEX IF NOT EXISTS idx_archived_part_status_timeline_part ON archived_part_status_timeline (part_id, id);
+
+-- Live and archived rows together, for reads that ask for archived data
+CREATE OR REPLACE VIEW assembly_laser_cut_parts_with_archive AS
+    SELECT * FROM assembly_laser_cut_parts
+    UNION ALL
+    SELECT * FROM archived_assembly_laser_cut_parts;
+
+CREATE OR REPLACE VIEW part_status_timeline_with_archive AS
+    SELECT * FROM part_status_timeline
+    UNION ALL
+    SELECT * FROM archived_part_status_timeline;
+
+CREATE OR REPLACE VIEW view_grouped_laser_cut_parts_by_job_with_archive AS
+    SELECT * FROM view_grouped_laser_cut_parts_by_job
+    UNION ALL
+    SELECT
+    g.group_id,
+    g.job_id,
+    g.name,
+    g.flowtag,
+    g.flowtag_index,
+    g.flowtag_status_index,
+    g.recut,
+    g.recoat,
+    g.is_timing,
+    g.current_flowtag,
+    g.is_completed,
+    g.quantity,
+    g.start_time,
+    g.end_time,
+    (g.end_time < NOW()) AS is_overdue,
+    l.meta_data,
+    l.workspace_data,
+    g.created_at,
+    g.modified_at
+    FROM archived_grouped_laser_cut_parts g
+    LEFT JOIN laser_cut_part_latest_data l ON l.name = g.name;
+
+-- Moves one job to the archive. Returns NULL (and moves nothing) if it has no parts, has an incomplete part, or is
+-- already archived. The job's parts are locked first so none can be reverted between the check and the move.
+CREATE OR REPLACE FUNCTION workspace_archive_job(archive_job_id BIGINT)
+RETURNS archived_jobs AS $$
+DECLARE
+    result archived_jobs;
+    part_count BIGINT;
+    incomplete_count BIGINT;
+    moved_rows BIGINT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM archived_jobs WHERE job_id = archive_job_id) THEN
+        RETURN NULL;
     END IF;
 
-    -- Otherwise, log state change
-    IF OLD.flowtag_index IS DISTINCT FROM NEW.flowtag_index
-       OR OLD.flowtag_status_index IS DISTINCT FROM NEW.flowtag_status_index
-       OR OLD.recut IS DISTINCT FROM NEW.recut
-       OR OLD.recoat IS DISTINCT FROM NEW.recoat
-       OR OLD.is_timing IS DISTINCT FROM NEW.is_timing
-    THEN
-        -- Close old state
-        UPDATE part_status_timeline
-        SET ended_at = now()
-        WHERE part_id = OLD.id
-          AND ended_at IS NULL;
-
-        -- Insert new state
-        INSERT INTO part_status_timeline (
-            part_id,
-            name,
-            flowtag,
-            flowtag_index,
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE flowtag_index <> cardinality(flowtag))
+    INTO part_count, incomplete_count
+    FROM (
+        SELECT flowtag, flowtag_index
+        FROM assembly_laser_cut_parts
+        WHERE job_id = archive_job_id
+        FOR UPDATE
+    ) locked;
+
+    IF part_count = 0 OR incomplete_count > 0 THEN
+        RETURN NULL;
+    END IF;
+
+    result.job_id := archive_job_id;
+    result.archived_at := now();
+
+    INSERT INTO archived_part_status_timeline
+    SELECT t.*
+    FROM part_status_timeline t
+    JOIN assembly_laser_cut_parts p ON p.id = t.part_id
+    WHERE p.job_id = archive_job_id;
+    GET DIAGNOSTICS moved_rows = ROW_COUNT;
+    result.timeline_rows := moved_rows;
+
+    INSERT INTO archived_assembly_laser_cut_parts SELECT * FROM assembly_laser_cut_parts WHERE job_id = archive_job_id;
+    GET DIAGNOSTICS moved_rows = ROW_COUNT;
+    result.laser_cut_parts := moved_rows;
+
+    INSERT INTO archived_components SELECT * FROM components WHERE job_id = archive_job_id;
+    GET DIAGNOSTICS moved_rows = ROW_COUNT;
+    result.components := moved_rows;
+
+    INSERT INTO archived_assemblies SELECT * FROM assemblies WHERE job_id = archive_job_id;
+    GET DIAGNOSTICS moved_rows = ROW_COUNT;
+    result.assemblies := moved_rows;
+
+    INSERT INTO archived_grouped_laser_cut_parts SELECT * FROM grouped_laser_cut_parts WHERE job_id = archive_job_id;
+
+    -- Timeline rows reference the parts, and dropping the groups first leaves the group trigger nothing to update
+    DELETE FROM part_status_timeline t
+    USING assembly_laser_cut_parts p
+    WHERE p.id = t.part_id
+      AND p.job_id = archive_job_id;
+    DELETE FROM grouped_laser_cut_parts WHERE job_id = archive_job_id;
+    DELETE FROM assembly_laser_cut_parts WHERE job_id = archive_job_id;
+    DELETE FROM components WHERE job_id = archive_job_id;
+    DELETE FROM assemblies WHERE job_id = archive_job_id;
+
+    INSERT INTO archived_jobs VALUES (result.*);
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Moves an archived job back into the live tables (e.g. to rework it). The part groups are rebuilt by their trigger.
+CREATE OR REPLACE FUNCTION workspace_restore_archived_job(restore_job_id BIGINT)
+RETURNS BOOLEAN AS $$
+BEGIN
+    DELETE FROM archived_jobs WHERE job_id = restore_job_id;
+    IF NOT FOUND THEN
+        RETURN false;
+    END IF;
+
+    -- The restored timeline was already counted in the production rollups when it happened
+    PERFORM set_config('invigo.restoring_archive', 'on', true);
+
+    INSERT INTO assemblies SELECT * FROM archived_assemblies WHERE job_id = restore_job_id;
+    INSERT INTO assembly_laser_cut_parts SELECT * FROM archived_assembly_laser_cut_parts WHERE job_id = restore_job_id;
+    INSERT INTO components SELECT * FROM archived_components WHERE job_id = restore_job_id;
+    INSERT INTO part_status_timeline
+    SELECT t.*
+    FROM archived_part_status_timeline t
+    JOIN archived_assembly_laser_cut_parts p ON p.id = t.part_id
+    WHERE p.job_id = restore_job_id;
+
+    DELETE FROM archived_part_status_timeline t
+    USING archived_assembly_laser_cut_parts p
+    WHERE p.id = t.part_id
+      AND p.job_id = restore_job_id;
+    DELETE FROM archived_grouped_laser_cut_parts WHERE job_id = restore_job_id;
+    DELETE FROM archived_assembly_laser_cut_parts WHERE job_id = restore_job_id;
+    DELETE FROM archived_components WHERE job_id = restore_job_id;
+    DELETE FROM archived_assemblies WHERE job_id = restore_job_id;
+
+    PERFORM set_config('invigo.restoring_archive', 'off', true);
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Production analytics rollups.
+-- A visit is a part's stay at one flowtag: consecutive timeline states at the same flowtag_index, each starting
+-- when the previous one ended (status and timing changes don't end a visit). Hourly buckets per (flowtag, job)
+-- count visits entering and leaving, and a histogram of the durations of those that left gives percentiles.
+-- Triggers on part_status_timeline keep them current; production_rollup_rebuild() recomputes them from history.
+CREATE TABLE IF NOT EXISTS production_flowtag_hourly (
+    bucket TIMESTAMPTZ NOT NULL,
+    flowtag_name TEXT NOT NULL,
+    job_id BIGINT NOT NULL,
+    units_entered BIGINT NOT NULL DEFAULT 0,
+    units_exited BIGINT NOT NULL DEFAULT 0,
+    visit_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (flowtag_name, bucket, job_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_production_flowtag_hourly_bucket ON production_flowtag_hourly (bucket);
+
+CREATE TABLE IF NOT EXISTS production_flowtag_hourly_durations (
+    bucket TIMESTAMPTZ NOT NULL,
+    flowtag_name TEXT NOT NULL,
+    job_id BIGINT NOT NULL,
+    duration_bucket SMALLINT NOT NULL,
+    units BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (flowtag_name, bucket, job_id, duration_bucket)
+);
+
+CREATE TABLE IF NOT EXISTS production_flowtag_wip (
+    flowtag_name TEXT NOT NULL,
+    job_id BIGINT NOT NULL,
+    wip BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (flowtag_name, job_id)
+);
+
+-- A part's states in order, for finding where its current visit started
+CREATE INDEX IF NOT EXISTS idx_part_status_timeline_part ON part_status_timeline (part_id, id);
+
+-- Histogram bucket of a visit duration; keep the bounds in sync with DURATION_BUCKET_BOUNDS in production_analytics_db.py
+CREATE OR REPLACE FUNCTION production_duration_bucket(seconds DOUBLE PRECISION)
+RETURNS SMALLINT AS $$
+    SELECT width_bucket(
+        seconds,
+        ARRAY[60, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400, 172800, 345600, 604800, 1209600, 2592000]::double precision[]
+    )::smallint
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Start of the visit a state belongs to
+CREATE OR REPLACE FUNCTION production_visit_started_at(state_part_id BIGINT, state_id BIGINT)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT s.started_at
+    FROM (
+        SELECT
+            t.id,
+            t.started_at,
+            t.flowtag_index,
+            LAG(t.flowtag_index) OVER (ORDER BY t.id) AS previous_index,
+            LAG(t.ended_at) OVER (ORDER BY t.id) AS previous_ended_at
+        FROM part_status_timeline t
+        WHERE t.part_id = state_part_id
+          AND t.id <= state_id
+    ) s
+    WHERE s.previous_index IS NULL
+       OR s.previous_index <> s.flowtag_index
+       OR s.previous_ended_at IS DISTINCT FROM s.started_at
+    ORDER BY s.id DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+-- Applies visit events: 'enter', 'exit' (with the visit's duration) and 'drop' (an open visit deleted, WIP only)
+CREATE OR REPLACE FUNCTION production_rollup_record(
+    event_kinds TEXT[],
+    event_times TIMESTAMPTZ[],
+    event_flowtags TEXT[],
+    event_job_ids BIGINT[],
+    event_seconds DOUBLE PRECISION[]
+)
+RETURNS void AS $$
+    WITH events AS (
+        SELECT e.kind, date_trunc('hour', e.occurred_at) AS bucket, e.flowtag_name, e.job_id, e.seconds
+        FROM unnest(event_kinds, event_times, event_flowtags, event_job_ids, event_seconds)
+            AS e(kind, occurred_at, flowtag_name, job_id, seconds)
+        WHERE e.flowtag_name IS NOT NULL
+          AND e.job_id IS NOT NULL
+    ),
+    hourly AS (
+        INSERT INTO production_flowtag_hourly AS h (bucket, flowtag_name, job_id, units_entered, units_exited, visit_seconds)
+        SELECT
+            bucket,
             flowtag_name,
-            flowtag_status_index,
-            recut,
-            recoat,
-            is_timing,
-            changed_by,
-            started_at
-        )
-        VALUES (
-            OLD.id,
-            OLD.name,
-            NEW.flowtag,
-            NEW.flowtag_index,
-            NEW.flowtag[NEW.flowtag_index + 1],
-            NEW.flowtag_status_index,
-            NEW.recut,
-            NEW.recoat,
-            NEW.is_timing,
-            NEW.changed_by,
-            now()
-        );
+            job_id,
+            COUNT(*) FILTER (WHERE kind = 'enter'),
+            COUNT(*) FILTER (WHERE kind = 'exit'),
+            COALESCE(SUM(seconds) FILTER (WHERE kind = 'exit'), 0)
+        FROM events
+        WHERE kind IN ('enter', 'exit')
+        GROUP BY bucket, flowtag_name, job_id
+        ON CONFLICT (flowtag_name, bucket, job_id) DO UPDATE SET
+            units_entered = h.units_entered + EXCLUDED.units_entered,
+            units_exited = h.units_exited + EXCLUDED.units_exited,
+            visit_seconds = h.visit_seconds + EXCLUDED.visit_seconds
+    ),
+    durations AS (
+        INSERT INTO production_flowtag_hourly_durations AS d (bucket, flowtag_name, job_id, duration_bucket, units)
+        SELECT bucket, flowtag_name, job_id, production_duration_bucket(seconds), COUNT(*)
+        FROM events
+        WHERE kind = 'exit'
+          AND seconds IS NOT NULL
+        GROUP BY bucket, flowtag_name, job_id, production_duration_bucket(seconds)
+        ON CONFLICT (flowtag_name, bucket, job_id, duration_bucket) DO UPDATE SET
+            units = d.units + EXCLUDED.units
+    )
+    INSERT INTO production_flowtag_wip AS w (flowtag_name, job_id, wip)
+    SELECT flowtag_name, job_id, SUM(CASE WHEN kind = 'enter' THEN 1 ELSE -1 END)
+    FROM events
+    GROUP BY flowtag_name, job_id
+    ON CONFLICT (flowtag_name, job_id) DO UPDATE SET
+        wip = w.wip + EXCLUDED.wip
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION production_rollup_states_opened()
+RETURNS trigger AS $$
+BEGIN
+    IF current_setting('invigo.restoring_archive', true) = 'on' THEN
+        RETURN NULL;
     END IF;
 
-    RETURN NEW;
+    PERFORM production_rollup_record(
+        array_agg(e.kind),
+        array_agg(e.occurred_at),
+        array_agg(e.flowtag_name),
+        array_agg(e.job_id),
+        array_agg(e.seconds)
+    )
+    FROM (
+        WITH opened AS (
+            SELECT
+                n.part_id,
+                n.started_at,
+                n.flowtag_name,
+                p.job_id,
+                previous.id AS previous_id,
+                previous.flowtag_name AS previous_flowtag_name,
+                -- The previous state was closed by this same change and was at another flowtag: its visit ends here
+                (previous.ended_at = n.started_at AND previous.flowtag_index <> n.flowtag_index) AS ends_previous_visit
+            FROM new_states n
+            JOIN assembly_laser_cut_parts p ON p.id = n.part_id
+            LEFT JOIN LATERAL (
+                SELECT x.id, x.flowtag_index, x.flowtag_name, x.ended_at
+                FROM part_status_timeline x
+                WHERE x.part_id = n.part_id
+                  AND x.id < n.id
+                ORDER BY x.id DESC
+                LIMIT 1
+            ) previous ON TRUE
+            WHERE previous.id IS NULL
+               OR previous.flowtag_index <> n.flowtag_index
+               OR previous.ended_at IS DISTINCT FROM n.started_at
+        )
+        SELECT 'enter'::text AS kind, started_at AS occurred_at, flowtag_name, job_id, NULL::double precision AS seconds
+        FROM opened
+        UNION ALL
+        SELECT
+            'exit'::text,
+            started_at,
+            previous_flowtag_name,
+            job_id,
+            EXTRACT(EPOCH FROM started_at - production_visit_started_at(part_id, previous_id))::double precision
+        FROM opened
+        WHERE ends_previous_visit
+    ) e;
+
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE OR REPLACE TRIGGER trg_part_status_timeline
-    AFTER UPDATE ON assembly_laser_cut_parts
-    FOR EACH ROW
-    EXECUTE FUNCTION log_part_status_timeline();
+CREATE OR REPLACE FUNCTION production_rollup_states_closed()
+RETURNS trigger AS $$
+BEGIN
+    -- A closed state is followed by a new one (counted when that is inserted) unless the part completed
+    PERFORM production_rollup_record(
+        array_agg('exit'::text),
+        array_agg(n.ended_at),
+        array_agg(n.flowtag_name),
+        array_agg(p.job_id),
+        array_agg(EXTRACT(EPOCH FROM n.ended_at - production_visit_started_at(n.part_id, n.id))::double precision)
+    )
+    FROM new_states n
+    JOIN old_states o ON o.id = n.id
+    JOIN assembly_laser_cut_parts p ON p.id = n.part_id
+    WHERE o.ended_at IS NULL
+      AND n.ended_at IS NOT NULL
+      AND p.flowtag_index = cardinality(p.flowtag);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION production_rollup_states_deleted()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM production_rollup_record(
+        array_agg('drop'::text),
+        array_agg(o.started_at),
+        array_agg(o.flowtag_name),
+        array_agg(p.job_id),
+        array_agg(NULL::double precision)
+    )
+    FROM old_states o
+    JOIN assembly_laser_cut_parts p ON p.id = o.part_id
+    WHERE o.ended_at IS NULL;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_production_rollup_states_opened
+    AFTER INSERT ON part_status_timeline
+    REFERENCING NEW TABLE AS new_states
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION production_rollup_states_opened();
+
+CREATE OR REPLACE TRIGGER trg_production_rollup_states_closed
+    AFTER UPDATE ON part_status_timeline
+    REFERENCING OLD TABLE AS old_states NEW TABLE AS new_states
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION production_rollup_states_closed();
+
+CREATE OR REPLACE TRIGGER trg_production_rollup_states_deleted
+    AFTER DELETE ON part_status_timeline
+    REFERENCING OLD TABLE AS old_states
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION production_rollup_states_deleted();
+
+CREATE OR REPLACE FUNCTION production_rollup_rebuild()
+RETURNS void AS $$
+BEGIN
+    -- Blocks the triggers above until the rebuild commits, so no event is counted twice or lost
+    TRUNCATE production_flowtag_hourly, production_flowtag_hourly_durations, production_flowtag_wip;
+
+    DROP TABLE IF EXISTS production_visits;
+    CREATE TEMP TABLE production_visits ON COMMIT DROP AS
+    WITH states AS (
+        SELECT
+            t.id,
+            t.part_id,
+            p.job_id,
+            t.flowtag_name,
+            t.flowtag_index,
+            t.started_at,
+            t.ended_at,
+            LAG(t.flowtag_index) OVER w AS previous_index,
+            LAG(t.ended_at) OVER w AS previous_ended_at
+        FROM part_status_timeline_with_archive t
+        JOIN assembly_laser_cut_parts_with_archive p ON p.id = t.part_id
+        WINDOW w AS (PARTITION BY t.part_id ORDER BY t.id)
+    ),
+    numbered AS (
+        SELECT
+            *,
+            COUNT(*) FILTER (
+                WHERE previous_index IS NULL
+                   OR previous_index <> flowtag_index
+                   OR previous_ended_at IS DISTINCT FROM started_at
+            ) OVER (PARTITION BY part_id ORDER BY id) AS visit
+        FROM states
+    )
+    SELECT
+        job_id,
+        (array_agg(flowtag_name ORDER BY id))[1] AS flowtag_name,
+        MIN(started_at) AS entered_at,
+        (array_agg(ended_at ORDER BY id DESC))[1] AS exited_at
+    FROM numbered
+    GROUP BY part_id, job_id, visit;
+
+    INSERT INTO production_flowtag_hourly (bucket, flowtag_name, job_id, units_entered, units_exited, visit_seconds)
+    SELECT bucket, flowtag_name, job_id, SUM(entered), SUM(exited), SUM(seconds)
+    FROM (
+        SELECT date_trunc('hour', entered_at) AS bucket, flowtag_name, job_id, 1 AS entered, 0 AS exited, 0::double precision AS seconds
+        FROM production_visits
+        UNION ALL
+        SELECT date_trunc('hour', exited_at), flowtag_name, job_id, 0, 1, EXTRACT(EPOCH FROM exited_at - entered_at)::double precision
+        FROM production_visits
+        WHERE exited_at IS NOT NULL
+    ) events
+    GROUP BY bucket, flowtag_name, job_id;
+
+    INSERT INTO production_flowtag_hourly_durations (bucket, flowtag_name, job_id, duration_bucket, units)
+    SELECT
+        date_trunc('hour', exited_at),
+        flowtag_name,
+        job_id,
+        production_duration_bucket(EXTRACT(EPOCH FROM exited_at - entered_at)::double precision),
+        COUNT(*)
+    FROM production_visits
+    WHERE exited_at IS NOT NULL
+    GROUP BY 1, 2, 3, 4;
+
+    INSERT INTO production_flowtag_wip (flowtag_name, job_id, wip)
+    SELECT flowtag_name, job_id, COUNT(*)
+    FROM production_visits
+    WHERE exited_at IS NULL
+    GROUP BY flowtag_name, job_id;
+
+    DROP TABLE production_visits;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-off backfill when the rollups are introduced on an existing database
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM production_flowtag_hourly)
+       AND NOT EXISTS (SELECT 1 FROM production_flowtag_wip)
+       AND EXISTS (SELECT 1 FROM part_status_timeline)
+    THEN
+        PERFORM production_rollup_rebuild();
+    END IF;
+END
+$$;
 
 CREATE OR REPLACE VIEW part_full_duration AS
 SELECT
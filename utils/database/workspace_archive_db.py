@@ -0,0 +1,179 @@
+"""
+Moves completed jobs out of the live workspace tables, see the archive section of workspace.sql.
+
+Runs daily from main.py; to archive (or restore a job) by hand:
+    python -m utils.database.workspace_archive_db
+    python -m utils.database.workspace_archive_db restore <job_id>
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry, SubsystemPool
+from utils.decorators.connection import BaseWithDBPool, ensure_connection
+
+LIVE_TABLES = ("assemblies", "assembly_laser_cut_parts", "components", "grouped_laser_cut_parts", "part_status_timeline")
+ARCHIVE_TABLES = tuple(f"archived_{table}" for table in LIVE_TABLES)
+
+# A job qualifies once all of its laser cut parts are complete and none has changed for a while;
+# workspace_archive_job() re-checks completeness with the parts locked.
+ARCHIVABLE_JOBS_SQL = """
+SELECT p.job_id
+FROM assembly_laser_cut_parts p
+WHERE NOT EXISTS (SELECT 1 FROM archived_jobs a WHERE a.job_id = p.job_id)
+GROUP BY p.job_id
+HAVING bool_and(p.flowtag_index = cardinality(p.flowtag))
+   AND MAX(p.modified_at) < $1
+ORDER BY p.job_id
+LIMIT $2
+"""
+
+TABLE_SIZES_SQL = """
+SELECT t.name, c.reltuples::bigint AS rows, pg_total_relation_size(c.oid) AS bytes
+FROM unnest($1::text[]) AS t(name)
+JOIN pg_class c ON c.oid = to_regclass(t.name)
+"""
+
+# Moving a large job or vacuuming the live tables takes longer than the usual command timeout
+MAINTENANCE_TIMEOUT = 3600
+
+
+class WorkspaceArchiveDB(BaseWithDBPool):
+    """
+    Hot/cold split of the workspace: completed jobs are moved to the ``archived_*`` tables in batches,
+    one transaction per job, and the live tables are vacuumed afterwards so the freed space is reused.
+
+    Reads that should see archived jobs go through the ``*_with_archive`` views (``include_archived``
+    on the WorkspaceDB and ViewDB read methods).
+    """
+
+    def __init__(self):
+        self.db_pool: SubsystemPool | None = None
+        self._lock = asyncio.Lock()
+        self.last_run: dict | None = None
+
+    async def connect(self):
+        if self.db_pool is None or self.db_pool._closed:
+            try:
+                # The archive tables are created with the rest of the workspace schema
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "workspace_archive")
+            except asyncpg.exceptions.PostgresError as e:
+                logging.error(f"Database connection error: {e}")
+                self.db_pool = None
+
+    @staticmethod
+    async def _table_sizes(conn: asyncpg.Connection) -> dict[str, dict[str, int]]:
+        rows = await conn.fetch(TABLE_SIZES_SQL, list(LIVE_TABLES + ARCHIVE_TABLES))
+        return {row["name"]: {"rows": max(row["rows"], 0), "bytes": row["bytes"]} for row in rows}
+
+    @ensure_connection
+    async def get_table_sizes(self) -> dict[str, dict[str, int]]:
+        """Estimated rows (as of the last ANALYZE) and on-disk bytes, indexes included, of the live and archive tables."""
+        async with self.db_pool.acquire() as conn:
+            return await self._table_sizes(conn)
+
+    @ensure_connection
+    async def archive_completed_jobs(self, older_than: timedelta | None = None, limit: int | None = None) -> dict | None:
+        """
+        Archives up to ``limit`` completed jobs whose parts haven't changed for ``older_than``.
+
+        Returns a summary with the table sizes before and after, or None if a run is already in progress.
+        """
+        if self._lock.locked():
+            logging.info("[Archive] Previous run still in progress, skipping")
+            return None
+
+        older_than = older_than or timedelta(days=Environment.WORKSPACE_ARCHIVE_AFTER_DAYS)
+        limit = limit or Environment.WORKSPACE_ARCHIVE_BATCH_SIZE
+
+        async with self._lock:
+            started = time.perf_counter()
+            started_at = datetime.now(timezone.utc)
+            archived = []
+
+            async with self.db_pool.acquire() as conn:
+                tables_before = await self._table_sizes(conn)
+                job_ids = await conn.fetch(ARCHIVABLE_JOBS_SQL, started_at - older_than, limit)
+
+                for record in job_ids:
+                    try:
+                        async with conn.transaction():
+                            row = await conn.fetchrow("SELECT * FROM workspace_archive_job($1)", record["job_id"], timeout=MAINTENANCE_TIMEOUT)
+                    except asyncpg.exceptions.PostgresError as e:
+                        logging.error(f"[Archive] Failed to archive job {record['job_id']}: {e}")
+                        continue
+                    # NULL when a part was reverted since the candidates were picked
+                    if row["job_id"] is not None:
+                        archived.append({key: value for key, value in row.items() if key != "archived_at"})
+
+                if archived:
+                    # Marks the moved rows' space reusable and refreshes the estimates reported below
+                    await conn.execute(f"VACUUM (ANALYZE) {', '.join(LIVE_TABLES)}", timeout=MAINTENANCE_TIMEOUT)
+                    await conn.execute(f"ANALYZE {', '.join(ARCHIVE_TABLES)}", timeout=MAINTENANCE_TIMEOUT)
+                tables_after = await self._table_sizes(conn)
+
+            self.last_run = {
+                "started_at": started_at.isoformat(),
+                "duration_seconds": round(time.perf_counter() - started, 3),
+                "candidates": len(job_ids),
+                "jobs_archived": len(archived),
+                "rows_moved": {
+                    key: sum(job[key] for job in archived) for key in ("assemblies", "laser_cut_parts", "components", "timeline_rows")
+                },
+                "jobs": [job["job_id"] for job in archived],
+                "tables": {
+                    table: {"before": tables_before.get(table), "after": tables_after.get(table)} for table in LIVE_TABLES + ARCHIVE_TABLES
+                },
+            }
+
+        if archived:
+            parts_before = tables_before.get("assembly_laser_cut_parts", {}).get("rows")
+            parts_after = tables_after.get("assembly_laser_cut_parts", {}).get("rows")
+            logging.info(
+                f"[Archive] Archived {len(archived)} jobs ({self.last_run['rows_moved']['laser_cut_parts']} parts) "
+                f"in {self.last_run['duration_seconds']}s, live parts ~{parts_before} -> ~{parts_after}"
+            )
+        return self.last_run
+
+    @ensure_connection
+    async def restore_job(self, job_id: int) -> bool:
+        """Moves an archived job back into the live tables; False if it wasn't archived."""
+        async with self.db_pool.acquire() as conn:
+            async with conn.transaction():
+                restored = await conn.fetchval("SELECT workspace_restore_archived_job($1)", job_id, timeout=MAINTENANCE_TIMEOUT)
+        if restored:
+            logging.info(f"[Archive] Restored job {job_id}")
+        return restored
+
+    @ensure_connection
+    async def get_archived_jobs(self) -> list[dict]:
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM archived_jobs ORDER BY archived_at DESC")
+        return [{**dict(row), "archived_at": row["archived_at"].isoformat()} for row in rows]
+
+    def status(self) -> dict:
+        return {"running": self._lock.locked(), "last_run": self.last_run}
+
+
+async def main():
+    archive_db = WorkspaceArchiveDB()
+    if len(sys.argv) == 3 and sys.argv[1] == "restore":
+        restored = await archive_db.restore_job(int(sys.argv[2]))
+        print(f"Restored job {sys.argv[2]}" if restored else f"Job {sys.argv[2]} is not archived")
+    else:
+        result = await archive_db.archive_completed_jobs()
+        print(f"Archived {result['jobs_archived']} of {result['candidates']} candidate jobs")
+        for table, sizes in result["tables"].items():
+            print(f"  {table:<38} {sizes['before']} -> {sizes['after']}")
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -2,20 +2,77 @@ import json
 import logging
 import os
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 import asyncpg
 import msgspec
-from asyncpg import Connection, Pool
+from asyncpg import Connection
 
 from config.environments import Environment
+from utils.database.pool_registry import PoolRegistry, SubsystemPool
 from utils.decorators.connection import BaseWithDBPool, ensure_connection
 
 
 class WorkspaceDB(BaseWithDBPool):
+    ASSEMBLY_COPY_COLUMNS = (
+        "id",
+        "job_id",
+        "parent_id",
+        "name",
+        "flowtag",
+        "flowtag_index",
+        "flowtag_status_index",
+        "start_time",
+        "end_time",
+        "meta_data",
+        "prices",
+        "paint_data",
+        "primer_data",
+        "powder_data",
+        "workspace_data",
+        "changed_by",
+    )
+    ASSEMBLY_LASER_CUT_PART_COPY_COLUMNS = (
+        "job_id",
+        "assembly_id",
+        "name",
+        "flowtag",
+        "flowtag_index",
+        "flowtag_status_index",
+        "recut",
+        "recoat",
+        "start_time",
+        "end_time",
+        "inventory_data",
+        "meta_data",
+        "prices",
+        "paint_data",
+        "primer_data",
+        "powder_data",
+        "workspace_data",
+        "changed_by",
+    )
+    COMPONENT_COPY_COLUMNS = ("job_id", "assembly_id", "name", "quantity", "data")
+    NEST_COPY_COLUMNS = ("id", "job_id", "sheet", "laser_cut_parts")
+    NEST_LASER_CUT_PART_COPY_COLUMNS = (
+        "job_id",
+        "nest_id",
+        "name",
+        "start_time",
+        "end_time",
+        "inventory_data",
+        "meta_data",
+        "prices",
+        "paint_data",
+        "primer_data",
+        "powder_data",
+        "workspace_data",
+        "changed_by",
+    )
+
     def __init__(self):
-        self.db_pool: Pool | None = None
+        self.db_pool: SubsystemPool | None = None
         self.cache = {}
         self.cache_expiry = timedelta(seconds=60)
         self._stop_background = False
@@ -25,18 +82,7 @@ class WorkspaceDB(BaseWithDBPool):
     async def connect(self):
         if self.db_pool is None or self.db_pool._closed:
             try:
-                self.db_pool = await asyncpg.create_pool(
-                    user=Environment.POSTGRES_USER,
-                    password=Environment.POSTGRES_PASSWORD,
-                    database=Environment.POSTGRES_WORKSPACE_DB,
-                    host=Environment.POSTGRES_HOST,
-                    port=Environment.POSTGRES_PORT,
-                    min_size=Environment.POSTGRES_MIN_POOL_SIZE,
-                    max_size=Environment.POSTGRES_MAX_POOL_SIZE,
-                    timeout=Environment.POSTGRES_TIMEOUT,
-                    command_timeout=Environment.POSTGRES_COMMAND_TIMEOUT,
-                    max_inactive_connection_lifetime=Environment.POSTGRES_MAX_INACTIVE_CONNECTION_LIFETIME,
-                )
+                self.db_pool = await PoolRegistry.borrow(Environment.POSTGRES_WORKSPACE_DB, "workspace")
                 await self._create_table_if_not_exists()
             except asyncpg.exceptions.PostgresError as e:
                 logging.error(f"Database connection error: {e}")
@@ -74,6 +120,97 @@ class WorkspaceDB(BaseWithDBPool):
             print(f"Error inserting into {table_name}: {e}")
             raise
 
+    @staticmethod
+    def _serialize_part(part: dict) -> tuple:
+        # Serialised once per distinct part and reused for every copy of it
+        return (
+            json.dumps(part.get("inventory_data")),
+            json.dumps(part.get("meta_data")),
+            json.dumps(part.get("prices")),
+            json.dumps(part.get("paint_data")),
+            json.dumps(part.get("primer_data")),
+            json.dumps(part.get("powder_data")),
+            json.dumps(part.get("workspace_data")),
+        )
+
+    @staticmethod
+    def _count_assembly_rows(assemblies: list[dict], multiplier: int = 1) -> int:
+        total = 0
+        for assembly in assemblies:
+            quantity = multiplier * int(assembly["meta_data"]["quantity"])
+            total += quantity
+            total += WorkspaceDB._count_assembly_rows(assembly.get("sub_assemblies", []), quantity)
+        return total
+
+    @staticmethod
+    async def _allocate_ids(conn: Connection, table_name: str, count: int) -> list[int]:
+        if count <= 0:
+            return []
+        rows = await conn.fetch(
+            "SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id FROM generate_series(1, $2)",
+            table_name,
+            count,
+        )
+        return [row["id"] for row in rows]
+
+    def _build_job_rows(self, job_id: int, job: dict, assembly_ids: list[int], nest_ids: list[int]) -> dict[str, list[tuple]]:
+        rows: dict[str, list[tuple]] = {
+            "assemblies": [],
+            "assembly_laser_cut_parts": [],
+            "components": [],
+            "nests": [],
+            "nest_laser_cut_parts": [],
+        }
+        next_assembly_id = iter(assembly_ids)
+
+        def add_assembly_group(assembly: dict, parent_id: int | None = None):
+            assembly_flowtag = assembly["workspace_data"]["flowtag"]["tags"]
+            assembly_payload = (
+                json.dumps(assembly.get("meta_data")),
+                json.dumps(assembly.get("prices")),
+                json.dumps(assembly.get("paint_data")),
+                json.dumps(assembly.get("primer_data")),
+                json.dumps(assembly.get("powder_data")),
+                json.dumps(assembly.get("workspace_data")),
+            )
+            parts = [
+                (
+                    part["name"],
+                    part["workspace_data"]["flowtag"]["tags"],
+                    int(part["inventory_data"]["quantity"]),
+                    self._serialize_part(part),
+                )
+                for part in assembly.get("laser_cut_parts", [])
+            ]
+            components = [(comp["part_name"], int(comp["quantity"]), json.dumps(comp)) for comp in assembly.get("components", [])]
+
+            for _ in range(int(assembly["meta_data"]["quantity"])):
+                this_assembly_id = next(next_assembly_id)
+                rows["assemblies"].append(
+                    (this_assembly_id, job_id, parent_id, assembly["name"], assembly_flowtag, 0, 0, None, None, *assembly_payload, "Part was added.")
+                )
+
+                for name, flowtag, quantity, payload in parts:
+                    part_row = (job_id, this_assembly_id, name, flowtag, 0, 0, False, False, None, None, *payload, "Part was added.")
+                    rows["assembly_laser_cut_parts"].extend([part_row] * quantity)
+
+                for name, quantity, data in components:
+                    rows["components"].append((job_id, this_assembly_id, name, quantity, data))
+
+                for sub in assembly.get("sub_assemblies", []):
+                    add_assembly_group(sub, parent_id=this_assembly_id)
+
+        for assembly in job.get("assemblies", []):
+            add_assembly_group(assembly)
+
+        for nest, nest_id in zip(job.get("nests", []), nest_ids):
+            rows["nests"].append((nest_id, job_id, json.dumps(nest["sheet"]), json.dumps(nest["laser_cut_parts"])))
+            for part in nest["laser_cut_parts"]:
+                part_row = (job_id, nest_id, part["name"], None, None, *self._serialize_part(part), "Part was added.")
+                rows["nest_laser_cut_parts"].extend([part_row] * int(part["inventory_data"]["quantity"]))
+
+        return rows
+
     @ensure_connection
     async def add_job(self, job: dict):
         try:
@@ -91,111 +228,22 @@ class WorkspaceDB(BaseWithDBPool):
                         return_column="id",
                     )
 
-                    async def insert_assembly_group(assembly, parent_id=None):
-                        for _ in range(int(assembly["meta_data"]["quantity"])):
-                            this_assembly_id = await self.insert_into_table(
-                                conn,
-                                "assemblies",
-                                {
-                                    "job_id": job_id,
-                                    "parent_id": parent_id,
-                                    "name": assembly["name"],
-                                    "flowtag": assembly["workspace_data"]["flowtag"]["tags"],
-                                    "flowtag_index": 0,
-                                    "flowtag_status_index": 0,
-                                    "start_time": None,
-                                    "end_time": None,
-                                    "meta_data": json.dumps(assembly.get("meta_data")),
-                                    "prices": json.dumps(assembly.get("prices")),
-                                    "paint_data": json.dumps(assembly.get("paint_data")),
-                                    "primer_data": json.dumps(assembly.get("primer_data")),
-                                    "powder_data": json.dumps(assembly.get("powder_data")),
-                                    "workspace_data": json.dumps(assembly.get("workspace_data")),
-                                    "changed_by": "Part was added.",
-                                },
-                                return_column="id",
-                            )
-
-                            for part in assembly.get("laser_cut_parts", []):
-                                for _ in range(int(part["inventory_data"]["quantity"])):
-                                    await self.insert_into_table(
-                                        conn,
-                                        "assembly_laser_cut_parts",
-                                        {
-                                            "job_id": job_id,
-                                            "assembly_id": this_assembly_id,
-                                            "name": part["name"],
-                                            "flowtag": part["workspace_data"]["flowtag"]["tags"],
-                                            "flowtag_index": 0,
-                                            "flowtag_status_index": 0,
-                                            "recut": False,
-                                            "recoat": False,
-                                            "start_time": None,
-                                            "end_time": None,
-                                            "inventory_data": json.dumps(part.get("inventory_data")),
-                                            "meta_data": json.dumps(part.get("meta_data")),
-                                            "prices": json.dumps(part.get("prices")),
-                                            "paint_data": json.dumps(part.get("paint_data")),
-                                            "primer_data": json.dumps(part.get("primer_data")),
-                                            "powder_data": json.dumps(part.get("powder_data")),
-                                            "workspace_data": json.dumps(part.get("workspace_data")),
-                                            "changed_by": "Part was added.",
-                                        },
-                                    )
-
-                            for comp in assembly.get("components", []):
-                                await self.insert_into_table(
-                                    conn,
-                                    "components",
-                                    {
-                                        "job_id": job_id,
-                                        "assembly_id": this_assembly_id,
-                                        "name": comp["part_name"],
-                                        "quantity": int(comp["quantity"]),
-                                        "data": json.dumps(comp),
-                                    },
-                                )
-                            for sub in assembly.get("sub_assemblies", []):
-                                await insert_assembly_group(sub, parent_id=this_assembly_id)
-
-                    async def insert_nest(nest):
-                        nest_id = await self.insert_into_table(
-                            conn,
-                            "nests",
-                            {
-                                "job_id": job_id,
-                                "sheet": json.dumps(nest["sheet"]),
-                                "laser_cut_parts": json.dumps(nest["laser_cut_parts"]),
-                            },
-                            return_column="id",
-                        )
-                        for part in nest["laser_cut_parts"]:
-                            for _ in range(int(part["inventory_data"]["quantity"])):
-                                await self.insert_into_table(
-                                    conn,
-                                    "nest_laser_cut_parts",
-                                    {
-                                        "job_id": job_id,
-                                        "nest_id": nest_id,
-                                        "name": part["name"],
-                                        "start_time": None,
-                                        "end_time": None,
-                                        "inventory_data": json.dumps(part.get("inventory_data")),
-                                        "meta_data": json.dumps(part.get("meta_data")),
-                                        "prices": json.dumps(part.get("prices")),
-                                        "paint_data": json.dumps(part.get("paint_data")),
-                                        "primer_data": json.dumps(part.get("primer_data")),
-                                        "powder_data": json.dumps(part.get("powder_data")),
-                                        "workspace_data": json.dumps(part.get("workspace_data")),
-                                        "changed_by": "Part was added.",
-                                    },
-                                )
-
-                    for assembly in job.get("assemblies", []):
-                        await insert_assembly_group(assembly)
-
-                    for nest in job.get("nests", []):
-                        await insert_nest(nest)
+                    # Ids are pre-allocated so parent/child references can be resolved client-side
+                    assembly_ids = await self._allocate_ids(conn, "assemblies", self._count_assembly_rows(job.get("assemblies", [])))
+                    nest_ids = await self._allocate_ids(conn, "nests", len(job.get("nests", [])))
+
+                    rows = self._build_job_rows(job_id, job, assembly_ids, nest_ids)
+
+                    # Order matters: children reference assemblies/nests through foreign keys
+                    for table_name, columns in (
+                        ("assemblies", self.ASSEMBLY_COPY_COLUMNS),
+                        ("assembly_laser_cut_parts", self.ASSEMBLY_LASER_CUT_PART_COPY_COLUMNS),
+                        ("components", self.COMPONENT_COPY_COLUMNS),
+                        ("nests", self.NEST_COPY_COLUMNS),
+                        ("nest_laser_cut_parts", self.NEST_LASER_CUT_PART_COPY_COLUMNS),
+                    ):
+                        if rows[table_name]:
+                            await conn.copy_records_to_table(table_name, records=rows[table_name], columns=columns)
 
                     # await conn.execute("NOTIFY jobs, $1", msgspec.json.encode({"type": "job_created", "job_id": job_id}).decode())
                     await conn.execute(f"NOTIFY jobs, '{msgspec.json.encode({'type': 'job_created', 'job_id': job_id}).decode()}'")
@@ -209,6 +257,21 @@ class WorkspaceDB(BaseWithDBPool):
     async def delete_job(self, job_id: int):
         async with self.db_pool.acquire() as conn:
             async with conn.transaction():
+                # Archived rows have no foreign keys to cascade through (archived_jobs goes with the job)
+                await conn.execute(
+                    """
+                    DELETE FROM archived_part_status_timeline
+                    WHERE part_id IN (
+                        SELECT id
+                        FROM archived_assembly_laser_cut_parts
+                        WHERE job_id = $1
+                    )
+                    """,
+                    job_id,
+                )
+                for table in ("archived_grouped_laser_cut_parts", "archived_assembly_laser_cut_parts", "archived_components", "archived_assemblies"):
+                    await conn.execute(f"DELETE FROM {table} WHERE job_id = $1", job_id)
+
                 await conn.execute(
                     """
                     DELETE FROM part_status_timeline
@@ -258,23 +321,25 @@ class WorkspaceDB(BaseWithDBPool):
                 "modified_at": row["modified_at"].isoformat() if row["modified_at"] else None,
             }
 
-    async def get_parts_by_job(self, job_id: int):
+    async def get_parts_by_job(self, job_id: int, include_archived: bool = False):
+        table = "assembly_laser_cut_parts_with_archive" if include_archived else "assembly_laser_cut_parts"
         async with self.db_pool.acquire() as conn:
             rows = await conn.fetch(
-                """
-                SELECT * FROM assembly_laser_cut_parts
-                WHERE assembly_laser_cut_parts.job_id = $1
-                ORDER BY assembly_laser_cut_parts.id
+                f"""
+                SELECT * FROM {table} parts
+                WHERE parts.job_id = $1
+                ORDER BY parts.id
                 """,
                 job_id,
             )
             return [dict(row) for row in rows]
 
     @ensure_connection
-    async def get_grouped_part_by_id(self, part_id: int):
+    async def get_grouped_part_by_id(self, part_id: int, include_archived: bool = False):
+        table = "assembly_laser_cut_parts_with_archive" if include_archived else "assembly_laser_cut_parts"
         async with self.db_pool.acquire() as conn:
             row = await conn.fetchrow(
-                "SELECT * FROM assembly_laser_cut_parts WHERE id = $1",
+                f"SELECT * FROM {table} WHERE id = $1",
                 part_id,
             )
             return dict(row) if row else None
@@ -318,140 +383,160 @@ class WorkspaceDB(BaseWithDBPool):
             logging.error(f"Error in get_job_items_timelines: {e} {traceback.format_exc()}")
             raise e
 
-    @ensure_connection
-    async def save_job_flowtag_timeline(self, job_id: int, flowtag_timeline: str):
-        async with self.db_pool.acquire() as conn:
-            query = """
-            UPDATE jobs
-            SET job_data = jsonb_set(job_data, '{flowtag_timeline}', $2::jsonb, true)
-            WHERE id = $1
-            """
-            await conn.execute(query, job_id, flowtag_timeline)
-        await self.update_part_flowtag_dates(job_id, flowtag_timeline)
+    # Per part: the earliest start and latest end across the timeline entries of its flowtags.
+    # Rows whose flowtags have no dated entries are left alone, and rows already on those dates aren't rewritten.
+    PROPAGATE_FLOWTAG_TIMELINE_SQL = """
+        WITH timeline AS (
+            SELECT
+                j.key::bigint AS job_id,
+                t.key AS tag,
+                (t.value ->> 'starting_date')::timestamptz AS starting_date,
+                (t.value ->> 'ending_date')::timestamptz AS ending_date
+            FROM jsonb_each($1::jsonb) AS j
+            CROSS JOIN LATERAL jsonb_each(j.value) AS t
+        ),
+        spans AS (
+            SELECT p.id, MIN(t.starting_date) AS start_time, MAX(t.ending_date) AS end_time
+            FROM {table} p
+            JOIN timeline t ON t.job_id = p.job_id AND t.tag = ANY (p.flowtag)
+            GROUP BY p.id
+        )
+        UPDATE {table} p
+        SET start_time = s.start_time,
+            end_time = s.end_time,
+            modified_at = NOW()
+        FROM spans s
+        WHERE p.id = s.id
+          AND s.start_time IS NOT NULL
+          AND s.end_time IS NOT NULL
+          AND (p.start_time IS DISTINCT FROM s.start_time OR p.end_time IS DISTINCT FROM s.end_time)
+    """
+
+    @staticmethod
+    def _normalize_flowtag_timeline(flowtag_timeline: dict) -> dict:
+        """Dates as ISO strings with an explicit offset, so Postgres reads them the way ``fromisoformat`` does (naive means UTC)."""
+
+        def normalize(value: str | None) -> str | None:
+            if not value:
+                return None
+            date = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return (date if date.tzinfo else date.replace(tzinfo=timezone.utc)).isoformat()
 
-    @ensure_connection
-    async def update_part_flowtag_dates(self, job_id: int, flowtag_timeline: str):
-        flowtag_timeline: dict = msgspec.json.decode(flowtag_timeline)
-        parsed_timeline = {
-            tag: {
-                "starting_date": datetime.fromisoformat(dates["starting_date"].replace("Z", "+00:00")) if dates.get("starting_date") else None,
-                "ending_date": datetime.fromisoformat(dates["ending_date"].replace("Z", "+00:00")) if dates.get("ending_date") else None,
-            }
+        return {
+            tag: {"starting_date": normalize(dates.get("starting_date")), "ending_date": normalize(dates.get("ending_date"))}
             for tag, dates in flowtag_timeline.items()
+            if isinstance(dates, dict)
         }
+
+    async def _propagate_flowtag_timelines(self, conn: Connection, flowtag_timelines: dict[int, dict]) -> dict[str, int]:
+        normalized = msgspec.json.encode({str(job_id): self._normalize_flowtag_timeline(timeline) for job_id, timeline in flowtag_timelines.items()}).decode()
+        updated = {}
+        for table in ("assembly_laser_cut_parts", "assemblies"):
+            status = await conn.execute(self.PROPAGATE_FLOWTAG_TIMELINE_SQL.format(table=table), normalized)
+            updated[table] = int(status.split()[-1])
+        return updated
+
+    @ensure_connection
+    async def save_job_flowtag_timelines(self, flowtag_timelines: dict[int, dict]) -> dict[str, int]:
+        """
+        Saves the flowtag timelines of several jobs and moves their parts' and assemblies' dates to match,
+        all in one transaction. Returns the number of rows updated per table.
+        """
         async with self.db_pool.acquire() as conn:
-            # fetch all parts for this job
-            assemblies_query = """
-                SELECT id, flowtag
-                FROM assembly_laser_cut_parts
-                WHERE job_id = $1
-            """
-            assemblies = await conn.fetch(assemblies_query, job_id)
-
-            updates = []
-            for assembly in assemblies:
-                flowtags = assembly["flowtag"]
-                start_dates = [parsed_timeline[tag]["starting_date"] for tag in flowtags if parsed_timeline.get(tag) and parsed_timeline[tag]["starting_date"]]
-                end_dates = [parsed_timeline[tag]["ending_date"] for tag in flowtags if parsed_timeline.get(tag) and parsed_timeline[tag]["ending_date"]]
-
-                if start_dates and end_dates:
-                    min_start = min(start_dates)
-                    max_end = max(end_dates)
-                    updates.append((assembly["id"], min_start, max_end))
-
-            update_query = """
-                UPDATE assembly_laser_cut_parts
-                SET start_time = $2,
-                    end_time = $3,
-                    modified_at = NOW()
-                WHERE id = $1
-            """
-            await conn.executemany(update_query, updates)
+            async with conn.transaction():
+                jobs_status = await conn.execute(
+                    """
+                    UPDATE jobs
+                    SET job_data = jsonb_set(COALESCE(job_data, '{}'::jsonb), '{flowtag_timeline}', t.value, true)
+                    FROM jsonb_each($1::jsonb) AS t
+                    WHERE jobs.id = t.key::bigint
+                      AND jobs.job_data -> 'flowtag_timeline' IS DISTINCT FROM t.value
+                    """,
+                    msgspec.json.encode({str(job_id): timeline for job_id, timeline in flowtag_timelines.items()}).decode(),
+                )
+                updated = await self._propagate_flowtag_timelines(conn, flowtag_timelines)
+        return {"jobs": int(jobs_status.split()[-1]), **updated}
 
+    async def save_job_flowtag_timeline(self, job_id: int, flowtag_timeline: str):
+        await self.save_job_flowtag_timelines({job_id: msgspec.json.decode(flowtag_timeline)})
+
+    @ensure_connection
+    async def update_part_flowtag_dates(self, job_id: int, flowtag_timeline: str):
         async with self.db_pool.acquire() as conn:
-            # fetch all parts for this job
-            assemblies_query = """
-                SELECT id, flowtag
-                FROM assemblies
-                WHERE job_id = $1
-            """
-            assemblies = await conn.fetch(assemblies_query, job_id)
-
-            updates = []
-            for assembly in assemblies:
-                flowtags = assembly["flowtag"]
-                start_dates = [parsed_timeline[tag]["starting_date"] for tag in flowtags if parsed_timeline.get(tag) and parsed_timeline[tag]["starting_date"]]
-                end_dates = [parsed_timeline[tag]["ending_date"] for tag in flowtags if parsed_timeline.get(tag) and parsed_timeline[tag]["ending_date"]]
-
-                if start_dates and end_dates:
-                    min_start = min(start_dates)
-                    max_end = max(end_dates)
-                    updates.append((assembly["id"], min_start, max_end))
-
-            update_query = """
-                UPDATE assemblies
-                SET start_time = $2,
-                    end_time = $3,
-                    modified_at = NOW()
-                WHERE id = $1
-            """
-            await conn.executemany(update_query, updates)
+            async with conn.transaction():
+                await self._propagate_flowtag_timelines(conn, {job_id: msgspec.json.decode(flowtag_timeline)})
+
+    # Advances the lowest-id parts at flowtag_index 1 for every requested name at once; the
+    # outer SELECT reports how many were advanced per name, in the order the names were requested.
+    MARK_WORKORDER_PARTS_COMPLETE_SQL = """
+        WITH requested AS (
+            SELECT name, SUM(qty)::bigint AS qty, MIN(position) AS position
+            FROM unnest($1::text[], $2::int[]) WITH ORDINALITY AS r(name, qty, position)
+            GROUP BY name
+        ),
+        candidates AS (
+            SELECT p.id, p.name, row_number() OVER (PARTITION BY p.name ORDER BY p.id) AS rank
+            FROM assembly_laser_cut_parts p
+            JOIN requested r ON r.name = p.name
+            WHERE p.flowtag_index = 1
+              AND ($4::bigint[] IS NULL OR p.job_id = ANY ($4::bigint[]))
+        ),
+        advanced AS (
+            UPDATE assembly_laser_cut_parts p
+            SET
+                flowtag_index = p.flowtag_index + 1,
+                flowtag_status_index = 0,
+                is_timing = false,
+                changed_by = $3,
+                modified_at = now()
+            FROM candidates c
+            JOIN requested r ON r.name = c.name
+            WHERE p.id = c.id
+              AND c.rank <= r.qty
+              AND p.flowtag_index = 1
+            RETURNING p.name
+        )
+        SELECT r.name, r.qty AS requested, COUNT(a.name) AS advanced
+        FROM requested r
+        LEFT JOIN advanced a ON a.name = r.name
+        GROUP BY r.name, r.qty, r.position
+        ORDER BY r.position
+    """
 
     @ensure_connection
     async def mark_workorder_parts_complete(
         self,
         parts: list[dict],
         changed_by: str,
+        job_ids: list[int] | None = None,
     ) -> dict:
-        overflow = []
-        total_advanced = 0
-
-        advance_sql = """
-        WITH rows_to_advance AS (
-            SELECT id
-            FROM assembly_laser_cut_parts
-            WHERE name = $1
-              AND flowtag_index = 1
-            ORDER BY id
-            LIMIT $2
-        )
-        UPDATE assembly_laser_cut_parts p
-        SET
-            flowtag_index = flowtag_index + 1,
-            flowtag_status_index = 0,
-            is_timing = false,
-            changed_by = $3,
-            modified_at = now()
-        FROM rows_to_advance r
-        WHERE p.id = r.id
-        RETURNING p.id;
         """
+        Advances ``qty`` parts per name from flowtag index 1 to 2 in one statement, lowest ids first.
 
+        Duplicate names are summed. Pass ``job_ids`` to only touch those jobs' parts. Names that
+        didn't have enough parts waiting are reported in ``overflow``.
+        """
         async with self.db_pool.acquire() as conn:
-            async with conn.transaction():
-                for part in parts:
-                    rows = await conn.fetch(
-                        advance_sql,
-                        part["name"],
-                        part["qty"],
-                        changed_by,
-                    )
-
-                    advanced = len(rows)
-                    total_advanced += advanced
-
-                    if advanced < part["qty"]:
-                        overflow.append(
-                            {
-                                "name": part["name"],
-                                "requested": part["qty"],
-                                "advanced": advanced,
-                                "overflow": part["qty"] - advanced,
-                            }
-                        )
+            rows = await conn.fetch(
+                self.MARK_WORKORDER_PARTS_COMPLETE_SQL,
+                [part["name"] for part in parts],
+                [int(part["qty"]) for part in parts],
+                changed_by,
+                job_ids or None,
+            )
 
+        overflow = [
+            {
+                "name": row["name"],
+                "requested": row["requested"],
+                "advanced": row["advanced"],
+                "overflow": row["requested"] - row["advanced"],
+            }
+            for row in rows
+            if row["advanced"] < row["requested"]
+        ]
         return {
             "status": "ok",
-            "advanced_total": total_advanced,
+            "advanced_total": sum(row["advanced"] for row in rows),
             "overflow": overflow,
         }
@@ -4,6 +4,8 @@ from typing import Awaitable, Callable, ParamSpec, TypeVar
 
 import asyncpg
 
+from utils.database.pool_registry import SubsystemPool
+
 T = TypeVar("T", bound="BaseWithDBPool")
 P = ParamSpec("P")
 
@@ -28,7 +30,7 @@ def ensure_connection(func: Callable[P, Awaitable]) -> Callable[P, Awaitable]:
 
 
 class BaseWithDBPool:
-    db_pool: asyncpg.Pool | None
+    db_pool: SubsystemPool | None
 
     async def connect(self) -> None:
         raise NotImplementedError
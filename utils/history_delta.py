@@ -0,0 +1,141 @@
+"""
+Path-level deltas between JSON documents, used by the history tables.
+
+History rows store a full keyframe every ``KEYFRAME_INTERVAL`` versions and only a
+delta in between. A delta is a list of operations on a path (a list of dict keys and
+list indexes):
+
+    [path, value]   set ``path`` to ``value`` (appends when the index is the list length)
+    [path]          delete the dict key, or truncate the list at that index
+
+Lists are compared element by element, so changing one assembly of a job stores that
+assembly's changed fields rather than the whole ``assemblies`` list.
+"""
+
+from typing import Any, Callable, Iterable, Iterator
+
+import msgspec
+
+KEYFRAME_INTERVAL = 20
+
+
+def diff_documents(prev: Any, current: Any, path: tuple = ()) -> list[list]:
+    """Returns the operations that turn ``prev`` into ``current``."""
+    if isinstance(prev, dict) and isinstance(current, dict):
+        ops = [[[*path, key]] for key in prev if key not in current]
+        for key, value in current.items():
+            if key in prev:
+                ops.extend(diff_documents(prev[key], value, (*path, key)))
+            else:
+                ops.append([[*path, key], value])
+        return ops
+
+    if isinstance(prev, list) and isinstance(current, list):
+        ops = []
+        for index in range(min(len(prev), len(current))):
+            ops.extend(diff_documents(prev[index], current[index], (*path, index)))
+        if len(current) < len(prev):
+            ops.append([[*path, len(current)]])
+        for index in range(len(prev), len(current)):
+            ops.append([[*path, index], current[index]])
+        return ops
+
+    # 1 == 1.0 == True in Python, but they round-trip through JSON differently
+    if prev != current or type(prev) is not type(current):
+        return [[list(path), current]]
+    return []
+
+
+def apply_delta(document: Any, ops: Iterable[list]) -> Any:
+    """
+    Returns ``document`` with ``ops`` applied.
+
+    Containers along each changed path are copied, the rest is shared, so the
+    previous version stays intact and reconstructing a chain doesn't deep copy.
+    """
+    owned: set[int] = set()
+
+    def own(container):
+        if id(container) in owned:
+            return container
+        copy = list(container) if isinstance(container, list) else dict(container)
+        owned.add(id(copy))
+        return copy
+
+    for op in ops:
+        path = op[0]
+        if not path:
+            document = op[1] if len(op) > 1 else None
+            continue
+
+        document = own(document)
+        node = document
+        for key in path[:-1]:
+            node[key] = own(node[key])
+            node = node[key]
+
+        key = path[-1]
+        if len(op) == 1:
+            if isinstance(node, list):
+                del node[key:]
+            else:
+                node.pop(key, None)
+        elif isinstance(node, list) and key == len(node):
+            node.append(op[1])
+        else:
+            node[key] = op[1]
+    return document
+
+
+def get_path(document: Any, path: list) -> Any:
+    for key in path:
+        try:
+            document = document[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return document
+
+
+def describe_delta(prev: Any, ops: list[list]) -> dict[str, dict]:
+    """``{"a.b.0.c": {"from": ..., "to": ...}}`` for every operation, the shape ``compute_diff`` returns."""
+    changes = {}
+    for op in ops:
+        changes[".".join(str(key) for key in op[0])] = {
+            "from": get_path(prev, op[0]),
+            "to": op[1] if len(op) > 1 else None,
+        }
+    return changes
+
+
+def plan_version(version: int, previous: tuple[int, Any] | None, document: Any) -> tuple[int, str | None]:
+    """
+    Decides how to store ``document`` as ``version``, given the previous version's ``(keyframe_version, document)``.
+
+    Returns ``(keyframe_version, delta)``; a ``None`` delta means the version is a keyframe and is stored in full.
+    A version is a keyframe every ``KEYFRAME_INTERVAL`` versions, or when its delta isn't much smaller than the document.
+    """
+    if previous is None:
+        return version, None
+
+    keyframe_version, previous_document = previous
+    delta = msgspec.json.encode(diff_documents(previous_document, document))
+    if version - keyframe_version >= KEYFRAME_INTERVAL or len(delta) * 2 >= len(msgspec.json.encode(document)):
+        return version, None
+    return keyframe_version, delta.decode()
+
+
+def replay(rows: Iterable, read_keyframe: Callable[[Any], Any]) -> Iterator[tuple[Any, Any, list | None]]:
+    """
+    Reconstructs history rows ordered by version, starting at a keyframe.
+
+    Yields ``(row, document, ops)``; ``ops`` is the stored delta, or ``None`` for keyframes.
+    """
+    document = None
+    for row in rows:
+        if row["delta"] is None:
+            document = read_keyframe(row)
+            yield row, document, None
+        else:
+            ops = msgspec.json.decode(row["delta"])
+            document = apply_delta(document, ops)
+            yield row, document, ops
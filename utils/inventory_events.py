@@ -0,0 +1,133 @@
+"""
+Typed inventory history events (price, quantity and order changes).
+
+Events are derived from a history version's ``diff_from``/``diff_to`` when the version is
+written and stored in ``{item}s_inventory_events`` (see ``ItemHistoryDB``), so the history
+endpoints read a few narrow rows instead of walking every version.
+
+Derive events for history written before the events tables existed with:
+    python -m utils.inventory_events
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+# Item name -> diff_from/diff_to key of each tracked field (and whether it has orders, and how its quantity reason is read); items without an entry get no events
+EVENT_FIELDS = {
+    "component": {
+        "price": "price",
+        "quantity": "quantity",
+        "quantity_reason": "latest_change_quantity",
+        # Components checked the reason for "category" before "manual"/"changed", the other items after
+        "category_reason_first": True,
+        "orders": True,
+    },
+    "sheet": {
+        "price": "price_per_pound",
+        "quantity": "quantity",
+        "quantity_reason": "latest_change_quantity",
+        "orders": True,
+    },
+    "laser_cut_part": {
+        "quantity": "inventory_data.quantity",
+        "quantity_reason": "modified_date",
+    },
+}
+
+
+def _changed(from_value: Any, to_value: Any) -> bool:
+    # Both known, different and comparable, as the history handlers checked
+    if from_value is None or to_value is None or from_value == to_value:
+        return False
+    try:
+        return to_value > from_value or to_value < from_value
+    except TypeError:
+        return False
+
+
+def _quantity_reason(reason: str, orders_changed: bool, category_first: bool = False) -> str:
+    reason = reason.lower()
+    is_category = "category" in reason
+    is_manual = "manual" in reason or "changed" in reason
+    if orders_changed or "order" in reason:
+        return "Order modification"
+    elif is_category and (category_first or not is_manual):
+        return "Category update"
+    elif is_manual:
+        return "Manual update"
+    return "Unknown"
+
+
+def derive_events(item_name: str, diff_from: dict, diff_to: dict) -> list[tuple[str, str, dict, dict]]:
+    """
+    Returns ``(kind, event_type, details, payload)`` for every tracked change in one history version.
+
+    ``payload`` holds the kind-specific fields of the endpoint's response (``from_price``, ``to_quantity``, ...).
+    """
+    fields = EVENT_FIELDS.get(item_name)
+    if not fields:
+        return []
+
+    events = []
+    from_orders = diff_from.get("orders") or []
+    to_orders = diff_to.get("orders") or []
+
+    if price_key := fields.get("price"):
+        from_price, to_price = diff_from.get(price_key), diff_to.get(price_key)
+        if _changed(from_price, to_price):
+            events.append(
+                (
+                    "price",
+                    "price_increased" if to_price > from_price else "price_decreased",
+                    {"modification_reason": "Manual update"},
+                    {"from_price": from_price, "to_price": to_price},
+                )
+            )
+
+    if quantity_key := fields.get("quantity"):
+        from_quantity, to_quantity = diff_from.get(quantity_key), diff_to.get(quantity_key)
+        if _changed(from_quantity, to_quantity):
+            reason_key = fields["quantity_reason"]
+            reason = f"{diff_from.get(reason_key) or ''}{diff_to.get(reason_key) or ''}"
+            orders_changed = bool(from_orders and to_orders and from_orders != to_orders)
+            events.append(
+                (
+                    "quantity",
+                    "quantity_added" if to_quantity > from_quantity else "quantity_removed",
+                    {"modification_reason": _quantity_reason(reason, orders_changed, fields.get("category_reason_first", False))},
+                    {"from_quantity": from_quantity, "to_quantity": to_quantity},
+                )
+            )
+
+    if fields.get("orders"):
+        event = None
+        if not from_orders and to_orders:
+            event = ("order_added", {"new_orders": to_orders})
+        elif from_orders and not to_orders:
+            event = ("order_removed", {"removed_orders": from_orders})
+        elif from_orders != to_orders:
+            event = ("order_modified", {"from": from_orders, "to": to_orders})
+
+        if event:
+            quantity_key = fields["quantity"]
+            quantity_changed = quantity_key in diff_from or quantity_key in diff_to
+            quantity_change = {"from_quantity": diff_from.get(quantity_key), "to_quantity": diff_to.get(quantity_key)}
+            events.append(("orders", event[0], event[1], {"quantity_change": quantity_change if quantity_changed else None}))
+
+    return events
+
+
+async def main():
+    from utils.database.item_history_db import ItemHistoryDB
+    from utils.database.pool_registry import PoolRegistry
+
+    for item_name in EVENT_FIELDS:
+        count = await ItemHistoryDB(item_name).backfill_events()
+        print(f"{item_name}: derived {count} events")
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import msgspec
+from tornado.ioloop import IOLoop
+
+from config.environments import Environment
+
+
+class LogFilter(msgspec.Struct):
+    """Filters for ``LogIndex.query``; ``None`` means no restriction."""
+
+    levels: set[str] | None = None
+    since: float | None = None
+    until: float | None = None
+    ips: set[str] | None = None
+    text: str | None = None
+
+    def matches(self, entry: dict) -> bool:
+        if self.levels is not None and entry.get("level") not in self.levels:
+            return False
+        ts = entry.get("ts", 0.0)
+        if self.since is not None and ts < self.since:
+            return False
+        if self.until is not None and ts > self.until:
+            return False
+        if self.ips is not None and entry.get("ip") not in self.ips:
+            return False
+        if self.text and self.text not in entry.get("msg", "").lower() and self.text != entry.get("level", "").lower():
+            return False
+        return True
+
+    def may_match(self, block: "LogBlock") -> bool:
+        if self.levels is not None and not (self.levels & block.levels):
+            return False
+        if self.since is not None and block.last_ts < self.since:
+            return False
+        if self.until is not None and block.first_ts > self.until:
+            return False
+        if self.ips is not None and not (self.ips & block.ips):
+            return False
+        return True
+
+
+class LogBlock(msgspec.Struct):
+    """A run of whole lines, ``[start, end)`` bytes, and what they contain."""
+
+    start: int
+    end: int
+    first_ts: float
+    last_ts: float
+    levels: set[str]
+    ips: set[str]
+
+    def copy(self) -> "LogBlock":
+        return LogBlock(self.start, self.end, self.first_ts, self.last_ts, set(self.levels), set(self.ips))
+
+
+class LogIndex:
+    """
+    Sparse index over the JSON-lines server log (see ``JsonLinesFormatter``).
+
+    The file is split into blocks of about ``BLOCK_BYTES`` whole lines, each recording its time
+    range and the levels and client IPs it contains. The index is extended incrementally from
+    the last indexed offset, so a query only reads the blocks its filters can match, and a page
+    is addressed by byte offset: ``before`` pages back towards the start, ``after`` follows the
+    tail. Scanning and reading run on a thread pool, off the event loop.
+    """
+
+    BLOCK_BYTES = 64 * 1024
+    READ_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self.blocks: list[LogBlock] = []
+        self.size = 0  # indexed bytes; always ends on a line boundary
+        self._file_id: tuple[int, int] | None = None
+        self._lock = asyncio.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    # -------------------------
+    # Indexing
+    # -------------------------
+    async def refresh(self):
+        async with self._lock:
+            file_id, size, blocks = await IOLoop.current().run_in_executor(
+                self.executor,
+                self._scan,
+                self._file_id,
+                self.size,
+                self.blocks[-1].copy() if self.blocks else None,
+            )
+            if file_id != self._file_id or size < self.size:
+                # Rotated or truncated (the log is recreated on startup): start over
+                self.blocks = []
+            elif blocks and self.blocks and blocks[0].start == self.blocks[-1].start:
+                self.blocks.pop()
+            self.blocks.extend(blocks)
+            self._file_id = file_id
+            self.size = size
+
+    def _scan(self, file_id: tuple[int, int] | None, offset: int, last_block: LogBlock | None) -> tuple[tuple[int, int] | None, int, list[LogBlock]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None, 0, []
+
+        current_id = (stat.st_dev, stat.st_ino)
+        if current_id != file_id or stat.st_size < offset:
+            offset, last_block = 0, None
+        if stat.st_size == offset:
+            return current_id, offset, []
+
+        blocks = [last_block] if last_block else []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while offset < stat.st_size:
+                chunk = f.read(min(self.READ_BYTES, stat.st_size - offset))
+                complete = chunk.rfind(b"\n") + 1
+                if not complete:
+                    if len(chunk) < self.READ_BYTES:
+                        break  # the last line is still being written
+                    # A line longer than READ_BYTES isn't indexed, skip to its end
+                    while (more := f.read(self.READ_BYTES)) and b"\n" not in more:
+                        complete += len(more)
+                    if not more:
+                        break
+                    offset += len(chunk) + complete + more.index(b"\n") + 1
+                    f.seek(offset)
+                    continue
+                for line_offset, line in self._split(chunk[:complete], offset):
+                    entry = self._decode(line)
+                    if entry is None:
+                        continue
+                    ts = entry.get("ts", 0.0)
+                    block = blocks[-1] if blocks else None
+                    if block is None or block.end - block.start >= self.BLOCK_BYTES or block.end != line_offset:
+                        block = LogBlock(line_offset, line_offset, ts, ts, set(), set())
+                        blocks.append(block)
+                    block.end = line_offset + len(line) + 1
+                    block.first_ts = min(block.first_ts, ts)
+                    block.last_ts = max(block.last_ts, ts)
+                    block.levels.add(entry.get("level"))
+                    if ip := entry.get("ip"):
+                        block.ips.add(ip)
+                offset += complete
+                f.seek(offset)
+        return current_id, offset, blocks
+
+    @staticmethod
+    def _split(data: bytes, base_offset: int) -> Iterator[tuple[int, bytes]]:
+        position = 0
+        while position < len(data):
+            newline = data.find(b"\n", position)
+            end = len(data) if newline == -1 else newline
+            yield base_offset + position, data[position:end]
+            position = end + 1
+
+    @staticmethod
+    def _decode(line: bytes) -> dict | None:
+        try:
+            entry = msgspec.json.decode(line)
+        except msgspec.DecodeError:
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    async def query(self, log_filter: LogFilter | None = None, before: int | None = None, after: int | None = None, limit: int = 200) -> dict:
+        """
+        Returns up to ``limit`` matching entries, oldest first, each with its byte ``offset``.
+
+        Without ``after`` the newest entries before ``before`` (default: the end) are returned;
+        with ``after`` the oldest entries from that offset on. The returned ``before``/``after``
+        offsets continue the paging in either direction; ``more`` is set when ``limit`` cut it short.
+        """
+        await self.refresh()
+        log_filter = log_filter or LogFilter()
+        blocks = self.blocks
+        size = self.size
+        forward = after is not None
+
+        if forward:
+            after = 0 if after > size else after
+            candidates = [b for b in blocks if b.end > after and log_filter.may_match(b)]
+        else:
+            before = size if before is None or before > size else before
+            candidates = [b for b in reversed(blocks) if b.start < before and log_filter.may_match(b)]
+
+        entries = []
+        more = False
+        for block in candidates:
+            found = await IOLoop.current().run_in_executor(self.executor, self._read_block, block, log_filter)
+            if forward:
+                found = [entry for entry in found if entry["offset"] >= after]
+            else:
+                found = [entry for entry in found if entry["offset"] < before][::-1]
+            entries.extend(found[: limit - len(entries)])
+            if len(entries) >= limit:
+                more = True
+                break
+
+        if not forward:
+            entries.reverse()
+        first, last = (entries[0], entries[-1]) if entries else (None, None)
+        if forward:
+            next_before = first["offset"] if first else after
+            next_after = last["offset"] + last["_length"] if more else size
+        else:
+            next_before = first["offset"] if more else 0
+            next_after = last["offset"] + last["_length"] if last else before
+
+        for entry in entries:
+            del entry["_length"]
+        return {"entries": entries, "before": next_before, "after": next_after, "more": more, "size": size}
+
+    def _read_block(self, block: LogBlock, log_filter: LogFilter) -> list[dict]:
+        with open(self.path, "rb") as f:
+            f.seek(block.start)
+            data = f.read(block.end - block.start)
+
+        entries = []
+        for offset, line in self._split(data, block.start):
+            entry = self._decode(line)
+            if entry is not None and log_filter.matches(entry):
+                entry["offset"] = offset
+                entry["_length"] = len(line) + 1
+                entries.append(entry)
+        return entries
+
+
+server_log_index = LogIndex(os.path.join(Environment.DATA_PATH, "server.jsonl"))
@@ -0,0 +1,77 @@
+import json
+import logging
+from typing import Any
+
+import aiohttp
+
+from config.environments import Environment
+
+
+class RendererError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class RendererClient:
+    """
+    Client for the puppeteer renderer service.
+
+    One ``aiohttp.ClientSession`` is shared by every request so connections to the
+    renderer are kept alive instead of being re-established per PDF/PNG.
+    """
+
+    TIMEOUT = aiohttp.ClientTimeout(total=90)
+    BATCH_TIMEOUT = aiohttp.ClientTimeout(total=600)
+
+    _session: aiohttp.ClientSession | None = None
+
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        if cls._session is None or cls._session.closed:
+            cls._session = aiohttp.ClientSession()
+        return cls._session
+
+    @classmethod
+    async def close(cls):
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+
+    @staticmethod
+    def rewrite_url(url: str) -> str:
+        # CRITICAL: url must be reachable from the renderer container.
+        # If user provides http://invi.go/... rewrite to the docker service name:
+        return url.replace("http://invi.go", f"http://invigo_server:{Environment.PORT}").replace("http://localhost:5057", "http://127.0.0.1:5057")
+
+    @classmethod
+    async def _post(cls, path: str, payload: dict[str, Any], timeout: aiohttp.ClientTimeout) -> bytes:
+        async with cls.get_session().post(f"{Environment.PUPPETEER_URL}{path}", json=payload, timeout=timeout) as resp:
+            data = await resp.read()
+            if resp.status != 200:
+                raise RendererError(resp.status, data.decode(errors="replace"))
+
+            try:
+                timings = json.loads(resp.headers.get("X-Render-Timings", "{}"))
+            except ValueError:
+                timings = {}
+            target = payload.get("url") or f"{len(payload['urls'])} urls"
+            logging.info(f"[Renderer] {path} {target}: {len(data)} bytes, timings (ms) {timings}")
+            return data
+
+    @classmethod
+    async def render_pdf(cls, url: str, local_storage: dict) -> bytes:
+        return await cls._post("/pdf", {"url": cls.rewrite_url(url), "localStorage": local_storage}, cls.TIMEOUT)
+
+    @classmethod
+    async def render_png(cls, url: str, local_storage: dict) -> bytes:
+        return await cls._post("/png", {"url": cls.rewrite_url(url), "localStorage": local_storage}, cls.TIMEOUT)
+
+    @classmethod
+    async def render_pdf_batch(cls, urls: list[str], local_storage: dict) -> bytes:
+        return await cls._post(
+            "/pdf/batch",
+            {"urls": [cls.rewrite_url(url) for url in urls], "localStorage": local_storage},
+            cls.BATCH_TIMEOUT,
+        )
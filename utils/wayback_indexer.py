@@ -0,0 +1,153 @@
+"""
+Ingests daily backups into the wayback_item_history table.
+
+Each daily snapshot in the backup store (and each legacy ``Daily Backup*.zip``) is
+decoded once (on a worker thread) and its items are stored against the backup's date,
+so ``/fetch_data`` becomes a single indexed read instead of re-opening every backup
+per request.
+
+Backfill every existing backup with:
+    python -m utils.wayback_indexer
+"""
+
+import asyncio
+import logging
+import os
+import zipfile
+from datetime import datetime
+
+import msgspec
+
+from config.environments import Environment
+from utils.backup.store import BackupStore
+from utils.database.pool_registry import PoolRegistry
+from utils.database.wayback_db import WaybackDB
+
+# Backup file -> list key inside it
+INVENTORY_TYPES = {
+    "components_inventory": "components",
+    "laser_cut_inventory": "laser_cut_parts",
+    "sheets_inventory": "sheets",
+}
+
+
+def _to_float(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _item_name(inventory_type: str, item: dict) -> str | None:
+    if inventory_type == "components_inventory":
+        return item.get("part_name")
+    if inventory_type == "sheets_inventory" and "name" not in item:
+        try:  # Have to generate name
+            return f"{item['thickness']} {item['material']} {item['length']:.3f}x{item['width']:.3f}"
+        except (KeyError, TypeError, ValueError):
+            return None
+    return item.get("name")
+
+
+def extract_items(inventory_type: str, inventory: dict) -> list[tuple[str, str, float | None, float | None]]:
+    """Returns (inventory_type, item_name, quantity, price) rows for both the old (dict) and new (list) formats."""
+    entries = inventory.get(INVENTORY_TYPES[inventory_type], [])
+    if isinstance(entries, dict):  # Old inventory format, keyed by name
+        named = entries.items()
+    else:
+        named = ((_item_name(inventory_type, item), item) for item in entries)
+
+    rows = []
+    for name, item in named:
+        if name and isinstance(item, dict) and "quantity" in item:
+            # Sheets don't have prices
+            rows.append((inventory_type, name, _to_float(item["quantity"]), _to_float(item.get("price"))))
+    return rows
+
+
+def _read_inventory_files(file_path: str) -> dict[str, bytes]:
+    """Inventory type -> JSON contents, from a backup zip or a snapshot manifest in the backup store."""
+    files = {}
+    if file_path.endswith(".json"):
+        store = BackupStore(os.path.dirname(os.path.dirname(file_path)))
+        snapshot = store.load_snapshot(os.path.basename(file_path)[: -len(".json")])
+        for inventory_type in INVENTORY_TYPES:
+            if (data := store.read_file(snapshot, f"{inventory_type}.json")) is not None:
+                files[inventory_type] = data
+        return files
+
+    with zipfile.ZipFile(file_path, "r") as zip_ref:
+        names = set(zip_ref.namelist())
+        for inventory_type in INVENTORY_TYPES:
+            if f"{inventory_type}.json" in names:
+                with zip_ref.open(f"{inventory_type}.json") as f:
+                    files[inventory_type] = f.read()
+    return files
+
+
+def read_backup(file_path: str) -> list[tuple[str, str, float | None, float | None]]:
+    rows = []
+    for inventory_type, data in _read_inventory_files(file_path).items():
+        try:
+            rows.extend(extract_items(inventory_type, msgspec.json.decode(data)))
+        except (msgspec.DecodeError, AttributeError) as e:
+            logging.warning(f"[WaybackIndexer] Skipping {inventory_type} in {file_path}: {e}")
+    return rows
+
+
+def find_daily_backups(backups_path: str) -> list[tuple[str, float]]:
+    backups = []
+    store_path = os.path.abspath(Environment.BACKUP_PATH)
+    for root, dirs, files in os.walk(backups_path):
+        # Chunks are read through their snapshot manifests below
+        dirs[:] = [name for name in dirs if os.path.abspath(os.path.join(root, name)) != store_path]
+        for file in files:
+            if file.startswith("Daily Backup") and file.endswith(".zip"):
+                file_path = os.path.join(root, file)
+                backups.append((file_path, os.path.getmtime(file_path)))
+
+    store = BackupStore(store_path)
+    for snapshot in store.list_snapshots():
+        if snapshot.kind == "daily":
+            backups.append((os.path.join(store.snapshots_path, f"{snapshot.id}.json"), snapshot.created_at))
+    return sorted(backups, key=lambda backup: backup[1])
+
+
+class WaybackIndexer:
+    def __init__(self, wayback_db: WaybackDB):
+        self.wayback_db = wayback_db
+        self._lock = asyncio.Lock()
+
+    async def index_new_backups(self) -> int:
+        """Ingests every daily backup that is new or was rewritten since it was last ingested."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            backups_path = os.path.join(Environment.DATA_PATH, "backups")
+            backups = await loop.run_in_executor(None, find_daily_backups, backups_path)
+            ingested = await self.wayback_db.get_ingested_backups()
+
+            count = 0
+            for file_path, mtime in backups:
+                file_name = os.path.relpath(file_path, backups_path)
+                if ingested.get(file_name) == mtime:
+                    continue
+                try:
+                    rows = await loop.run_in_executor(None, read_backup, file_path)
+                    await self.wayback_db.ingest_snapshot(file_name, mtime, datetime.fromtimestamp(mtime).date(), rows)
+                    count += 1
+                    logging.info(f"[WaybackIndexer] Ingested {file_name}: {len(rows)} items")
+                except Exception as e:
+                    logging.error(f"[WaybackIndexer] Failed to ingest {file_name}: {e}")
+            return count
+
+
+async def main():
+    indexer = WaybackIndexer(WaybackDB())
+    count = await indexer.index_new_backups()
+    print(f"Ingested {count} backups")
+    await PoolRegistry.close_all()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())